@@ -26,14 +26,13 @@ from functools import partial
 from datetime import datetime
 import tempfile
 import os
-import json
 import subprocess
 from copy import deepcopy
 from xml.dom import minidom
 
 from PyQt5 import QtCore, QtGui, QtSvg, QtWidgets
 
-from lib import unidades
+from lib import unidades, projectArchive
 from lib.project import Project
 from lib.thread import WaitforClick
 from lib.config import Preferences
@@ -42,7 +41,7 @@ from UI import texteditor, UI_corriente
 from UI.plots import Plot_Distribucion
 from UI.widgets import createAction, Table_Graphics, PathConfig
 from UI.prefPFD import ConfLineDialog
-from equipment import *
+from equipment import UI_equipments, flux, spreadsheet
 from equipment.parents import equipment
 
 # Value for mouse wheel zoom
@@ -63,7 +62,8 @@ class SelectStreamProject(QtWidgets.QDialog):
             "pychemqt", "Select pychemqt project file")
         patrones = []
         patrones.append(QtWidgets.QApplication.translate(
-            "pychemqt", "pychemqt project file") + " (*.pcq)")
+            "pychemqt", "pychemqt project file") +
+            " (*.pcq *.%s)" % projectArchive.EXTENSION)
         patron = ";;".join(patrones)
         self.filename = PathConfig(label + ":", msg=msg, patron=patron)
         self.filename.valueChanged.connect(self.changeproject)
@@ -91,17 +91,24 @@ class SelectStreamProject(QtWidgets.QDialog):
         self.status.setText(st)
         QtWidgets.QApplication.processEvents()
         try:
-            with open(path, "r") as file:
-                self.project = json.load(file)
+            project = projectArchive.load(path)
+            # Copy the streams and close the archive files, the dialog only
+            # need them
+            if isinstance(project, projectArchive.ProjectArchive):
+                with project:
+                    self.streams = dict(project["stream"])
+            else:
+                self.streams = project["stream"]
         except Exception as e:
             print(e)
-            self.status.setText(QtGui.QApplication.translate(
+            self.status.setText(QtWidgets.QApplication.translate(
                 "pychemqt", "Failed to loading project..."))
+            return
         self.buttonBox.button(QtWidgets.QDialogButtonBox.Ok).setEnabled(True)
         self.status.setText(QtWidgets.QApplication.translate(
             "pychemqt", "Project loaded succesfully"))
         self.stream.clear()
-        for stream in sorted(self.project["stream"].keys()):
+        for stream in sorted(self.streams.keys()):
             self.stream.addItem(stream)
 
 
@@ -431,7 +438,7 @@ class StreamItem(GeometricItem, QtWidgets.QGraphicsPathItem, GraphicsEntity):
         dialog = SelectStreamProject()
         if dialog.exec_():
             indice = dialog.stream.currentText()
-            data = dialog.project["stream"][indice]
+            data = dialog.streams[indice]
             corriente = Corriente()
             corriente.readFromJSON(data)
             self.setCorriente(corriente)
@@ -20,7 +20,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 
 from configparser import ConfigParser
 from functools import partial
-import json
+from importlib import import_module
 import os
 import platform
 import sys
@@ -34,18 +34,58 @@ from UI.widgets import createAction, ClickableLabel
 from lib.config import (conf_dir, QTSETTING_FILE, setMainWindowConfig,
                         IMAGE_PATH)
 from lib.project import Project
+from lib import projectArchive
 from lib.EoS import K, H
-from equipment import *  # noqa
+from equipment import UI_equipments
 from tools import (UI_confComponents, UI_Preferences, UI_confTransport,
                    UI_confThermo, UI_confUnits, UI_confResolution, UI_databank,
-                   UI_Tables, UI_unitConverter, UI_psychrometry, costIndex,
-                   doi, dependences)
+                   UI_unitConverter, UI_psychrometry, costIndex, dependences)
 
 __version__ = "0.1.0"
 
-other_window = (plots.Binary_distillation, UI_Tables.TablaMEoS,
-                UI_Tables.PlotMEoS)
-other_window_names = [cl.__name__ for cl in other_window]
+# Other windows saved in project files, the meos tools are imported when a
+# project with these windows is opened
+other_window_names = ["Binary_distillation", "TablaMEoS", "PlotMEoS"]
+
+
+def otherWindow(name):
+    """Return the class of a window saved in project file"""
+    if name not in other_window_names:
+        raise ValueError("Unknown window %s" % name)
+    if name == "Binary_distillation":
+        return plots.Binary_distillation
+    from tools import UI_Tables
+    return getattr(UI_Tables, name)
+
+
+class LazyMenu(QtWidgets.QMenu):
+    """Menu populated with the actions of other menu class imported in first
+    show, so the module of the tool is not imported at startup
+
+    Parameters
+    ----------
+    title : str
+        Menu title
+    module : str
+        Module with the menu class
+    cls : str
+        Name of menu class, it must be populated in its aboutToShow signal
+    """
+    def __init__(self, title, module, cls, parent=None):
+        super(LazyMenu, self).__init__(title, parent)
+        self.module = module
+        self.cls = cls
+        self.menu = None
+        self.aboutToShow.connect(self.populate)
+
+    def populate(self):
+        """Create the real menu if necessary and show its actions"""
+        if self.menu is None:
+            menu = getattr(import_module(self.module), self.cls)
+            self.menu = menu(parent=self.parent())
+        self.clear()
+        self.menu.aboutToShow.emit()
+        self.addActions(self.menu.actions())
 
 
 class TabWidget(QtWidgets.QTabWidget):
@@ -599,43 +639,43 @@ class UI_pychemqt(QtWidgets.QMainWindow):
         actionDivider, botonDivider = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Divider"),
             icon="equipment/divider",
-            slot=partial(self.addEquipment, UI_divider),
+            slot=partial(self.addEquipment, "UI_divider"),
             button=True, parent=toolboxContenido)
         l2.addWidget(botonDivider)
         actionValve, botonValve = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Valve"),
             icon="equipment/valve",
-            slot=partial(self.addEquipment, UI_valve),
+            slot=partial(self.addEquipment, "UI_valve"),
             button=True, parent=toolboxContenido)
         l2.addWidget(botonValve)
         actionMixer, botonMixer = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Mixer"),
             icon="equipment/mixer",
-            slot=partial(self.addEquipment, UI_mixer),
+            slot=partial(self.addEquipment, "UI_mixer"),
             button=True, parent=toolboxContenido)
         l2.addWidget(botonMixer)
         actionCompresor, botonCompresor = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Compressor"),
             icon="equipment/compressor",
-            slot=partial(self.addEquipment, UI_compressor),
+            slot=partial(self.addEquipment, "UI_compressor"),
             button=True, parent=toolboxContenido)
         l2.addWidget(botonCompresor)
         actionTurbine, botonTurbine = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Turbine"),
             icon="equipment/turbine",
-            slot=partial(self.addEquipment, UI_turbine),
+            slot=partial(self.addEquipment, "UI_turbine"),
             button=True, parent=toolboxContenido)
         l2.addWidget(botonTurbine)
         actionPump, botonPump = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Pump"),
             icon="equipment/pump",
-            slot=partial(self.addEquipment, UI_pump),
+            slot=partial(self.addEquipment, "UI_pump"),
             button=True, parent=toolboxContenido)
         l2.addWidget(botonPump)
         actionPipe, botonPipe = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Pipe"),
             icon="equipment/pipe",
-            slot=partial(self.addEquipment, UI_pipe),
+            slot=partial(self.addEquipment, "UI_pipe"),
             button=True, parent=toolboxContenido)
         l2.addWidget(botonPipe)
         layouttoolbox.addItem(l2)
@@ -650,20 +690,20 @@ class UI_pychemqt(QtWidgets.QMainWindow):
             QtWidgets.QApplication.translate(
                 "pychemqt", "Distillation tower (method FUG)"),
             icon="equipment/columnFUG",
-            slot=partial(self.addEquipment, UI_columnFUG),
+            slot=partial(self.addEquipment, "UI_columnFUG"),
             button=True, parent=toolboxContenido)
         l3.addWidget(botonTorreFUG)
         actionFlash, botonFlash = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Flash"),
             icon="equipment/flash",
-            slot=partial(self.addEquipment, UI_flash),
+            slot=partial(self.addEquipment, "UI_flash"),
             button=True, parent=toolboxContenido)
         l3.addWidget(botonFlash)
         actionTorre, botonTorre = createAction(
             QtWidgets.QApplication.translate(
                 "pychemqt", "Distillation tower (exact method)"),
             icon="equipment/tower",
-            slot=partial(self.addEquipment, UI_tower),
+            slot=partial(self.addEquipment, "UI_tower"),
             button=True, parent=toolboxContenido)
         l3.addWidget(botonTorre)
         botonTorre.setEnabled(False)
@@ -671,34 +711,34 @@ class UI_pychemqt(QtWidgets.QMainWindow):
             QtWidgets.QApplication.translate(
                 "pychemqt", "Generic heat exchanger"),
             icon="equipment/heatExchanger",
-            slot=partial(self.addEquipment, UI_heatExchanger),
+            slot=partial(self.addEquipment, "UI_heatExchanger"),
             button=True, parent=toolboxContenido)
         l3.addWidget(botonheatExchanger)
         actionhairpin, botonhairpin = createAction(
             QtWidgets.QApplication.translate(
                 "pychemqt", "Hairpin heat exchanger"),
             icon="equipment/hairpin",
-            slot=partial(self.addEquipment, UI_hairpin),
+            slot=partial(self.addEquipment, "UI_hairpin"),
             button=True, parent=toolboxContenido)
         l3.addWidget(botonhairpin)
         actionShellTube, botonShellTube = createAction(
             QtWidgets.QApplication.translate(
                 "pychemqt", "Shell and tube heat exchanger"),
             icon="equipment/shellTube",
-            slot=partial(self.addEquipment, UI_shellTube),
+            slot=partial(self.addEquipment, "UI_shellTube"),
             button=True, parent=toolboxContenido)
         l3.addWidget(botonShellTube)
         actionFireHeater, botonFireHeater = createAction(
             QtWidgets.QApplication.translate(
                 "pychemqt", "Fired Heater heat exchanger"),
             icon="equipment/fireHeater",
-            slot=partial(self.addEquipment, UI_fireHeater),
+            slot=partial(self.addEquipment, "UI_fireHeater"),
             button=True, parent=toolboxContenido)
         l3.addWidget(botonFireHeater)
         actionReactor, botonReactor = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Reactor"),
             icon="equipment/reactor",
-            slot=partial(self.addEquipment, UI_reactor),
+            slot=partial(self.addEquipment, "UI_reactor"),
             button=True, parent=toolboxContenido)
         l3.addWidget(botonReactor)
         layouttoolbox.addItem(l3)
@@ -712,67 +752,67 @@ class UI_pychemqt(QtWidgets.QMainWindow):
         actionBaghouse, botonBaghouse = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Baghouse"),
             icon="equipment/baghouse",
-            slot=partial(self.addEquipment, UI_baghouse),
+            slot=partial(self.addEquipment, "UI_baghouse"),
             button=True, parent=toolboxContenido)
         l4.addWidget(botonBaghouse)
         actionCentrifuge, botonCentrifuge = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Centrifuge"),
             icon="equipment/centrifuge",
-            slot=partial(self.addEquipment, UI_centrifuge),
+            slot=partial(self.addEquipment, "UI_centrifuge"),
             button=True, parent=toolboxContenido)
         l4.addWidget(botonCentrifuge)
         botonCentrifuge.setEnabled(False)
         actionCiclon, botonCiclon = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Cyclone"),
             icon="equipment/ciclon",
-            slot=partial(self.addEquipment, UI_ciclon),
+            slot=partial(self.addEquipment, "UI_ciclon"),
             button=True, parent=toolboxContenido)
         l4.addWidget(botonCiclon)
         actionElectroPrecipitator, botonElectroPrecipitator = createAction(
             QtWidgets.QApplication.translate(
                 "pychemqt", "Electric precipitator"),
             icon="equipment/electricPrecipitator",
-            slot=partial(self.addEquipment, UI_electricPrecipitator),
+            slot=partial(self.addEquipment, "UI_electricPrecipitator"),
             button=True, parent=toolboxContenido)
         l4.addWidget(botonElectroPrecipitator)
         actionGrinder, botonGrinder = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Grinder"),
             icon="equipment/grinder",
-            slot=partial(self.addEquipment, UI_grinder),
+            slot=partial(self.addEquipment, "UI_grinder"),
             button=True, parent=toolboxContenido)
         l4.addWidget(botonGrinder)
         botonGrinder.setEnabled(False)
         actionDryer, botonDryer = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Solids dryer"),
             icon="equipment/dryer",
-            slot=partial(self.addEquipment, UI_dryer),
+            slot=partial(self.addEquipment, "UI_dryer"),
             button=True, parent=toolboxContenido)
         l4.addWidget(botonDryer)
         actionWasher, botonWasher = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Solid washer"),
             icon="equipment/solidWasher",
-            slot=partial(self.addEquipment, UI_solidWasher),
+            slot=partial(self.addEquipment, "UI_solidWasher"),
             button=True, parent=toolboxContenido)
         l4.addWidget(botonWasher)
         botonWasher.setEnabled(False)
         actionVacuum, botonVacuum = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Vacuum filter"),
             icon="equipment/vacuumfilter",
-            slot=partial(self.addEquipment, UI_vacuum),
+            slot=partial(self.addEquipment, "UI_vacuum"),
             button=True, parent=toolboxContenido)
         l4.addWidget(botonVacuum)
         botonVacuum.setEnabled(False)
         actionScrubber, botonScrubber = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Scrubber"),
             icon="equipment/scrubber",
-            slot=partial(self.addEquipment, UI_scrubber),
+            slot=partial(self.addEquipment, "UI_scrubber"),
             button=True, parent=toolboxContenido)
         l4.addWidget(botonScrubber)
         actionGravityChandler, botonGravityChandler = createAction(
             QtWidgets.QApplication.translate(
                 "pychemqt", "Gravity settling chamber"),
             icon="equipment/gravityChamber",
-            slot=partial(self.addEquipment, UI_gravityChamber),
+            slot=partial(self.addEquipment, "UI_gravityChamber"),
             button=True, parent=toolboxContenido)
         l4.addWidget(botonGravityChandler)
         layouttoolbox.addItem(l4)
@@ -786,14 +826,14 @@ class UI_pychemqt(QtWidgets.QMainWindow):
         actionControler, botonControler = createAction(
             QtWidgets.QApplication.translate("pychemqt", "PID controller"),
             icon="equipment/controller",
-            slot=partial(self.addEquipment, UI_solidWasher),
+            slot=partial(self.addEquipment, "UI_solidWasher"),
             button=True, parent=toolboxContenido)
         l5.addWidget(botonControler)
         botonControler.setEnabled(False)
         actionControlValve, botonControlValve = createAction(
             QtWidgets.QApplication.translate("pychemqt", "Control valve"),
             icon="equipment/controlvalve",
-            slot=partial(self.addEquipment, UI_vacuum),
+            slot=partial(self.addEquipment, "UI_vacuum"),
             button=True, parent=toolboxContenido)
         l5.addWidget(botonControlValve)
         botonControlValve.setEnabled(False)
@@ -801,7 +841,7 @@ class UI_pychemqt(QtWidgets.QMainWindow):
             QtWidgets.QApplication.translate(
                 "pychemqt", "External spreadsheet module"),
             icon="equipment/spreadsheet",
-            slot=partial(self.addEquipment, UI_spreadsheet),
+            slot=partial(self.addEquipment, "UI_spreadsheet"),
             button=True,
             parent=toolboxContenido)
         if os.environ["ezodf"] != "True" and os.environ["openpyxl"] != "True" \
@@ -972,7 +1012,9 @@ class UI_pychemqt(QtWidgets.QMainWindow):
         self.menuHerramientas.addAction(conversorUnidadesAction)
         self.menuHerramientas.addAction(currencyAction)
         self.menuHerramientas.addAction(TablaPeriodicaAction)
-        self.menuMEoS = UI_Tables.Menu(parent=self)
+        self.menuMEoS = LazyMenu(
+            QtWidgets.QApplication.translate("pychemqt", "MEoS properties"),
+            "tools.UI_Tables", "Menu", parent=self)
         self.menuHerramientas.addAction(self.menuMEoS.menuAction())
         self.menuHerramientas.addAction(psychrometricChartAction)
         self.menuHerramientas.addSeparator()
@@ -1305,46 +1347,45 @@ class UI_pychemqt(QtWidgets.QMainWindow):
         if not self.filename[indice]:
             self.fileSaveAs()
         else:
-            with open(self.filename[indice], "w") as file:
-                data = {}
-                self.getScene(indice).project.writeToJSON(data)
-
-                PFD = {}
-                win = self.centralwidget.currentWidget().subWindowList()[0]
-                PFD["x"] = win.pos().x()
-                PFD["y"] = win.pos().y()
-                PFD["height"] = win.size().height()
-                PFD["width"] = win.size().width()
-                self.currentScene.writeToJSON(PFD)
-                data["PFD"] = PFD
-
-                other = {}
-                ventanas = self.centralwidget.currentWidget().subWindowList()
-                for ind, win in enumerate(ventanas[1:]):
-                    ventana = {}
-                    ventana["class"] = win.widget().__class__.__name__
-                    ventana["x"] = win.pos().x()
-                    ventana["y"] = win.pos().y()
-                    ventana["height"] = win.size().height()
-                    ventana["width"] = win.size().width()
-
-                    widget = {}
-                    win.widget().writeToJSON(widget)
-                    ventana["window"] = widget
-                    other[ind] = ventana
-
-                    # Add dependences from other windows
-                    if widget["external_dependences"]:
-                        data["external_dependences"].add(
-                            widget["external_dependences"])
-
-                data["other"] = other
-
-                # python set are not serializable so convert to lis s
-                data["external_dependences"] = list(
-                    data["external_dependences"])
-
-                json.dump(data, file, indent=4)
+            data = {}
+            self.getScene(indice).project.writeToJSON(data)
+
+            PFD = {}
+            win = self.centralwidget.currentWidget().subWindowList()[0]
+            PFD["x"] = win.pos().x()
+            PFD["y"] = win.pos().y()
+            PFD["height"] = win.size().height()
+            PFD["width"] = win.size().width()
+            self.currentScene.writeToJSON(PFD)
+            data["PFD"] = PFD
+
+            other = {}
+            ventanas = self.centralwidget.currentWidget().subWindowList()
+            for ind, win in enumerate(ventanas[1:]):
+                ventana = {}
+                ventana["class"] = win.widget().__class__.__name__
+                ventana["x"] = win.pos().x()
+                ventana["y"] = win.pos().y()
+                ventana["height"] = win.size().height()
+                ventana["width"] = win.size().width()
+
+                widget = {}
+                win.widget().writeToJSON(widget)
+                ventana["window"] = widget
+                other[ind] = ventana
+
+                # Add dependences from other windows
+                if widget["external_dependences"]:
+                    data["external_dependences"].add(
+                        widget["external_dependences"])
+
+            data["other"] = other
+
+            # python set are not serializable so convert to lis s
+            data["external_dependences"] = list(
+                data["external_dependences"])
+
+            projectArchive.save(data, self.filename[indice])
 
             self.dirty[self.idTab] = False
             self.updateStatus(
@@ -1360,11 +1401,17 @@ class UI_pychemqt(QtWidgets.QMainWindow):
         fname = QtWidgets.QFileDialog.getSaveFileName(
             self,
             QtWidgets.QApplication.translate("pychemqt", "Save project"),
-            dir, "pychemqt project file (*.pcq)")
-        if fname:
+            dir, ";;".join([
+                "pychemqt project file (*.pcq)",
+                "pychemqt compressed project file (*.%s)" %
+                projectArchive.EXTENSION]))
+        if fname[0]:
             name = fname[0]
-            if name.split(".")[-1] != "pcq":
-                name += ".pcq"
+            if name.split(".")[-1] not in ("pcq", projectArchive.EXTENSION):
+                if projectArchive.EXTENSION in fname[1]:
+                    name += "." + projectArchive.EXTENSION
+                else:
+                    name += ".pcq"
             self.addRecentFile(name)
             self.filename[indice] = name
             self.fileSave(indice)
@@ -1386,7 +1433,8 @@ class UI_pychemqt(QtWidgets.QMainWindow):
                 self,
                 QtWidgets.QApplication.translate("pychemqt", "Open project"),
                 dir, QtWidgets.QApplication.translate(
-                    "pychemqt", "pychemqt project file") + " (*.pcq)")[0]
+                    "pychemqt", "pychemqt project file") +
+                " (*.pcq *.%s)" % projectArchive.EXTENSION)[0]
         if fname:
             try:
                 self.loadFile(fname)
@@ -1414,64 +1462,68 @@ class UI_pychemqt(QtWidgets.QMainWindow):
                 return
 
         if fname:
-            with open(fname, "r") as file:
-                data = json.load(file)
-
-            # Check availability of optional dependences necessary for the file
-            if "external_dependences" in data:
-                available = True
-                for dep in data["external_dependences"]:
-                    if os.environ[dep] != "True":
-                        available = False
-                        break
-
-                if not available:
-                    msg = QtWidgets.QApplication.translate(
-                        "pychemqt", "Failed to load")
-                    msg += " " + fname + os.linesep
-                    msg += QtWidgets.QApplication.translate(
-                            "pychemqt", "This project require")
-                    msg += ": %s" % ", ".join(data["external_dependences"])
-                    raise ImportError(msg)
-
-            self.dirty.append(False)
-            self.filename.append(fname)
-            self.addRecentFile(fname)
-
-            project = Project()
-            project.readFromJSON(data)
-            self.config.append(project.config)
-
-            mdiArea = QtWidgets.QMdiArea()
-            self.loadPFD(mdiArea)
-
-            x = data["PFD"]["x"]
-            y = data["PFD"]["y"]
-            pos = QtCore.QPoint(x, y)
-            width = data["PFD"]["width"]
-            height = data["PFD"]["height"]
-            size = QtCore.QSize(width, height)
-            mdiArea.subWindowList()[0].move(pos)
-            mdiArea.subWindowList()[0].resize(size)
-
-            mdiArea.subWindowList()[0].widget().scene().readFromJSON(data)
-            self.list.updateList(
-                mdiArea.subWindowList()[0].widget().scene().objects)
-
-            for i, ventana in data["other"].items():
-                name = ventana["class"]
-                indice = other_window_names.index(name)
-                widget = other_window[indice]
-                instance = widget.readFromJSON(ventana["window"], self)
-                mdiArea.addSubWindow(instance)
-                x = ventana["x"]
-                y = ventana["y"]
+            # The arrays of archive projects are decoded only when its entity
+            # is accessed, but all entities are rehydrated here
+            data = projectArchive.load(fname)
+            try:
+                # Check availability of optional dependences necessary for
+                # the file
+                if "external_dependences" in data:
+                    available = True
+                    for dep in data["external_dependences"]:
+                        if os.environ[dep] != "True":
+                            available = False
+                            break
+
+                    if not available:
+                        msg = QtWidgets.QApplication.translate(
+                            "pychemqt", "Failed to load")
+                        msg += " " + fname + os.linesep
+                        msg += QtWidgets.QApplication.translate(
+                                "pychemqt", "This project require")
+                        msg += ": %s" % ", ".join(data["external_dependences"])
+                        raise ImportError(msg)
+
+                self.dirty.append(False)
+                self.filename.append(fname)
+                self.addRecentFile(fname)
+
+                project = Project()
+                project.readFromJSON(data)
+                self.config.append(project.config)
+
+                mdiArea = QtWidgets.QMdiArea()
+                self.loadPFD(mdiArea)
+
+                x = data["PFD"]["x"]
+                y = data["PFD"]["y"]
                 pos = QtCore.QPoint(x, y)
-                h = ventana["height"]
-                w = ventana["width"]
-                size = QtCore.QSize(w, h)
-                mdiArea.subWindowList()[-1].move(pos)
-                mdiArea.subWindowList()[-1].resize(size)
+                width = data["PFD"]["width"]
+                height = data["PFD"]["height"]
+                size = QtCore.QSize(width, height)
+                mdiArea.subWindowList()[0].move(pos)
+                mdiArea.subWindowList()[0].resize(size)
+
+                mdiArea.subWindowList()[0].widget().scene().readFromJSON(data)
+                self.list.updateList(
+                    mdiArea.subWindowList()[0].widget().scene().objects)
+
+                for i, ventana in data["other"].items():
+                    name = ventana["class"]
+                    widget = otherWindow(name)
+                    instance = widget.readFromJSON(ventana["window"], self)
+                    mdiArea.addSubWindow(instance)
+                    x = ventana["x"]
+                    y = ventana["y"]
+                    pos = QtCore.QPoint(x, y)
+                    h = ventana["height"]
+                    w = ventana["width"]
+                    size = QtCore.QSize(w, h)
+                    mdiArea.subWindowList()[-1].move(pos)
+                    mdiArea.subWindowList()[-1].resize(size)
+            finally:
+                if isinstance(data, projectArchive.ProjectArchive):
+                    data.close()
 
             self.centralwidget.addTab(
                 mdiArea, os.path.splitext(os.path.basename(str(fname)))[0])
@@ -1659,6 +1711,7 @@ class UI_pychemqt(QtWidgets.QMainWindow):
 
     # Help
     def help(self):
+        from tools import doi
         dialog = doi.ShowReference()
         dialog.exec_()
 
@@ -1699,6 +1752,7 @@ class UI_pychemqt(QtWidgets.QMainWindow):
         Tabla_Periodica.exec_()
 
     def meos(self):
+        from tools import UI_Tables
         dialog = UI_Tables.Dialog(self.currentConfig, self)
         dialog.exec_()
 
@@ -1858,5 +1912,5 @@ class UI_pychemqt(QtWidgets.QMainWindow):
 
     def addEquipment(self, equipo):
         equip = UI_equipments.index(equipo)
-        object = flujo.EquipmentItem(equipo.__name__.split("_")[-1], equip)
+        object = flujo.EquipmentItem(equipo.split("_")[-1], equip)
         self.currentScene.waitClick(1, "equip", object)
@@ -67,7 +67,8 @@ class newComponent(QtWidgets.QDialog):
         """Save new componente in user database"""
         elemento = self.unknown.export2Component()
         sql.inserElementsFromArray(sql.databank_Custom_name, [elemento])
-        Dialog = View_Component(1001+sql.N_comp_Custom)
+        Dialog = View_Component(
+            sql.CUSTOM+sql.getDatabank().count(custom=True))
         Dialog.show()
         QtWidgets.QDialog.accept(self)
 
@@ -251,6 +251,12 @@ class Widget(QtWidgets.QDialog):
         for q in quality:
             self.definition.addItem(q)
         layout.addWidget(self.definition, 7, 2)
+        layout.addWidget(QtWidgets.QLabel(QtWidgets.QApplication.translate(
+            "pychemqt", "Plot data cache size")), 8, 1)
+        self.cacheSize = QtWidgets.QSpinBox()
+        self.cacheSize.setRange(0, 100000)
+        self.cacheSize.setSuffix(" MB")
+        layout.addWidget(self.cacheSize, 8, 2)
         self.grid = QtWidgets.QCheckBox(
             QtWidgets.QApplication.translate("pychemqt", "Draw grid"))
         layout.addWidget(self.grid, 9, 1, 1, 2)
@@ -272,6 +278,7 @@ class Widget(QtWidgets.QDialog):
             self.grid.setChecked(config.getboolean("MEOS", 'grid'))
             self.definition.setCurrentIndex(
                 config.getint("MEOS", 'definition'))
+            self.cacheSize.setValue(config.getint("MEOS", 'cacheSize'))
             self.lineconfig.setConfig(config)
 
     def value(self, config):
@@ -284,6 +291,7 @@ class Widget(QtWidgets.QDialog):
         config = self.lineconfig.value(config)
         config.set("MEOS", "grid", str(self.grid.isChecked()))
         config.set("MEOS", "definition", str(self.definition.currentIndex()))
+        config.set("MEOS", "cacheSize", str(self.cacheSize.value()))
 
         for indice in range(self.Isolineas.count()):
             config = self.Isolineas.widget(indice).value(config)
@@ -1143,8 +1143,9 @@ class View_Component(QtWidgets.QDialog):
             else:
                 indice=self.indice+1
         elif indice=="last":
-            if sql.N_comp_Custom:
-                indice=1000+sql.N_comp_Custom
+            N_comp_Custom=sql.getDatabank().count(custom=True)
+            if N_comp_Custom:
+                indice=sql.CUSTOM+N_comp_Custom
             else:
                 indice=sql.N_comp
 
@@ -1173,8 +1174,9 @@ class View_Component(QtWidgets.QDialog):
             self.clear()
             self.buttonFirst.setDisabled(indice==1)
             self.buttonPrevious.setDisabled(indice==1)
-            if sql.N_comp_Custom:
-                last=1000+sql.N_comp_Custom
+            N_comp_Custom=sql.getDatabank().count(custom=True)
+            if N_comp_Custom:
+                last=sql.CUSTOM+N_comp_Custom
             else:
                 last=sql.N_comp
             self.buttonNext.setDisabled(indice==last)
@@ -27,7 +27,7 @@ from functools import partial
 
 from PyQt5 import QtWidgets
 
-from lib.unidades import Pressure, Power, Currency
+from lib.unidades import Temperature, Pressure, DeltaP, Power, Currency
 from tools.costIndex import CostData
 from equipment.parents import UI_equip
 from equipment.compressor import Compressor
@@ -99,11 +99,23 @@ class UI_equipment(UI_equip):
             int, spinbox=True, min=1, value=1, step=1)
         self.etapas.valueChanged.connect(partial(self.changeParams, "etapas"))
         lyt_Calc.addWidget(self.etapas, 9, 2)
-        lyt_Calc.setRowStretch(10, 1)
+        lyt_Calc.addWidget(QtWidgets.QLabel(QtWidgets.QApplication.translate(
+            "pychemqt", "Intercooler temperature")), 10, 1)
+        self.Tintercooler = Entrada_con_unidades(Temperature)
+        self.Tintercooler.valueChanged.connect(
+            partial(self.changeParams, "Tintercooler"))
+        lyt_Calc.addWidget(self.Tintercooler, 10, 2)
+        lyt_Calc.addWidget(QtWidgets.QLabel(QtWidgets.QApplication.translate(
+            "pychemqt", "Intercooler pressure drop")), 11, 1)
+        self.deltaPintercooler = Entrada_con_unidades(DeltaP)
+        self.deltaPintercooler.valueChanged.connect(
+            partial(self.changeParams, "deltaPintercooler"))
+        lyt_Calc.addWidget(self.deltaPintercooler, 11, 2)
+        lyt_Calc.setRowStretch(12, 1)
 
         group = QtWidgets.QGroupBox()
         group.setTitle(QtWidgets.QApplication.translate("pychemqt", "Results"))
-        lyt_Calc.addWidget(group, 12, 1, 1, 2)
+        lyt_Calc.addWidget(group, 14, 1, 1, 2)
         lyt = QtWidgets.QGridLayout(group)
         lyt.addWidget(QtWidgets.QLabel(QtWidgets.QApplication.translate(
             "pychemqt", "Power")), 1, 1)
@@ -122,6 +134,11 @@ class UI_equipment(UI_equip):
             "pychemqt", "Efficiency")), 2, 4)
         self.rendimientoCalculado = Entrada_con_unidades(float, readOnly=True)
         lyt.addWidget(self.rendimientoCalculado, 2, 5)
+        lyt.addWidget(QtWidgets.QLabel(QtWidgets.QApplication.translate(
+            "pychemqt", "Intercooler duty")), 3, 1)
+        self.Qintercooler = Entrada_con_unidades(
+            Power, retornar=False, readOnly=True)
+        lyt.addWidget(self.Qintercooler, 3, 2)
 
         # Cost tab
         lyt_Cost = QtWidgets.QGridLayout(self.tabCostos)
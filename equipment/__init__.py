@@ -19,62 +19,132 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 
 
 
-###Modulo de equipos
-
-#Inicializa importando las interfaces gráficas de los equipos
-
-# flow
-from . import UI_divider
-from . import UI_valve
-from . import UI_mixer
-from . import UI_compressor
-from . import UI_turbine
-from . import UI_pump
-from . import UI_pipe
-
-# Operaciones
-from . import UI_flash
-from . import UI_columnFUG
-from . import UI_heatExchanger
-from . import UI_hairpin
-from . import UI_shellTube
-from . import UI_fireHeater
-
-# solids
-from . import UI_ciclon
-from . import UI_gravityChamber
-from . import UI_baghouse
-from . import UI_electricPrecipitator
-from . import UI_dryer
-from . import UI_scrubber
-
-# Tools
-from . import UI_spreadsheet
+###############################################################################
+# Equipment module
+#
+#   The graphical interface of equipments are imported in first use, the
+#   package only define the lists of equipments:
+#
+#   - LazyList: Sequence of modules or classes imported in first access
+#   - UI_equipments: Graphical interface modules of functional equipments
+#   - equipments: Equipment classes, in the same order as UI_equipments
+#
+#   The UI modules are also available as package attributes, with the
+#   import in first access, equipment.UI_pump
+###############################################################################
+
+
+from importlib import import_module
+
+
+class LazyList(object):
+    """Sequence of modules or module attributes imported in first access, it
+    support the list operations used with equipments, index access,
+    iteration, index and in
+
+    Parameters
+    ----------
+    items : list
+        (module, attribute) tuples, attribute None for the module itself
+    """
+
+    def __init__(self, items):
+        self.items = list(items)
+
+    def _load(self, item):
+        module, attr = item
+        obj = import_module(module)
+        if attr:
+            obj = getattr(obj, attr)
+        return obj
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._load(item) for item in self.items[index]]
+        return self._load(self.items[index])
+
+    def __iter__(self):
+        for item in self.items:
+            yield self._load(item)
+
+    def _key(self, obj):
+        """Return the (module, attribute) of obj, it can be a module, a
+        class or the name of module or class"""
+        if isinstance(obj, str):
+            for item in self.items:
+                if obj in (item[0], item[0].split(".")[-1], item[1]):
+                    return item
+        elif isinstance(obj, type):
+            return (obj.__module__, obj.__name__)
+        else:
+            return (getattr(obj, "__name__", None), None)
+
+    def __contains__(self, obj):
+        return self._key(obj) in self.items
+
+    def index(self, obj):
+        """Return the position of obj in list"""
+        key = self._key(obj)
+        if key not in self.items:
+            raise ValueError("%s is not in list" % obj)
+        return self.items.index(key)
+
+
+# Graphical interface of functional equipments and its equipment class
+_equipments = [
+    # flow
+    ("UI_divider", "flux", "Divider"),
+    ("UI_valve", "flux", "Valve"),
+    ("UI_mixer", "flux", "Mixer"),
+    ("UI_pump", "pump", "Pump"),
+    ("UI_compressor", "compressor", "Compressor"),
+    ("UI_turbine", "compressor", "Turbine"),
+    ("UI_pipe", "pipe", "Pipe"),
+
+    # Operaciones
+    ("UI_flash", "distillation", "Flash"),
+    ("UI_columnFUG", "distillation", "ColumnFUG"),
+    ("UI_heatExchanger", "heatExchanger", "Heat_Exchanger"),
+    ("UI_shellTube", "heatExchanger", "Shell_Tube"),
+    ("UI_hairpin", "heatExchanger", "Hairpin"),
+    ("UI_fireHeater", "heatExchanger", "Fired_Heater"),
+
+    # solids
+    ("UI_ciclon", "gas_solid", "Ciclon"),
+    ("UI_gravityChamber", "gas_solid", "GravityChamber"),
+    ("UI_baghouse", "gas_solid", "Baghouse"),
+    ("UI_electricPrecipitator", "gas_solid", "ElectricPrecipitator"),
+    ("UI_dryer", "gas_solid_liquid", "Dryer"),
+    ("UI_scrubber", "gas_solid_liquid", "Scrubber"),
+
+    # Tools
+    ("UI_spreadsheet", "spreadsheet", "Spreadsheet"),
+
+    ("UI_reactor", "reactor", "Reactor")]
 
 # No funcionales
-from . import UI_centrifuge
-from . import UI_crystallizer
-from . import UI_filter
-from . import UI_grinder
-from . import UI_screen
-from . import UI_solidWasher
-from . import UI_vacuum
-from . import UI_tank
-from . import UI_tower
-from . import UI_reactor
-
-
-UI_equipments = [UI_divider, UI_valve, UI_mixer, UI_pump, UI_compressor,
-                 UI_turbine, UI_pipe, UI_flash, UI_columnFUG, UI_heatExchanger,
-                 UI_shellTube, UI_hairpin, UI_fireHeater, UI_ciclon,
-                 UI_gravityChamber, UI_baghouse, UI_electricPrecipitator,
-                 UI_dryer, UI_scrubber, UI_spreadsheet, UI_reactor]
-# UI_tower, UI_reactor, UI_centrifuge, UI_grinder, UI_solidWasher, UI_vacuum, ]
-
-equipments=[ui.UI_equipment.Equipment.__class__ for ui in UI_equipments]
-
-#__all__ = [equip.__name__ for equip in UI_equipments]
-#print(__all__)
+_UI_others = ["UI_centrifuge", "UI_crystallizer", "UI_filter", "UI_grinder",
+              "UI_screen", "UI_solidWasher", "UI_vacuum", "UI_tank",
+              "UI_tower"]
+
+UI_equipments = LazyList(
+    ("%s.%s" % (__name__, ui), None) for ui, module, cls in _equipments)
+equipments = LazyList(
+    ("%s.%s" % (__name__, module), cls) for ui, module, cls in _equipments)
+
+__all__ = ["UI_equipments", "equipments"]
+
+
+def __getattr__(name):
+    """Import the UI modules of equipments in first access"""
+    if name in [ui for ui, module, cls in _equipments]+_UI_others:
+        return import_module("%s.%s" % (__name__, name))
+    raise AttributeError("module %s has no attribute %s" % (__name__, name))
+
+
 
 # To get a list of equipment available to add to lib/firstrun.py file:
 # equipos=[equipment.__name__ for equipment in equipments]
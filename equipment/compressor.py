@@ -29,14 +29,35 @@ import os
 
 from PyQt5.QtWidgets import QApplication
 from scipy import log, exp
-from scipy.constants import R
-from scipy.optimize import fsolve
+from scipy.optimize import brentq
 
+from lib.compression import getFluid, multistage
 from lib.unidades import (DeltaT, DeltaP, Temperature, Pressure, MassFlow,
                           Power, Currency, Dimensionless)
 from equipment.parents import equipment
 
 
+# Thermodynamic path of each termodinamica option
+PATHS = ("isentropic", "polytropic", "isothermal", "schultz")
+
+
+def _outlet(entrada, result):
+    """Outlet stream of a compression result, in two phase region defined
+    with the quality"""
+    x = float(result.x)
+    if 0 < x < 1:
+        return entrada.clone(P=float(result.P), x=x)
+    return entrada.clone(T=float(result.T), P=float(result.P))
+
+
+def _cp_cv(entrada, fluid):
+    """Heat capacity ratio of input stream, the cubic equation of state
+    don't calculate it, so use the ideal gas value"""
+    if hasattr(entrada.Gas, "cp_cv"):
+        return entrada.Gas.cp_cv
+    return Dimensionless(float(fluid.cp_cv(entrada.T)))
+
+
 class Compressor(equipment):
     """Class to model a gas compressor
 
@@ -55,11 +76,16 @@ class Compressor(equipment):
             0 - Adiabatic
             1 - Polytropic
             2 - Isothermic
+            3 - Polytropic, Schultz method
         Pout: Output pressure
-        razon: Compression ratio
-        rendimeinto: Compressor efficiency
+        razon: Compression ratio of each stage
+        rendimeinto: Compressor efficiency, isentropic, polytropic or
+            isothermal for each thermodynamic model
         etapas: Compressor etapas
         trabajo: Compressor work
+        Tintercooler: Gas temperature at the outlet of intercoolers, 0 to
+            don't use intercooling between stages
+        deltaPintercooler: Pressure drop in each intercooler
 
     Coste
         f_install: instalation factor
@@ -87,11 +113,11 @@ class Compressor(equipment):
                             fraccionMasica=[1., 0, 0, 0])
     >>> compresor=Compressor(entrada=corriente, metodo=1, termodinamica=0, \
                              razon=3, rendimiento=0.75, etapas=1)
-    >>> print(compresor.power.kW)
-    31.1007420914
+    >>> print("%0.4f" % compresor.power.kW)
+    30.5767
     >>> compresor(compresor=2, transmision=1, motor=0, rpm=1)
-    >>> print(compresor.C_inst)
-    60464.196881
+    >>> print("%0.2f" % compresor.C_inst)
+    59735.69
     """
     title = QApplication.translate("pychemqt", "Compressor")
     help = ""
@@ -103,6 +129,8 @@ class Compressor(equipment):
               "rendimiento": 0.0,
               "etapas": 0,
               "trabajo": 0.0,
+              "Tintercooler": 0.0,
+              "deltaPintercooler": 0.0,
 
               "f_install": 1.3,
               "Base_index": 0.0,
@@ -112,11 +140,12 @@ class Compressor(equipment):
               "motor": 0,
               "rpm": 0}
     kwargsInput = ("entrada", )
-    kwargsValue = ("Pout", "razon", "rendimiento", "etapas", "trabajo")
+    kwargsValue = ("Pout", "razon", "rendimiento", "etapas", "trabajo",
+                   "Tintercooler", "deltaPintercooler")
     kwargsList = ("metodo", "termodinamica", "compresor", "transmision",
                   "motor", "rpm")
     calculateValue = ("power", "cp_cv", "razonCalculada",
-                      "rendimientoCalculado")
+                      "rendimientoCalculado", "Qintercooler")
     calculateCostos = ("C_comp", "C_motor", "C_trans", "C_adq", "C_inst")
     indiceCostos = 7
 
@@ -126,9 +155,11 @@ class Compressor(equipment):
         QApplication.translate("pychemqt", "Specify out pressure and actual power"),  # noqa
         QApplication.translate("pychemqt", "Specify pressure ratio and actual power"),  # noqa
         QApplication.translate("pychemqt", "Calculate input flowrate")]
-    TEXT_TERMODINAMICA = [QApplication.translate("pychemqt", "Adiabatic"),
-                          QApplication.translate("pychemqt", "Polytropic"),
-                          QApplication.translate("pychemqt", "Isothermic")]
+    TEXT_TERMODINAMICA = [
+        QApplication.translate("pychemqt", "Adiabatic"),
+        QApplication.translate("pychemqt", "Polytropic"),
+        QApplication.translate("pychemqt", "Isothermic"),
+        QApplication.translate("pychemqt", "Polytropic, Schultz method")]
     TEXT_COMPRESOR = [
         QApplication.translate("pychemqt", "Centrifugal compressor"),
         QApplication.translate("pychemqt", "Reciprocating compressor"),
@@ -198,84 +229,70 @@ class Compressor(equipment):
         if self.kwargs["etapas"]:
             self.etapas = self.kwargs["etapas"]
         else:
-            self.etapas = 1.
+            self.etapas = 1
         self.power = Power(self.kwargs["trabajo"])
 
-        def f(Pout, rendimiento):
-            W_ideal = self.__Wideal(Pout)
-            power = W_ideal*self.entrada.caudalmasico.gs/rendimiento
-            return power
+        fluid = getFluid(self.entrada)
+        path = PATHS[self.kwargs["termodinamica"]]
+        Tin = self.entrada.T
+        Pin = self.entrada.P
+        dP = self.kwargs["deltaPintercooler"]
+
+        def compress(Pout, rendimiento):
+            return multistage(fluid, Tin, Pin, Pout, rendimiento, self.etapas,
+                              path, self.kwargs["Tintercooler"], dP)
+
+        if metodo in [1, 4] or (metodo == 5 and razon):
+            # The ratio is defined for each stage
+            P = Pin
+            for i in range(self.etapas-1):
+                P = P*razon-dP
+            self.Pout = Pressure(P*razon)
+
+        try:
+            if metodo == 2:
+                # The work increase with the outlet pressure
+                w = self.power/self.entrada.caudalmasico
+
+                def funcion(lnr):
+                    Pout = Pin*exp(lnr)
+                    return compress(Pout, self.rendimientoCalculado).w-w
+                lnr = brentq(funcion, 1e-6, log(1e3))
+                self.Pout = Pressure(Pin*exp(lnr))
+            elif metodo in [3, 4]:
+                w = self.power/self.entrada.caudalmasico
+                if path in ("isentropic", "isothermal"):
+                    eta = compress(self.Pout, 1.).w/w
+                else:
+                    def funcion(rendimiento):
+                        return compress(self.Pout, rendimiento).w-w
+                    eta = brentq(funcion, 1e-3, 1.)
+                self.rendimientoCalculado = Dimensionless(eta)
+
+            result = compress(self.Pout, self.rendimientoCalculado)
+        except ValueError as error:
+            # Flash of the real fluid not converged
+            self.status = 5
+            self.msg = str(error)
+            self.statusCoste = False
+            return
 
-        if metodo in [0, 3] or (metodo == 5 and self.Pout):
-            if self.etapas == 1:
-                razon = self.Pout.atm/self.entrada.P.atm
-            else:
-                razon = (self.Pout.atm/self.entrada.P.atm)**(1./self.etapas)
-        elif metodo in [1, 4] or (metodo == 5 and razon):
-            if self.etapas == 1:
-                self.Pout = Pressure(self.entrada.P*razon)
-            else:
-                self.Pout = Pressure(razon**self.etapas*self.entrada.P)
-
-        if metodo in [0, 1]:
-            Wid = self.__Wideal(self.Pout.atm)
-            power = Wid*self.entrada.caudalmasico.gs/self.rendimientoCalculado
-            self.power = Power(power*self.etapas)
-        elif metodo == 2:
-            def funcion(P):
-                return f(P, self.rendimientoCalculado)-self.power
-            self.Pout = Pressure(fsolve(funcion, self.entrada.P+1))
-            if self.etapas == 1:
-                razon = self.Pout/self.entrada.P
-            else:
-                razon = (self.Pout/self.entrada.P)**(1./self.etapas)
-        elif metodo in [3, 4]:
-            def funcion(rendimiento):
-                return f(self.Pout.atm, rendimiento)-self.power
-            self.rendimientoCalculado = Dimensionless(fsolve(funcion, 0.5))
-        elif metodo == 5:
-            Wideal = self.__Wideal(self.Pout.atm)
-            G = MassFlow(self.power*self.rendimientoCalculado/Wideal, "gs")
-            self.Tout = self.__Tout(Wideal)
+        if metodo == 5:
+            G = MassFlow(self.power/float(result.w))
             self.entrada = self.entrada.clone(caudalMasico=G)
+        else:
+            self.power = Power(float(result.w)*self.entrada.caudalmasico)
 
-        Wideal = self.__Wideal(self.Pout.atm)
-        self.Tout = Temperature(self.__Tout(Wideal))
-        self.salida = [self.entrada.clone(T=self.Tout, P=self.Pout)]
+        self.Tout = Temperature(float(result.T))
+        self.salida = [_outlet(self.entrada, result)]
+        self.Qintercooler = Power(float(result.q)*self.entrada.caudalmasico)
         self.razonCalculada = Dimensionless(self.Pout/self.entrada.P)
         self.deltaT = DeltaT(self.salida[0].T-self.entrada.T)
         self.deltaP = DeltaP(self.salida[0].P-self.entrada.P)
-        self.cp_cv = self.entrada.Gas.cp_cv
+        self.cp_cv = _cp_cv(self.entrada, fluid)
         self.Pin = self.entrada.P
         self.Tin = self.entrada.T
 
-    def __Wideal(self, Pout):
-        """Calculate the ideal work"""
-        if self.kwargs["termodinamica"] == 0:
-            cpv = self.entrada.Gas.cp_cv
-        else:
-            cpv = 1.40388
-        if self.kwargs["termodinamica"] == 2:
-            W_ideal = R*self.entrada.T/self.entrada.M*log(Pout/self.entrada.P)
-        else:
-            W_ideal = R*self.entrada.T*cpv/self.entrada.M/(cpv-1) *\
-                ((Pout/self.entrada.P.atm)**((cpv-1)/cpv)-1)
-        return W_ideal
-
-    def __Tout(self, Wid):
-        """Calculate the output temperature"""
-        if self.kwargs["termodinamica"] == 0:
-            cpv = self.entrada.Gas.cp_cv
-        else:
-            cpv = 1.40388
-        if self.kwargs["termodinamica"] == 2:
-            Tout = self.entrada.T
-        else:
-            eta = self.rendimientoCalculado
-            Tout = (self.Pout.atm/self.entrada.P.atm)**((cpv-1)/cpv) *\
-                self.entrada.T+(1-eta)/eta*(Wid/self.entrada.Gas.cv)
-        return Tout
-
     def coste(self):
         HP = self.power.hp/self.etapas
         CI = self.kwargs["Current_index"]
@@ -367,14 +384,14 @@ class Compressor(equipment):
         txt = "#---------------"
         txt += QApplication.translate("pychemqt", "Calculate properties")
         txt += "-----------------#"+os.linesep
-        txt += self.propertiesToText(range(11))
+        txt += self.propertiesToText(range(12))
 
         if self.statusCoste:
             txt += os.linesep+"#---------------"
             txt += QApplication.translate(
                 "pychemqt", "Preliminary Cost Estimation")
             txt += "-----------------#" + os.linesep
-            txt += self.propertiesToText(range(11, 23))
+            txt += self.propertiesToText(range(12, 24))
         return txt
 
     @classmethod
@@ -400,6 +417,8 @@ class Compressor(equipment):
               "rendimientoCalculado", Dimensionless),
              (QApplication.translate("pychemqt", "Especific capacities ratio"),
               "cp_cv", Dimensionless),
+             (QApplication.translate("pychemqt", "Intercooler duty"),
+              "Qintercooler", Power),
              (QApplication.translate("pychemqt", "Base index"),
               "Base_index", float),
              (QApplication.translate("pychemqt", "Current index"),
@@ -437,6 +456,7 @@ class Compressor(equipment):
         state["deltaT"] = self.deltaT
         state["deltaP"] = self.deltaP
         state["cp_cv"] = self.cp_cv
+        state["Qintercooler"] = self.Qintercooler
         state["Pin"] = self.Pin
         state["Tin"] = self.Tin
         state["statusCoste"] = self.statusCoste
@@ -458,6 +478,7 @@ class Compressor(equipment):
         self.deltaT = DeltaT(state["deltaT"])
         self.deltaP = DeltaP(state["deltaP"])
         self.cp_cv = Dimensionless(state["cp_cv"])
+        self.Qintercooler = Power(state.get("Qintercooler", 0))
         self.Pin = Pressure(state["Pin"])
         self.Tin = Temperature(state["Tin"])
         self.statusCoste = state["statusCoste"]
@@ -487,6 +508,7 @@ class Turbine(equipment):
             0 - Adiabatic
             1 - Polytropic
             2 - Isothermic
+            3 - Polytropic, Schultz method
         Pout: Output pressure
         razon: Pressures ratio
         rendimeinto: Turbine efficiency
@@ -501,10 +523,12 @@ class Turbine(equipment):
     >>> corriente=Corriente(T=400, P=101325, caudalMasico=0.1, \
             fraccionMasica=[1., 0, 0, 0])
     >>> turbina=Turbine(entrada=corriente, metodo=1, razon=0.3, rendimiento=1.)
-    >>> print(turbina.power.MJh)
-    -69.138664576
-    >>> print(turbina.C_inst)
-    30713.7301133
+    >>> print("%0.2f" % turbina.power.MJh)
+    -70.78
+    >>> print("%0.2f %0.3f" % (turbina.Tout, turbina.salida[0].x))
+    342.55 0.961
+    >>> print("%0.2f" % turbina.C_inst)
+    31302.72
     """
 
     title = QApplication.translate("pychemqt", "Turbine")
@@ -536,9 +560,11 @@ class Turbine(equipment):
         QApplication.translate("pychemqt", "Specify out pressure and actual power"),   # noqa
         QApplication.translate("pychemqt", "Specify pressure ratio and actual power"),   # noqa
         QApplication.translate("pychemqt", "Calculate input flowrate")]
-    TEXT_TERMODINAMICA = [QApplication.translate("pychemqt", "Adiabatic"),
-                          QApplication.translate("pychemqt", "Polytropic"),
-                          QApplication.translate("pychemqt", "Isotermic")]
+    TEXT_TERMODINAMICA = [
+        QApplication.translate("pychemqt", "Adiabatic"),
+        QApplication.translate("pychemqt", "Polytropic"),
+        QApplication.translate("pychemqt", "Isotermic"),
+        QApplication.translate("pychemqt", "Polytropic, Schultz method")]
 
     @property
     def isCalculable(self):
@@ -590,12 +616,14 @@ class Turbine(equipment):
         self.rendimientoCalculado = Dimensionless(self.kwargs["rendimiento"])
         self.power = Power(-abs(self.kwargs["trabajo"]))
 
-        def f(Pout, rendimiento):
-            W_ideal = self.__Wideal(Pout)
-            power = W_ideal*self.entrada.caudalmasico.gs*rendimiento
-            return power
+        fluid = getFluid(self.entrada)
+        path = PATHS[self.kwargs["termodinamica"]]
+        Tin = self.entrada.T
+        Pin = self.entrada.P
 
-        self.cp_cv = self.entrada.Gas.cp_cv
+        def expand(Pout, rendimiento):
+            return multistage(fluid, Tin, Pin, Pout, rendimiento,
+                              method=path)
 
         if self.kwargs["metodo"] in [0, 3] or \
                 (self.kwargs["metodo"] == 5 and self.Pout):
@@ -604,61 +632,50 @@ class Turbine(equipment):
                 (self.kwargs["metodo"] == 5 and self.razon):
             self.Pout = Pressure(self.entrada.P*self.razon)
 
-        if self.kwargs["metodo"] in [0, 1]:
-            Wideal = self.__Wideal(self.Pout)
-            G = self.entrada.caudalmasico.gs
-            self.power = Power(Wideal*G*self.rendimientoCalculado)
-        elif self.kwargs["metodo"] == 2:
-            def function(P):
-                return f(P, self.rendimientoCalculado)-self.power
-            self.Pout = Pressure(fsolve(function, self.entrada.P.atm+1), "atm")
-            self.razon = Dimensionless(self.Pout/self.entrada.P)
-        elif self.kwargs["metodo"] in [3, 4]:
-            def function(rendimiento):
-                return f(self.Pout.atm, rendimiento)-self.power
-            self.rendimientoCalculado = Dimensionless(fsolve(function, 0.5))
-        elif self.kwargs["metodo"] == 5:
-            Wideal = self.__Wideal(self.Pout)
-            G = MassFlow(self.power/self.rendimientoCalculado/Wideal, "gs")
-            self.Tout = self.__Tout(Wideal)
+        try:
+            if self.kwargs["metodo"] == 2:
+                # The work released increase as the outlet pressure decrease
+                w = self.power/self.entrada.caudalmasico
+
+                def funcion(lnr):
+                    Pout = Pin*exp(lnr)
+                    return expand(Pout, self.rendimientoCalculado).w-w
+                lnr = brentq(funcion, log(1e-3), -1e-6)
+                self.Pout = Pressure(Pin*exp(lnr))
+                self.razon = Dimensionless(self.Pout/self.entrada.P)
+            elif self.kwargs["metodo"] in [3, 4]:
+                w = self.power/self.entrada.caudalmasico
+                if path in ("isentropic", "isothermal"):
+                    eta = w/expand(self.Pout, 1.).w
+                else:
+                    def funcion(rendimiento):
+                        return expand(self.Pout, rendimiento).w-w
+                    eta = brentq(funcion, 1e-3, 1.)
+                self.rendimientoCalculado = Dimensionless(eta)
+
+            result = expand(self.Pout, self.rendimientoCalculado)
+        except ValueError as error:
+            # Flash of the real fluid not converged
+            self.status = 5
+            self.msg = str(error)
+            self.statusCoste = False
+            return
+
+        if self.kwargs["metodo"] == 5:
+            G = MassFlow(self.power/float(result.w))
             self.entrada = self.entrada.clone(caudalMasico=G)
+        else:
+            self.power = Power(float(result.w)*self.entrada.caudalmasico)
 
-        Wideal = self.__Wideal(self.Pout)
-        self.Tout = Temperature(self.__Tout(Wideal))
+        self.cp_cv = _cp_cv(self.entrada, fluid)
+        self.Tout = Temperature(float(result.T))
         self.razonCalculada = Dimensionless(self.Pout/self.entrada.P)
-        self.salida = [self.entrada.clone(T=self.Tout, P=self.Pout)]
+        self.salida = [_outlet(self.entrada, result)]
         self.deltaT = DeltaT(self.salida[0].T-self.entrada.T)
         self.deltaP = DeltaP(self.salida[0].P-self.entrada.P)
         self.Pin = self.entrada.P
         self.Tin = self.entrada.T
 
-    def __Wideal(self, Pout):
-        """Calculo del trabajo ideal"""
-        if self.kwargs["termodinamica"] == 0:
-            cpv = self.cp_cv
-        else:
-            cpv = 1.40388
-        if self.kwargs["termodinamica"] == 2:
-            W_ideal = R*self.entrada.T/self.entrada.M*log(Pout/self.entrada.P)
-        else:
-            W_ideal = R*self.entrada.T*cpv/self.entrada.M/(cpv-1) * \
-                ((Pout/self.entrada.P)**((cpv-1)/cpv)-1)
-        return W_ideal
-
-    def __Tout(self, W_ideal):
-        """Cálculo de la temperatura de salida"""
-        if self.kwargs["termodinamica"] == 0:
-            cpv = self.cp_cv
-        else:
-            cpv = 1.40388
-        if self.kwargs["termodinamica"] == 2:
-            Tout = self.entrada.T
-        else:
-            Tout = (self.Pout/self.entrada.P)**((cpv-1)/cpv)*self.entrada.T + \
-                (1-self.rendimientoCalculado)/self.rendimientoCalculado * \
-                (W_ideal/self.entrada.Gas.cv)
-        return Tout
-
     def coste(self):
         HP = abs(self.power.hp)
         CI = self.kwargs["Current_index"]
@@ -23,6 +23,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 # - Flash
 # - Tower
 # - ColumnFUG
+# - ColumnMESH
 ###############################################################################
 
 
@@ -34,6 +35,8 @@ from PyQt5.QtWidgets import QApplication
 
 from lib import unidades
 from lib.corriente import Corriente
+from lib.mesh import Column
+from lib.mezcla import Mezcla
 from lib.plot import Plot
 from equipment.parents import equipment
 from equipment.heatExchanger import Heat_Exchanger
@@ -864,6 +867,233 @@ class ColumnFUG(Tower):
 
 
 
+class ColumnMESH(Tower):
+    """Rigorous stage by stage distillation column, MESH equations solved
+    with inside-out algorithm, see lib.mesh
+
+    Parameters:
+        entrada: Corriente instance to define the input stream to equipment
+        N: Number of stages, including condenser and reboiler
+        N_feed: Feed stage, counted from top, the condenser is the stage 1
+        condenser: Condenser type
+            0 - Total
+            1 - Partial
+        R: Reflux ratio
+        D: Distillate molar flow
+        Pd: Top column pressure, default input stream pressure
+        DeltaP: Pressure drop in column
+
+    Cost: Same parameters as ColumnFUG
+    """
+    title = QApplication.translate("pychemqt", "Column (Rigorous method)")
+    help = ""
+    kwargs = {
+        "entrada": None,
+        "N": 0,
+        "N_feed": 0,
+        "condenser": 0,
+        "R": 0.0,
+        "D": 0.0,
+        "Pd": 0.0,
+        "DeltaP": 0.0,
+
+        "f_install": 3,
+        "Base_index": 0.0,
+        "Current_index": 0.0,
+        "proceso": 0,
+        "tipo": 0,
+        "tipo_pisos": 0,
+        "material_columna": 0,
+        "material_pisos": 0,
+        "C_unitario": 0.0,
+        "Di": 0.0,
+        "h": 0.0,
+        "W": 0.0,
+        "Wb": 0.0}
+
+    kwargsInput = ("entrada", )
+    kwargsValue = ("N", "N_feed", "R", "D", "Pd", "DeltaP")
+    kwargsList = ("condenser", )
+    calculateValue = ("DutyCondenser", "DutyReboiler", "NTray", "N_feed",
+                      "RCalculada", "Iterations")
+    indiceCostos = 3
+
+    TEXT_CONDENSER = ColumnFUG.TEXT_CONDENSER
+
+    @property
+    def isCalculable(self):
+        Tower.isCalculable(self)
+
+        if not self.kwargs["entrada"]:
+            self.msg = QApplication.translate("pychemqt", "undefined input")
+            self.status = 0
+            return
+        if self.kwargs["N"] < 3:
+            self.msg = QApplication.translate(
+                "pychemqt", "undefined stage number")
+            self.status = 0
+            return
+        if not 1 < self.kwargs["N_feed"] < self.kwargs["N"]:
+            self.msg = QApplication.translate(
+                "pychemqt", "feed stage bad specified")
+            self.status = 0
+            return
+        if not self.kwargs["R"]:
+            self.msg = QApplication.translate(
+                "pychemqt", "undefined reflux ratio condition")
+            self.status = 0
+            return
+        if not 0 < self.kwargs["D"] < self.kwargs["entrada"].caudalmolar:
+            self.msg = QApplication.translate(
+                "pychemqt", "distillate flow bad specified")
+            self.status = 0
+            return
+
+        self.msg = ""
+        self.status = 1
+        return True
+
+    def calculo(self):
+        self.entrada = self.kwargs["entrada"]
+        if self.kwargs["Pd"]:
+            self.Pd = unidades.Pressure(self.kwargs["Pd"])
+        else:
+            self.Pd = self.entrada.P
+        self.DeltaP = unidades.Pressure(self.kwargs["DeltaP"])
+
+        column = Column(
+            [(self.kwargs["N_feed"], self.entrada)], self.kwargs["N"],
+            self.kwargs["R"], self.kwargs["D"], self.Pd, self.DeltaP,
+            self.kwargs["condenser"])
+        try:
+            column.solve()
+        except ValueError:
+            self.msg = QApplication.translate(
+                "pychemqt", "column calculation don't converge")
+            self.status = 0
+            return
+
+        self.RCalculada = unidades.Dimensionless(self.kwargs["R"])
+        self.NTray = unidades.Dimensionless(self.kwargs["N"]-2)
+        self.N_feed = unidades.Dimensionless(self.kwargs["N_feed"])
+        self.Iterations = unidades.Dimensionless(column.iterations)
+        self.DutyCondenser = unidades.Power(column.Qc)
+        self.DutyReboiler = unidades.Power(column.Qr)
+
+        # Stage profiles
+        self.T = [unidades.Temperature(T) for T in column.T]
+        self.P = [unidades.Pressure(P) for P in column.P]
+        self.L = [unidades.MolarFlow(L) for L in column.L]
+        self.V = [unidades.MolarFlow(V) for V in column.V]
+        self.x = column.x
+        self.y = column.y
+
+        destilado = Mezcla(tipo=2, ids=self.entrada.ids,
+                           caudalUnitarioMolar=list(column.distillate))
+        residuo = Mezcla(tipo=2, ids=self.entrada.ids,
+                         caudalUnitarioMolar=list(column.bottom))
+        SalidaDestilado = self.entrada.clone(
+            T=column.T[0], P=column.P[0], mezcla=destilado)
+        SalidaResiduo = self.entrada.clone(
+            T=column.T[-1], P=column.P[-1], mezcla=residuo)
+        self.salida = [SalidaDestilado, SalidaResiduo]
+
+        self.DestiladoT = SalidaDestilado.T
+        self.DestiladoP = SalidaDestilado.P
+        self.DestiladoMassFlow = SalidaDestilado.caudalmasico
+        self.DestiladoMolarComposition = SalidaDestilado.fraccion
+        self.ResiduoT = SalidaResiduo.T
+        self.ResiduoP = SalidaResiduo.P
+        self.ResiduoMassFlow = SalidaResiduo.caudalmasico
+        self.ResiduoMolarComposition = SalidaResiduo.fraccion
+
+    def propTxt(self):
+        txt = "#---------------"
+        txt += QApplication.translate("pychemqt", "Calculate properties")
+        txt += "-----------------#"+os.linesep
+        txt += os.linesep+"%-25s\t%s" % (QApplication.translate(
+            "pychemqt", "Top Output Temperature"), self.DestiladoT.str)
+        txt += os.linesep+"%-25s\t%s" % (QApplication.translate(
+            "pychemqt", "Top Output Pressure"), self.DestiladoP.str)
+        txt += os.linesep+"%-25s\t%s" % (QApplication.translate(
+            "pychemqt", "Top Output Mass Flow"), self.DestiladoMassFlow.str)
+        txt += os.linesep+"#"+QApplication.translate(
+            "pychemqt", "Top Output Molar Composition")+os.linesep
+        for componente, fraccion in zip(self.salida[0].componente,
+                                        self.DestiladoMolarComposition):
+            txt += "%-25s\t %0.4f" % (componente.nombre, fraccion)+os.linesep
+
+        txt += os.linesep+"%-25s\t%s" % (QApplication.translate(
+            "pychemqt", "Bottom Output Temperature"), self.ResiduoT.str)
+        txt += os.linesep+"%-25s\t%s" % (QApplication.translate(
+            "pychemqt", "Bottom Output Pressure"), self.ResiduoP.str)
+        txt += os.linesep+"%-25s\t%s" % (QApplication.translate(
+            "pychemqt", "Bottom Output Mass Flow"), self.ResiduoMassFlow.str)
+        txt += os.linesep+"#"+QApplication.translate(
+            "pychemqt", "Bottom Output Molar Composition")+os.linesep
+        for componente, fraccion in zip(self.salida[1].componente,
+                                        self.ResiduoMolarComposition):
+            txt += "%-25s\t %0.4f" % (componente.nombre, fraccion)+os.linesep
+
+        txt += os.linesep+"%-25s\t %s" % (QApplication.translate(
+            "pychemqt", "Condenser type"),
+            self.TEXT_CONDENSER[self.kwargs["condenser"]])+os.linesep
+        txt += "%-25s\t%s" % (QApplication.translate(
+            "pychemqt", "Reflux Ratio"), self.RCalculada.str)+os.linesep
+        txt += "%-25s\t%s" % (QApplication.translate(
+            "pychemqt", "Stage Number"), self.NTray.str)+os.linesep
+        txt += "%-25s\t%s" % (QApplication.translate(
+            "pychemqt", "Feed Stage"), self.N_feed.str)+os.linesep
+        txt += "%-25s\t%s" % (QApplication.translate(
+            "pychemqt", "Condenser Duty"), self.DutyCondenser.str)+os.linesep
+        txt += "%-25s\t%s" % (QApplication.translate(
+            "pychemqt", "Reboiler Duty"), self.DutyReboiler.str)+os.linesep
+        txt += "%-25s\t%s" % (QApplication.translate(
+            "pychemqt", "Iterations"), self.Iterations.str)+os.linesep
+        return txt
+
+    @classmethod
+    def propertiesEquipment(cls):
+        l = [(QApplication.translate("pychemqt", "Top Output Temperature"),
+              "DestiladoT", unidades.Temperature),
+             (QApplication.translate("pychemqt", "Top Output Pressure"),
+              "DestiladoP", unidades.Pressure),
+             (QApplication.translate("pychemqt", "Top Output Mass Flow"),
+              "DestiladoMassFlow", unidades.MassFlow),
+             (QApplication.translate("pychemqt",
+                                     "Top Output Molar Composition"),
+              "DestiladoMolarComposition", unidades.Dimensionless),
+             (QApplication.translate("pychemqt", "Bottom Output Temperature"),
+              "ResiduoT", unidades.Temperature),
+             (QApplication.translate("pychemqt", "Bottom Output Pressure"),
+              "ResiduoP", unidades.Pressure),
+             (QApplication.translate("pychemqt", "Bottom Output Mass Flow"),
+              "ResiduoMassFlow", unidades.MassFlow),
+             (QApplication.translate("pychemqt",
+                                     "Bottom Output Molar Composition"),
+              "ResiduoMolarComposition", unidades.Dimensionless),
+             (QApplication.translate("pychemqt", "Condenser type"),
+              ("TEXT_CONDENSER", "condenser"), str),
+             (QApplication.translate("pychemqt", "Reflux Ratio"),
+              "RCalculada", unidades.Dimensionless),
+             (QApplication.translate("pychemqt", "Stage Number"),
+              "NTray", unidades.Dimensionless),
+             (QApplication.translate("pychemqt", "Feed Stage"),
+              "N_feed", unidades.Dimensionless),
+             (QApplication.translate("pychemqt", "Condenser Duty"),
+              "DutyCondenser", unidades.Power),
+             (QApplication.translate("pychemqt", "Reboiler Duty"),
+              "DutyReboiler", unidades.Power),
+             (QApplication.translate("pychemqt", "Iterations"),
+              "Iterations", unidades.Dimensionless)]
+        return l
+
+    def propertiesListTitle(self, index):
+        """Define los titulos para los popup de listas"""
+        lista = [comp.nombre for comp in self.kwargs["entrada"].componente]
+        return lista
+
+
 def batch():
     # Plugging-in contant values
     D = 10
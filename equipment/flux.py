@@ -32,6 +32,7 @@ from PyQt5.QtWidgets import QApplication
 from scipy.optimize import fsolve
 
 from lib.corriente import Corriente
+from lib.solids import Solid
 from lib import unidades
 from equipment.parents import equipment
 
@@ -208,7 +209,7 @@ class Divider(equipment):
     def readStatefromJSON(self, state):
         """Load instance parameter from saved file"""
         self.criterio = state["criterio"]
-        self.split = (unidades.Dimensionless(x) for x in state["split"])
+        self.split = [unidades.Dimensionless(x) for x in state["split"]]
         self.deltaP = unidades.DeltaP(state["deltaP"])
         self.inputMolarFlow = unidades.MolarFlow(state["inputMolarFlow"])
         self.inputMassFlow = unidades.MassFlow(state["inputMassFlow"])
@@ -348,11 +349,9 @@ class Mixer(equipment):
             return output.h-h_in
         T = fsolve(f, To)[0]
 
-        # TODO: Add solid mixer capability
-        if self.entrada[0].solido:
-            pass
-
-        salida = Corriente(T=T, P=self.Pout, caudalUnitarioMasico=massUnitFlow)
+        solido = Solid.mezclar([entrada.solido for entrada in self.entrada])
+        salida = Corriente(T=T, P=self.Pout, caudalUnitarioMasico=massUnitFlow,
+                           solido=solido)
         self.salida = [salida]
 
         # Calculate other properties
@@ -28,12 +28,18 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 
 
 import os
-from math import exp, sqrt, ceil
+from math import ceil, sqrt
 
+from numpy import isnan
 from PyQt5.QtWidgets import QApplication
 from scipy import roots
-from scipy.constants import pi, g, e, epsilon_0
-from scipy.optimize import fsolve
+from scipy.constants import pi
+
+from lib.gasSolid import (bracket, cutDiameter_Rosin, cycloneCount,
+                          eta_GravityChamber, eta_LeithLicht,
+                          eta_Precipitator, eta_Rosin, eta_Sylvan,
+                          exponent_LeithLicht, gradeEfficiency,
+                          overallEfficiency)
 
 from lib.unidades import (Length, Pressure, DeltaP, Speed, Time, Area, VolFlow,
                           PotencialElectric, Currency, Dimensionless, MassFlow)
@@ -43,14 +49,29 @@ from equipment.parents import equipment
 
 
 class Separador_SolidGas(equipment):
-    """Generic class with common functionality of gas-solid equipment"""
+    """Generic class with common functionality of gas-solid equipment
+
+    The subclasses accept the continuo kwarg to integrate the grade efficiency
+    inside each class of the particle size distribution"""
 
     def calcularRendimiento(self, rendimientos):
         entrada = self.kwargs["entrada"]
-        rendimiento_global = 0
-        for i, fraccion in enumerate(entrada.solido.fracciones):
-            rendimiento_global += rendimientos[i]*fraccion
-        return Dimensionless(rendimiento_global)
+        rendimiento_global = overallEfficiency(
+            rendimientos, entrada.solido.fracciones)
+        return Dimensionless(float(rendimiento_global))
+
+    def rendimientoGlobal(self, rendimientos):
+        """Global efficiency for arrays of partial efficiencies, with the
+        classes of particle distribution in the last axis"""
+        entrada = self.kwargs["entrada"]
+        return overallEfficiency(rendimientos, entrada.solido.fracciones)
+
+    def gradeEfficiency(self, func):
+        """Calculate the efficiency of each class of input solid, func is the
+        grade efficiency function of particle diameter"""
+        entrada = self.kwargs["entrada"]
+        return gradeEfficiency(func, entrada.solido.diametros,
+                               self.kwargs["continuo"])
 
     def CalcularSalidas(self, entrada=None):
         if entrada is None:
@@ -173,6 +194,7 @@ class GravityChamber(Separador_SolidGas):
             chosen method of calculate is design
         velocidadAdmisible: Maximum speed of gas in chamber, default 1 m/s
         deltaP: Pressure loss
+        continuo: Integrate the efficiency inside each class of particles
 
     >>> from lib.corriente import Corriente
     >>> from lib.solids import Solid
@@ -198,7 +220,8 @@ class GravityChamber(Separador_SolidGas):
               "L": 0.0,
               "rendimientoAdmisible": 0.0,
               "velocidadAdmisible": 0.0,
-              "deltaP": 0.0}
+              "deltaP": 0.0,
+              "continuo": 0}
 
     kwargsInput = ("entrada", )
     kwargsValue = ("W", "H", "L", "rendimientoAdmisible", "velocidadAdmisible",
@@ -263,27 +286,24 @@ class GravityChamber(Separador_SolidGas):
 
         if self.kwargs["metodo"] == 0:  # Calculo
             self.Vgas = Speed(entrada.Q/self.H/W)
-            self.rendimiento_parcial = self.calcularRendimientos_parciales(L)
-            rendimiento = self.calcularRendimiento(self.rendimiento_parcial)
-            self.rendimiento = Dimensionless(rendimiento)
         else:  # Diseño
             self.Vgas = Speed(velocidadAdmisible)
             W = Length(entrada.Q/velocidadAdmisible/self.H)
 
+            # Shortest chamber with the required efficiency
             def f(longitud):
-                eta = self.calcularRendimientos_parciales(longitud)
-                eta_adm = self.kwargs["rendimientoAdmisible"]
-                return self.calcularRendimiento(eta)-eta_adm
+                eta = self.calcularRendimientos_parciales(longitud[:, None])
+                return self.rendimientoGlobal(eta)
 
-            if f(0.1) > self.kwargs["rendimientoAdmisible"]:
-                longitud = 1
-            else:
-                longitud_ = 0.1
-                longitud = fsolve(f, longitud_)[0]
+            longitud = bracket(f, 1e-3, 1e4,
+                               self.kwargs["rendimientoAdmisible"])
+            if isnan(longitud):
+                longitud = 1e4
             L = Length(float(longitud))
-            eta_i = self.calcularRendimientos_parciales(L)
-            self.rendimiento_parcial = eta_i
-            self.rendimiento = Dimensionless(self.calcularRendimiento(eta_i))
+
+        eta_i = self.calcularRendimientos_parciales(L)
+        self.rendimiento_parcial = [Dimensionless(eta) for eta in eta_i]
+        self.rendimiento = self.calcularRendimiento(eta_i)
 
         self.LCalc = L
         self.WCalc = W
@@ -294,24 +314,16 @@ class GravityChamber(Separador_SolidGas):
 
     def calcularRendimientos_parciales(self, L):
         """Calculate the efficiency of separation process for each diameter of
-        solid fraction"""
+        solid fraction, L can be an array with shape (n, 1)"""
         entrada = self.kwargs["entrada"]
         rhoS = entrada.solido.rho
         rhoG = entrada.Gas.rho
         muG = entrada.Gas.mu
-        rendimientos = []
-        for d in entrada.solido.diametros:
-            Ar = d**3*rhoG*(rhoS-rhoG)*g/muG**2
-            Vt = muG/d*rhoG*((14.42+1.827*Ar**0.5)**0.5-3.798)**2
-            if self.kwargs["modelo"] == 0:
-                r = Vt*L/self.Vgas/self.H
-            else:
-                r = 1-exp(-Vt*L/self.Vgas/self.H)
-            if r > 1:
-                rendimientos.append(1)
-            else:
-                rendimientos.append(r)
-        return rendimientos
+
+        def func(d):
+            return eta_GravityChamber(d, L, self.H, self.Vgas, rhoS, rhoG,
+                                      muG, self.kwargs["modelo"])
+        return self.gradeEfficiency(func)
 
     def propTxt(self):
         txt = os.linesep + "#---------------"
@@ -402,6 +414,7 @@ class Ciclon(Separador_SolidGas):
         rendimientoAdmisible: Required efficiency orcyclone (design)
         DeltaPAdmisible: Maximum pressure loss permisible of cyclone
         velocidadAdmisible: Input gas speed to equipment
+        continuo: Integrate the efficiency inside each class of particles
 
     Coste
         tipo_costo:
@@ -437,6 +450,7 @@ class Ciclon(Separador_SolidGas):
               "rendimientoAdmisible": 0.0,
               "DeltaPAdmisible": 0.0,
               "velocidadAdmisible": 0.0,
+              "continuo": 0,
 
               "f_install": 1.4,
               "Base_index": 0.0,
@@ -535,10 +549,6 @@ class Ciclon(Separador_SolidGas):
         self.rendimientoAdmisible = self.kwargs["rendimientoAdmisible"]
         self.DeltaPAdmisible = Pressure(self.kwargs["DeltaPAdmisible"])
 
-        rhoS = entrada.solido.rho
-        rhoG = entrada.Gas.rho
-        muG = entrada.Gas.mu
-
         if self.kwargs["tipo_calculo"] == 0:  # Calculo
             if self.kwargs["modelo_ciclon"] != 8:
                 # Hc, Bc, Jc, Lc, Zc, De, Sc,kf, G
@@ -546,29 +556,14 @@ class Ciclon(Separador_SolidGas):
             else:
                 dimensiones = self.dimensionado(dimensiones=self.dimensiones)
                 self.dimensiones = dimensiones
-            self.Hc = Length(self.dimensiones[0])
-            self.Bc = Length(self.dimensiones[1])
-            self.Jc = Length(self.dimensiones[2])
-            self.Lc = Length(self.dimensiones[3])
-            self.Zc = Length(self.dimensiones[4])
-            self.De = Length(self.dimensiones[5])
-            self.Sc = Length(self.dimensiones[6])
-            self.kf = Length(self.dimensiones[7])
-            self.G = Length(self.dimensiones[8])
-
+            self._setDimensiones(self.dimensiones)
             self.V = Speed(entrada.Q/(self.Bc*self.Hc*self.num_ciclones))
-            if self.kwargs["modelo_rendimiento"] == 0:
-                self.N = 11.3*(self.Hc*self.Bc/self.Sc**2)**2+3.33
-                dc = sqrt(9*self.Bc*muG/(2*pi*self.N*self.V*(rhoS-rhoG)))
-                self.dc = Length(dc, "ParticleDiameter")
-            else:
-                self.N = self.V*(0.1079-0.00077*self.V+1.924e-6*self.V**2)
-
-            eta_i = self.calcularRendimientos_parciales()
-            self.rendimiento_parcial = eta_i
-            self.rendimiento = self.calcularRendimiento(eta_i)
 
         else:
+            # The geometry ratios of model define the velocity for the
+            # pressure loss limit
+            self._setDimensiones(self.dimensionado(Dc=1))
+            self._setN(self.kwargs["velocidadAdmisible"])
             if self.DeltaPAdmisible and self.kwargs["velocidadAdmisible"]:
                 V_fpresion = self.velocidad_f_presion()
                 if self.kwargs["velocidadAdmisible"] > V_fpresion:
@@ -576,49 +571,28 @@ class Ciclon(Separador_SolidGas):
             elif self.DeltaPAdmisible:
                 self.kwargs["velocidadAdmisible"] = self.velocidad_f_presion()
 
+            # Largest cyclone with the required efficiency
             def f(diametro):
-                self.dimensiones = self.dimensionado(Dc=diametro)
-                self.Dc = Length(diametro)
-                self.Hc = Length(self.dimensiones[0])
-                self.Bc = Length(self.dimensiones[1])
-                self.Jc = Length(self.dimensiones[2])
-                self.Lc = Length(self.dimensiones[3])
-                self.Zc = Length(self.dimensiones[4])
-                self.De = Length(self.dimensiones[5])
-                self.Sc = Length(self.dimensiones[6])
-                self.kf = Length(self.dimensiones[7])
-                self.G = Length(self.dimensiones[8])
-                n = entrada.Q/self.Bc/self.Hc/self.kwargs["velocidadAdmisible"]
-                self.num_ciclones = int(ceil(n))
-                self.V = Speed(entrada.Q/(self.Bc*self.Hc*ceil(n)))
-                if self.kwargs["modelo_rendimiento"] == 0:
-                    N = 11.3*(self.Hc*self.Bc/self.Sc**2)**2+3.33
-                    self.N = Dimensionless(N)
-                    dc = sqrt(9*self.Bc*muG/(2*pi*N*self.V*(rhoS-rhoG)))
-                    self.dc = Length(dc, magnitud="ParticleDiameter")
-                else:
-                    N = self.V*(0.1079-0.00077*self.V+1.924e-6*self.V**2)
-                    self.N = Dimensionless(N)
-                rendimiento_parcial = self.calcularRendimientos_parciales()
-                rendimiento = self.calcularRendimiento(rendimiento_parcial)
-                return rendimiento-self.kwargs["rendimientoAdmisible"]
-
-            Dc0 = 1
-            diametro = fsolve(f, Dc0)
-            self.Dc = Length(diametro[0])
-            self.dimensiones = self.dimensionado(self.Dc)
-            self.Hc = Length(self.dimensiones[0])
-            self.Bc = Length(self.dimensiones[1])
-            self.Jc = Length(self.dimensiones[2])
-            self.Lc = Length(self.dimensiones[3])
-            self.Zc = Length(self.dimensiones[4])
-            self.De = Length(self.dimensiones[5])
-            self.Sc = Length(self.dimensiones[6])
-            self.kf = Length(self.dimensiones[7])
-            self.G = Length(self.dimensiones[8])
-            eta_i = self.calcularRendimientos_parciales()
-            self.rendimiento_parcial = eta_i
-            self.rendimiento = self.calcularRendimiento(eta_i)
+                return self.rendimientoDiametro(diametro[:, None])
+
+            diametro = bracket(f, 0.01, 10., self.rendimientoAdmisible,
+                               largest=True)
+            if isnan(diametro):
+                diametro = 0.01
+            self.Dc = Length(diametro)
+            self.dimensiones = self.dimensionado(Dc=self.Dc)
+            self._setDimensiones(self.dimensiones)
+            n, V = cycloneCount(entrada.Q, self.Hc, self.Bc,
+                                self.kwargs["velocidadAdmisible"])
+            self.num_ciclones = int(n)
+            self.V = Speed(V)
+
+        self._setN(self.V)
+        eta_i = self.calcularRendimientos_parciales(
+            self.Dc, self.Hc, self.Bc, self.Sc, self.G, self.V,
+            self.num_ciclones)
+        self.rendimiento_parcial = [Dimensionless(eta) for eta in eta_i]
+        self.rendimiento = self.calcularRendimiento(eta_i)
 
         self.deltaP = self.PerdidaPresion()
         self.num_ciclonesCoste = self.num_ciclones
@@ -627,6 +601,33 @@ class Ciclon(Separador_SolidGas):
         self.Dcc = self.Dc
         self.CalcularSalidas()
 
+    def _setDimensiones(self, dimensiones):
+        """Save the cyclone dimensions as attributes"""
+        self.Hc = Length(dimensiones[0])
+        self.Bc = Length(dimensiones[1])
+        self.Jc = Length(dimensiones[2])
+        self.Lc = Length(dimensiones[3])
+        self.Zc = Length(dimensiones[4])
+        self.De = Length(dimensiones[5])
+        self.Sc = Length(dimensiones[6])
+        self.kf = Length(dimensiones[7])
+        self.G = Length(dimensiones[8])
+
+    def _setN(self, V):
+        """Calculate the number of turns and the cut diameter for the inlet
+        velocity V"""
+        entrada = self.kwargs["entrada"]
+        if self.kwargs["modelo_rendimiento"] == 0:
+            N = 11.3*(self.Hc*self.Bc/self.Sc**2)**2+3.33
+            if V:
+                dc, N = cutDiameter_Rosin(
+                    self.Hc, self.Bc, self.Sc, V, entrada.solido.rho,
+                    entrada.Gas.rho, entrada.Gas.mu)
+                self.dc = Length(dc, magnitud="ParticleDiameter")
+        else:
+            N = V*(0.1079-0.00077*V+1.924e-6*V**2)
+        self.N = Dimensionless(N)
+
     def dimensionado(self, Dc=0, dimensiones=[]):
         coef = [
             # Stairmand (Alta η)
@@ -665,29 +666,43 @@ class Ciclon(Separador_SolidGas):
 
         return Hc, Bc, Jc, Lc, Zc, De, Sc, kf, G
 
-    def calcularRendimientos_parciales(self):
+    def calcularRendimientos_parciales(self, Dc, Hc, Bc, Sc, G, V, num):
+        """Calculate the efficiency of each class of solid, the cyclone
+        parameters can be arrays with shape (n, 1) to evaluate several
+        cyclones at the same time"""
         entrada = self.kwargs["entrada"]
         rhoS = entrada.solido.rho
+        rhoG = entrada.Gas.rho
         muG = entrada.Gas.mu
 
-        rendimiento_parcial = []
         if self.kwargs["modelo_rendimiento"]:
             # modelo Leith-Licht
-            Vo = entrada.Q/self.num_ciclones
-            n = 1-(1-(12*self.Dc.ft)**0.14/2.5)*((entrada.T.F+460)/530)**0.3
-            if self.G == 0:
-                Vs = entrada.solido.caudal/entrada.solido.rho/self.num_ciclones
-                self.G = 4*self.Dc*(2*Vs+Vo)/self.num_ciclones / \
-                    self.Hc**2/self.Bc**2
-            for d in entrada.solido.diametros:
-                t = rhoS*(d)**2/18/muG
-                rendimiento_parcial.append(
-                    1-exp(-2*(self.G*t*Vo/self.Dc**3*(n+1))**(0.5/(n+1))))
+            Vo = entrada.Q/num
+            n = exponent_LeithLicht(Dc, entrada.T)
+            if not G:
+                Vs = entrada.solido.caudal/entrada.solido.rho/num
+                G = 4*Dc*(2*Vs+Vo)/num/Hc**2/Bc**2
+
+            def func(d):
+                return eta_LeithLicht(d, G, Dc, Vo, n, rhoS, muG)
         else:
             # model Rosin-Rammler-Intelmann
-            for d in entrada.solido.diametros:
-                rendimiento_parcial.append((d/self.dc)**2/(1+(d/self.dc)**2))
-        return rendimiento_parcial
+            dc, N = cutDiameter_Rosin(Hc, Bc, Sc, V, rhoS, rhoG, muG)
+
+            def func(d):
+                return eta_Rosin(d, dc)
+        return self.gradeEfficiency(func)
+
+    def rendimientoDiametro(self, Dc):
+        """Global efficiency of cyclones of the standard model selected, with
+        the allowable inlet velocity and cyclone diameter Dc, it can be an
+        array to evaluate several designs in a single call"""
+        entrada = self.kwargs["entrada"]
+        Hc, Bc, Jc, Lc, Zc, De, Sc, kf, G = self.dimensionado(Dc=Dc)
+        n, V = cycloneCount(entrada.Q, Hc, Bc,
+                            self.kwargs["velocidadAdmisible"])
+        eta = self.calcularRendimientos_parciales(Dc, Hc, Bc, Sc, G, V, n)
+        return self.rendimientoGlobal(eta)
 
     def PerdidaPresion(self):
         entrada = self.kwargs["entrada"]
@@ -905,6 +920,7 @@ class Baghouse(Separador_SolidGas):
         diametroMembrana: Diameter of membrane
         areaMembrana: Filter area of a membrana
         rendimientos: Array with the fabric efficiency of membrane
+        continuo: Integrate the efficiency inside each class of particles
 
     >>> from lib.corriente import Corriente
     >>> from lib.solids import Solid
@@ -932,7 +948,8 @@ class Baghouse(Separador_SolidGas):
               "membranasFiltro": 0,
               "diametroMembrana": 0.0,
               "areaMembrana": 0.0,
-              "rendimientos": []}
+              "rendimientos": [],
+              "continuo": 0}
     kwargsInput = ("entrada", )
     kwargsValue = ("num_filtros", "tiempo", "deltaP", "resistenciaFiltro",
                    "resistenciaTorta", "limpieza", "membranasFiltro",
@@ -1087,9 +1104,8 @@ class Baghouse(Separador_SolidGas):
 
     def defaultRendimiento(self):
         """Sylvan default filter efficciency, used if no specified"""
-        dia = self.kwargs["entrada"].solido.diametros
-        rendimiento = [(d/0.3177e-6)/(1+(d/0.3177e-6)) for d in dia]
-        return rendimiento
+        rendimiento = self.gradeEfficiency(eta_Sylvan)
+        return [Dimensionless(eta) for eta in rendimiento]
 
     def propTxt(self):
         txt = os.linesep + "#---------------"
@@ -1178,6 +1194,7 @@ class ElectricPrecipitator(Separador_SolidGas):
         epsilon: Relative dielectric constant of material
         rendimientoAdmisible: Required efficiency of equipment (design)
         deltaP: Pressure loss of equipoment
+        continuo: Integrate the efficiency inside each class of particles
 
     >>> from lib.corriente import Corriente
     >>> from lib.solids import Solid
@@ -1202,7 +1219,8 @@ class ElectricPrecipitator(Separador_SolidGas):
               "area": 0.0,
               "epsilon": 0.0,
               "rendimientoAdmisible": 0.0,
-              "deltaP": 0.0}
+              "deltaP": 0.0,
+              "continuo": 0}
     kwargsInput = ("entrada", )
     kwargsValue = ("potencialCarga", "potencialDescarga", "area",
                    "rendimientoAdmisible", "epsilon", "deltaP")
@@ -1273,32 +1291,32 @@ class ElectricPrecipitator(Separador_SolidGas):
             self.epsilon = Dimensionless(4.)
 
         if self.kwargs["metodo"] == 1:
+            # Smallest area with the required efficiency
             def f(area):
-                eta_i = self.calcularRendimientos_parciales(area)
-                eta = self.calcularRendimiento(eta_i)
-                return eta-self.kwargs["rendimientoAdmisible"]
+                eta_i = self.calcularRendimientos_parciales(area[:, None])
+                return self.rendimientoGlobal(eta_i)
 
-            self.areaCalculada = Area(fsolve(f, 100)[0])
+            area = bracket(f, 1e-2, 1e6, self.kwargs["rendimientoAdmisible"])
+            if isnan(area):
+                area = 1e6
+            self.areaCalculada = Area(area)
 
         eta_i = self.calcularRendimientos_parciales(self.areaCalculada)
-        self.rendimiento_parcial = eta_i
+        self.rendimiento_parcial = [Dimensionless(eta) for eta in eta_i]
         self.rendimiento = self.calcularRendimiento(eta_i)
 
         self.CalcularSalidas()
 
     def calcularRendimientos_parciales(self, A):
-        """Calculate the separation efficiency per diameter"""
+        """Calculate the separation efficiency per diameter, the area can be
+        an array with shape (n, 1)"""
         entrada = self.kwargs["entrada"]
-        rendimiento_parcial = []
-        for dp in entrada.solido.diametros:
-            if dp <= 1e-6:
-                q = dp*e*1e8
-            else:
-                q = pi*epsilon_0*self.potencialCarga*dp**2 * \
-                    (1+2*(self.epsilon-1.)/(self.epsilon+2.))
-            U = q*self.potencialDescarga/(3*pi*dp*entrada.Gas.mu)
-            rendimiento_parcial.append(Dimensionless(1-exp(-U*A/entrada.Q)))
-        return rendimiento_parcial
+
+        def func(d):
+            return eta_Precipitator(d, A, entrada.Q, self.potencialCarga,
+                                    self.potencialDescarga, self.epsilon,
+                                    entrada.Gas.mu)
+        return self.gradeEfficiency(func)
 
     def propTxt(self):
         txt = os.linesep + "#---------------"
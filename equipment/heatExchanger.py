@@ -36,6 +36,8 @@ from scipy.optimize import fsolve
 
 from lib import unidades
 from lib.adimensional import Re, Pr, Gr, Gz
+from lib.exchangerProfile import (DistributedExchanger, h_tube, h_annulli,
+                                  h_shell)
 from lib.friction import f_friccion
 from lib.heatTransfer import *  # noqa
 from equipment.parents import equipment
@@ -543,7 +545,8 @@ class Hairpin(equipment):
             2 - Vertical, internal up
         metodo:
             0 - Mean temperature
-            1 - Split the pipe in segments
+            1 - Split the pipe in segments, integrating both sides along the
+                length with local properties and phase change zones
         tubesideLaminar: Method to calculate the global heat transfer
             coefficient in laminar flow for tubeside
             0 - Eubank-Proctor
@@ -650,7 +653,7 @@ class Hairpin(equipment):
     kwargsValue = ("DeTube", "DiTube", "wTube", "rTube", "kTube", "LTube",
                    "nTube", "tubeFouling", "annulliFouling", "P_dis",
                    "tubeTout", "annulliTout")
-    kwargsList = ("modo", "flujo", "orientacion")
+    kwargsList = ("modo", "flujo", "orientacion", "metodo")
     kwargsCheck = ("tubeFinned", )
     calculateValue = ("Q", "ToutAnnulli", "ToutTube", "U", "A", "L",
                       "deltaPTube", "deltaPAnnulli", "CF")
@@ -667,6 +670,9 @@ class Hairpin(equipment):
         QApplication.translate("pychemqt", "Horizontal"),
         QApplication.translate("pychemqt", "Vertical, (in down)"),
         QApplication.translate("pychemqt", "Vertical, (in up)")]
+    TEXT_METODO = [
+        QApplication.translate("pychemqt", "Mean temperature"),
+        QApplication.translate("pychemqt", "Split in segments")]
     TEXT_MATERIAL = [
         QApplication.translate("pychemqt", "Carbon steel/carbon steel"),
         QApplication.translate("pychemqt", "Carbon steel/304 stainless"),
@@ -789,6 +795,8 @@ class Hairpin(equipment):
             self.rating()
         else:
             self.design()
+            if not self.status:
+                return
 
         eD = unidades.Dimensionless(self.kwargs["rTube"]/self.Di)
         f = f_friccion(self.ReTube, eD)
@@ -857,65 +865,75 @@ class Hairpin(equipment):
             T = fsolve(f, inAnnulli.T)[0]
             self.outAnnulli = inAnnulli.clone(T=T)
 
+        # Split in segments
+        else:
+            model = self._distributed()
+            model.rating(self.L)
+            self._distributedResults(model)
+            self.outTube = model.outlet("A")
+            self.outAnnulli = model.outlet("B")
+            self.phaseTube = self.ThermalPhase(inTube, self.outTube)
+            self.phaseAnnulli = self.ThermalPhase(inAnnulli, self.outAnnulli)
+
     def design(self):
         """Design a pipe to meet the specified heat transfer requeriments"""
         # Input stream
         inTube = self.kwargs["entradaTubo"]
         inAnnulli = self.kwargs["entradaExterior"]
 
-        # Metodo temperaturas medias
-        if self.kwargs["metodo"] == 0:
+        # Calculate output condition and sensible/latent thermal situation,
+        # global thermal balance
+        if self.statusOut == 1:
+            if self.kwargs["tubeTout"]:
+                self.outTube = inTube.clone(T=self.kwargs["tubeTout"])
+            else:
+                self.outTube = inTube.clone(x=self.kwargs["tubeXout"])
+            if self.kwargs["annulliTout"]:
+                Tout = self.kwargs["annulliTout"]
+                self.outAnnulli = inAnnulli.clone(T=Tout)
+            else:
+                Xout = self.kwargs["annulliXout"]
+                self.outAnnulli = inAnnulli.clone(x=Xout)
 
-            # Calculate output condition and sensible/latent thermal situation,
-            # global thermal balance
-            if self.statusOut == 1:
-                if self.kwargs["tubeTout"]:
-                    self.outTube = inTube.clone(T=self.kwargs["tubeTout"])
-                else:
-                    self.outTube = inTube.clone(x=self.kwargs["tubeXout"])
-                if self.kwargs["annulliTout"]:
-                    Tout = self.kwargs["annulliTout"]
-                    self.outAnnulli = inAnnulli.clone(T=Tout)
-                else:
-                    Xout = self.kwargs["annulliXout"]
-                    self.outAnnulli = inAnnulli.clone(x=Xout)
+            Qo = abs(self.outAnnulli.h-inAnnulli.h)
+            Qi = abs(self.outTube.h-inTube.h)
+            self.Q = unidades.Power((Qo+Qi)/2.)
 
-                Qo = abs(self.outAnnulli.h-inAnnulli.h)
-                Qi = abs(self.outTube.h-inTube.h)
-                self.Q = unidades.Power((Qo+Qi)/2.)
+        elif self.statusOut == 2:
+            if self.kwargs["tubeTout"]:
+                self.outTube = inTube.clone(T=self.kwargs["tubeTout"])
+            else:
+                self.outTube = inTube.clone(x=self.kwargs["tubeXout"])
 
-            elif self.statusOut == 2:
-                if self.kwargs["tubeTout"]:
-                    self.outTube = inTube.clone(T=self.kwargs["tubeTout"])
-                else:
-                    self.outTube = inTube.clone(x=self.kwargs["tubeXout"])
+            Qi = abs(self.outTube.h-inTube.h)
+            self.Q = unidades.Power(Qi)
 
-                Qi = abs(self.outTube.h-inTube.h)
-                self.Q = unidades.Power(Qi)
+            def f(T):
+                return inAnnulli.clone(T=T).h-inAnnulli.h-Qi
+            T = fsolve(f, inAnnulli.T)[0]
+            self.outAnnulli = inAnnulli.clone(T=T)
 
-                def f(T):
-                    return inAnnulli.clone(T=T).h-inAnnulli.h-Qi
-                T = fsolve(f, inAnnulli.T)[0]
-                self.outAnnulli = inAnnulli.clone(T=T)
+        elif self.statusOut == 3:
+            if self.kwargs["annulliTout"]:
+                Tout = self.kwargs["annulliTout"]
+                self.outAnnulli = inAnnulli.clone(T=Tout)
+            else:
+                Xout = self.kwargs["annulliXout"]
+                self.outAnnulli = inAnnulli.clone(x=Xout)
 
-            elif self.statusOut == 3:
-                if self.kwargs["annulliTout"]:
-                    Tout = self.kwargs["annulliTout"]
-                    self.outAnnulli = inAnnulli.clone(T=Tout)
-                else:
-                    Xout = self.kwargs["annulliXout"]
-                    self.outAnnulli = inAnnulli.clone(x=Xout)
+            Qo = abs(self.outAnnulli.h-inAnnulli.h)
+            self.Q = unidades.Power(Qo)
 
-                Qo = abs(self.outAnnulli.h-inAnnulli.h)
-                self.Q = unidades.Power(Qo)
+            def f(T):
+                return inTube.clone(T=T).h-inTube.h-Qi
+            T = fsolve(f, inTube.T)[0]
+            self.outTube = inTube.clone(T=T)
 
-                def f(T):
-                    return inTube.clone(T=T).h-inTube.h-Qi
-                T = fsolve(f, inTube.T)[0]
-                self.outTube = inTube.clone(T=T)
+        self.phaseTube = self.ThermalPhase(inTube, self.outTube)
+        self.phaseAnnulli = self.ThermalPhase(inAnnulli, self.outAnnulli)
 
-            self.phaseTube = self.ThermalPhase(inTube, self.outTube)
-            self.phaseAnnulli = self.ThermalPhase(inAnnulli, self.outAnnulli)
+        # Mean temperature method
+        if self.kwargs["metodo"] == 0:
 
             fluidTube = inTube.clone(T=(inTube.T+self.outTube.T)/2.)
             T = (inAnnulli.T+self.outAnnulli.T)/2.
@@ -937,22 +955,107 @@ class Hairpin(equipment):
             else:
                 DTm = (DTin-DTout)/log(DTin/DTout)
 
-        self.A = unidades.Area(self.Q/self.U/DTm)
-        self.L = unidades.Length(self.A/2/pi)
+            self.A = unidades.Area(self.Q/self.U/DTm)
+            self.L = unidades.Length(self.A/2/pi)
 
-    def Ug(self, hi, ni, ho, no):
-        """Calculate global heat transfer coefficient"""
+        # Split in segments
+        else:
+            model = self._distributed()
+            try:
+                model.design(inTube.h-self.outTube.h)
+            except ValueError:
+                self.msg = QApplication.translate(
+                    "pychemqt", "Temperature cross, output not reachable")
+                self.status = 0
+                return
+            self.L = unidades.Length(model.L)
+            self._distributedResults(model)
+
+    def _U(self, hi, ni, ho, no):
+        """Return the global heat transfer coefficient and the clean value,
+        referred to external pipe area, hi and ho can be arrays"""
         Ui = self.De/self.Di/hi/ni
         Ufi = self.De*self.fi/self.Di/ni
         k = self.De*log(self.De/self.Di)/2/self.k
         U = 1/(Ui+Ufi+k+self.fo/no+1/ho/no)
         Uc = 1/(Ui+k+1/ho/no)
+        return U, Uc
+
+    def Ug(self, hi, ni, ho, no):
+        """Calculate global heat transfer coefficient"""
+        U, Uc = self._U(hi, ni, ho, no)
         self.hTube = unidades.HeatTransfCoef(hi)
         self.hAnnulli = unidades.HeatTransfCoef(ho)
         self.U = unidades.HeatTransfCoef(U)
         self.CF = unidades.Dimensionless(U/Uc)
         self.OS = unidades.Dimensionless(Uc*(self.fi+self.fo))
 
+    def _distributed(self):
+        """Define the distributed model of exchanger"""
+        inTube = self.kwargs["entradaTubo"]
+        inAnnulli = self.kwargs["entradaExterior"]
+        self.GTube = inTube.caudalmasico*4/pi/self.Di**2
+        self.GAnnulli = inAnnulli.caudalmasico*4/pi/(self.Dee**2-self.De**2)
+
+        if self.kwargs["modo"]:
+            L = self.kwargs["LTube"]
+        else:
+            # The length is unknown, the entrance effect in laminar
+            # correlations is evaluated with a long pipe
+            L = 100*self.Di
+
+        def conductance(fluidTube, fluidAnnulli):
+            U = self._coefficients(fluidTube, fluidAnnulli, L)[2]
+            return U*pi*self.De
+
+        return DistributedExchanger(inTube, inAnnulli, conductance,
+                                    self.CODE_FLUJO[self.kwargs["flujo"]])
+
+    def _coefficients(self, fluidTube, fluidAnnulli, L):
+        """Calculate the local heat transfer coefficients in distributed
+        model, return the tubeside, annulliside, global and clean global
+        heat transfer coefficients"""
+        cooled = self.kwargs["entradaTubo"].T > self.kwargs["entradaExterior"].T
+        hi = h_tube(fluidTube, self.GTube, self.Di, L,
+                    self.kwargs["tubesideLaminar"],
+                    self.kwargs["tubesideTurbulent"], cooled)
+        ho = h_annulli(fluidAnnulli, self.GAnnulli, self.Dee, self.De,
+                       self.Di, not cooled)
+        ni, no = self.rendimientoAletas(hi, ho)
+        U, Uc = self._U(hi, ni, ho, no)
+        return hi, ho, U, Uc
+
+    def _distributedResults(self, model):
+        """Save the mean values of distributed model"""
+        self.profile = model
+        self.Q = unidades.Power(abs(model.Q))
+        self.A = unidades.Area(model.L*pi*self.De)
+
+        fluidTube = model.fluidA
+        fluidAnnulli = model.fluidB
+        hi, ho, U, Uc = self._coefficients(fluidTube, fluidAnnulli, model.L)
+        self.hTube = unidades.HeatTransfCoef(model.mean(hi))
+        self.hAnnulli = unidades.HeatTransfCoef(model.mean(ho))
+        self.U = unidades.HeatTransfCoef(model.mean(U))
+        self.CF = unidades.Dimensionless(self.U/model.mean(Uc))
+        self.OS = unidades.Dimensionless(model.mean(Uc)*(self.fi+self.fo))
+
+        # Mean values for pressure drop
+        self.rhoTube = unidades.Density(model.mean(fluidTube.rho))
+        self.VTube = unidades.Speed(model.mean(self.GTube/fluidTube.rho))
+        self.ReTube = unidades.Dimensionless(
+            model.mean(self.GTube*self.Di/fluidTube.mu))
+        dh = self.Dee-self.De
+        self.rhoAnnulli = unidades.Density(model.mean(fluidAnnulli.rho))
+        self.VAnnulli = unidades.Speed(
+            model.mean(self.GAnnulli/fluidAnnulli.rho))
+        self.ReAnnulli = unidades.Dimensionless(
+            model.mean(self.GAnnulli*dh/fluidAnnulli.mu))
+
+        # Phase zones along length
+        self.zonesTube = model.zones("A")
+        self.zonesAnnulli = model.zones("B")
+
     def ThermalPhase(self, input, output):
         # Calculate thermal fundamentals
         if input.x == output.x:
@@ -1408,6 +1511,10 @@ class Shell_Tube(equipment):
             0   -   Stream analysis
             1   -   Bell-Delaware
             2   -   Kern
+        metodo: Método de evaluación
+            0   -   Propiedades de entrada
+            1   -   División en segmentos, integrando ambos lados a lo largo
+                    de los tubos con propiedades locales (carcasa por Kern)
 
     Tubo:
         NTubes: Número de tubos
@@ -1496,6 +1603,7 @@ class Shell_Tube(equipment):
         "tubesideLaminar": 0,
         "tubesideTurbulent": 0,
         "shellsideSensible": 0,
+        "metodo": 0,
 
         "NTube": 0,
         "NPases": 0,
@@ -1505,7 +1613,7 @@ class Shell_Tube(equipment):
         "rTube": 0.0,
         "kTube": 0.0,
         "distribucionTube": 0,
-        "pitch": 0,
+        "pitch": 0.0,
         "finned": 0,
         "Nfin": 0,
         "heightFin": 0.0,
@@ -1630,6 +1738,10 @@ class Shell_Tube(equipment):
             #Diseño
             pass
 
+        elif self.kwargs["metodo"]:
+            self.ratingDistributed()
+            return
+
         else:  # Evaluación
             N = self.kwargs["NTube"]
             De = unidades.Length(self.kwargs["DeTube"])
@@ -1699,6 +1811,102 @@ class Shell_Tube(equipment):
         self.area = unidades.Area(25)
 
 
+    def ratingDistributed(self):
+        """Rating with the distributed model, integrating both sides along
+        the tube path with the local properties. The shellside use the Kern
+        method, the multipass bundles are approximated as countercurrent
+        along the unfolded tube path
+
+        The heat duty agree with the ε-NTU method for countercurrent flow
+        with the mean global coefficient
+
+        >>> from math import exp
+        >>> from lib.corriente import Corriente
+        >>> kw = {"ids": [62], "fraccionMolar": [1.]}
+        >>> hot = Corriente(T=350, P=101325., caudalMasico=5., **kw)
+        >>> cold = Corriente(T=300, P=101325., caudalMasico=8., **kw)
+        >>> st = Shell_Tube(entradaTubo=hot, entradaCarcasa=cold, metodo=1, \
+                            NTube=100, NPases=1, DeTube=0.019, wTube=0.0021, \
+                            LTube=4, kTube=50, pitch=0.025, DShell=0.4, \
+                            baffleSpacing=0.2)
+        >>> print("%i %0.0f %0.1f %0.1f" % (
+        ...     st.status, st.Q.kW, st.ToutTube, st.ToutShell))
+        1 667 318.1 320.0
+        >>> Cmin, Cr = 5*4194., 5*4194/8/4180
+        >>> NTU = st.U*st.area/Cmin
+        >>> e = (1-exp(-NTU*(1-Cr)))/(1-Cr*exp(-NTU*(1-Cr)))
+        >>> print("%0.0f" % (e*Cmin*50/1e3))
+        668
+        """
+        inTube = self.kwargs["entradaTubo"]
+        inShell = self.kwargs["entradaCarcasa"]
+        self.status = 1
+        self.msg = ""
+        if self.kwargs["NPases"] > 1:
+            self.msg = QApplication.translate(
+                "pychemqt", "multipass bundle approximated as countercurrent")
+            self.status = 3
+        passes = max(self.kwargs["NPases"], 1)
+
+        self.De = unidades.Length(self.kwargs["DeTube"])
+        self.Di = unidades.Length(self.De-2*self.kwargs["wTube"])
+        self.L = unidades.Length(self.kwargs["LTube"])
+        Nt = self.kwargs["NTube"]/passes
+        self.GTube = inTube.caudalmasico/Nt*4/pi/self.Di**2
+
+        # Kern shellside geometry
+        Pt = self.kwargs["pitch"]
+        if self.kwargs["distribucionTube"] in (1, 3):
+            Deq = 4*(Pt**2-pi*self.De**2/4)/pi/self.De
+        else:
+            Deq = 4*(3**0.5/4*Pt**2-pi*self.De**2/8)/(pi*self.De/2)
+        self.Deq = unidades.Length(Deq)
+        As = self.kwargs["DShell"]*(Pt-self.De)*self.kwargs["baffleSpacing"]/Pt
+        self.GShell = inShell.caudalmasico/As
+
+        k = self.kwargs["kTube"]
+        fi = self.kwargs["foulingTube"]
+        fo = self.kwargs["foulingShell"]
+        cooled = inTube.T > inShell.T
+
+        def coefficients(fluidTube, fluidShell):
+            hi = h_tube(fluidTube, self.GTube, self.Di, self.L,
+                        self.kwargs["tubesideLaminar"],
+                        self.kwargs["tubesideTurbulent"], cooled)
+            ho = h_shell(fluidShell, self.GShell, Deq, not cooled)
+            U = 1/(self.De/self.Di/hi+self.De*fi/self.Di +
+                   self.De*log(self.De/self.Di)/2/k+fo+1/ho)
+            return hi, ho, U
+
+        def conductance(fluidTube, fluidShell):
+            return coefficients(fluidTube, fluidShell)[2]*Nt*pi*self.De
+
+        model = DistributedExchanger(inTube, inShell, conductance)
+        try:
+            model.rating(self.L*passes)
+        except ValueError:
+            self.msg = QApplication.translate(
+                "pychemqt", "Heat duty not found for the tube length")
+            self.status = 5
+            self.statusCoste = False
+            return
+        self.profile = model
+
+        hi, ho, U = coefficients(model.fluidA, model.fluidB)
+        self.hTube = unidades.HeatTransfCoef(model.mean(hi))
+        self.hShell = unidades.HeatTransfCoef(model.mean(ho))
+        self.U = unidades.HeatTransfCoef(model.mean(U))
+        self.area = unidades.Area(self.kwargs["NTube"]*pi*self.De*self.L)
+        self.Q = unidades.Power(abs(model.Q))
+        self.zonesTube = model.zones("A")
+        self.zonesShell = model.zones("B")
+
+        self.salida = [model.outlet("A"), model.outlet("B")]
+        self.ToutTube = self.salida[0].T
+        self.ToutShell = self.salida[1].T
+        self.XoutTube = self.salida[0].x
+        self.XoutShell = self.salida[1].x
+
     def fw(self):
         if self.kwargs["finned"]:
             fw=self.kwargs["wTube"]/self.kwargs["kTube"]*((self.kwargs["DeTube"]+2*self.kwargs["Nfin"]*self.kwargs["heightFin"]*(self.kwargs["DeTube"]+self.kwargs["heightFin"]))/(self.kwargs["DeTube"]-self.kwargs["wTube"]))
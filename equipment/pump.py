@@ -32,6 +32,7 @@ from scipy.constants import g
 from lib.unidades import (Pressure, Length, Power, VolFlow, Currency,
                           Dimensionless, DeltaP)
 from lib.datasheet import pdf
+from lib.pumpSystem import PumpCurve
 from equipment.parents import equipment
 
 
@@ -330,6 +331,15 @@ class Pump(equipment):
 
         return [D2, N2, Q2, h2, Pot2, npsh2]
 
+    def pumpCurve(self):
+        """Return the characteristic curve of pump at the working diameter
+        and speed as a lib.pumpSystem.PumpCurve instance, to calculate the
+        operating point with a piping system"""
+        curva = getattr(self, "curvaActual",
+                        self.kwargs["curvaCaracteristica"])
+        return PumpCurve.fromCharacteristic(
+            curva, self.kwargs["entrada"].Liquido.rho)
+
     def coste(self):
         HP = self.power.hp
         LnHP = log(self.power.hp)
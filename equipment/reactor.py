@@ -19,15 +19,25 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 
 
 
-############################
-###  librería de definición de reactores   ###
-############################
+###############################################################################
+# Reactor equipment
+#
+#   - Reactor: Ideal reactor with stoichiometric or kinetic reactions
+#
+#   The calculation of reactors is done in lib.kinetics and lib.gibbs
+###############################################################################
 
-from scipy.optimize import fsolve
-from PyQt5.QtWidgets import  QApplication
+
+import os
+
+from numpy import array, dot
+from PyQt5.QtWidgets import QApplication
 
 from lib import unidades
 from lib.corriente import Corriente
+from lib.gibbs import getSystem
+from lib.kinetics import KineticSystem, batch, cstr, pfr, stoichiometric
+from lib.mezcla import Mezcla
 from lib.reaction import Reaction
 from .parents import equipment
 
@@ -37,92 +47,280 @@ class Reactor(equipment):
 
     Parámetros:
         entrada: Instancia de clase corriente que define la corriente que fluye por la tubería
+        reaccion: lista con instanacias de clase Reaction
+        modelo: Modelo de reactor
+            0   -   Conversión fija, reacciones estequiométricas
+            1   -   Flujo pistón (PFR)
+            2   -   Tanque agitado continuo (CSTR)
+            3   -   Discontinuo (Batch) a volumen constante
+            4   -   Equilibrio por minimización de la energía libre de Gibbs
         thermal: Comportamiento térmico
             0   -   Adiabático
             1   -   Isotérmico
             2   -   Flujo de calor
             3   -   Calcular el intercambio de calor conocidas U y Tª externa
-        reaccion: lista con instanacias de clase Reaction
-        P: Presión en el reactor
-        T: temperatura en el reactor
-        Q: Calor transmitido a través de las paredes de la tubería
-        Text: Temperatura en el exterior de la tubería
-        U: Coeficiente global de transimisión de calor entre la tubería y el exterior
+        T: temperatura en el reactor isotérmico, por defecto la de entrada
+        Q: Calor transmitido a través de las paredes del reactor
+        Text: Temperatura en el exterior del reactor
+        U: Coeficiente global de transimisión de calor entre el reactor y el exterior
+        A: Área de intercambio de calor
+        V: Volumen del reactor
+        tiempo: Tiempo de reacción del reactor discontinuo
+        condensados: lista con los índices de los componentes que forman
+            fases condensadas puras en el reactor de equilibrio, p.ej. carbono
+        deltaP: Pérdida de presión en el reactor
+        Pout: Presión de salida
+
+    Las reacciones en modelos cinéticos usan los parámetros cinéticos de
+    Reaction, Ko, Ei, n y orden. El reactor en fase gas o líquida se define
+    según el estado de la corriente de entrada. El reactor discontinuo se
+    carga con la corriente de entrada, la salida se refiere a la misma base
+    de caudal procesado por cargas sucesivas. El reactor de equilibrio no
+    necesita reacciones, todos los componentes de la corriente de entrada
+    son las especies posibles en el equilibrio.
     """
-    title=QApplication.translate("pychemqt", "Reactor")
-    help=""
-    kwargs={"entrada": None,
-                    "thermal": 0,
-                    "deltaP": 0.0,
-                    "Pout": 0.0,
-                    "Hmax": 0.0,
-                    "eficiencia": 0.0,
-                    "poderCalorifico": 0.0,
-
-                    "f_install": 1.3,
-                    "Base_index": 0.0,
-                    "Current_index": 0.0,
-                    "tipo": 0,
-                    "subtipo": 0,
-                    "material": 0,
-                    "P_dis": 0.0}
-
-    kwargsInput=("entrada", )
+    title = QApplication.translate("pychemqt", "Reactor")
+    help = ""
+    kwargs = {"entrada": None,
+              "reaccion": [],
+              "modelo": 0,
+              "thermal": 0,
+              "T": 0.0,
+              "Q": 0.0,
+              "Text": 0.0,
+              "U": 0.0,
+              "A": 0.0,
+              "V": 0.0,
+              "tiempo": 0.0,
+              "condensados": [],
+              "deltaP": 0.0,
+              "Pout": 0.0,
+              "Hmax": 0.0,
+              "eficiencia": 0.0,
+              "poderCalorifico": 0.0,
+
+              "f_install": 1.3,
+              "Base_index": 0.0,
+              "Current_index": 0.0,
+              "tipo": 0,
+              "subtipo": 0,
+              "material": 0,
+              "P_dis": 0.0}
+
+    kwargsInput = ("entrada", )
+    kwargsValue = ("T", "Q", "Text", "U", "A", "V", "tiempo", "deltaP",
+                   "Pout")
+    kwargsList = ("modelo", "thermal")
+    calculateValue = ("Tout", "Pout", "Heat", "Conversion")
+
+    TEXT_MODELO = [
+        QApplication.translate("pychemqt", "Fixed conversion"),
+        QApplication.translate("pychemqt", "Plug flow (PFR)"),
+        QApplication.translate("pychemqt", "Continuous stirred tank (CSTR)"),
+        QApplication.translate("pychemqt", "Batch"),
+        QApplication.translate("pychemqt", "Gibbs free energy minimization")]
+    TEXT_THERMAL = [
+        QApplication.translate("pychemqt", "Adiabatic"),
+        QApplication.translate("pychemqt", "Isothermic"),
+        QApplication.translate("pychemqt", "Heat flux"),
+        QApplication.translate("pychemqt", "Heat transfer")]
 
     @property
     def isCalculable(self):
+        if not self.kwargs["entrada"]:
+            self.msg = QApplication.translate("pychemqt", "undefined input")
+            self.status = 0
+            return
+        if self.kwargs["modelo"] != 4 and not self.kwargs["reaccion"]:
+            self.msg = QApplication.translate(
+                "pychemqt", "undefined reaction")
+            self.status = 0
+            return
+        if self.kwargs["modelo"] in (1, 2, 3) and not self.kwargs["V"]:
+            self.msg = QApplication.translate(
+                "pychemqt", "undefined reactor volume")
+            self.status = 0
+            return
+        if self.kwargs["modelo"] == 3 and not self.kwargs["tiempo"]:
+            self.msg = QApplication.translate(
+                "pychemqt", "undefined reaction time")
+            self.status = 0
+            return
+        if self.kwargs["modelo"] in (0, 4) and self.kwargs["thermal"] == 3:
+            self.msg = QApplication.translate(
+                "pychemqt", "heat transfer not supported in reactor model")
+            self.status = 0
+            return
+        if self.kwargs["thermal"] == 3 and not (
+                self.kwargs["U"] and self.kwargs["A"] and self.kwargs["Text"]):
+            self.msg = QApplication.translate(
+                "pychemqt", "undefined heat transfer condition")
+            self.status = 0
+            return
+
+        self.msg = ""
+        self.status = 1
         return True
 
     def calculo(self):
-        self.entrada=self.kwargs.get("entrada", None)
-        self.thermal=self.kwargs.get("thermal", 0)
+        self.entrada = self.kwargs["entrada"]
+        self.reaccion = self.kwargs["reaccion"]
+        modelo = self.kwargs["modelo"]
+        thermal = self.kwargs["thermal"]
 
-        #TODO: implementar para más de una reacción
-        self.reaccion=self.kwargs.get("reaccion", 0)[0]
-
-
-#        P=self.kwargs.get("P", 0)
-#        if P:
-#            self.entrada=Corriente(self.entrada.T, P, self.entrada.caudalmasico.kgh, self.entrada.mezcla, self.entrada.solido)
-        T=self.kwargs.get("T", 0)
-        if T:
-            self.T=unidades.Temperature(T)
+        if self.kwargs["Pout"]:
+            self.Pout = unidades.Pressure(self.kwargs["Pout"])
+        else:
+            self.Pout = unidades.Pressure(
+                self.entrada.P-self.kwargs["deltaP"])
+        if self.kwargs["T"]:
+            self.T = unidades.Temperature(self.kwargs["T"])
         else:
-            self.T=self.entrada.T
+            self.T = self.entrada.T
+        self.Text = unidades.Temperature(self.kwargs["Text"])
+        self.U = unidades.HeatTransfCoef(self.kwargs["U"])
+        self.A = unidades.Area(self.kwargs["A"])
+        self.V = unidades.Volume(self.kwargs["V"])
+        UA = self.U*self.A
+        Q = self.kwargs["Q"]
 
-        self.Q=unidades.Power(self.kwargs.get("Q", 0))
+        F0 = array(self.entrada.caudalunitariomolar)
+        T0 = self.entrada.T
+        P = self.entrada.P
+        Qv = self.entrada.Q
+        gas = self.entrada.x == 1
+        if modelo == 4:
+            self._gibbs(F0, T0, P, thermal, Q)
+            return
+        try:
+            system = KineticSystem(self.reaccion, self.entrada.componente,
+                                   gas, T0)
+            if modelo == 0:
+                conversion = [r.kwargs["conversion"] for r in self.reaccion]
+                perfil = stoichiometric(system, F0, T0, conversion, thermal,
+                                        Q, self.T)
+            elif modelo == 1:
+                perfil = pfr(system, F0, T0, P, self.V, thermal, Q, UA,
+                             self.Text, Qv)
+            elif modelo == 2:
+                perfil = cstr(system, F0, T0, P, self.V, thermal, Q, UA,
+                              self.Text, self.T, Qv)
+            else:
+                # The batch is loaded with the input stream, the output
+                # refers to the processed flow
+                carga = self.V/Qv
+                perfil = batch(system, F0*carga, T0, self.V,
+                               self.kwargs["tiempo"], thermal, Q, UA,
+                               self.Text)
+                perfil.F = perfil.F/carga
+                perfil.Q = perfil.Q/carga
+        except (ValueError, TypeError, KeyError) as error:
+            self.msg = QApplication.translate(
+                "pychemqt", "reactor calculation failed")+": "+str(error)
+            self.status = 0
+            return
 
-        self.Text=self.kwargs.get("Text", 0)
-        self.U=unidades.HeatTransfCoef(self.kwargs.get("U", 0))
+        self.perfil = perfil
+        F = perfil.F[:, -1]
+        self.Tout = unidades.Temperature(perfil.T[-1])
+        self.Heat = unidades.Power(perfil.Q[-1])
+        self.Conversion = [
+            unidades.Dimensionless(perfil.conversion(i)[-1])
+            if F0[i] else unidades.Dimensionless(0) for i in system.key]
 
-        if self.thermal in [0, 2]:
+        mezcla = Mezcla(tipo=2, ids=self.entrada.ids,
+                        caudalUnitarioMolar=list(F))
+        self.Salida = self.entrada.clone(T=self.Tout, P=self.Pout,
+                                         mezcla=mezcla)
+        self.salida = [self.Salida]
 
-            def f(T):
-                fracciones, h=self.reaccion.conversion(self.entrada, T)
-                corriente=Corriente(T, self.entrada.P.atm, self.entrada.caudalmasico.kgh, Mezcla(self.entrada.ids, fracciones), self.entrada.solido)
-                return corriente.h-self.Q-self.entrada.h-h
-            T=fsolve(f, self.entrada.T)
-            fracciones, h=self.reaccion.conversion(self.entrada, T)
+    def _gibbs(self, F0, T0, P, thermal, Q):
+        """Calculate the equilibrium reactor"""
+        ids = self.entrada.ids
+        condensados = [ids.index(i) for i in self.kwargs["condensados"]
+                       if i in ids]
+        system = getSystem(self.entrada.componente, condensados)
+        try:
+            if thermal == 1:
+                eq = system.equilibrium(self.T, P, F0)
+                Heat = dot(eq.n, system.enthalpy(self.T)) - \
+                    dot(F0, system.enthalpy(T0))
+            else:
+                if thermal != 2:
+                    Q = 0
+                eq = system.adiabatic(T0, P, F0, Q)
+                Heat = Q
+        except ValueError as error:
+            self.msg = QApplication.translate(
+                "pychemqt", "reactor calculation failed")+": "+str(error)
+            self.status = 0
+            return
 
-        elif self.thermal==1:
-            T=self.T
-            fracciones, h=self.reaccion.conversion(self.entrada, T)
+        self.equilibrio = eq
+        self.Tout = unidades.Temperature(eq.T)
+        self.Heat = unidades.Power(Heat)
+        self.Conversion = []
 
-        elif self.thermal==3:
-            pass
+        mezcla = Mezcla(tipo=2, ids=ids, caudalUnitarioMolar=list(eq.n))
+        self.Salida = self.entrada.clone(T=self.Tout, P=self.Pout,
+                                         mezcla=mezcla)
+        self.salida = [self.Salida]
 
-        print(fracciones)
-        self.Salida=Corriente(T=T, P=self.entrada.P, caudalMasico=self.entrada.caudalmasico, fraccionMolar=fracciones, solido=self.entrada.solido)
-        self.Heat=unidades.Power(self.Salida.h-self.entrada.h-h)
+    def propTxt(self):
+        txt = "#---------------"
+        txt += QApplication.translate("pychemqt", "Calculate properties")
+        txt += "-----------------#"+os.linesep
+        txt += "%-25s\t %s" % (QApplication.translate("pychemqt", "Model"),
+                               self.TEXT_MODELO[self.kwargs["modelo"]])
+        txt += os.linesep
+        txt += "%-25s\t %s" % (
+            QApplication.translate("pychemqt", "Thermal"),
+            self.TEXT_THERMAL[self.kwargs["thermal"]])+os.linesep
+        txt += "%-25s\t%s" % (QApplication.translate(
+            "pychemqt", "Output Temperature"), self.Tout.str)+os.linesep
+        txt += "%-25s\t%s" % (QApplication.translate(
+            "pychemqt", "Output Pressure"), self.Pout.str)+os.linesep
+        txt += "%-25s\t%s" % (QApplication.translate(
+            "pychemqt", "Heat"), self.Heat.str)+os.linesep
+        txt += "#"+QApplication.translate(
+            "pychemqt", "Key component conversion")+os.linesep
+        for reaccion, conversion in zip(self.reaccion, self.Conversion):
+            txt += "%-25s\t%s" % (reaccion.text, conversion.str)+os.linesep
+        return txt
 
+    @classmethod
+    def propertiesEquipment(cls):
+        l = [(QApplication.translate("pychemqt", "Model"),
+              ("TEXT_MODELO", "modelo"), str),
+             (QApplication.translate("pychemqt", "Thermal"),
+              ("TEXT_THERMAL", "thermal"), str),
+             (QApplication.translate("pychemqt", "Output Temperature"),
+              "Tout", unidades.Temperature),
+             (QApplication.translate("pychemqt", "Output Pressure"),
+              "Pout", unidades.Pressure),
+             (QApplication.translate("pychemqt", "Heat"),
+              "Heat", unidades.Power),
+             (QApplication.translate("pychemqt", "Key component conversion"),
+              "Conversion", unidades.Dimensionless)]
+        return l
 
 
 if __name__ == '__main__':
-    from math import exp, log
-    mezcla=Corriente(T=300, P=101325., caudalMasico=1.0, ids=[1, 46, 47, 62], fraccionMolar=[0.03, 0.96, 0.01, 0.])
-    reaccion=Reaction(comp=[1, 46, 47, 62], coef=[-2, 0, -1, 2], tipo=0, base=0, conversion=0.9)
+    mezcla = Corriente(T=700, P=101325., caudalMasico=1.0,
+                       ids=[1, 46, 47, 62], fraccionMolar=[0.03, 0.96, 0.01, 0.])
+    reaccion = Reaction(comp=[1, 47, 62], coef=[-2, -1, 2], key=1, tipo=3,
+                        conversion=0.9, Ko=1e9, Ei=8e7)
     print(reaccion)
-    reactor=Reactor(entrada=mezcla, reaccion=[reaccion], thermal=1)
-    print(reactor.status)
+    reactor = Reactor(entrada=mezcla, reaccion=[reaccion], thermal=1)
+    print(reactor.status, reactor.msg)
     print(reactor.Salida.fraccion, reactor.Salida.T, reactor.Heat.MJh)
+    reactor(modelo=1, V=10, thermal=0)
+    print(reactor.status, reactor.msg)
+    print(reactor.perfil.T, reactor.Conversion)
 
+    reformado = Corriente(T=900, P=20e5, caudalMolar=1.0,
+                          ids=[2, 62, 48, 49, 1],
+                          fraccionMolar=[0.25, 0.75, 0, 0, 0])
+    reactor = Reactor(entrada=reformado, modelo=4, thermal=1, T=1100)
+    print(reactor.status, reactor.msg)
+    print(reactor.Salida.fraccion, reactor.Heat.MJh)
@@ -26,14 +26,155 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 ###     -Molinos
 #######################################################################
 
+import os
+
+from PyQt5.QtWidgets import QApplication
+
 from lib import unidades
 from lib.corriente import Corriente
+from lib.gasSolid import gradeEfficiency
 from .parents import equipment
 
+
 class Screen(equipment):
-    """Clase que define los tamices"""
-    title = "Screen"
+    """Clase que define los tamices
+
+    Parameters:
+        entrada: Corriente instance with solid to screen
+        apertura: Screen aperture, cut diameter, [m]
+        nitidez: Sharpness of separation, exponent of partition curve
+            E = 1/(1+(apertura/d)^nitidez), 0 for a ideal screen
+
+    The partition curve is integrated inside each class of the particle
+    distribution, the output streams are the oversize and the undersize,
+    the liquid or gas of input stream go with the undersize
+
+    >>> from lib.corriente import Corriente
+    >>> from lib.solids import Solid
+    >>> solido = Solid(caudalSolido=[1], distribucion_diametro=[1e-4, 1e-3], \
+                       distribucion_fraccion=[0.5, 0.5], solids=[638])
+    >>> kw = {"ids": [62], "fraccionMolar": [1.], "iapws": True}
+    >>> entrada = Corriente(T=300, P=1e5, caudalMasico=1, solido=solido, **kw)
+    >>> tamiz = Screen(entrada=entrada, apertura=3.1623e-4)
+    >>> print("%0.4f %0.4f" % (tamiz.rendimiento, tamiz.Dmover.mm))
+    0.5000 1.0000
+    """
+    title = QApplication.translate("pychemqt", "Screen")
     help = ""
+    kwargs = {"entrada": None,
+              "apertura": 0.0,
+              "nitidez": 0.0}
+    kwargsInput = ("entrada", )
+
+    @property
+    def isCalculable(self):
+        if not self.kwargs["entrada"]:
+            self.msg = QApplication.translate("pychemqt", "undefined input")
+            self.status = 0
+        elif not self.kwargs["entrada"].solido or \
+                not self.kwargs["entrada"].solido.status:
+            self.msg = QApplication.translate("pychemqt", "undefined solid")
+            self.status = 0
+        elif not self.kwargs["apertura"]:
+            self.msg = QApplication.translate("pychemqt",
+                                              "undefined screen aperture")
+            self.status = 0
+        else:
+            self.msg = ""
+            self.status = 1
+            return True
+
+    def calculo(self):
+        self.entrada = self.kwargs["entrada"]
+        self.apertura = unidades.Length(self.kwargs["apertura"])
+        self.nitidez = unidades.Dimensionless(self.kwargs["nitidez"])
+
+        solido = self.entrada.solido
+        d50 = self.apertura
+        alpha = self.nitidez
+
+        def func(d):
+            if alpha:
+                return 1/(1+(d50/d)**alpha)
+            return 1.*(d >= d50)
+
+        eta = gradeEfficiency(func, solido.psd.d, True)
+        self.rendimiento_parcial = [unidades.Dimensionless(x) for x in eta]
+        self.rendimiento = unidades.Dimensionless(
+            solido.psd.partition(eta)[0])
+
+        undersize, oversize = solido.Separar(eta)
+        if self.rendimiento == 0:
+            self.salida = [self.entrada.clone(split=0), self.entrada.clone()]
+        elif self.rendimiento == 1:
+            self.salida = [self.entrada.clone(), self.entrada.clone(split=0)]
+        else:
+            self.salida = [
+                Corriente(T=self.entrada.T, P=self.entrada.P,
+                          solido=oversize),
+                self.entrada.clone(solido=undersize)]
+
+        self.Min = solido.caudal
+        self.Dmin = solido.diametro_medio
+        self.Mover = unidades.MassFlow(solido.caudal*self.rendimiento)
+        self.Dmover = self.salida[0].solido.diametro_medio
+        self.Munder = unidades.MassFlow(solido.caudal*(1-self.rendimiento))
+        self.Dmunder = self.salida[1].solido.diametro_medio
+
+    def propTxt(self):
+        txt = "#---------------"
+        txt += QApplication.translate("pychemqt", "Calculate properties")
+        txt += "-----------------#"+os.linesep
+        txt += self.propertiesToText(range(9))
+        return txt
+
+    @classmethod
+    def propertiesEquipment(cls):
+        l = [(QApplication.translate("pychemqt", "Screen aperture"),
+              "apertura", unidades.Length),
+             (QApplication.translate("pychemqt", "Sharpness"), "nitidez",
+              unidades.Dimensionless),
+             (QApplication.translate("pychemqt", "Oversize recovery"),
+              "rendimiento", unidades.Dimensionless),
+             (QApplication.translate("pychemqt", "Solid input flow"), "Min",
+              unidades.MassFlow),
+             (QApplication.translate("pychemqt", "Input mean diameter"),
+              "Dmin", unidades.Length),
+             (QApplication.translate("pychemqt", "Oversize flow"), "Mover",
+              unidades.MassFlow),
+             (QApplication.translate("pychemqt", "Oversize mean diameter"),
+              "Dmover", unidades.Length),
+             (QApplication.translate("pychemqt", "Undersize flow"), "Munder",
+              unidades.MassFlow),
+             (QApplication.translate("pychemqt", "Undersize mean diameter"),
+              "Dmunder", unidades.Length)]
+        return l
+
+    def writeStatetoJSON(self, state):
+        state["apertura"] = self.apertura
+        state["nitidez"] = self.nitidez
+        state["rendimiento"] = self.rendimiento
+        state["rendimiento_parcial"] = self.rendimiento_parcial
+        state["Min"] = self.Min
+        state["Dmin"] = self.Dmin
+        state["Mover"] = self.Mover
+        state["Dmover"] = self.Dmover
+        state["Munder"] = self.Munder
+        state["Dmunder"] = self.Dmunder
+
+    def readStatefromJSON(self, state):
+        self.apertura = unidades.Length(state["apertura"])
+        self.nitidez = unidades.Dimensionless(state["nitidez"])
+        self.rendimiento = unidades.Dimensionless(state["rendimiento"])
+        self.rendimiento_parcial = [
+            unidades.Dimensionless(x) for x in state["rendimiento_parcial"]]
+        self.Min = unidades.MassFlow(state["Min"])
+        self.Dmin = unidades.Length(state["Dmin"])
+        self.Mover = unidades.MassFlow(state["Mover"])
+        self.Dmover = unidades.Length(state["Dmover"])
+        self.Munder = unidades.MassFlow(state["Munder"])
+        self.Dmunder = unidades.Length(state["Dmunder"])
+        self.salida = [None, None]
 
     def coste(self, *args):
         self._indicesCoste(*args)
@@ -44,9 +185,132 @@ class Screen(equipment):
 
 
 class Grinder(equipment):
-    """Clase que define los molinos de trituración de sólidos"""
-    title = "Molino"
+    """Clase que define los molinos de trituración de sólidos
+
+    Parameters:
+        entrada: Corriente instance with solid to grind
+        metodo: Product specification
+            0 - Reduction ratio, F80/P80
+            1 - Product size P80
+        reduccion: Reduction ratio
+        P80: Diameter passing the 80% of product, [m]
+        Wi: Bond work index, [kWh/t]
+
+    The product distribution is the feed distribution scaled with the
+    reduction ratio, the power is calculated with the Bond law
+
+    >>> from lib.corriente import Corriente
+    >>> from lib.solids import Solid
+    >>> solido = Solid(caudalSolido=[1], distribucion_diametro=[1e-3, 4e-3], \
+                       distribucion_fraccion=[0.5, 0.5], solids=[638])
+    >>> kw = {"ids": [62], "fraccionMolar": [1.], "iapws": True}
+    >>> entrada = Corriente(T=300, P=1e5, caudalMasico=1, solido=solido, **kw)
+    >>> molino = Grinder(entrada=entrada, metodo=1, P80=1e-4, Wi=11.61)
+    >>> print("%0.2f %0.1f %0.2f" % (molino.F80.mm, molino.reduccion, \
+                                      molino.power.kW))
+    4.59 45.9 35.63
+    """
+    title = QApplication.translate("pychemqt", "Grinder")
     help = ""
+    kwargs = {"entrada": None,
+              "metodo": 0,
+              "reduccion": 0.0,
+              "P80": 0.0,
+              "Wi": 0.0}
+    kwargsInput = ("entrada", )
+
+    @property
+    def isCalculable(self):
+        if not self.kwargs["entrada"]:
+            self.msg = QApplication.translate("pychemqt", "undefined input")
+            self.status = 0
+        elif not self.kwargs["entrada"].solido or \
+                not self.kwargs["entrada"].solido.status:
+            self.msg = QApplication.translate("pychemqt", "undefined solid")
+            self.status = 0
+        elif self.kwargs["metodo"] == 0 and self.kwargs["reduccion"] <= 1:
+            self.msg = QApplication.translate("pychemqt",
+                                              "undefined reduction ratio")
+            self.status = 0
+        elif self.kwargs["metodo"] == 1 and not self.kwargs["P80"]:
+            self.msg = QApplication.translate("pychemqt",
+                                              "undefined product size")
+            self.status = 0
+        elif not self.kwargs["Wi"]:
+            self.msg = QApplication.translate("pychemqt",
+                                              "undefined work index")
+            self.status = 0
+        else:
+            self.msg = ""
+            self.status = 1
+            return True
+
+    def calculo(self):
+        self.entrada = self.kwargs["entrada"]
+        solido = self.entrada.solido
+        self.Wi = unidades.Dimensionless(self.kwargs["Wi"])
+
+        self.F80 = unidades.Length(solido.psd.quantile(0.8))
+        if self.kwargs["metodo"] == 0:
+            R = self.kwargs["reduccion"]
+        else:
+            R = self.F80/self.kwargs["P80"]
+        self.reduccion = unidades.Dimensionless(R)
+        self.P80 = unidades.Length(self.F80/R)
+
+        producto = solido.clone(diametros=solido.psd.d/R)
+        self.salida = [self.entrada.clone(solido=producto)]
+
+        # Bond law with diameters in µm, specific energy in kWh/t
+        W = 10*self.Wi*(1/self.P80.micra**0.5-1/self.F80.micra**0.5)
+        self.power = unidades.Power(W*solido.caudal.Tonh, "kW")
+
+        self.Dmin = solido.diametro_medio
+        self.Dmout = producto.diametro_medio
+
+    def propTxt(self):
+        txt = "#---------------"
+        txt += QApplication.translate("pychemqt", "Calculate properties")
+        txt += "-----------------#"+os.linesep
+        txt += self.propertiesToText(range(7))
+        return txt
+
+    @classmethod
+    def propertiesEquipment(cls):
+        l = [(QApplication.translate("pychemqt", "Bond work index"), "Wi",
+              unidades.Dimensionless),
+             (QApplication.translate("pychemqt", "Reduction ratio"),
+              "reduccion", unidades.Dimensionless),
+             (QApplication.translate("pychemqt", "Feed size F80"), "F80",
+              unidades.Length),
+             (QApplication.translate("pychemqt", "Product size P80"), "P80",
+              unidades.Length),
+             (QApplication.translate("pychemqt", "Input mean diameter"),
+              "Dmin", unidades.Length),
+             (QApplication.translate("pychemqt", "Output mean diameter"),
+              "Dmout", unidades.Length),
+             (QApplication.translate("pychemqt", "Power"), "power",
+              unidades.Power)]
+        return l
+
+    def writeStatetoJSON(self, state):
+        state["Wi"] = self.Wi
+        state["reduccion"] = self.reduccion
+        state["F80"] = self.F80
+        state["P80"] = self.P80
+        state["Dmin"] = self.Dmin
+        state["Dmout"] = self.Dmout
+        state["power"] = self.power
+
+    def readStatefromJSON(self, state):
+        self.Wi = unidades.Dimensionless(state["Wi"])
+        self.reduccion = unidades.Dimensionless(state["reduccion"])
+        self.F80 = unidades.Length(state["F80"])
+        self.P80 = unidades.Length(state["P80"])
+        self.Dmin = unidades.Length(state["Dmin"])
+        self.Dmout = unidades.Length(state["Dmout"])
+        self.power = unidades.Power(state["power"])
+        self.salida = [None]
 
     def coste(self, *args, **kwargs):
         """
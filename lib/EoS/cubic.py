@@ -22,6 +22,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 # Virial equation of state implementation
 ###############################################################################
 
+from numpy import array
 from scipy import roots, r_, log, exp, sqrt
 
 from PyQt5.QtWidgets import QApplication
@@ -61,16 +62,14 @@ class Cubic(EoS):
         self.H_exc=-(self.tita+self.dTitadT)/R_atml/self.T/(self.delta**2-4*self.epsilon)**0.5*log((2*self.V+self.delta-(self.delta**2-4*self.epsilon)**0.5)/(2*self.V+self.delta+(self.delta**2-4*self.epsilon)**0.5))+1-self.Z
 
     def _fug(self, Z, xi):
-        Ai=[]
-        for i in range(len(self.componente)):
-            suma=0
-            for j in range(len(self.componente)):
-                suma+=self.fraccion[j]*self.ai[j]**0.5*(1-self.kij[i][j])
-            Ai.append(1/self.tita*2*self.ai[i]**0.5*suma)
-        tita=[]
-        for i in range(len(self.componente)):
-            tita.append(exp(self.bi[i]/self.b*(Z-1)-log(Z-self.B)-self.Tita/self.B/sqrt(self.u**2-4*self.w)*(Ai[i]-self.bi[i]/self.b)*log((Z+self.B/2*(self.u+sqrt(self.u**2-4*self.w)))/(Z+self.B/2*(self.u-sqrt(self.u**2-4*self.w))))).real)
-        return tita
+        kij = array(self.kij, dtype=float)
+        ai = array(self.ai, dtype=float)**0.5
+        Ai = 2*ai/self.tita*(1-kij).dot(array(self.fraccion, dtype=float)*ai)
+        bi = array(self.bi, dtype=float)/self.b
+        d = sqrt(self.u**2-4*self.w)
+        tita = exp(bi*(Z-1)-log(Z-self.B)-self.Tita/self.B/d*(Ai-bi)*log(
+            (Z+self.B/2*(self.u+d))/(Z+self.B/2*(self.u-d))))
+        return list(tita.real)
 
 
 class _2ParameterCubic(Cubic):
@@ -23,9 +23,12 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 # module with general library functionality of pychemqt
 ###############################################################################
 
-__all__ = ["EoS", "mEoS", "adimensional", "bip", "compuestos", "config",
-           "coolProp", "corriente", "datasheet", "elemental", "eos",
-           "firstrun", "freeSteam", "friction", "gerg", "heatTransfer", "meos",
-           "petro", "physics", "pipeDatabase", "plot", "project",
-           "psycrometry", "reaction", "refProp", "sql", "thermo", "thread",
+__all__ = ["EoS", "mEoS", "adimensional", "assay", "bip", "compuestos",
+           "compression", "config", "coolProp", "corriente", "datasheet",
+           "elemental", "eos", "exchangerProfile", "firstrun", "freeSteam",
+           "friction", "gasSolid", "gerg", "gibbs", "heatTransfer", "hydrate",
+           "kinetics", "meos", "meosCache", "mesh", "petro", "physics",
+           "pinch", "pipeDatabase", "plot", "project", "projectArchive", "psd",
+           "psyArray", "psyBatch", "psycrometry", "pumpSystem", "reaction",
+           "refProp", "sql", "startup", "streamExport", "thermo", "thread",
            "unidades", "utilities"]
@@ -0,0 +1,539 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Crude assay characterization in pseudo-components
+#
+#   - RiaziDaubert: Properties of fractions from Tb and SG, Riazi-Daubert
+#   - Twu: Properties of fractions from Tb and SG, Twu
+#   - acentric_KeslerLee: Acentric factor of fractions
+#   - viscosity_API: Kinematic viscosity at 100ºF and 210ºF
+#
+#   - Pseudocomponent: Component definition of a cut, for cubic eos
+#   - PseudoMezcla: Mixture of pseudocomponents, for cubic eos
+#   - Assay: Cut a distillation curve in pseudo-components
+#   - assayKey: Hash of assay definition
+#   - characterize: Assay with results cached by hash
+#
+#   The distillation curve is converted to TBP and fitted to the Riazi
+#   distribution model, the cuts are defined in this continuous curve so the
+#   boiling point of each cut is the volumetric average in its interval. The
+#   specific gravity of cuts is calculated with a constant Watson factor
+#   consistent with the crude specific gravity. All the properties of cuts
+#   are calculated with arrays in a single call for all cuts.
+###############################################################################
+
+
+import hashlib
+import json
+
+from numpy import (array, asarray, clip, concatenate, exp, linspace, log,
+                   log10, where)
+from numpy.polynomial.legendre import leggauss
+
+from lib import unidades
+from lib.mezcla import Mezcla
+from lib.petro import (curve_Predicted, D86_TBP_Riazi, RD_Tb_SG, T_Predicted,
+                       Tb_Presion)
+
+
+# Percent of standard points of distillation curves
+POINTS = [0, 5, 10, 20, 30, 40, 50, 60, 70, 80, 90, 95, 99]
+
+# Maximum number of characterized assay saved in cache
+CACHE_SIZE = 256
+_cache = {}
+
+
+def RiaziDaubert(Tb, SG):
+    """Properties of petroleum fractions from boiling point and specific
+    gravity
+
+    Parameters
+    ----------
+    Tb : array
+        Normal boiling temperature, [K]
+    SG : array
+        Specific gravity 60ºF/60ºF, [-]
+
+    Returns
+    -------
+    prop : dict
+        M: molecular weight, [g/mol]
+        Tc: critical temperature, [K]
+        Pc: critical pressure, [Pa]
+        Vc: critical volume, [m³/kg]
+        I: Huang parameter, [-]
+        CH: carbon to hydrogen weight ratio, [-]
+
+    References
+    ----------
+    Riazi, M. R., and T. E. Daubert. “Characterization Parameters for
+    Petroleum Fractions.” Ind. Eng. Chem. Res. 26, no. 24 (1987): 755–759.
+
+    >>> p = RiaziDaubert(447.3, 0.7342)
+    >>> print("%0.1f %0.1f %0.2f" % (p["M"], p["Tc"], p["Pc"]*1e-5))
+    144.1 621.4 20.39
+    """
+    Tb = asarray(Tb, dtype=float)[..., None]
+    SG = asarray(SG, dtype=float)[..., None]
+    a, b, c, d, e, f = RD_Tb_SG
+    x = a*Tb**e*SG**f*exp(b*Tb+c*SG+d*Tb*SG)
+    x = x.T
+    return {"M": x[0], "Tc": x[1], "Pc": x[2]*1e5, "Vc": x[3]*1e-3,
+            "I": x[4], "CH": x[5]}
+
+
+def Twu(Tb, SG, iterations=20):
+    """Properties of petroleum fractions from boiling point and specific
+    gravity with the perturbation of normal paraffin properties. The
+    paraffin molecular weight is solved with a vectorized Newton method
+
+    Parameters
+    ----------
+    Tb : array
+        Normal boiling temperature, [K]
+    SG : array
+        Specific gravity 60ºF/60ºF, [-]
+    iterations : int
+        Newton iterations for paraffin molecular weight
+
+    Returns
+    -------
+    prop : dict
+        M: molecular weight, [g/mol]
+        Tc: critical temperature, [K]
+        Pc: critical pressure, [Pa]
+        Vc: critical volume, [m³/kg]
+
+    References
+    ----------
+    Twu, C. “An Internally Consistent Correlation for Predicting the Critical
+    Properties and Molecular Weight of Petroleum and Coal-Tar Liquids.” Fluid
+    Phase Equilibria 16 (1984): 137–150.
+
+    >>> p = Twu(447.3, 0.7342)
+    >>> print("%0.1f %0.1f %0.2f" % (p["M"], p["Tc"], p["Pc"]*1e-5))
+    142.3 619.1 21.22
+    """
+    T = asarray(Tb, dtype=float)*1.8
+    SG = asarray(SG, dtype=float)
+
+    # Normal paraffin properties
+    Tco = T/(0.533272+0.191017e-3*T+0.779681e-7*T**2-0.284376e-10*T**3 +
+             0.959468e28/T**13)
+    alfa = 1-T/Tco
+    Pco = (3.83354+1.19629*alfa**0.5+34.8888*alfa+36.1952*alfa**2 +
+           104.193*alfa**4)**2
+    Vco = (1-(0.419869-0.505839*alfa-1.56436*alfa**3-9481.70*alfa**14))**-8
+    SGo = 0.843593-0.128624*alfa-3.36159*alfa**3-13749.5*alfa**12
+
+    # This relation use the boiling temperature in K
+    K = T/1.8
+    theta = log(K/(5.8-0.0052*K))
+    for i in range(iterations):
+        E = exp(5.1264+2.71579*theta-0.28659*theta**2-39.8544/theta -
+                0.122488/theta**2)
+        f = E-13.7512*theta+19.6197*theta**2-K
+        df = E*(2.71579-0.57318*theta+39.8544/theta**2+0.244976/theta**3) - \
+            13.7512+39.2394*theta
+        theta -= f/df
+    Mo = exp(theta)
+
+    # Perturbation with the specific gravity difference
+    def ratio(f):
+        return ((1+2*f)/(1-2*f))**2
+
+    dSGT = exp(5*(SGo-SG))-1
+    fT = dSGT*(-0.362456/T**0.5+(0.0398285-0.948125/T**0.5)*dSGT)
+    Tc = Tco*ratio(fT)
+
+    dSGV = exp(4*(SGo**2-SG**2))-1
+    fV = dSGV*(0.46659/T**0.5+(-0.182421+3.01721/T**0.5)*dSGV)
+    Vc = Vco*ratio(fV)
+
+    dSGP = exp(0.5*(SGo-SG))-1
+    fP = dSGP*((2.53262-46.1955/T**0.5-0.00127885*T) +
+               (-11.4277+252.14/T**0.5+0.00230535*T)*dSGP)
+    Pc = Pco*Tc/Tco*Vco/Vc*ratio(fP)
+
+    dSGM = exp(5*(SGo-SG))-1
+    x = abs(0.012342-0.328086/T**0.5)
+    fM = dSGM*(x+(-0.0175691+0.193168/T**0.5)*dSGM)
+    M = exp(log(Mo)*ratio(fM))
+
+    # Convert from english units
+    return {"M": M, "Tc": Tc/1.8, "Pc": Pc*6894.757293168,
+            "Vc": Vc/M*0.028316846592/0.45359237}
+
+
+def acentric_KeslerLee(Tb, Tc, Pc, Kw):
+    """Acentric factor of petroleum fractions
+
+    Parameters
+    ----------
+    Tb, Tc : array
+        Normal boiling and critical temperature, [K]
+    Pc : array
+        Critical pressure, [Pa]
+    Kw : array
+        Watson characterization factor, [-]
+
+    References
+    ----------
+    Kesler, M. G., and B. I. Lee. “Improve Prediction of Enthalpy of
+    Fractions.” Hydrocarbon Processing (March 1976): 153–158.
+    """
+    tita = asarray(Tb, dtype=float)/Tc
+    Pr = asarray(Pc, dtype=float)/101325
+    light = (-log(Pr)-5.92714+6.09648/tita+1.28862*log(tita) -
+             0.169347*tita**6)/(15.2518-15.6875/tita-13.4721*log(tita) +
+                                0.43577*tita**6)
+    heavy = -7.904+0.1352*Kw-0.007465*Kw**2+8.359*tita + \
+        (1.408-0.01063*Kw)/tita
+    return where(tita > 0.8, heavy, light)
+
+
+def viscosity_API(Tb, Kw):
+    """Kinematic viscosity of petroleum fractions at 100ºF and 210ºF, API
+    procedure 11A4.2
+
+    Parameters
+    ----------
+    Tb : array
+        Normal boiling temperature, [K]
+    Kw : array
+        Watson characterization factor, [-]
+
+    Returns
+    -------
+    v100, v210 : array
+        Kinematic viscosity, [cSt]
+    """
+    T = asarray(Tb, dtype=float)*1.8
+    A1 = 34.9310-8.84387e-2*T+6.73513e-5*T**2-1.01394e-8*T**3
+    A2 = -2.92649+6.98405e-3*T-5.09947e-6*T**2+7.49378e-10*T**3
+    v100 = 10**(-1.35579+8.16059e-4*T+8.38505e-7*T**2)+10**(A1+A2*Kw)
+    v210 = 10**(-1.92353+2.41071e-4*T+0.5113*log10(T*v100))
+    return v100, v210
+
+
+class Pseudocomponent(object):
+    """Component defined by a cut of petroleum, with the properties used by
+    cubic equations of state"""
+
+    def __init__(self, name, M, Tb, SG, Tc, Pc, Vc, f_acent, rackett):
+        self.name = name
+        self.formula = ""
+        self.M = M
+        self.Tb = unidades.Temperature(Tb)
+        self.SG = SG
+        self.API = 141.5/SG-131.5
+        self.Tc = unidades.Temperature(Tc)
+        self.Pc = unidades.Pressure(Pc)
+        self.Vc = unidades.SpecificVolume(Vc)
+        self.f_acent = f_acent
+        self.rackett = rackett
+
+    def tr(self, T):
+        return T/self.Tc
+
+    def pr(self, P):
+        return P/self.Pc.atm
+
+    def __repr__(self):
+        return "Pseudocomponent %s with Tb %0.1f K" % (self.name, self.Tb)
+
+
+class PseudoMezcla(object):
+    """Mixture of pseudocomponents with the interface of
+    :class:`lib.mezcla.Mezcla` needed by cubic equations of state, a Mezcla
+    can only be defined with components from databank
+
+    Parameters
+    ----------
+    componente : list
+        Pseudocomponent instances
+    fraccion : list
+        Molar fraction of components, [-]
+
+    The binary interaction parameters between cuts aren't available so they
+    are set to zero, and the van der Waals mixing rules are used
+    """
+
+    def __init__(self, componente, fraccion):
+        self.componente = componente
+        self.fraccion = [float(x) for x in fraccion]
+        self.ids = [cmp.name for cmp in componente]
+
+    def Kij(self, T=0, EOS=None):
+        """Binary interaction matrix, zero for pseudocomponents"""
+        n = len(self.componente)
+        return [[0]*n for i in range(n)]
+
+    Mix_van_der_Waals = Mezcla.Mix_van_der_Waals
+    Mixing_Rule = Mezcla.Mix_van_der_Waals
+
+
+class Assay(object):
+    """Characterization of a crude assay in pseudo-components
+
+    Parameters
+    ----------
+    x : list
+        Percent volume distilled of points of distillation curve
+    T : list
+        Temperature of points of distillation curve, [K]
+    curva : str
+        Type of distillation curve, TBP or D86
+    SG : float
+        Specific gravity of crude, if it's not defined it's calculated from
+        distillation curve
+    P : float
+        Pressure of distillation curve, only for TBP curves, [Pa]
+    N : int
+        Number of cuts of equal volume
+    cortes : list
+        Cut temperatures in TBP curve, [K], override N
+    metodo : str
+        Correlation for critical properties, RiaziDaubert or Twu
+
+    The arrays with cut properties are:
+        xv, xw, xm: volume, mass and molar fraction, [-]
+        Tb, Tc: normal boiling and critical temperature, [K]
+        SG: specific gravity, [-]
+        M: molecular weight, [g/mol]
+        Pc: critical pressure, [Pa]
+        Vc: critical volume, [m³/kg]
+        f_acent: acentric factor, [-]
+        rackett: Rackett compressibility factor, [-]
+        Kw: Watson characterization factor, [-]
+        v100, v210: Kinematic viscosity at 100ºF and 210ºF, [cSt]
+
+    >>> x = [0, 10, 30, 50, 70, 90, 95]
+    >>> T = [300, 380, 480, 570, 660, 790, 840]
+    >>> crudo = Assay(x, T, SG=0.85, N=5)
+    >>> print(" ".join("%0.1f" % t for t in crudo.Tb))
+    392.5 485.1 561.8 648.7 807.0
+    >>> print("%0.4f" % sum(crudo.xv*crudo.SG))
+    0.8500
+    >>> print(" ".join("%0.1f" % m for m in crudo.M))
+    111.0 169.8 233.9 329.4 595.1
+    """
+
+    def __init__(self, x, T, curva="TBP", SG=None, P=101325, N=10,
+                 cortes=None, metodo="RiaziDaubert"):
+        self.curva = curva
+        self.metodo = metodo
+
+        # Normalize curve to the standard points
+        par = curve_Predicted(list(x), list(T))
+        curve = [T_Predicted(par, xi) for xi in POINTS]
+        for i, xi in enumerate(POINTS):
+            if xi in x:
+                curve[i] = T[list(x).index(xi)]
+
+        if curva == "D86":
+            if SG is None:
+                SG = 0.08342*curve[2]**0.10731*curve[6]**0.26288
+            curve = [float(t) for t in D86_TBP_Riazi(curve)]
+        else:
+            if P != 101325:
+                curve = [float(Tb_Presion(t, P/101325)) for t in curve]
+            if SG is None:
+                SG = 0.10431*curve[2]**0.12550*curve[6]**0.20862
+        self.TBP = array(curve)
+        self.SGcrudo = SG
+        self.parameters = curve_Predicted(POINTS, curve)
+
+        # Cut limits in volume fraction
+        if cortes:
+            limits = concatenate(([0], self._x(asarray(cortes)), [1]))
+        else:
+            limits = linspace(0, 1, N+1)
+        self.limits = limits
+        self.xv = limits[1:]-limits[:-1]
+
+        # Volumetric average boiling point of cuts
+        nodes, weights = leggauss(8)
+        lo = limits[:-1, None]
+        hi = limits[1:, None]
+        xi = lo+(hi-lo)*(nodes+1)/2
+        Ti = self._T(xi)
+        self.Tb = (Ti*weights).sum(axis=1)/2
+
+        # Specific gravity with constant Watson factor
+        Kw = (self.xv*(self.Tb*1.8)**(1/3)).sum()/SG
+        self.SG = (self.Tb*1.8)**(1/3)/Kw
+        self.Kw = self.SG*0+Kw
+
+        self._properties()
+
+    def _T(self, x):
+        """TBP temperature at volume fraction x"""
+        To, A, B = self.parameters
+        x = clip(x, 0, 1-1e-12)
+        return To*(1+(A/B*log(1/(1-x)))**(1/B))
+
+    def _x(self, T):
+        """Volume fraction distilled at TBP temperature T"""
+        To, A, B = self.parameters
+        return 1-exp(-B/A*(clip((T-To)/To, 0, None))**B)
+
+    def _properties(self):
+        """Calculate the properties of cuts from Tb and SG"""
+        if self.metodo == "Twu":
+            prop = Twu(self.Tb, self.SG)
+        else:
+            prop = RiaziDaubert(self.Tb, self.SG)
+        self.M = prop["M"]
+        self.Tc = prop["Tc"]
+        self.Pc = prop["Pc"]
+        self.Vc = prop["Vc"]
+        self.f_acent = acentric_KeslerLee(self.Tb, self.Tc, self.Pc, self.Kw)
+        self.rackett = 0.29056-0.08775*self.f_acent
+        self.v100, self.v210 = viscosity_API(self.Tb, self.Kw)
+
+        w = self.xv*self.SG
+        self.xw = w/w.sum()
+        n = self.xw/self.M
+        self.xm = n/n.sum()
+
+    def temperature(self, x):
+        """TBP temperature at percent volume distilled, [K]"""
+        return self._T(asarray(x, dtype=float)/100)
+
+    def distilled(self, T):
+        """Percent volume distilled at TBP temperature T, [K]"""
+        return self._x(asarray(T, dtype=float))*100
+
+    def componentes(self, prefix="Cut"):
+        """List of pseudocomponent of cuts, use :meth:`mezcla` to get the
+        mixture used by cubic eos"""
+        cmps = []
+        for i in range(len(self.Tb)):
+            name = "%s %i (%0.0f K)" % (prefix, i+1, self.Tb[i])
+            cmps.append(Pseudocomponent(
+                name, self.M[i], self.Tb[i], self.SG[i], self.Tc[i],
+                self.Pc[i], self.Vc[i], self.f_acent[i], self.rackett[i]))
+        return cmps
+
+    def mezcla(self, prefix="Cut"):
+        """Mixture of pseudocomponents of cuts with its molar fractions,
+        ready to use in cubic eos
+
+        >>> from lib.EoS.cubic import SRK, PR
+        >>> x = [0, 10, 30, 50, 70, 90, 95]
+        >>> T = [300, 380, 480, 570, 660, 790, 840]
+        >>> mix = Assay(x, T, SG=0.85, N=5).mezcla()
+        >>> srk = SRK(500, 1, mix)
+        >>> pr = PR(500, 1, mix)
+        >>> print("%0.3f %0.3f" % (srk.x, pr.x))
+        0.477 0.478
+        >>> print("%0.3f %0.3f" % (srk.yi[0], srk.xi[0]))
+        0.638 0.083
+        """
+        return PseudoMezcla(self.componentes(prefix), self.xm)
+
+    @classmethod
+    def blend(cls, assays, volumes):
+        """Blend of crudes characterized with the same cut temperatures,
+        the cuts are mixed by volume and the properties recalculated
+
+        Parameters
+        ----------
+        assays : list
+            Assay instances, they must share the cut temperatures
+        volumes : list
+            Volume of each crude in blend
+
+        >>> x = [0, 10, 30, 50, 70, 90, 95]
+        >>> a = Assay(x, [300, 380, 480, 570, 660, 790, 840], SG=0.85, N=5)
+        >>> b = Assay(x, [310, 390, 490, 590, 680, 810, 870], SG=0.87, N=5)
+        >>> mezcla = Assay.blend([a, b], [1, 1])
+        >>> print(" ".join("%0.1f" % t for t in a.temperature([95, 99])))
+        852.9 988.1
+        >>> print(" ".join("%0.1f" % t for t in b.temperature([95, 99])))
+        880.4 1021.9
+        >>> print(" ".join("%0.1f" % t for t in mezcla.TBP[-2:]))
+        867.2 1006.3
+        """
+        volumes = asarray(volumes, dtype=float)
+        volumes = volumes/volumes.sum()
+        xv = array([a.xv for a in assays])*volumes[:, None]
+        vol = xv.sum(axis=0)
+        blend = cls.__new__(cls)
+        blend.curva = "TBP"
+        blend.metodo = assays[0].metodo
+        blend.limits = concatenate(([0], vol.cumsum()))
+        blend.xv = vol
+        blend.Tb = (xv*array([a.Tb for a in assays])).sum(axis=0)/vol
+        blend.SG = (xv*array([a.SG for a in assays])).sum(axis=0)/vol
+        blend.SGcrudo = (blend.xv*blend.SG).sum()
+        blend.Kw = (blend.Tb*1.8)**(1/3)/blend.SG
+
+        # Blended TBP curve, inverse of the volume distilled of blend
+        blend.TBP = _blendCurve(assays, volumes, array(POINTS)/100)
+        blend.parameters = curve_Predicted(POINTS, list(blend.TBP))
+        blend._properties()
+        return blend
+
+
+def _blendCurve(assays, volumes, x, iterations=60):
+    """TBP temperatures of a blend of crudes at volume fractions x
+
+    The volume distilled of blend at any temperature is the volume weighted
+    sum of the distilled of each crude, Σ v_k·x_k(T). This sum is inverted
+    by bisection in the interval between the temperatures of the crudes at
+    the same volume fraction, where the blend temperature must be.
+    """
+    x = asarray(x, dtype=float)
+    T = array([a._T(x) for a in assays])
+    Tmin = T.min(axis=0)
+    Tmax = T.max(axis=0)
+    for i in range(iterations):
+        Tm = (Tmin+Tmax)/2
+        xm = sum(v*a._x(Tm) for v, a in zip(volumes, assays))
+        below = xm < x
+        Tmin = where(below, Tm, Tmin)
+        Tmax = where(below, Tmax, Tm)
+    return (Tmin+Tmax)/2
+
+
+def assayKey(x, T, **kwargs):
+    """sha1 hash of assay definition used as cache key"""
+    data = {"x": [float(i) for i in x], "T": [float(i) for i in T]}
+    for key, value in kwargs.items():
+        if value is not None and not isinstance(value, str):
+            value = asarray(value, dtype=float).tolist()
+        data[key] = value
+    txt = json.dumps(data, sort_keys=True)
+    return hashlib.sha1(txt.encode("utf-8")).hexdigest()
+
+
+def characterize(x, T, **kwargs):
+    """Characterize a crude assay with the results cached by the hash of its
+    definition, the arguments are the same of Assay"""
+    key = assayKey(x, T, **kwargs)
+    if key not in _cache:
+        if len(_cache) >= CACHE_SIZE:
+            del _cache[next(iter(_cache))]
+        _cache[key] = Assay(x, T, **kwargs)
+    return _cache[key]
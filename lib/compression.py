@@ -0,0 +1,641 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Stage by stage calculation of gas compression and expansion
+#
+#   - IdealGas: Ideal gas mixture with temperature dependent heat capacity
+#   - StreamFluid: Real fluid properties calculated with Corriente
+#   - getFluid: Return a cached fluid model for a stream
+#   - Stage: Result of a compression or expansion stage
+#   - stage: Calculate a stage with the selected thermodynamic path
+#   - Compression: Result of a multistage calculation
+#   - multistage: Multistage compression or expansion with intercooling
+#
+#   The thermodynamic paths available are:
+#       - isentropic: Adiabatic with isentropic efficiency
+#       - polytropic: Integration of polytropic path dh = v·dP/η in small
+#         pressure steps with the polytropic efficiency
+#       - schultz: Polytropic head with the Schultz correction factor
+#       - isothermal: Isothermal with efficiency referred to reversible work
+#
+#   The fluid models solve the P-s and P-h flashes by Newton iteration with
+#   warm started initial guesses. IdealGas works with arrays, so a
+#   compressor map with thousand of operating points is calculated at the
+#   same time. StreamFluid save the calculated states and flashes, so the
+#   iterative solution of equipment reuse the calculation.
+#
+#   Schultz, J.M. The polytropic analysis of centrifugal compressors.
+#   J. Eng. Power 84(1) (1962) 69-82
+###############################################################################
+
+
+from collections import OrderedDict
+
+from numpy import (abs as abs_, arange, asarray, broadcast_arrays, clip,
+                   dot, errstate, full, isfinite, log, nan, ones_like,
+                   polyval, power, where, zeros_like)
+from scipy.constants import R
+
+
+R = R*1000  # J/kmolK
+Pref = 101325.
+
+# Maximum number of fluid models saved in cache
+CACHE_SIZE = 16
+_fluids = OrderedDict()
+
+# Maximum number of states saved in each StreamFluid
+STATES_SIZE = 4096
+
+
+class IdealGas(object):
+    """Ideal gas mixture with heat capacity from database polynomial
+
+    Parameters
+    ----------
+    componente : list
+        Componente instances
+    fraccion : list
+        Molar fraction of components
+
+    All the methods accept arrays of temperatures and pressures
+    """
+    def __init__(self, componente, fraccion):
+        x = asarray(fraccion, dtype=float)
+        self.M = dot(x, [cmp.M for cmp in componente])
+        self.R = R/self.M
+
+        # Heat capacity of mixture in J/kgK, polynomial in T
+        cp = dot(x, [cmp.cp for cmp in componente])*4184/self.M
+        self._cp = cp[::-1]
+        self._h = (cp/arange(1, 7))[::-1]
+        self._s = (cp[1:]/arange(1, 6))[::-1]
+        self._a0 = cp[0]
+
+    def cp(self, T, P=None):
+        """Heat capacity, [J/kgK]"""
+        return polyval(self._cp, T)
+
+    def cp_cv(self, T, P=None):
+        """Heat capacity ratio"""
+        cp = self.cp(T)
+        return cp/(cp-self.R)
+
+    def state(self, T, P, x=None):
+        """Specific enthalpy, entropy, volume and quality, [J/kg], [J/kgK],
+        [m³/kg], the quality is nan for ideal gas"""
+        T, P = broadcast_arrays(asarray(T, dtype=float),
+                                asarray(P, dtype=float))
+        h = T*polyval(self._h, T)
+        s = self._a0*log(T)+T*polyval(self._s, T)-self.R*log(P/Pref)
+        return h, s, self.R*T/P, full(T.shape, nan)
+
+    def flash(self, P, value, prop, T0):
+        """Temperature at pressure P with the specified enthalpy or entropy
+
+        Parameters
+        ----------
+        P : array
+            Pressure, [Pa]
+        value : array
+            Specific enthalpy or entropy, [J/kg], [J/kgK]
+        prop : string
+            Property specified, h or s
+        T0 : array
+            Initial guess of temperature, [K]
+
+        Returns
+        -------
+        T : array
+            Temperature, [K]
+        x : array
+            Quality, nan for ideal gas
+        """
+        index = {"h": 0, "s": 1}[prop]
+        T = asarray(T0, dtype=float)*ones_like(value)
+        for i in range(50):
+            f = self.state(T, P)[index]-value
+            df = self.cp(T)
+            if index:
+                df = df/T
+            dT = clip(-f/df, -0.5*T, 0.5*T)
+            T = T+dT
+            if (abs_(dT) < 1e-9*T).all():
+                break
+        return T, full(T.shape, nan)
+
+
+class StreamFluid(object):
+    """Real fluid model calculated with the thermodynamic method of a stream,
+    multiparameter equation of state, coolprop, refprop...
+
+    The states calculated are saved, and the flashes are warm started with
+    the nearest solution calculated, in the two phase region the quality
+    is calculated with the saturation states at that pressure
+
+    Parameters
+    ----------
+    stream : Corriente
+        Stream with the composition and thermodynamic method to use
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.M = stream.M
+        self.R = R/stream.M
+        self._states = OrderedDict()
+        self._saturation = {}
+        self._flashes = OrderedDict()
+        self._cp = 4*self.R
+
+    def _save(self, cache, key, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > STATES_SIZE:
+            cache.popitem(last=False)
+
+    def _clone(self, **kwargs):
+        st = self.stream.clone(**kwargs)
+        return (st.h/st.caudalmasico, st.s/st.caudalmasico, 1/st.rho, st.x,
+                st.T)
+
+    def _state(self, T, P):
+        key = (round(T, 8), round(P, 4))
+        if key not in self._states:
+            self._save(self._states, key, self._clone(T=T, P=P))
+        return self._states[key]
+
+    def _sat(self, P):
+        """Saturated liquid and vapor states at pressure P of pure fluids,
+        None if the pressure is supercritical or the fluid is a mixture. The
+        states are the phases of the saturation flash of the stream method,
+        if it fails the saturation temperature is bracketed with the single
+        phase states"""
+        key = round(P, 4)
+        if key not in self._saturation:
+            states = None
+            if len(self.stream.ids) == 1:
+                states = self._flashSat(P)
+                if states is None:
+                    states = self._bracketSat(P)
+            self._saturation[key] = states
+        return self._saturation[key]
+
+    def _flashSat(self, P):
+        """Saturated states from the phases of a two phase stream at P"""
+        try:
+            st = self.stream.clone(P=P, x=0.5)
+            states = []
+            for x, phase in ((0., st.Liquido), (1., st.Gas)):
+                states.append((float(phase.h), float(phase.s),
+                               1/float(phase.rho), x, float(st.T)))
+        except Exception:
+            return None
+        if self._isSat(*states):
+            return tuple(states)
+
+    @staticmethod
+    def _isSat(liquid, vapor):
+        """Check the states are a converged liquid and vapor pair"""
+        return liquid[3] == 0 and vapor[3] == 1 and all(
+            isfinite(st[:3]).all() for st in (liquid, vapor))
+
+    def _bracketSat(self, P):
+        """Saturated states of a pure fluid by bisection of the saturation
+        temperature between a liquid and a vapor single phase state, None
+        if the pressure is supercritical or the states can't be bracketed"""
+        cmp = self.stream.componente[0]
+        if P >= cmp.Pc:
+            return None
+
+        # Near the critical temperature the fluid is vapor at any subcritical
+        # pressure, the liquid is searched decreasing the temperature
+        Tvap = float(cmp.Tc)
+        vapor = self._state(Tvap, P)
+        Tliq = Tvap
+        for i in range(20):
+            Tliq *= 0.9
+            liquid = self._state(Tliq, P)
+            if liquid[3] == 0:
+                break
+        else:
+            return None
+        if not self._isSat(liquid, vapor):
+            return None
+
+        while Tvap-Tliq > 1e-7*Tvap:
+            T = (Tliq+Tvap)/2
+            state = self._state(T, P)
+            if not isfinite(state[:3]).all():
+                break
+            if state[3] == 0:
+                Tliq, liquid = T, state
+            elif state[3] == 1:
+                Tvap, vapor = T, state
+            else:
+                # The single phase solution don't converge so close to the
+                # saturation curve
+                break
+        return liquid, vapor
+
+    def cp(self, T=None, P=None):
+        """Heat capacity estimation from the last flash calculated, used for
+        the initial guesses, [J/kgK]"""
+        return self._cp
+
+    def state(self, T, P, x=None):
+        """Specific enthalpy, entropy, volume and quality, the quality is
+        necessary to define the states in the two phase region"""
+        if x is None:
+            x = nan
+        T, P, x = broadcast_arrays(asarray(T, dtype=float),
+                                   asarray(P, dtype=float),
+                                   asarray(x, dtype=float))
+        result = [self._point(t, p, xi)
+                  for t, p, xi in zip(T.flat, P.flat, x.flat)]
+        return tuple(asarray(r, dtype=float).reshape(T.shape)
+                     for r in list(zip(*result))[:4])
+
+    def _point(self, T, P, x):
+        if 0 < x < 1:
+            sat = self._sat(P)
+            if sat is not None:
+                liquid, vapor = sat
+                return tuple(l+x*(v-l) for l, v in zip(liquid[:3], vapor[:3]))\
+                    + (x, )
+        return self._state(T, P)
+
+    def flash(self, P, value, prop, T0):
+        """Temperature and quality at pressure P with the specified enthalpy
+        or entropy, see IdealGas.flash"""
+        P, value, T0 = broadcast_arrays(asarray(P, dtype=float),
+                                        asarray(value, dtype=float),
+                                        asarray(T0, dtype=float))
+        result = [self._flash(p, v, prop, t)
+                  for p, v, t in zip(P.flat, value.flat, T0.flat)]
+        T, x = zip(*result)
+        return (asarray(T, dtype=float).reshape(P.shape),
+                asarray(x, dtype=float).reshape(P.shape))
+
+    def _flash(self, P, value, prop, T0):
+        index = {"h": 0, "s": 1}[prop]
+        key = (prop, round(P, 4), round(value, 6))
+        if key in self._flashes:
+            return self._flashes[key]
+
+        sat = self._sat(P)
+        if sat is not None:
+            liquid, vapor = sat
+            if liquid[index] < value < vapor[index]:
+                x = (value-liquid[index])/(vapor[index]-liquid[index])
+                if len(self.stream.ids) == 1:
+                    T = vapor[4]
+                else:
+                    T = self.stream.clone(P=P, x=x).T
+                result = (float(T), x)
+                self._save(self._flashes, key, result)
+                return result
+
+        # Single phase, secant iteration in the side of saturation curve of
+        # the solution, the first step with the last heat capacity
+        T = float(T0)
+        Tmin, Tmax = 0.5*T, 2*T
+        if sat is not None:
+            Tsat = sat[1][4]
+            if value >= sat[1][index]:
+                Tmin = Tsat*(1+1e-9)
+                Tmax = max(Tmax, 2*Tsat)
+            else:
+                Tmax = Tsat*(1-1e-9)
+                Tmin = min(Tmin, 0.5*Tsat)
+            T = min(max(T, Tmin), Tmax)
+        f = self._state(T, P)[index]-value
+        df = self._cp/T if index else self._cp
+        for i in range(50):
+            Tnew = min(max(T-f/df, (T+Tmin)/2), (T+Tmax)/2)
+            fnew = self._state(Tnew, P)[index]-value
+            if abs(Tnew-T) < 1e-7*T or fnew == f:
+                T = Tnew
+                break
+            df = (fnew-f)/(Tnew-T)
+            T, f = Tnew, fnew
+            if df > 0:
+                self._cp = df*T if index else df
+
+        # Check the solution, the residual must be equivalent to a
+        # temperature error lower than 1 ppm
+        state = self._state(T, P)
+        f = state[index]-value
+        tol = 1e-6*self._cp if index else 1e-6*self._cp*T
+        if not abs(f) <= tol:
+            raise ValueError(
+                "%s flash don't converge at P=%g Pa, %s=%g, residual %g" % (
+                    prop.upper(), P, prop, value, f))
+        result = (T, state[3])
+        self._save(self._flashes, key, result)
+        return result
+
+
+def getFluid(stream):
+    """Return the fluid model of a stream, reusing the models of same fluid
+    so the flash calculations are shared between equipments. The ideal gas
+    model is used with the cubic equations of state, the real fluid with
+    the other thermodynamic methods"""
+    thermo = getattr(stream, "_thermo", "eos")
+    key = (tuple(stream.ids), tuple(round(x, 10) for x in stream.fraccion),
+           thermo)
+    fluid = _fluids.get(key)
+    if fluid is None:
+        if thermo == "eos":
+            fluid = IdealGas(stream.componente, stream.fraccion)
+        else:
+            fluid = StreamFluid(stream)
+        _fluids[key] = fluid
+    _fluids.move_to_end(key)
+    while len(_fluids) > CACHE_SIZE:
+        _fluids.popitem(last=False)
+    return fluid
+
+
+class Stage(object):
+    """Result of a compression or expansion stage, the attributes are arrays
+    with the shape of inputs
+
+    Attributes
+    ----------
+    Tin, Pin : array
+        Inlet temperature and pressure, [K], [Pa]
+    T, P : array
+        Outlet temperature and pressure, [K], [Pa]
+    x : array
+        Outlet quality, nan for ideal gas
+    w : array
+        Specific work, positive for compression, [J/kg]
+    wideal : array
+        Specific work of the ideal path, [J/kg]
+    q : array
+        Heat removed in the stage, only for isothermal path, [J/kg]
+    """
+    def __init__(self, Tin, Pin, T, P, x, w, wideal, q):
+        self.Tin = Tin
+        self.Pin = Pin
+        self.T = T
+        self.P = P
+        self.x = x
+        self.w = w
+        self.wideal = wideal
+        self.q = q
+
+
+def _guess(fluid, T, P1, P2):
+    """Isentropic temperature estimation for the initial guess of flash,
+    the real fluids use a heat capacity ratio of 4/3"""
+    if isinstance(fluid, IdealGas):
+        cp = fluid.cp(T)
+    else:
+        cp = 4*fluid.R
+    return T*power(P2/P1, fluid.R/cp)
+
+
+def _work(w, eta, compression):
+    """Actual work from the ideal work with the stage efficiency"""
+    return where(compression, w/eta, w*eta)
+
+
+def stage(fluid, T, P, Pout, eta, method="isentropic", steps=20, x=None):
+    """Compression or expansion stage
+
+    Parameters
+    ----------
+    fluid : IdealGas or StreamFluid
+        Fluid model
+    T : array
+        Inlet temperature, [K]
+    P : array
+        Inlet pressure, [Pa]
+    Pout : array
+        Outlet pressure, [Pa]
+    eta : array
+        Efficiency of stage, isentropic, polytropic or isothermal efficiency
+        for each thermodynamic path
+    method : string
+        Thermodynamic path, isentropic, polytropic, schultz or isothermal
+    steps : integer
+        Number of steps in the polytropic integration
+    x : array
+        Inlet quality, necessary only for inlet in two phase region
+
+    Returns
+    -------
+    stage : Stage
+        Stage results
+
+    >>> from lib.compuestos import Componente
+    >>> air = IdealGas([Componente(46), Componente(47)], [0.79, 0.21])
+    >>> s = stage(air, 300, 101325, [2e5, 5e5, 1e6], 0.8)
+    >>> print(" ".join("%0.1f" % T for T in s.T))
+    379.8 513.3 636.6
+    >>> p = stage(air, 300, 101325, 5e5, 0.8, "polytropic")
+    >>> s = stage(air, 300, 101325, 5e5, 0.8, "schultz")
+    >>> print("%0.2f %0.2f" % (p.w/1e3, s.w/1e3))
+    231.79 231.64
+    """
+    T, P, Pout, eta = broadcast_arrays(*[asarray(v, dtype=float) for v in (
+        T, P, Pout, eta)])
+    compression = Pout > P
+    h1, s1, v1, x = fluid.state(T, P, x)
+
+    if method == "isothermal":
+        h2, s2, v2, x = fluid.state(T, Pout)
+        wideal = h2-h1-T*(s2-s1)
+        w = _work(wideal, eta, compression)
+        return Stage(T, P, T, Pout, x, w, wideal, w-(h2-h1))
+
+    Ts, xs = fluid.flash(Pout, s1, "s", _guess(fluid, T, P, Pout))
+    h2s, s2s, v2s, xs = fluid.state(Ts, Pout, xs)
+    wideal = h2s-h1
+
+    if method == "isentropic":
+        w = _work(wideal, eta, compression)
+        T2, x = fluid.flash(Pout, h1+w, "h", Ts)
+
+    elif method == "polytropic":
+        # Integration of polytropic path, dh = v·dP/ηp in compression and
+        # dh = ηp·v·dP in expansion, by Heun method in ln P
+        eff = where(compression, 1/eta, eta)
+        dlnP = log(Pout/P)/steps
+        Ti, hi, vi = T, h1, v1
+        for k in range(1, steps+1):
+            Pi = P*(Pout/P)**((k-1)/steps)
+            Pj = P*(Pout/P)**(k/steps)
+            k1 = eff*Pi*vi*dlnP
+            Tj, xj = fluid.flash(Pj, hi+k1, "h", _guess(fluid, Ti, Pi, Pj))
+            k2 = eff*Pj*fluid.state(Tj, Pj, xj)[2]*dlnP
+            hi = hi+(k1+k2)/2
+            Ti, x = fluid.flash(Pj, hi, "h", Tj)
+            vi = fluid.state(Ti, Pj, x)[2]
+        T2 = Ti
+        w = hi-h1
+
+    elif method == "schultz":
+        with errstate(divide="ignore", invalid="ignore"):
+            ns = log(Pout/P)/log(v1/v2s)
+            f = wideal/(ns/(ns-1)*(Pout*v2s-P*v1))
+        f = where(isfinite(f), f, 1)
+
+        # Iteration over outlet state with the polytropic exponent
+        w = _work(wideal, eta, compression)
+        T2, x = fluid.flash(Pout, h1+w, "h", Ts)
+        for i in range(20):
+            v2 = fluid.state(T2, Pout, x)[2]
+            with errstate(divide="ignore", invalid="ignore"):
+                n = log(Pout/P)/log(v1/v2)
+                Hp = f*n/(n-1)*(Pout*v2-P*v1)
+            Hp = where(isfinite(Hp), Hp, wideal)
+            wnew = _work(Hp, eta, compression)
+            T2, x = fluid.flash(Pout, h1+wnew, "h", T2)
+            converged = (abs_(wnew-w) <= 1e-9*abs_(w)).all()
+            w = wnew
+            if converged:
+                break
+        wideal = where(compression, w*eta, w/eta)
+
+    else:
+        raise ValueError("Unknown thermodynamic path %s" % method)
+
+    return Stage(T, P, T2, Pout, x, w, wideal, zeros_like(w))
+
+
+class Compression(object):
+    """Result of a multistage calculation
+
+    Attributes
+    ----------
+    T, P : array
+        Outlet temperature and pressure, [K], [Pa]
+    x : array
+        Outlet quality, nan for ideal gas
+    w : array
+        Total specific work, positive for compression, [J/kg]
+    wideal : array
+        Total specific work of the ideal path, [J/kg]
+    q : array
+        Heat removed in intercoolers and isothermal stages, negative for
+        reheating between expansion stages, [J/kg]
+    stages : list
+        Stage instances
+    """
+    def __init__(self, stages, q):
+        self.stages = stages
+        self.T = stages[-1].T
+        self.P = stages[-1].P
+        self.x = stages[-1].x
+        self.w = sum(s.w for s in stages)
+        self.wideal = sum(s.wideal for s in stages)
+        self.q = q+sum(s.q for s in stages)
+
+
+def stageRatio(P, Pout, etapas, dP=0):
+    """Pressure ratio of each stage, equal for all stages, taking into
+    account the pressure drop in the coolers between stages
+
+    The ratio r is the solution of P·r^N - ΔP·(r^(N-1)+...+r) = Pout"""
+    P, Pout = asarray(P, dtype=float), asarray(Pout, dtype=float)
+    r = (Pout/P)**(1./etapas)
+    if not dP or etapas == 1:
+        return r
+    j = arange(1, etapas)
+    for i in range(50):
+        f = P*r**etapas-dP*power.outer(r, j).sum(axis=-1)-Pout
+        df = etapas*P*r**(etapas-1)-dP*(j*power.outer(r, j-1)).sum(axis=-1)
+        dr = f/df
+        r = r-dr
+        if (abs_(dr) < 1e-12*r).all():
+            break
+    return r
+
+
+def multistage(fluid, T, P, Pout, eta, etapas=1, method="isentropic",
+               Tinter=0, dPinter=0, steps=20):
+    """Multistage compression or expansion with equal pressure ratio in
+    each stage and cooling (or reheating in expansion) between stages
+
+    Parameters
+    ----------
+    fluid : IdealGas or StreamFluid
+        Fluid model
+    T : array
+        Inlet temperature, [K]
+    P : array
+        Inlet pressure, [Pa]
+    Pout : array
+        Outlet pressure of last stage, [Pa]
+    eta : array
+        Efficiency of each stage
+    etapas : integer
+        Number of stages
+    method : string
+        Thermodynamic path, see stage
+    Tinter : float
+        Temperature of gas at the inlet of stages after the first, 0 to
+        don't use intercooling, [K]
+    dPinter : float
+        Pressure drop in intercoolers, [Pa]
+    steps : integer
+        Number of steps in the polytropic integration
+
+    Returns
+    -------
+    result : Compression
+        Multistage results
+
+    >>> from lib.compuestos import Componente
+    >>> air = IdealGas([Componente(46), Componente(47)], [0.79, 0.21])
+    >>> c1 = multistage(air, 300, 101325, 1e6, 0.8)
+    >>> c3 = multistage(air, 300, 101325, 1e6, 0.8, 3, Tinter=300)
+    >>> print("%0.1f %0.1f %0.1f" % (c1.w/1e3, c3.w/1e3, c3.q/1e3))
+    347.9 276.3 184.2
+    """
+    T = asarray(T, dtype=float)
+    P = asarray(P, dtype=float)
+    Pout = asarray(Pout, dtype=float)
+    dP = abs(dPinter)
+    r = stageRatio(P, Pout, etapas, dP)
+
+    stages = []
+    q = zeros_like(T*P*Pout)
+    Pi, Ti, x = P, T, None
+    for k in range(etapas):
+        Pj = Pi*r
+        if k == etapas-1:
+            Pj = Pout*ones_like(Pj)
+        st = stage(fluid, Ti, Pi, Pj, eta, method, steps, x)
+        stages.append(st)
+        Ti, Pi, x = st.T, Pj, st.x
+        if k < etapas-1:
+            h = fluid.state(Ti, Pi, x)[0]
+            Pi = Pi-dP
+            if Tinter:
+                Ti, x = Tinter*ones_like(Ti), None
+                q = q+h-fluid.state(Ti, Pi)[0]
+            elif dP:
+                # Adiabatic pressure drop
+                Ti, x = fluid.flash(Pi, h, "h", Ti)
+    return Compression(stages, q)
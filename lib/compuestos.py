@@ -24,6 +24,7 @@ import tempfile
 import time
 import os
 
+from numpy import array, asarray, full, nan, ndim, ones, piecewise
 from scipy import exp, cosh, sinh, log, log10, roots, absolute, sqrt
 from scipy.optimize import fsolve
 from scipy.constants import R, Avogadro
@@ -33,17 +34,99 @@ from lib.physics import R_atml, R_Btu, R_cal, factor_acentrico_octano
 from lib import unidades, config, eos, sql
 
 
+def toUnidad(cls, value, *unit):
+    """Return the value of a correlation as a unidades instance, the results
+    of temperature arrays are returned as ndarray in SI units
+
+    >>> toUnidad(unidades.Pressure, 760, "mmHg")
+    101325.0
+    >>> toUnidad(unidades.Pressure, [760, 1520], "mmHg")
+    array([101325., 202650.])
+    """
+    if ndim(value) == 0:
+        return cls(value, *unit)
+    if unit:
+        unit = unit[0]
+    else:
+        unit = ""
+    return cls._getBaseValue(array(value, dtype=float), unit, "")
+
+
+def _inRange(T, parametros, Tmin=6, Tmax=7):
+    """Check if the temperature is in the range of validity of correlation
+    parameters, elementwise for arrays"""
+    if not parametros:
+        return False
+    return (parametros[Tmin] <= T) & (T <= parametros[Tmax])
+
+
+def _select(T, options):
+    """Evaluate a property with the first available correlation
+
+    Parameters
+    ----------
+    T : float or array
+        Temperature, [K]
+    options : list
+        Tuples (condition, method) in order of preference, the condition can
+        be a boolean or a function of temperature returning a boolean or a
+        boolean mask for arrays
+
+    Returns
+    -------
+    value : unidad or array
+        For scalar temperatures the result of first method with a true
+        condition, None if there isn't any. For arrays each temperature is
+        evaluated with its first available method, in SI units, with nan
+        where there isn't any
+    """
+    if ndim(T) == 0:
+        for condition, method in options:
+            if callable(condition):
+                condition = condition(T)
+            if condition:
+                return method(T)
+        return None
+
+    T = asarray(T, dtype=float)
+    value = full(T.shape, nan)
+    pending = ones(T.shape, dtype=bool)
+    for condition, method in options:
+        if callable(condition):
+            condition = condition(T)
+        mask = pending & condition
+        if mask.any():
+            result = method(T[mask])
+            if result is not None:
+                value[mask] = result
+            pending &= ~mask
+            if not pending.any():
+                break
+    return value
+
+
+def _pointwise(method, T, *args):
+    """Evaluate a scalar only correlation in each temperature of an array,
+    the values are returned in SI units"""
+    T = asarray(T, dtype=float)
+    value = [float(method(t, *args)) for t in T.flat]
+    return array(value).reshape(T.shape)
+
+
 class Componente(object):
     """Clase que define los compuestos químicos con todas sus caracteristicas,
     algunas sacadas de la base de datos, otras calculadas a partir de estas
     Introduciendo el id del componente de la base de datos quedaría perfectamente definido"""
 
-    def __init__(self, indice=None):
+    def __init__(self, indice=None, componente=None):
+        """componente: databank row of component, optional to avoid the
+        query when the row is already available"""
         if not indice:
             return
         self.indice=indice
         self.Config=config.getMainWindowConfig()
-        componente=sql.getElement(indice)
+        if componente is None:
+            componente=sql.getElement(indice)
         self.formula=componente[1]
         self.nombre=componente[2]
         self.M=componente[3]
@@ -391,7 +474,8 @@ class Componente(object):
                 Tr la temperatura reducida T/Tc
                 A,B,C,D,E los parametros
 
-        Estos parámetros vendrán dados en la base de datos, para cada propiedad física"""
+        Estos parámetros vendrán dados en la base de datos, para cada propiedad física
+        La temperatura puede ser un array, evaluandose la ecuación para todos sus valores"""
 
         ecuacion=parametros[0]
         if ecuacion == 1:
@@ -407,40 +491,37 @@ class Componente(object):
         elif ecuacion == 6:
             return parametros[1]/(parametros[2]**(1+((1-T/parametros[3])**parametros[4])))
         elif ecuacion == 7:
-            return parametros[1]*(1-self.tr(T))**(parametros[2]+parametros[3]*self.tr(T)+parametros[4]*self.tr(T)**2+parametros[5]*self.tr(T)**3)
+            Tr=self.tr(T)
+            return parametros[1]*(1-Tr)**(parametros[2]+parametros[3]*Tr+parametros[4]*Tr**2+parametros[5]*Tr**3)
         elif ecuacion == 8:
             return parametros[1]+parametros[2]*(parametros[3]/T/sinh(parametros[3]/T))**2+parametros[4]*(parametros[5]/T/cosh(parametros[5]/T))**2
         elif ecuacion == 9:
-            return parametros[1]**2/self.tr(T)+parametros[2]-2*parametros[1]*parametros[3]*self.tr(T)-parametros[1]*parametros[4]*self.tr(T)**2-parametros[3]**2*self.tr(T)**3/3-parametros[3]*parametros[4]*self.tr(T)**4/2-parametros[4]**2*self.tr(T)**5/5
+            Tr=self.tr(T)
+            return parametros[1]**2/Tr+parametros[2]-2*parametros[1]*parametros[3]*Tr-parametros[1]*parametros[4]*Tr**2-parametros[3]**2*Tr**3/3-parametros[3]*parametros[4]*Tr**4/2-parametros[4]**2*Tr**5/5
 
 
     def RhoS(self,T):
         """Cálculo de la densidad del sólido usando las ecuaciones DIPPR"""
-        return unidades.Density(self.DIPPR(T,self.densidad_solido)*self.M)
+        return toUnidad(unidades.Density, self.DIPPR(T,self.densidad_solido)*self.M)
 
 
     def RhoL(self, T, P):
-        """Procedimiento que define el método más apropiado para el calculo de la densidad del líquido"""
+        """Procedimiento que define el método más apropiado para el calculo de la densidad del líquido
+        Con un array de temperaturas se elige el método para cada valor"""
         rhoL=self.Config.getint("Transport","RhoL")
         corr=self.Config.getint("Transport","Corr_RhoL")
         if P<1013250:
-            if rhoL==0 and self.densidad_liquido and self.densidad_liquido[6]<=T<=self.densidad_liquido[7]:
-                return self.RhoL_DIPPR(T)
-            elif rhoL==1 and self.rackett!=0 and T<self.Tc:
-                return self.RhoL_Rackett(T)
-            elif rhoL==2 and self.Vliq!=0:
-                return self.RhoL_Cavett(T)
-            elif rhoL==3:
-                return self.RhoL_Costald(T)
-            else:
-                if self.densidad_liquido and self.densidad_liquido[6]<=T<=self.densidad_liquido[7]:
-                    return self.RhoL_DIPPR(T)
-                elif self.rackett!=0 and T<self.Tc:
-                    return self.RhoL_Rackett(T)
-                elif self.Vliq!=0:
-                    return self.RhoL_Cavett(T)
-                else:
-                    return self.RhoL_Costald(T)
+            return _select(T, [
+                (lambda T: rhoL==0 and _inRange(T, self.densidad_liquido), self.RhoL_DIPPR),
+                (lambda T: rhoL==1 and self.rackett!=0 and T<self.Tc, self.RhoL_Rackett),
+                (rhoL==2 and self.Vliq!=0, self.RhoL_Cavett),
+                (rhoL==3, self.RhoL_Costald),
+                (lambda T: _inRange(T, self.densidad_liquido), self.RhoL_DIPPR),
+                (lambda T: self.rackett!=0 and T<self.Tc, self.RhoL_Rackett),
+                (self.Vliq!=0, self.RhoL_Cavett),
+                (True, self.RhoL_Costald)])
+        elif ndim(T):
+            return _pointwise(self.RhoL, T, P)
         else:
             if corr==0:
                 return self.RhoL_Thomson_Brobst_Hankinson(T, P)
@@ -451,7 +532,7 @@ class Componente(object):
         """Cálculo de la densidad del líquido usando las ecuaciones DIPPR
         Los parámetros se encuentran en la base de datos en decimocuarta posición
         densidad obtenida en kg/m3"""
-        return unidades.Density(self.DIPPR(T,self.densidad_liquido)*self.M)
+        return toUnidad(unidades.Density, self.DIPPR(T,self.densidad_liquido)*self.M)
 
     def RhoL_Cavett(self, T):
         """Método alternativo para calcular la densidad de liquidos haciendo uso
@@ -460,7 +541,7 @@ class Componente(object):
                 Vol_Con es una constante para cada compuesto, situada en la base de datos en el puesto veinticinco
                 Tr es la temperatura reducida
                 Densidad obtenida en g/l"""
-        return unidades.Density(1/(self.Vliq*(5.7+3*self.tr(T)))*1000*self.M)
+        return toUnidad(unidades.Density, 1/(self.Vliq*(5.7+3*self.tr(T)))*1000*self.M)
 
     def RhoL_Rackett(self, T):
         """Método alternativo para calcular la densidad de líquidos saturados haciendo uso
@@ -469,7 +550,7 @@ class Componente(object):
         Spencer, F. F., and R. P. Danner. “Prediction of Bubble-Point Density of Mixtures,” Journal of Chemi-
    cal Engineering Data 18, no. 2 (1973): 230–234"""
         V=R_atml*self.Tc/self.Pc.atm*self.rackett**(1.+(1.-self.tr(T))**(2./7))
-        return unidades.Density(1/V*self.M)
+        return toUnidad(unidades.Density, 1/V*self.M)
 
     def RhoL_Costald(self, T):
         """Método alternativo para el cálculo de la densidad de líquidos saturados
@@ -481,10 +562,11 @@ class Componente(object):
             V_=self.V_char
         else: V_=self.Vc
 
-        Vr0=1-1.52816*(1-self.tr(T))**(1./3)+1.43907*(1-self.tr(T))**(2./3)-0.81446*(1-self.tr(T))+0.190454*(1-self.tr(T))**(4./3)
-        Vr1=(-0.296123+0.386914*self.tr(T)-0.0417258*self.tr(T)**2-0.0480645*self.tr(T)**3)/(self.tr(T)-1.00001)
+        Tr=self.tr(T)
+        Vr0=1-1.52816*(1-Tr)**(1./3)+1.43907*(1-Tr)**(2./3)-0.81446*(1-Tr)+0.190454*(1-Tr)**(4./3)
+        Vr1=(-0.296123+0.386914*Tr-0.0417258*Tr**2-0.0480645*Tr**3)/(Tr-1.00001)
         #TODO: Añadiendo V* a la base de datos mejoraría la precisión de este método, en vez de usar el volumen critico, porque la constante de volumen de líquido no parece corresponder a esta constante
-        return unidades.Density(1/(V_*Vr0*(1-w*Vr1))*self.M)
+        return toUnidad(unidades.Density, 1/(V_*Vr0*(1-w*Vr1))*self.M)
 
     def RhoL_Thomson_Brobst_Hankinson(self, T, P):
         """Método alternativo para el cálculo de la densidad de líquidos comprimidos
@@ -524,54 +606,46 @@ class Componente(object):
 
 
     def Pv(self, T):
-        """Procedimiento que define el método más apropiado para el cálculo de la presión de vapor"""
+        """Procedimiento que define el método más apropiado para el cálculo de la presión de vapor
+        Con un array de temperaturas se elige el método para cada valor"""
         Pv=self.Config.getint("Transport","Pv")
-        T=unidades.Temperature(T)
-        if Pv==0 and self.presion_vapor and self.presion_vapor[6]<=T<=self.presion_vapor[7]:
-            return self.Pv_DIPPR(T)
-        elif Pv==1 and self.antoine:
-            return self.Pv_Antoine(T)
-        elif Pv==2 and self.Pc and self.Tc and self.f_acent:
-            return self.Pv_Lee_Kesler(T)
-        elif Pv==3 and self.Kw and self.Tb:
-            return self.Pv_Maxwell_Bonnel(T)
-        elif Pv==4 and self.wagner and self.wagner[4]<=T.R<=self.wagner[5]:
-            return self.Pv_Wagner(T)
-        else:
-            if self.presion_vapor and self.presion_vapor[6]<=T<=self.presion_vapor[7]:
-                return self.Pv_DIPPR(T)
-            elif self.antoine:
-                return self.Pv_Antoine(T)
-            elif self.Pc and self.Tc and self.f_acent:
-                return self.Pv_Lee_Kesler(T)
-            elif self.Kw and self.Tb:
-                return self.Pv_Maxwell_Bonnel(T)
-            elif self.wagner and self.wagner[4]<=T.R<=self.wagner[5]:
-                return self.Pv_Wagner(T)
-            else:
-                print("Ningún método disponible")
+        pv=_select(T, [
+            (lambda T: Pv==0 and _inRange(T, self.presion_vapor), self.Pv_DIPPR),
+            (Pv==1 and bool(self.antoine), self.Pv_Antoine),
+            (Pv==2 and bool(self.Pc and self.Tc and self.f_acent), self.Pv_Lee_Kesler),
+            (Pv==3 and bool(self.Kw and self.Tb), self.Pv_Maxwell_Bonnel),
+            (lambda T: Pv==4 and _inRange(unidades.K2R(T), self.wagner, 4, 5), self.Pv_Wagner),
+            (lambda T: _inRange(T, self.presion_vapor), self.Pv_DIPPR),
+            (bool(self.antoine), self.Pv_Antoine),
+            (bool(self.Pc and self.Tc and self.f_acent), self.Pv_Lee_Kesler),
+            (bool(self.Kw and self.Tb), self.Pv_Maxwell_Bonnel),
+            (lambda T: _inRange(unidades.K2R(T), self.wagner, 4, 5), self.Pv_Wagner)])
+        if pv is None:
+            print("Ningún método disponible")
+        return pv
 
     def Pv_DIPPR(self,T):
         """Cálculo de la presión de vapor usando las ecuaciones DIPPR
         Los parámetros se encuentran en la base de datos en decimoquinta posición
         Presión de vapor obtenida en Pa"""
-        return unidades.Pressure(self.DIPPR(T,self.presion_vapor))
+        return toUnidad(unidades.Pressure, self.DIPPR(T,self.presion_vapor))
 
     def Pv_Antoine(self,T,parameters=None):
         """Presión de vapor de Antoine
         Los parámetros de la ecuación se encuentran en la base de datos"""
         if parameters==None:
             parameters=self.antoine
-        return unidades.Pressure(exp(parameters[0]-parameters[1]/(T+parameters[2])), "mmHg")
+        return toUnidad(unidades.Pressure, exp(parameters[0]-parameters[1]/(T+parameters[2])), "mmHg")
 
     def Pv_Lee_Kesler(self, T):
         """Denominado en Chemcad Curl Pitzer.
         Método alternativo para calcular la presión de vapor, usando las
         propiedades críticas, cuando no están disponibles los parametros DIPPR
         ni de Antoine pero si las propiedades críticas, API procedure 5A1.16, pag 390"""
-        f0=5.92714-6.09648/self.tr(T)-1.28862*log(self.tr(T))+0.169347*self.tr(T)**6
-        f1=15.2518-15.6875/self.tr(T)-13.4721*log(self.tr(T))+0.43577*self.tr(T)**6
-        return unidades.Pressure(exp(f0+self.f_acent*f1)*self.Pc.atm, "atm")
+        Tr=self.tr(T)
+        f0=5.92714-6.09648/Tr-1.28862*log(Tr)+0.169347*Tr**6
+        f1=15.2518-15.6875/Tr-13.4721*log(Tr)+0.43577*Tr**6
+        return toUnidad(unidades.Pressure, exp(f0+self.f_acent*f1)*self.Pc.atm, "atm")
 
     def Pv_Wagner(self, T):
         """Método alternativo para el cálculo de la presión de vapor, API procedure 5A1.3 pag 366"""
@@ -580,10 +654,13 @@ class Componente(object):
         X2=(1-Tr)**1.5/Tr
         X3=(1-Tr)**2.6/Tr
         X4=(1-Tr)**5./Tr
-        return unidades.Pressure(exp(self.wagner[0]*X1+self.wagner[1]*X2+self.wagner[2]*X3+self.wagner[3]*X4)*self.Pc)
+        return toUnidad(unidades.Pressure, exp(self.wagner[0]*X1+self.wagner[1]*X2+self.wagner[2]*X3+self.wagner[3]*X4)*self.Pc)
 
     def Pv_Maxwell_Bonnel(self, T):
-        """Método alternativo de cálculo de la presión de vapor, cuando no se dispone de los parametros DIPPR, ni de los valores de las propiedades críticas del elemento. Necesita el factor de Watson. API procedure 5A1.18  Pag. 394"""
+        """Método alternativo de cálculo de la presión de vapor, cuando no se dispone de los parametros DIPPR, ni de los valores de las propiedades críticas del elemento. Necesita el factor de Watson. API procedure 5A1.18  Pag. 394
+        Con un array de temperaturas se resuelve para cada valor"""
+        if ndim(T):
+            return _pointwise(self.Pv_Maxwell_Bonnel, T)
         if self.Tb.F>400: f=1.0
         elif self.Tb.F <200: f=0.0
         else: f=(self.Tb.R-659.7)/200
@@ -624,7 +701,7 @@ class Componente(object):
         """Cálculo de la conductividad terminca del líquido usando las ecuaciones DIPPR
         Los parámetros se encuentran en la base de datos en vigesimosegunda posición
         Conductividad termica obtenida en W/(m·K), API procedure 12A1.1, pag 1137"""
-        return unidades.ThermalConductivity(self.DIPPR(T,self.conductividad_liquido))
+        return toUnidad(unidades.ThermalConductivity, self.DIPPR(T,self.conductividad_liquido))
 
     def ThCond_Liquido_Pachaiyappan(self, T):
         """Método alternativo para el cálculo de la conductividad de líquidos a baja presión, API procedure 12A1.2, pag 1141"""
@@ -680,15 +757,17 @@ class Componente(object):
 
 
     def ThCond_Gas(self, T, P):
-        """Procedimiento que define el método más apropiado para el cálculo de la conductividad térmica del líquido, pag 1136"""
+        """Procedimiento que define el método más apropiado para el cálculo de la conductividad térmica del líquido, pag 1136
+        Con un array de temperaturas se elige el método para cada valor"""
         ThCondG=self.Config.getint("Transport","ThCondG")
         p=unidades.Pressure(P)
         if p.psi<50:
-            if ThCondG==0 and self.conductividad_gas and self.conductividad_gas[6]<=T<=self.conductividad_gas[7]:
-                return self.ThCond_Gas_DIPPR(T)
-            else:
-                return self.ThCond_Gas_Misic_Thodos(T)
+            return _select(T, [
+                (lambda T: ThCondG==0 and _inRange(T, self.conductividad_gas), self.ThCond_Gas_DIPPR),
+                (True, self.ThCond_Gas_Misic_Thodos)])
         elif self.indice in [1, 46, 47, 48, 50, 51, 111]:
+            if ndim(T):
+                return _pointwise(self.ThCond_Gas_Nonhidrocarbon, T, P)
             return self.ThCond_Gas_Nonhidrocarbon(T, P)
         else:
             # TODO: fix crooks methods with lost lee_kesler library
@@ -699,18 +778,18 @@ class Componente(object):
         """Cálculo de la conductividad terminca del gas usando las ecuaciones DIPPR
         Los parámetros se encuentran en la base de datos en vigesimotercera posición
         Conductividad termica obtenida en W/(m·K), API procedure 12B1.1 pag 1158"""
-        return unidades.ThermalConductivity(self.DIPPR(T,self.conductividad_gas))
+        return toUnidad(unidades.ThermalConductivity, self.DIPPR(T,self.conductividad_gas))
 
     def ThCond_Gas_Misic_Thodos(self, T):
         """Método alternativo para el cálculo de la conductividad térmica de gases a baja presión <4 atm, API Procedure 12B1.2 pag.1162"""
         l=(self.Tc.R)**(1./6)*self.M**0.5*(1/self.Pc.atm)**(2./3)
-        cp=self.Cp_Gas_DIPPR(T)
+        cp=self.Cp_Gas_DIPPR(T)/unidades.SpecificHeat.rates["BtulbF"]
         #TODO: Cuando se añada alguna propiedad en la base de datos que defina la naturaleza cíclica de los componentes se podrá generalizar este metodo a una temperatura reducida menor de 1 para compuestos cíclicos e hidrógeno, de momento todos se calculan por el metodo de tr mayor de 1.
 #        if self.tr(T)<1:
 #            k=1.188e-3*self.tr(T)*cp.BtulbF/l
 #        else:
-        k=2.67e-4*(14.52*self.tr(T)-5.14)**(2.0/3)*cp.BtulbF*self.M/l
-        return unidades.ThermalConductivity(k, "BtuhftF")
+        k=2.67e-4*(14.52*self.tr(T)-5.14)**(2.0/3)*cp*self.M/l
+        return toUnidad(unidades.ThermalConductivity, k, "BtuhftF")
 
     def ThCond_Gas_Crooks(self, T, P):
         """Método alternativo para el cálculo de la conductividad térmica de gases a alta presión >4 atm, API Procedure 12B4.1 pag.1170"""
@@ -754,15 +833,16 @@ class Componente(object):
 
 
     def Mu_Gas(self, T, P):
-        """Procedimiento que define el método más apropiado para el cálculo de la viscosidad del líquido, pag 1026"""
+        """Procedimiento que define el método más apropiado para el cálculo de la viscosidad del líquido, pag 1026
+        Con un array de temperaturas se elige el método para cada valor"""
         MuG=self.Config.getint("Transport","MuG")
         if P/self.Pc<0.6:
-           if MuG==0 and self.viscosidad_gas and self.viscosidad_gas[6]<=T<=self.viscosidad_gas[7]:
-                return self.Mu_Gas_DIPPR(T)
-           elif MuG==1:
-               return self.Mu_Gas_Chapman_Enskog(T)
-           else :
-               return self.Mu_Gas_Thodos(T)
+            return _select(T, [
+                (lambda T: MuG==0 and _inRange(T, self.viscosidad_gas), self.Mu_Gas_DIPPR),
+                (MuG==1, self.Mu_Gas_Chapman_Enskog),
+                (True, self.Mu_Gas_Thodos)])
+        elif ndim(T):
+            return _pointwise(self.Mu_Gas, T, P)
         else:
             if self.hidrocarburo:
                 return self.Mu_Gas_Eakin_Ellingtong(T, P)
@@ -774,7 +854,7 @@ class Componente(object):
         Los parámetros se encuentran en la base de datos en vigesimoprimera posición
         Viscosidad obtenida en Pa·s
         API procedure 11B1.1, pag 1091"""
-        return unidades.Viscosity(self.DIPPR(T,self.viscosidad_gas))
+        return toUnidad(unidades.Viscosity, self.DIPPR(T,self.viscosidad_gas))
 
     def Mu_Gas_Chapman_Enskog(self,T):
         """Método alternativo para calcular la viscosidad de gases (a baja presión):
@@ -802,25 +882,22 @@ class Componente(object):
             omega=1.03036/T_**0.15610+0.193/exp(0.47635*T_)+1.03587/exp(1.52996*T_)+1.76474/exp(3.89411*T_)+0.19*self.parametro_polar**2/T_
         else: #No polar, colisión integral de Neufeld
             omega=1.16145/T_**0.14874+0.52487/exp(0.7732*T_)+2.16178/exp(2.43787*T_)
-        return unidades.Viscosity(26.69*(self.M*T)**0.5/diametro_molecular**2/omega, "microP")
+        return toUnidad(unidades.Viscosity, 26.69*(self.M*T)**0.5/diametro_molecular**2/omega, "microP")
 
     def Mu_Gas_Thodos(self, T):
         """Método alternativo para el cálculo de la viscosidad de gases a baja presión, solo necesita las propiedades críticas, API procedure 11B1.3, pag 1099"""
-        t=unidades.Temperature(T)
         Tr=self.tr(T)
         if self.indice==1:
-            if Tr<=1.5:
-                mu=3.7e-5*t.R**0.94
-            else:
-                mu=9.071e-4*(7.639e-2*t.R-1.67)**0.625
+            mu=piecewise(unidades.K2R(T), [Tr<=1.5], [
+                lambda R: 3.7e-5*R**0.94,
+                lambda R: 9.071e-4*(7.639e-2*R-1.67)**0.625])
         else:
-            if Tr<=1.5:
-                N=3.5e-4*Tr**0.94
-            else:
-                N=1.778e-4*(4.58*Tr-1.67)**0.625
+            N=piecewise(Tr, [Tr<=1.5], [
+                lambda Tr: 3.5e-4*Tr**0.94,
+                lambda Tr: 1.778e-4*(4.58*Tr-1.67)**0.625])
             x=self.Tc**(1.0/6)/self.M**0.5/self.Pc.atm**(2.0/3)
             mu=N/x
-        return unidades.Viscosity(mu, "cP")
+        return toUnidad(unidades.Viscosity, mu, "cP")
 
     def Mu_Gas_Jossi(self, T, P, muo=0):
         """Método de cálculo de la viscosidad de hidrocarburos gaseosos pesados a alta presión,
@@ -873,29 +950,28 @@ class Componente(object):
 
 
     def Mu_Liquido(self, T, P):
-        """Procedimiento que define el método más apropiado para el cálculo de la viscosidad del líquido, pag 1026"""
+        """Procedimiento que define el método más apropiado para el cálculo de la viscosidad del líquido, pag 1026
+        Con un array de temperaturas se elige el método para cada valor"""
         #Comparacion de métodos: pag 405 Vismanath
         MuL=self.Config.getint("Transport","MuL")
         corr=self.Config.getint("Transport","Corr_MuL")
+        parametrica=self.viscosidad_parametrica[0]!=0 and self.viscosidad_parametrica[1]!=0
+        critica=self.Tc!=0 and self.Pc!=0 and self.f_acent!=0
         if P<1013250:
-            if MuL==0 and self.viscosidad_liquido and self.viscosidad_liquido[6]<=T<=self.viscosidad_liquido[7]:
-                return self.Mu_Liquido_DIPPR(T)
-            elif MuL==1 and self.viscosidad_parametrica[0]!=0 and self.viscosidad_parametrica[1]!=0:
-                return self.Mu_Liquido_Parametrica(T)
-            elif MuL==2 and self.Tc!=0 and self.Pc!=0 and self.f_acent!=0:
-                return self.Mu_Liquido_Letsou_Steil(T)
-            elif MuL==3 and self.Van_Veltzen:
-                return self.Mu_Liquido_Van_Veltzen(T)
-            else:
-                if  self.viscosidad_liquido and self.viscosidad_liquido[6]<=T<=self.viscosidad_liquido[7]:
-                    return self.Mu_Liquido_DIPPR(T)
-                elif self.viscosidad_parametrica[0]!=0 and self.viscosidad_parametrica[1]!=0:
-                    return self.Mu_Liquido_Parametrica(T)
-                elif self.Tc!=0 and self.Pc!=0 and self.f_acent!=0:
-                    return self.Mu_Liquido_Letsou_Steil(T)
-                elif self.Van_Veltzen:
-                    return self.Mu_Liquido_Van_Veltzen(T)
-                else: print("Ningún método disponible")
+            mu=_select(T, [
+                (lambda T: MuL==0 and _inRange(T, self.viscosidad_liquido), self.Mu_Liquido_DIPPR),
+                (MuL==1 and parametrica, self.Mu_Liquido_Parametrica),
+                (MuL==2 and critica, self.Mu_Liquido_Letsou_Steil),
+                (MuL==3 and bool(self.Van_Veltzen), self.Mu_Liquido_Van_Veltzen),
+                (lambda T: _inRange(T, self.viscosidad_liquido), self.Mu_Liquido_DIPPR),
+                (parametrica, self.Mu_Liquido_Parametrica),
+                (critica, self.Mu_Liquido_Letsou_Steil),
+                (bool(self.Van_Veltzen), self.Mu_Liquido_Van_Veltzen)])
+            if mu is None:
+                print("Ningún método disponible")
+            return mu
+        elif ndim(T):
+            return _pointwise(self.Mu_Liquido, T, P)
         else:
             if corr==0 and self.Tb<650:
             #En realidad el criterio de corte es los hidrocarburos de menos de 20 átomos de carbono (hidrocarburos de bajo peso molecular), pero aprovechando que la temperatura de ebullición es proporcional al peso molecular podemos usar esta
@@ -917,13 +993,13 @@ class Componente(object):
         Los parámetros se encuentran en la base de datos en vigésima posición
         Viscosidad obtenida en Pa·s
         API procedure 11A2.1, pag 1038"""
-        return unidades.Viscosity(self.DIPPR(T,self.viscosidad_liquido))
+        return toUnidad(unidades.Viscosity, self.DIPPR(T,self.viscosidad_liquido))
 
     def Mu_Liquido_Parametrica(self, T, parameters=None):
         """Cálculo paramétrico de la viscosidad del líquido"""
         if parameters==None:
             parameters=self.viscosidad_parametrica
-        return unidades.Viscosity(10**(parameters[0]*(1./T-1/parameters[1])), "cP")
+        return toUnidad(unidades.Viscosity, 10**(parameters[0]*(1./T-1/parameters[1])), "cP")
 
     def Mu_Liquido_Van_Veltzen(self, T):
         """Método alternativo para calcular la viscosidad de líquidos haciendo uso de la contribución de los grupos moleculares, API procedure 11A2.3, pag 1048"""
@@ -932,9 +1008,10 @@ class Componente(object):
     def Mu_Liquido_Letsou_Steil(self, T):
         """Método alternativo para el cálculo de la viscosidad en líquidos."""
         x= self.Tc**(1./6)/self.M**0.5/self.Pc.atm**(2./3)
-        x0=0.015178-0.021351*self.tr(T)+0.007503*self.tr(T)**2
-        x1=0.042559-0.07675*self.tr(T)+0.034007*self.tr(T)**2
-        return unidades.Viscosity((x0+self.f_acent*x1)/x, "cP")
+        Tr=self.tr(T)
+        x0=0.015178-0.021351*Tr+0.007503*Tr**2
+        x1=0.042559-0.07675*Tr+0.034007*Tr**2
+        return toUnidad(unidades.Viscosity, (x0+self.f_acent*x1)/x, "cP")
 
     def Mu_Liquido_Lucas(self, T, P, muo=0):
         """Método de cálculo de la viscosidad de líquidos a alta presión
@@ -1032,37 +1109,26 @@ class Componente(object):
         return unidades.Viscosity(7.7e-4/x, "cP")
 
     def Tension(self, T):
-        """Procedimiento que define el método más apropiado para el cálculo de la tensión superficial"""
+        """Procedimiento que define el método más apropiado para el cálculo de la tensión superficial
+        Con un array de temperaturas se elige el método para cada valor"""
         tension=self.Config.getint("Transport","Tension")
-        if tension==0 and self.tension_superficial and self.tension_superficial[6]<=T<=self.tension_superficial[7]:
-            return self.Tension_DIPPR(T)
-        elif tension==1 and self.tension_superficial_parametrica:
-            return self.Tension_Parametrica(T)
-        elif tension==2 and self.parachor:
-            return self.Tension_Parachor(T)
-        elif tension==3:
-            return self.Tension_MIller(T)
-        elif tension==4 and self.stiehl:
-            return self.Tension_Hakim(T)
-        elif tension==5 and self.Kw:
-            return self.Tension_Hydrocarbon(T)
-        else:
-            if self.tension_superficial and self.tension_superficial[6]<=T<=self.tension_superficial[7]:
-                return self.Tension_DIPPR(T)
-            elif self.tension_superficial_parametrica:
-                return self.Tension_Parametrica(T)
-            elif self.parachor:
-                return self.Tension_Parachor(T)
-            elif self.stiehl:
-                return self.Tension_Hakim(T)
-            elif self.Kw:
-                return self.Tension_Hydrocarbon(T)
-            else:
-                return self.Tension_MIller(T)
+        return _select(T, [
+            (lambda T: tension==0 and _inRange(T, self.tension_superficial), self.Tension_DIPPR),
+            (tension==1 and bool(self.tension_superficial_parametrica), self.Tension_Parametrica),
+            (tension==2 and bool(self.parachor), self.Tension_Parachor),
+            (tension==3, self.Tension_MIller),
+            (tension==4 and bool(self.stiehl), self.Tension_Hakim),
+            (tension==5 and bool(self.Kw), self.Tension_Hydrocarbon),
+            (lambda T: _inRange(T, self.tension_superficial), self.Tension_DIPPR),
+            (bool(self.tension_superficial_parametrica), self.Tension_Parametrica),
+            (bool(self.parachor), self.Tension_Parachor),
+            (bool(self.stiehl), self.Tension_Hakim),
+            (bool(self.Kw), self.Tension_Hydrocarbon),
+            (True, self.Tension_MIller)])
 
     def Tension_DIPPR(self,T):
         """Cálculo de la tensión superficial del líquido usando las ecuaciones DIPPR"""
-        return unidades.Tension(self.DIPPR(T,self.tension_superficial))
+        return toUnidad(unidades.Tension, self.DIPPR(T,self.tension_superficial))
 
     def Tension_Parametrica(self, T, parameters=None):
         """Cálculo paramétrico de la tensión superficial
@@ -1073,7 +1139,7 @@ class Componente(object):
         en forma de lista en la posición duodécima"""
         if parameters==None:
             parameters=self.tension_superficial_parametrica
-        return unidades.Tension(parameters[0]*(1-self.tr(T))**parameters[1])
+        return toUnidad(unidades.Tension, parameters[0]*(1-self.tr(T))**parameters[1])
 
     def Tension_Hakim(self, T):
         """Método alternativo para el cálculo de la tensión superficial de líquidos.
@@ -1081,14 +1147,14 @@ class Componente(object):
         ref Properties of gases and liquids pag 693 y sig."""
         Qp=0.1574+0.385*self.f_acent-1.769*self.stiehl-13.69*self.stiehl**2-0.510*self.f_acent**2+1.298*self.f_acent*self.stiehl
         m=1.21+0.5385*self.f_acent-14.61*self.stiehl-32.07*self.stiehl**2-1.656*self.f_acent**2+22.03*self.f_acent*self.stiehl
-        return unidades.Tension(self.Pc.atm**0.67*self.Tc**0.33*Qp*((1-self.tr(T))/0.4)**m, "dyncm")
+        return toUnidad(unidades.Tension, self.Pc.atm**0.67*self.Tc**0.33*Qp*((1-self.tr(T))/0.4)**m, "dyncm")
 
     def Tension_Block_Bird(self, T):
         """Método alternativo para el cálculo de la tensión superficial de líquidos.
         ref Eq.8.88 Riazi-Characterization of petroleum fractions pag 373"""
         Tbr=self.Tb/self.Tc
         Q=0.1196*(1+Tbr*log(self.Pc.atm)/(1-Tbr))-0.279
-        return unidades.Tension(self.Pc.atm**0.67*self.Tc**0.33*Q*(1-self.tr(T))**(11./9), "dyncm")
+        return toUnidad(unidades.Tension, self.Pc.atm**0.67*self.Tc**0.33*Q*(1-self.tr(T))**(11./9), "dyncm")
 
     def Tension_Miqueu(self, T):
         """Método alternativo para el cálculo de la tensión superficial de líquidos.
@@ -1098,13 +1164,12 @@ class Componente(object):
 
     def Tension_Hydrocarbon(self, T):
         """Método alternativo para el cálculo de la tensión superficial de líquidos"""
-        t=unidades.Temperature(T)
-        return unidades.Tension(673.7/self.Kw*((self.Tc.R-t.R)/self.Tc.R)**1.232, "dyncm")
+        return toUnidad(unidades.Tension, 673.7/self.Kw*((self.Tc.R-unidades.K2R(T))/self.Tc.R)**1.232, "dyncm")
 
     def Tension_MIller(self, T):
         """Método alternativo para el cálculo de la tensión superficial de líquidos"""
         Q=0.1207*(1+self.tr(self.Tb)*log(self.Pc.atm)/(1-self.tr(self.Tb)))-0.281
-        return unidades.Tension(self.Pc.atm**0.67*self.Tc**0.33*Q*(1-self.tr(T))**(11.0/9), "dyncm")
+        return toUnidad(unidades.Tension, self.Pc.atm**0.67*self.Tc**0.33*Q*(1-self.tr(T))**(11.0/9), "dyncm")
 
     def Tension_Parachor(self, T, parachor):
         """Método alternativo para el cálculo de la tensión superficial de líquidos haciendo uso de las contribuciones de grupos
@@ -1123,7 +1188,7 @@ class Componente(object):
         """Cálculo del calor de vaporización usando las ecuaciones DIPPR
         Los parámetros se encuentran en la base de datos en decimosexta posición
         Calor de vaporización obtenido en (J/kmol)"""
-        return unidades.Enthalpy(self.DIPPR(T,self.calor_vaporizacion)/self.M)
+        return toUnidad(unidades.Enthalpy, self.DIPPR(T,self.calor_vaporizacion)/self.M)
 
     def Hv_Lee_Kesler(self, T):
         """Método alternativo para el cálculo del calor de vaporización haciendo uso de las propiedades críticas
@@ -1140,13 +1205,13 @@ class Componente(object):
         """Cálculo de la capacidad calorifica del solido usando las ecuaciones DIPPR
         Los parámetros se encuentran en la base de datos en decimoseptima posición
         Capacidad calorifica obtenida en (J/kmol·K)"""
-        return unidades.SpecificHeat(self.DIPPR(T,self.capacidad_calorifica_solido)/self.M)
+        return toUnidad(unidades.SpecificHeat, self.DIPPR(T,self.capacidad_calorifica_solido)/self.M)
 
     def Cp_Liquido_DIPPR(self,T):
         """Cálculo de la capacidad calorifica del liquido usando las ecuaciones DIPPR
         Los parámetros se encuentran en la base de datos en decimoctava posición
         Capacidad calorifica obtenida en (J/kmol·K)"""
-        return unidades.SpecificHeat(self.DIPPR(T,self.capacidad_calorifica_liquido)/self.M)
+        return toUnidad(unidades.SpecificHeat, self.DIPPR(T,self.capacidad_calorifica_liquido)/self.M)
 
     def Cp_Hadden(self, T):
         """Método alternativo para el cálculo de la capacidad calorífica en líquidos por debajo de su punto de ebullición
@@ -1157,7 +1222,7 @@ class Componente(object):
         """Cálculo de la capacidad calorifica del gas ideal usando las ecuaciones DIPPR
         Los parámetros se encuentran en la base de datos en decimonovena posición
         Capacidad calorifica obtenida en (J/kmol·K)"""
-        return unidades.SpecificHeat(self.DIPPR(T,self.capacidad_calorifica_gas)/self.M)
+        return toUnidad(unidades.SpecificHeat, self.DIPPR(T,self.capacidad_calorifica_gas)/self.M)
 
     def Cp_Lee_Kesler(self, T, P, fase=None):
         """Método alternativo para el cálculo de la capacidad calorífica
@@ -1271,6 +1336,12 @@ class Componente(object):
         return P/z/R_atml/T
 
 
+def componentes(ids):
+    """Create the Componente of several index with a single databank query"""
+    rows = sql.getElements(ids)
+    return [Componente(int(i), row) for i, row in zip(ids, rows)]
+
+
 class newComponente(object):
     """Clase general que define la creaccion de nuevos componentes"""
     def export2Component(self):
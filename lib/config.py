@@ -37,8 +37,6 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 from configparser import ConfigParser
 import os
 
-from PyQt5 import QtWidgets
-
 # TODO: Delete when it isn´t necessary debug
 # os.environ["pychemqt"] = "/home/jjgomera/Programacion/pychemqt/"
 # os.environ["freesteam"] = "True"
@@ -53,7 +51,7 @@ from PyQt5 import QtWidgets
 # os.environ["PyQt5.Qsci"] = "True"
 
 
-from lib.sql import databank
+from lib.sql import getDatabank
 
 
 conf_dir = os.path.expanduser('~') + os.sep + ".pychemqt" + os.sep
@@ -89,14 +87,9 @@ def getComponents(solidos=False, config=None, name=True):
             indices = eval(indices)
 
     if name:
-        nombres = []
-        M = []
-        for componente in indices:
-            databank.execute("select nombre, peso_molecular from compuestos \
-where id == %s" % str(componente))
-            texto = databank.fetchone()
-            nombres.append(texto[0])
-            M.append(texto[1])
+        rows = getDatabank().getColumns(indices, ("nombre", "peso_molecular"))
+        nombres = [row[0] for row in rows]
+        M = [row[1] for row in rows]
         return indices, nombres, M
     else:
         return indices
@@ -114,6 +107,9 @@ def setMainWindowConfig(config=None):
         currentConfig = config
         return
     else:
+        # The graphical library is only needed here, so the modules using
+        # configuration can be imported without it, as lib.psyBatch
+        from PyQt5 import QtWidgets
         widget = QtWidgets.QApplication.activeWindow()
         if isinstance(widget, QtWidgets.QMainWindow) and \
            widget.__class__.__name__ == "UI_pychemqt":
@@ -418,8 +418,8 @@ class Corriente(config.Entity):
 #            self.mezcla.recallZeros(eos.Ki, 1.)
 
             if 0. < self.x < 1.:
-                self.Liquido = Mezcla(tipo=5, fraccionMolar=eos.xi, caudalMolar=self.caudalmolar*(1-self.x))
-                self.Gas = Mezcla(tipo=5, fraccionMolar=eos.yi, caudalMolar=self.caudalmolar*self.x)
+                self.Liquido = Mezcla(tipo=5, ids=self.ids, fraccionMolar=eos.xi, caudalMolar=self.caudalmolar*(1-self.x))
+                self.Gas = Mezcla(tipo=5, ids=self.ids, fraccionMolar=eos.yi, caudalMolar=self.caudalmolar*self.x)
             elif self.x <= 0:
                 self.Liquido = self.mezcla
                 self.Gas = Mezcla()
@@ -129,6 +129,8 @@ class EoS(object):
             x=0.
         else:
             x=0.5
+            xi=[zi/(1-x+x*ki) for zi, ki in zip(self.fraccion, Ki)]
+            yi=[zi*ki/(1-x+x*ki) for zi, ki in zip(self.fraccion, Ki)]
             while True:
                 xo=x
                 solucion=fsolve(Rachford, x, full_output=True)
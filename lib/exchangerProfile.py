@@ -0,0 +1,602 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Distributed (segment-wise) model of two stream heat exchangers
+#
+#   - FluidProfile: Cached thermodynamic evaluator of a stream along enthalpy
+#   - getProfile: Return a cached FluidProfile covering a temperature range
+#   - h_tube: Local heat transfer coefficient inside tubes
+#   - h_annulli: Local heat transfer coefficient in annulli of double pipe
+#   - h_shell: Local heat transfer coefficient in shellside, Kern method
+#   - DistributedExchanger: Integration of both sides along the length
+#
+#   The energy balance along length is integrated as ODE in the specific
+#   enthalpies of both streams, with adaptive step so the segmentation is
+#   refined where the properties change quickly, as in the phase change
+#   boundaries. The countercurrent flow is solved as boundary value problem
+#   by shooting over the heat duty. The local properties are interpolated in
+#   tables calculated once for each fluid, so the integration don't need new
+#   thermodynamic calculations.
+###############################################################################
+
+
+from collections import OrderedDict
+
+from numpy import (arange, argsort, array, asarray, broadcast_to, clip,
+                   errstate, interp, isfinite, linspace, maximum, nan, pi,
+                   where)
+from scipy.integrate import solve_ivp
+from scipy.optimize import brentq
+
+from lib.heatTransfer import (
+    h_tubeside_laminar_Eubank_Proctor, h_tubeside_laminar_VDI,
+    h_tubeside_laminar_Hausen, h_tubeside_laminar_Sieder_Tate,
+    h_tubeside_turbulent_Sieder_Tate, h_tubeside_turbulent_Colburn,
+    h_tubeside_turbulent_Dittus_Boelter, h_tubeside_turbulent_ESDU,
+    h_tubeside_turbulent_Gnielinski, h_anulli_Laminar, h_anulli_Turbulent,
+    h_anulli_Transition, h_shellside_turbulent_Kern,
+    h_tube_Condensation_Shah, h_tube_Boiling_Kenning_Cooper)
+
+
+# Number of temperature points to tabulate the properties of each fluid
+POINTS = 9
+
+# Maximum number of fluid profiles saved in cache
+CACHE_SIZE = 32
+_cache = OrderedDict()
+
+# Phase properties tabulated, in the Liquido and Vapor phases
+_PHASE = ("rho", "mu", "k", "cp", "Prandt")
+
+
+class _Namespace(object):
+    """Container of properties with the attribute interface of streams, so it
+    can be used with the heat transfer correlations"""
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def _float(value):
+    """Convert a property value to float, nan for undefined values"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return nan
+
+
+def _fill(values):
+    """Fill the undefined values with the nearest defined value"""
+    values = asarray(values, dtype=float)
+    valid = isfinite(values)
+    if not valid.any():
+        return values
+    index = arange(len(values))
+    forward = maximum.accumulate(where(valid, index, 0))
+    first = index[valid][0]
+    forward[:first] = first
+    return values[forward]
+
+
+class FluidProfile(object):
+    """Cached thermodynamic evaluator of a stream at constant pressure
+
+    The properties are tabulated as function of specific enthalpy in a
+    temperature range, with the saturation points when the stream change of
+    phase in that range. Calling the instance with an array of specific
+    enthalpies return the interpolated properties as a namespace with the
+    same attributes than a stream, T, x, Pr, Liquido, Vapor...
+
+    Parameters
+    ----------
+    stream : Corriente
+        Stream to tabulate, the pressure and composition are used
+    Tmin : float
+        Lower temperature of table, [K]
+    Tmax : float
+        Upper temperature of table, [K]
+    points : integer
+        Number of temperature points in table
+    """
+    def __init__(self, stream, Tmin, Tmax, points=POINTS):
+        self.P = stream.P
+        self.Tmin = Tmin
+        self.Tmax = Tmax
+        self.Pr = stream.P/stream.Pc
+        self.hBubble = None
+        self.hDew = None
+
+        states = [stream]
+        for T in linspace(Tmin, Tmax, points):
+            if T != stream.T:
+                states.append(stream.clone(T=T, P=stream.P))
+
+        # Phase change in range, add the saturation states
+        bubble = None
+        x = [st.x for st in states]
+        if min(x) < 1 and max(x) > 0 and (min(x) != max(x) or 0 < x[0] < 1):
+            # Corriente don't accept a null quality as input
+            bubble = stream.clone(P=stream.P, x=1e-10)
+            dew = stream.clone(P=stream.P, x=1.)
+            states += [bubble, dew]
+            self.hBubble = bubble.h/bubble.caudalmasico
+            self.hDew = dew.h/dew.caudalmasico
+            if len(stream.ids) > 1:
+                # Temperature glide of mixtures
+                for xi in linspace(0, 1, points)[1:-1]:
+                    states.append(stream.clone(P=stream.P, x=xi))
+
+        data = {"h": [], "T": [], "x": []}
+        for key in _PHASE:
+            data[key+"L"] = []
+            data[key+"G"] = []
+        for st in states:
+            data["h"].append(st.h/st.caudalmasico)
+            data["T"].append(st.T)
+            if st is bubble:
+                data["x"].append(0.)
+            else:
+                data["x"].append(st.x)
+            for key in _PHASE:
+                if st.x < 1:
+                    value = _float(getattr(st.Liquido, key, None))
+                else:
+                    value = nan
+                data[key+"L"].append(value)
+                if st.x > 0:
+                    value = _float(getattr(st.Gas, key, None))
+                else:
+                    value = nan
+                data[key+"G"].append(value)
+
+        order = argsort(data["h"])
+        self.data = {}
+        for key, value in data.items():
+            value = array(value, dtype=float)[order]
+            if key[:-1] in _PHASE:
+                value = _fill(value)
+            self.data[key] = value
+
+    def covers(self, Tmin, Tmax):
+        """Check if the profile table include the temperature range"""
+        return self.Tmin <= Tmin and Tmax <= self.Tmax
+
+    def enthalpy(self, T):
+        """Specific enthalpy at temperature T, [J/kg]"""
+        return interp(T, self.data["T"], self.data["h"])
+
+    def __call__(self, h):
+        """Return the properties at the specific enthalpies h, [J/kg]"""
+        h = asarray(h, dtype=float)
+        prop = {}
+        for key, value in self.data.items():
+            prop[key] = interp(h, self.data["h"], value)
+        x = clip(prop["x"], 0, 1)
+
+        liquid = _Namespace(**{key: prop[key+"L"] for key in _PHASE})
+        vapor = _Namespace(**{key: prop[key+"G"] for key in _PHASE})
+
+        # Bulk properties, vapor only for superheated vapor, homogeneous
+        # density for two phase flow
+        gas = x >= 1
+        with errstate(invalid="ignore", divide="ignore"):
+            rho = where(x <= 0, liquid.rho, where(
+                gas, vapor.rho, 1/(x/vapor.rho+(1-x)/liquid.rho)))
+        bulk = {"rho": rho}
+        for key in _PHASE[1:]:
+            bulk[key] = where(gas, getattr(vapor, key), getattr(liquid, key))
+
+        return _Namespace(h=h, T=prop["T"], x=x, Pr=self.Pr, Liquido=liquid,
+                          Vapor=vapor, Gas=vapor, **bulk)
+
+
+def getProfile(stream, Tmin, Tmax, points=POINTS):
+    """Return a FluidProfile of stream covering the temperature range,
+    reusing the cached profiles of the same fluid and pressure"""
+    key = (tuple(stream.ids), tuple(round(x, 10) for x in stream.fraccion),
+           round(float(stream.P), 3), repr(sorted(
+               (k, v) for k, v in stream.kwargs.items()
+               if k in ("K", "alfa", "mix", "H", "MEoS", "iapws", "GERG",
+                        "freesteam", "coolProp", "refprop"))))
+    profile = _cache.get(key)
+    if profile is not None and profile.covers(Tmin, Tmax):
+        _cache.move_to_end(key)
+        return profile
+
+    if profile is not None:
+        Tmin = min(Tmin, profile.Tmin)
+        Tmax = max(Tmax, profile.Tmax)
+    profile = FluidProfile(stream, Tmin, Tmax, points)
+    _cache[key] = profile
+    _cache.move_to_end(key)
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return profile
+
+
+def h_twophase(fluid, G, D, cooled):
+    """Local Nusselt number of two phase flow, using the Shah correlation for
+    condensation and Kenning-Cooper for convective boiling
+    fluid: FluidProfile properties
+    G: mass flux, [kg/m²s]
+    D: diameter, [m]
+    cooled: boolean, True for condensation"""
+    twophase = _Namespace(**fluid.__dict__)
+    twophase.x = clip(fluid.x, 1e-6, 0.999)
+    twophase.caudalmasico = G*pi*D**2/4
+    with errstate(invalid="ignore", divide="ignore"):
+        if cooled:
+            return h_tube_Condensation_Shah(twophase, D)
+        else:
+            return h_tube_Boiling_Kenning_Cooper(twophase, D)
+
+
+def h_tube(fluid, G, D, L, laminar=0, turbulent=0, cooled=True):
+    """Local heat transfer coefficient inside tubes, [W/m²K]
+
+    Parameters
+    ----------
+    fluid : namespace
+        Properties as returned by a FluidProfile
+    G : float
+        Mass flux, [kg/m²s]
+    D : float
+        Internal diameter, [m]
+    L : float
+        Tube length, [m]
+    laminar : integer
+        Index of laminar correlation, as tubesideLaminar in equipments
+    turbulent : integer
+        Index of turbulent correlation, as tubesideTurbulent in equipments
+    cooled : boolean
+        The fluid is cooled
+    """
+    with errstate(invalid="ignore", divide="ignore", over="ignore"):
+        re = G*D/fluid.mu
+        pr = fluid.Prandt
+        gz = re*pr*D/L
+        gr = 0
+
+        if laminar == 0:
+            Nu_lam = h_tubeside_laminar_Eubank_Proctor(
+                Pr=pr, Gz=gz, Gr=gr, D=D, L=L)
+        elif laminar == 1:
+            Nu_lam = h_tubeside_laminar_VDI(Re=re, Pr=pr, D=D, L=L)
+        elif laminar == 2:
+            Nu_lam = h_tubeside_laminar_Hausen(Gz=gz)
+        else:
+            Nu_lam = h_tubeside_laminar_Sieder_Tate(Gz=gz, Gr=gr)
+
+        if turbulent == 0:
+            Nu_tur = h_tubeside_turbulent_Sieder_Tate(Re=re, Pr=pr)
+        elif turbulent == 1:
+            Nu_tur = h_tubeside_turbulent_Colburn(Re=re, Pr=pr)
+        elif turbulent == 2:
+            Nu_tur = h_tubeside_turbulent_Dittus_Boelter(
+                Re=re, Pr=pr, calentamiento=not cooled)
+        elif turbulent == 3:
+            Nu_tur = h_tubeside_turbulent_ESDU(Re=re, Pr=pr)
+        else:
+            Nu_tur = h_tubeside_turbulent_Gnielinski(Re=re, Pr=pr, D=D, L=L)
+
+        Nu = where(re < 2300, Nu_lam, Nu_tur)
+        h = Nu*fluid.k/D
+
+        twophase = (fluid.x > 0) & (fluid.x < 1)
+        if twophase.any():
+            Nu_tp = h_twophase(fluid, G, D, cooled)
+            h = where(twophase, Nu_tp*fluid.Liquido.k/D, h)
+    return h
+
+
+def h_annulli(fluid, G, Dee, De, Di, cooled=True):
+    """Local heat transfer coefficient in the annulli of double pipe
+    exchanger, [W/m²K]
+
+    Parameters
+    ----------
+    fluid : namespace
+        Properties as returned by a FluidProfile
+    G : float
+        Mass flux, [kg/m²s]
+    Dee : float
+        Internal diameter of external pipe, [m]
+    De : float
+        External diameter of internal pipe, [m]
+    Di : float
+        Internal diameter of internal pipe, reference diameter of Nusselt
+        number as in mean temperature method, [m]
+    cooled : boolean
+        The fluid is cooled
+    """
+    a = Dee/De
+    dh = Dee-De
+    with errstate(invalid="ignore", divide="ignore", over="ignore"):
+        re = G*dh/fluid.mu
+        pr = fluid.Prandt
+        Nu = where(re <= 2300, h_anulli_Laminar(re, pr, a), where(
+            re >= 1e4, h_anulli_Turbulent(re, pr, a),
+            h_anulli_Transition(re, pr, a)))
+        h = Nu*fluid.k/Di
+
+        twophase = (fluid.x > 0) & (fluid.x < 1)
+        if twophase.any():
+            Nu_tp = h_twophase(fluid, G, dh, cooled)
+            h = where(twophase, Nu_tp*fluid.Liquido.k/dh, h)
+    return h
+
+
+def h_shell(fluid, G, Deq, cooled=True):
+    """Local heat transfer coefficient in shellside using the Kern method,
+    [W/m²K]
+
+    Parameters
+    ----------
+    fluid : namespace
+        Properties as returned by a FluidProfile
+    G : float
+        Mass flux in crossflow area, [kg/m²s]
+    Deq : float
+        Equivalent diameter of shell, [m]
+    cooled : boolean
+        The fluid is cooled
+    """
+    with errstate(invalid="ignore", divide="ignore", over="ignore"):
+        re = G*Deq/fluid.mu
+        Nu = h_shellside_turbulent_Kern(re, fluid.Prandt)
+        h = Nu*fluid.k/Deq
+
+        twophase = (fluid.x > 0) & (fluid.x < 1)
+        if twophase.any():
+            Nu_tp = h_twophase(fluid, G, Deq, cooled)
+            h = where(twophase, Nu_tp*fluid.Liquido.k/Deq, h)
+    return h
+
+
+class DistributedExchanger(object):
+    """Distributed model of a two streams heat exchanger
+
+    The stream A flow in the positive direction of length, the stream B can
+    flow in cocurrent or countercurrent. The local heat flow per unit length
+    is q = UL·(TA-TB), with UL the local conductance per unit length
+    calculated with the local properties of both sides.
+
+    Parameters
+    ----------
+    streamA : Corriente
+        Input stream of side A
+    streamB : Corriente
+        Input stream of side B
+    conductance : function
+        Function with the properties of both sides as parameters, return
+        the conductance per unit length, [W/mK], must accept arrays
+    flujo : string
+        Flow type, CF countercurrent, PF cocurrent
+    rtol : float
+        Relative tolerance of integration
+    segments : integer
+        Minimum number of segments of solution
+
+    Calculated values (after rating or design):
+        L: Length, [m]
+        Q: Heat duty from stream A to stream B, [W]
+        z: Length coordinate of segment boundaries, [m]
+        hA, hB: Specific enthalpy profiles, [J/kg]
+        fluidA, fluidB: Properties profiles
+        UL: Conductance profile, [W/mK]
+        q: Heat flow per unit length profile, [W/m]
+
+    Rating of two water streams with a constant conductance, the heat duty
+    agree with the ε-NTU method, with cp 4.19 and 4.18 kJ/kgK and UA=5 kW/K
+
+    >>> from math import exp, log
+    >>> from lib.corriente import Corriente
+    >>> kw = {"ids": [62], "fraccionMolar": [1.]}
+    >>> hot = Corriente(T=350, P=101325., caudalMasico=1., **kw)
+    >>> cold = Corriente(T=300, P=101325., caudalMasico=2., **kw)
+    >>> def conductance(fluidA, fluidB):
+    ...     return 500
+    >>> Cmin, Cr = 4190., 4190/8360.
+    >>> NTU = 5000/Cmin
+    >>> cf = DistributedExchanger(hot, cold, conductance, "CF")
+    >>> cf.rating(10)
+    >>> e = (1-exp(-NTU*(1-Cr)))/(1-Cr*exp(-NTU*(1-Cr)))
+    >>> print("%0.1f %0.1f" % (cf.Q/1e3, e*Cmin*50/1e3))
+    129.8 129.9
+    >>> pf = DistributedExchanger(hot, cold, conductance, "PF")
+    >>> pf.rating(10)
+    >>> e = (1-exp(-NTU*(1+Cr)))/(1+Cr)
+    >>> print("%0.1f %0.1f" % (pf.Q/1e3, e*Cmin*50/1e3))
+    116.3 116.3
+    >>> print("%0.1f %0.1f" % (pf.outlet("A").T, pf.outlet("B").T))
+    322.2 313.9
+
+    Design of the countercurrent exchanger for 100 kW, the ε-NTU length is
+    L = NTU·Cmin/UL
+    >>> cf.design(1e5)
+    >>> e = 1e5/Cmin/50
+    >>> NTU = log((e-1)/(e*Cr-1))/(Cr-1)
+    >>> print("%0.2f %0.2f" % (cf.L, NTU*Cmin/500))
+    6.31 6.31
+    """
+    def __init__(self, streamA, streamB, conductance, flujo="CF", rtol=1e-5,
+                 segments=10):
+        self.streamA = streamA
+        self.streamB = streamB
+        self.conductance = conductance
+        self.flujo = flujo
+        self.rtol = rtol
+        self.segments = segments
+
+        self.mA = streamA.caudalmasico
+        self.mB = streamB.caudalmasico
+        self.hAin = streamA.h/self.mA
+        self.hBin = streamB.h/self.mB
+
+        Tmin = min(streamA.T, streamB.T)
+        Tmax = max(streamA.T, streamB.T)
+        self.profileA = getProfile(streamA, Tmin, Tmax)
+        self.profileB = getProfile(streamB, Tmin, Tmax)
+
+        # Maximum heat duty, both streams to the other stream input
+        # temperature
+        QA = self.mA*(self.hAin-self.profileA.enthalpy(streamB.T))
+        QB = self.mB*(self.profileB.enthalpy(streamA.T)-self.hBin)
+        if QA > 0:
+            self.Qmax = min(QA, QB)
+        else:
+            self.Qmax = max(QA, QB)
+
+        if flujo == "CF":
+            self._sign = -1
+        else:
+            self._sign = 1
+
+    def _derivative(self, z, y):
+        """Enthalpy gradients along the length"""
+        fluidA = self.profileA(y[0])
+        fluidB = self.profileB(y[1])
+        q = self.conductance(fluidA, fluidB)*(fluidA.T-fluidB.T)
+        return [-q/self.mA, self._sign*q/self.mB]
+
+    def _integrate(self, y0, L, events=None, step=None):
+        if step is None:
+            step = L/self.segments
+        return solve_ivp(self._derivative, (0, L), y0, events=events,
+                         rtol=self.rtol, atol=1e-6*abs(self.Qmax/self.mA),
+                         max_step=step)
+
+    def rating(self, L):
+        """Calculate the heat exchanged with the specified length"""
+        if self.flujo == "CF":
+            # Shooting over heat duty to meet the B input condition at z=L
+            def f(Q):
+                y0 = [self.hAin, self.hBin+Q/self.mB]
+                sol = self._integrate(y0, L)
+                return sol.y[1][-1]-self.hBin
+
+            # The solution must be between no heat exchanged and the
+            # maximum heat duty, any other result is unphysical
+            Q = self.Qmax
+            fmax, fmin = f(Q), f(0)
+            if fmin == 0:
+                Q = 0
+            elif fmax*fmin < 0:
+                Q = brentq(f, 0, Q, xtol=abs(Q)*self.rtol)
+            elif fmax != 0:
+                raise ValueError("Heat duty not found for the length")
+            y0 = [self.hAin, self.hBin+Q/self.mB]
+        else:
+            y0 = [self.hAin, self.hBin]
+
+        sol = self._integrate(y0, L)
+        self._solution(sol.t, sol.y)
+
+    def design(self, Q):
+        """Calculate the length needed to exchange the heat duty Q, [W]"""
+        hAout = self.hAin-Q/self.mA
+        if self.flujo == "CF":
+            y0 = [self.hAin, self.hBin+Q/self.mB]
+        else:
+            y0 = [self.hAin, self.hBin]
+
+        def event(z, y):
+            return y[0]-hAout
+        event.terminal = True
+
+        # Heat flow per length at input to estimate the integration range
+        fluidA = self.profileA(y0[0])
+        fluidB = self.profileB(y0[1])
+        q = self.conductance(fluidA, fluidB)*(fluidA.T-fluidB.T)
+        if q*Q <= 0:
+            raise ValueError("Temperature cross at input")
+        L = Q/q
+
+        sol = self._integrate(y0, 1e3*L, events=event, step=L/self.segments)
+        if not sol.t_events[0].size:
+            raise ValueError("Temperature cross, heat duty not reachable")
+        self._solution(sol.t, sol.y)
+
+    def _solution(self, z, y):
+        """Save the profiles of solution"""
+        self.z = z
+        self.L = z[-1]
+        self.hA, self.hB = y
+        self.fluidA = self.profileA(self.hA)
+        self.fluidB = self.profileB(self.hB)
+        self.UL = self.conductance(self.fluidA, self.fluidB)
+        self.q = self.UL*(self.fluidA.T-self.fluidB.T)
+        self.Q = self.mA*(self.hAin-self.hA[-1])
+        if self.flujo == "CF":
+            self.hBout = self.hB[0]
+        else:
+            self.hBout = self.hB[-1]
+
+    def mean(self, values):
+        """Length average of a profile"""
+        values = broadcast_to(asarray(values, dtype=float), self.z.shape)
+        dz = self.z[1:]-self.z[:-1]
+        return ((values[1:]+values[:-1])/2*dz).sum()/self.L
+
+    def zones(self, side="A"):
+        """Return the length of each phase zone of a side as a list of
+        [phase, start, end], phase can be liquid, twophase or vapor"""
+        if side == "A":
+            profile, h = self.profileA, self.hA
+        else:
+            profile, h = self.profileB, self.hB
+
+        # Position of phase change boundaries, the enthalpy is monotonic
+        # along length
+        points = [self.z[0], self.z[-1]]
+        for hsat in (profile.hBubble, profile.hDew):
+            if hsat is not None and min(h) < hsat < max(h):
+                if h[-1] > h[0]:
+                    points.append(interp(hsat, h, self.z))
+                else:
+                    points.append(interp(hsat, h[::-1], self.z[::-1]))
+        points.sort()
+
+        zones = []
+        for z1, z2 in zip(points[:-1], points[1:]):
+            x = profile(interp((z1+z2)/2, self.z, h)).x
+            if x <= 0:
+                phase = "liquid"
+            elif x >= 1:
+                phase = "vapor"
+            else:
+                phase = "twophase"
+            if zones and zones[-1][0] == phase:
+                zones[-1][2] = z2
+            else:
+                zones.append([phase, z1, z2])
+        return zones
+
+    def outlet(self, side="A"):
+        """Return the output stream of a side"""
+        if side == "A":
+            stream, profile, h = self.streamA, self.profileA, self.hA[-1]
+        else:
+            stream, profile, h = self.streamB, self.profileB, self.hBout
+        fluid = profile(h)
+        if 0 < fluid.x < 1:
+            return stream.clone(P=stream.P, x=float(fluid.x))
+        else:
+            return stream.clone(T=float(fluid.T), P=stream.P)
@@ -23,6 +23,9 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 # let import other pychemqt library to avoid import error when no config
 # files availables.
 #   -createDatabase: Create empty database
+#   -createIndex: Create the search index of component databank
+#   -checkIndex: Check if the search index is updated
+#   -updateIndex: Update components in search index
 ###############################################################################
 
 
@@ -30,6 +33,7 @@ import codecs
 from configparser import ConfigParser
 import csv
 import json
+import os
 import sqlite3
 import sys
 import urllib.request
@@ -204,6 +208,7 @@ def Preferences():
     config.set("MEOS", "saturation"+"markeredgecolor", "#000000")
     config.set("MEOS", "grid", "False")
     config.set("MEOS", "definition", "1")
+    config.set("MEOS", "cacheSize", "200")
     lineas = ["Isotherm", "Isobar", "Isoenthalpic", "Isoentropic", "Isochor",
               "Isoquality"]
     for linea in lineas:
@@ -558,3 +563,127 @@ def createDatabase(name):
                  """)
     conn.commit()
     conn.close()
+
+
+# Search index of component databank
+INDEX_VERSION = 1
+
+# Indexed properties, name in index, column in databank and conversion factor
+# to SI units
+INDEX_PROPERTIES = (("Tc", "tc", 1), ("Pc", "pc", 101325),
+                    ("Tb", "t_ebullicion", 1), ("Tf", "t_fusion", 1),
+                    ("M", "peso_molecular", 1))
+
+# Properties with DIPPR correlation, saved as flag in index
+INDEX_DIPPR = ("rhoS", "rhoL", "Pv", "Hv", "CpS", "CpL", "CpG", "muL", "muG",
+               "ThcondL", "ThcondG", "tension")
+
+
+def _databankSignature(databank):
+    """Text to detect changes in bundled databank"""
+    stat = os.stat(databank)
+    return "%i:%i:%i" % (INDEX_VERSION, stat.st_mtime, stat.st_size)
+
+
+def _indexComponents(index, source, ids=None):
+    """Add the components of source database to index
+    index: connection to index database
+    source: connection to databank
+    ids: index of components to add, default all"""
+    columns = ["id", "nombre", "formula", "nombre_alternativo",
+               "formula_alternativa", "CAS_id"]
+    columns += [column for name, column, factor in INDEX_PROPERTIES]
+    columns += ["%s_DIPPR_EQ" % name for name in INDEX_DIPPR]
+    query = "SELECT %s FROM compuestos" % ", ".join(columns)
+    params = ()
+    if ids is not None:
+        query += " WHERE id IN (%s)" % ", ".join("?"*len(ids))
+        params = tuple(ids)
+
+    n = len(INDEX_PROPERTIES)
+    props = "INSERT INTO properties VALUES (%s)" % ", ".join(
+        "?"*(2+n+len(INDEX_DIPPR)))
+    text = "INSERT INTO text (rowid, nombre, formula, synonyms, cas) " \
+        "VALUES (?, ?, ?, ?, ?)"
+    for row in source.execute(query, params):
+        id, nombre, formula, synonym, formula2, cas = row[:6]
+        values = []
+        for (name, column, factor), value in zip(INDEX_PROPERTIES,
+                                                 row[6:6+n]):
+            if value:
+                value *= factor
+            else:
+                value = None
+            values.append(value)
+        dippr = [int(bool(eq)) for eq in row[6+n:]]
+        index.execute(props, [id, int(id > 1000)] + values + dippr)
+        synonyms = " ".join(str(txt) for txt in (synonym, formula2) if txt)
+        index.execute(text, (id, nombre or "", formula or "", synonyms,
+                             cas or ""))
+
+
+def createIndex(name, databank, custom=None):
+    """Create the search index of component databank, with a full text index
+    of name, formula, synonyms and CAS number, and the main properties with
+    a B-tree index for range queries
+    name: path of index database, it's overwritten if exist
+    databank: path of bundled databank
+    custom: path of custom databank, optional"""
+    if os.path.isfile(name):
+        os.remove(name)
+    conn = sqlite3.connect(name)
+    conn.execute("CREATE TABLE info (key TEXT PRIMARY KEY, value TEXT)")
+    columns = ["id INTEGER PRIMARY KEY", "custom INTEGER"]
+    columns += ["%s REAL" % prop[0] for prop in INDEX_PROPERTIES]
+    columns += ["%s INTEGER" % dippr for dippr in INDEX_DIPPR]
+    conn.execute("CREATE TABLE properties (%s)" % ", ".join(columns))
+    for prop in INDEX_PROPERTIES:
+        conn.execute("CREATE INDEX idx_{0} ON properties ({0})".format(
+            prop[0]))
+    conn.execute("CREATE VIRTUAL TABLE text USING fts5(nombre, formula, "
+                 "synonyms, cas, prefix='1 2 3')")
+
+    for path in (databank, custom):
+        if path and os.path.isfile(path):
+            source = sqlite3.connect(path)
+            _indexComponents(conn, source)
+            source.close()
+
+    conn.execute("INSERT INTO info VALUES ('databank', ?)",
+                 (_databankSignature(databank), ))
+    conn.commit()
+    conn.close()
+
+
+def checkIndex(name, databank):
+    """Check if the search index exist and is updated with the bundled
+    databank"""
+    if not os.path.isfile(name):
+        return False
+    conn = sqlite3.connect(name)
+    try:
+        row = conn.execute(
+            "SELECT value FROM info WHERE key == 'databank'").fetchone()
+    except sqlite3.Error:
+        row = None
+    conn.close()
+    return row is not None and row[0] == _databankSignature(databank)
+
+
+def updateIndex(name, source, ids):
+    """Update the search index for the components with ids, the components
+    not available in source are removed from index
+    name: path of index database
+    source: path of databank with the components"""
+    if not os.path.isfile(name):
+        return
+    conn = sqlite3.connect(name)
+    params = tuple(ids)
+    marks = ", ".join("?"*len(params))
+    conn.execute("DELETE FROM properties WHERE id IN (%s)" % marks, params)
+    conn.execute("DELETE FROM text WHERE rowid IN (%s)" % marks, params)
+    db = sqlite3.connect(source)
+    _indexComponents(conn, db, ids)
+    db.close()
+    conn.commit()
+    conn.close()
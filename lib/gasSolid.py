@@ -0,0 +1,302 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Grade efficiency of gas-solid separation equipment
+#
+#   - terminalVelocity: Settling velocity of particles
+#   - eta_GravityChamber: Gravity settling chamber
+#   - cutDiameter_Rosin: Cut diameter of cyclone, Rosin-Rammler-Intelmann
+#   - eta_Rosin: Cyclone efficiency, Rosin-Rammler-Intelmann
+#   - exponent_LeithLicht: Vortex exponent of cyclone, Leith-Licht
+#   - eta_LeithLicht: Cyclone efficiency, Leith-Licht
+#   - eta_Sylvan: Default baghouse fabric efficiency
+#   - eta_Precipitator: Electrostatic precipitator, Deutsch equation
+#   - cycloneCount: Cyclones in parallel for a maximum inlet velocity
+#
+#   - classDiameters: Fine diameters inside each class of distribution
+#   - gradeEfficiency: Efficiency of each class of particle distribution
+#   - overallEfficiency: Global efficiency of separation
+#   - bracket: Vectorized bracketing for design calculations
+#
+#   All functions work with arrays, the particle diameter and the equipment
+#   parameters are broadcasted, so the parameters with shape (n, 1) give the
+#   efficiency of n equipments for all the diameters at the same time.
+#   The continuous mode integrates the grade efficiency inside each class of
+#   the distribution, with the mass uniformly distributed in log(d) between
+#   the geometric mean of consecutive class diameters.
+###############################################################################
+
+
+from numpy import (arange, asarray, ceil, clip, errstate, exp, geomspace,
+                   nan, pi, sqrt, where)
+from scipy.constants import e, epsilon_0, g
+
+from lib.psd import classLimits
+
+
+# Diameters by class used in continuous mode
+POINTS = 20
+
+
+def terminalVelocity(d, rhoS, rhoG, muG):
+    """Terminal settling velocity of spherical particles valid in all flow
+    regimes, [m/s]
+
+    Parameters
+    ----------
+    d : array
+        Particle diameter, [m]
+    rhoS : float
+        Solid density, [kg/m³]
+    rhoG : float
+        Gas density, [kg/m³]
+    muG : float
+        Gas viscosity, [Pa·s]
+    """
+    Ar = d**3*rhoG*(rhoS-rhoG)*g/muG**2
+    return muG/d*rhoG*((14.42+1.827*Ar**0.5)**0.5-3.798)**2
+
+
+def eta_GravityChamber(d, L, H, V, rhoS, rhoG, muG, modelo=0):
+    """Grade efficiency of gravity settling chamber
+
+    Parameters
+    ----------
+    d : array
+        Particle diameter, [m]
+    L, H : array
+        Length and height of chamber, [m]
+    V : array
+        Gas velocity, [m/s]
+    rhoS, rhoG, muG : float
+        Solid and gas density, [kg/m³], and gas viscosity, [Pa·s]
+    modelo : int
+        0 - Plug flow without vertical mixing
+        1 - Perfect vertical mix
+    """
+    r = terminalVelocity(d, rhoS, rhoG, muG)*L/V/H
+    if modelo:
+        r = 1-exp(-r)
+    return clip(r, 0, 1)
+
+
+def cutDiameter_Rosin(Hc, Bc, Sc, V, rhoS, rhoG, muG):
+    """Cut diameter and number of effective turns of cyclone with
+    Rosin-Rammler-Intelmann model, [m], [-]"""
+    N = 11.3*(Hc*Bc/Sc**2)**2+3.33
+    return sqrt(9*Bc*muG/(2*pi*N*V*(rhoS-rhoG))), N
+
+
+def eta_Rosin(d, dc):
+    """Grade efficiency of cyclone with Rosin-Rammler-Intelmann model"""
+    r = (d/dc)**2
+    return r/(1+r)
+
+
+def exponent_LeithLicht(Dc, T):
+    """Vortex exponent of Leith-Licht model for a cyclone of diameter Dc, [m],
+    working at temperature T, [K]"""
+    return 1-(1-(12*Dc/0.3048)**0.14/2.5)*(1.8*T/530)**0.3
+
+
+def eta_LeithLicht(d, G, Dc, Vo, n, rhoS, muG):
+    """Grade efficiency of cyclone with Leith-Licht model
+
+    Parameters
+    ----------
+    d : array
+        Particle diameter, [m]
+    G : array
+        Cyclone configuration factor, [-]
+    Dc : array
+        Cyclone diameter, [m]
+    Vo : array
+        Gas flow per cyclone, [m³/s]
+    n : array
+        Vortex exponent, [-]
+    rhoS, muG : float
+        Solid density, [kg/m³], and gas viscosity, [Pa·s]
+    """
+    t = rhoS*d**2/18/muG
+    return 1-exp(-2*(G*t*Vo/Dc**3*(n+1))**(0.5/(n+1)))
+
+
+def eta_Sylvan(d):
+    """Sylvan default efficiency of baghouse fabric"""
+    r = d/0.3177e-6
+    return r/(1+r)
+
+
+def eta_Precipitator(d, A, Q, Ec, Ed, epsilon, muG):
+    """Grade efficiency of electrostatic precipitator with Deutsch equation
+
+    Parameters
+    ----------
+    d : array
+        Particle diameter, [m]
+    A : array
+        Deposition area, [m²]
+    Q : float
+        Gas volumetric flow, [m³/s]
+    Ec, Ed : float
+        Charge and discharge potential, [V/m]
+    epsilon : float
+        Relative dielectric constant of particles, [-]
+    muG : float
+        Gas viscosity, [Pa·s]
+    """
+    d = asarray(d, dtype=float)
+    # Diffusion charging for submicron particles, field charging else
+    q = where(d <= 1e-6, d*e*1e8,
+              pi*epsilon_0*Ec*d**2*(1+2*(epsilon-1.)/(epsilon+2.)))
+    U = q*Ed/(3*pi*d*muG)
+    return 1-exp(-U*A/Q)
+
+
+def classDiameters(diametros, points=POINTS):
+    """Fine diameters inside each class of particle distribution, the class
+    limits are the geometric mean of consecutive diameters
+
+    Parameters
+    ----------
+    diametros : array
+        Mean diameter of classes, in increasing order, [m]
+    points : int
+        Diameters by class
+
+    Returns
+    -------
+    d : array
+        Diameters with shape (len(diametros), points), [m]
+
+    >>> d = classDiameters([10e-6, 40e-6], 2)
+    >>> print(" ".join("%0.2f" % x for x in d.ravel()*1e6))
+    7.07 14.14 28.28 56.57
+    """
+    limits = classLimits(diametros)
+    lo = limits[:-1, None]
+    hi = limits[1:, None]
+    return lo*(hi/lo)**((arange(points)+0.5)/points)
+
+
+def gradeEfficiency(func, diametros, continuo=False, points=POINTS):
+    """Efficiency of each class of particle distribution
+
+    Parameters
+    ----------
+    func : function
+        Grade efficiency, the only argument is the diameter, the equipment
+        parameters with shape (..., 1) are broadcasted
+    diametros : array
+        Mean diameter of classes, [m]
+    continuo : bool
+        Integrate the grade efficiency inside each class
+    points : int
+        Diameters by class in continuous mode
+
+    Returns
+    -------
+    eta : array
+        Efficiency of classes with shape (..., len(diametros))
+
+    >>> eta = gradeEfficiency(lambda d: eta_Rosin(d, 20e-6), [10e-6, 40e-6])
+    >>> print(" ".join("%0.4f" % x for x in eta))
+    0.2000 0.8000
+    >>> eta = gradeEfficiency(lambda d: eta_Rosin(d, 20e-6), \
+                              [10e-6, 40e-6], True)
+    >>> print(" ".join("%0.4f" % x for x in eta))
+    0.2281 0.7719
+    """
+    d = asarray(diametros, dtype=float)
+    if not continuo:
+        return func(d)
+
+    n = len(d)
+    fine = classDiameters(d, points).ravel()
+    eta = func(fine)
+    return eta.reshape(eta.shape[:-1]+(n, points)).mean(axis=-1)
+
+
+def overallEfficiency(eta, fracciones):
+    """Global separation efficiency from the efficiency of classes, the last
+    axis of eta must be the classes of distribution"""
+    return (asarray(eta)*asarray(fracciones)).sum(axis=-1)
+
+
+def bracket(func, a, b, target, largest=False, points=33, iterations=6):
+    """Vectorized bracketing of the limit where a function reach a target
+    value, in each iteration the function is evaluated in a logarithmic grid
+    with a single call
+
+    Parameters
+    ----------
+    func : function
+        Function accepting an array of values
+    a, b : float
+        Search interval, must be positive
+    target : float
+        Target value of function
+    largest : bool
+        Search the largest value meeting the target, func(x) >= target, if
+        False the smallest value
+    points : int
+        Points of grid
+    iterations : int
+        Number of grid refinements
+
+    Returns
+    -------
+    x : float
+        Value meeting the target, nan if none value of interval reach it
+
+    >>> x = bracket(lambda x: 1-exp(-x), 1e-3, 1e3, 0.9)
+    >>> print("%0.5f" % x)
+    2.30259
+    >>> x = bracket(lambda d: eta_Rosin(20e-6, d), 1e-7, 1e-3, 0.9, True)
+    >>> print("%0.4f" % (x*1e6))
+    6.6667
+    """
+    x = geomspace(a, b, points)
+    for i in range(iterations):
+        with errstate(all="ignore"):
+            ok = func(x) >= target
+        if not ok.any():
+            return nan
+        if largest:
+            j = len(ok)-1-ok[::-1].argmax()
+            if j == len(ok)-1:
+                return x[-1]
+            x = geomspace(x[j], x[j+1], points)
+        else:
+            j = ok.argmax()
+            if j == 0:
+                return x[0]
+            x = geomspace(x[j-1], x[j], points)
+    if largest:
+        return x[0]
+    return x[-1]
+
+
+def cycloneCount(Q, Hc, Bc, V):
+    """Number of cyclones in parallel to work with a maximum inlet velocity
+    V, [m/s], and the actual inlet velocity"""
+    n = ceil(Q/Bc/Hc/V)
+    return n, Q/(Bc*Hc*n)
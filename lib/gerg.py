@@ -62,10 +62,10 @@ class GERG(object):
               "x": None,
               "mezcla": None}
 
-    componentes = [mEoS.CH4, mEoS.N2, mEoS.CO2, mEoS.C2, mEoS.C3, mEoS.nC4,
-                   mEoS.iC4, mEoS.nC5, mEoS.iC5, mEoS.nC6, mEoS.nC7, mEoS.nC8,
-                   mEoS.H2, mEoS.O2, mEoS.CO, mEoS.H2O, mEoS.He, mEoS.Ar,
-                   mEoS.H2S, mEoS.nC9, mEoS.nC10]
+    componentes = mEoS.Registry([
+        "CH4", "N2", "CO2", "C2", "C3", "nC4", "iC4", "nC5", "iC5", "nC6",
+        "nC7", "nC8", "H2", "O2", "CO", "H2O", "He", "Ar", "H2S", "nC9",
+        "nC10"])
 
     Fij = pickle.load(open(os.path.join(os.environ["pychemqt"], "dat",
                                         "mEoS_Fij.pkl"), "rb"))
@@ -700,7 +700,7 @@ class GERG(object):
         return Ki, xi, yi, Q
 
 
-id_GERG = [i.id for i in GERG.componentes]
+id_GERG = GERG.componentes.ids
 
 
 if __name__ == "__main__":
@@ -0,0 +1,439 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Chemical equilibrium by minimization of Gibbs free energy
+#
+#   - elementMatrix: Element composition matrix of a set of components
+#   - GibbsSystem: Multiphase equilibrium of ideal gas mixture and pure
+#     condensed phases
+#   - Equilibrium: Result of equilibrium calculation
+#   - getSystem: GibbsSystem of a set of components reused between calls
+#
+#   The minimization with element balance constraints is solved with the
+#   Lagrange multipliers method in the formulation of NASA CEA program, the
+#   newton iteration use the logarithm of gas moles so the trace species
+#   are handled without negative values, and the pure condensed phases are
+#   added or removed of the active set until all phases are stable.
+#
+#   The standard chemical potentials are calculated from the heat and free
+#   energy of formation at 298.15 K and the ideal gas heat capacity of
+#   database. The element reference contributions are linear in element
+#   amounts so they are irrelevant in the equilibrium composition.
+#
+#   Gordon, S., McBride, B.J. Computer Program for Calculation of Complex
+#   Chemical Equilibrium Compositions and Applications. NASA RP-1311 (1994)
+###############################################################################
+
+
+from collections import OrderedDict
+
+from numpy import (arange, array, asarray, dot, exp, log, maximum, power,
+                   zeros)
+from numpy.linalg import LinAlgError, solve
+from scipy.constants import R
+from scipy.sparse import csr_matrix
+
+
+R = R*1000  # J/kmolK
+Tref = 298.15
+Pref = 101325.
+
+# Maximum number of equilibrium results saved in cache of each system
+CACHE_SIZE = 64
+
+# Maximum number of systems saved to reuse in flowsheet calculations
+SYSTEMS_SIZE = 16
+_systems = OrderedDict()
+
+# Trace species limit of CEA, ln(1e-8) and ln(1e-4)
+_TRACE = -18.420681
+_TRACE_STEP = 9.2103404
+
+
+def elementMatrix(componente):
+    """Element composition matrix of a set of components
+
+    Parameters
+    ----------
+    componente : list
+        Componente instances
+
+    Returns
+    -------
+    elementos : list
+        Symbols of elements present in components
+    A : csr_matrix
+        Atoms of each element in each component, shape (elements, components)
+
+    >>> from lib.compuestos import Componente
+    >>> el, A = elementMatrix([Componente(i) for i in (2, 49, 62)])
+    >>> print(el)
+    ['C', 'H', 'O']
+    >>> print(A.toarray())
+    [[1. 1. 0.]
+     [4. 0. 2.]
+     [0. 2. 1.]]
+    """
+    elementos = []
+    for cmp in componente:
+        for el in cmp.composicion_molecular[0]:
+            if el not in elementos:
+                elementos.append(el)
+    elementos.sort()
+    A = zeros((len(elementos), len(componente)))
+    for j, cmp in enumerate(componente):
+        for el, atomos in zip(*cmp.composicion_molecular):
+            A[elementos.index(el), j] += atomos
+    return elementos, csr_matrix(A)
+
+
+class Equilibrium(object):
+    """Result of a equilibrium calculation
+
+    Attributes
+    ----------
+    T : float
+        Temperature, K
+    P : float
+        Pressure, Pa
+    n : array
+        Component moles or molar flows, in the same units of feed, the
+        condensed components included
+    x : array
+        Mole fraction of components in gas phase, zero for condensed
+    ngas : float
+        Total moles of gas phase
+    pi : array
+        Lagrange multipliers of elements, dimensionless (divided by RT)
+    iterations : integer
+        Newton iterations of calculation
+    """
+
+    def __init__(self, T, P, n, x, ngas, pi, iterations):
+        self.T = T
+        self.P = P
+        self.n = n
+        self.x = x
+        self.ngas = ngas
+        self.pi = pi
+        self.iterations = iterations
+
+
+class GibbsSystem(object):
+    """Chemical equilibrium of a set of components with a ideal gas mixture
+    and pure condensed phases
+
+    Parameters
+    ----------
+    componente : list
+        Componente instances of all possible species
+    condensed : list
+        Index in componente of species treated as pure condensed phases,
+        i.e. graphite carbon, with activity one when present
+    tol : float
+        Convergence tolerance in relative moles
+
+    The instances save a cache of the last calculated equilibria, by
+    temperature, pressure and feed, so repeated calculation in flowsheet
+    iterations are reused, and the nearest previous result is used as
+    initial estimate of new calculations.
+
+    >>> from lib.compuestos import Componente
+    >>> cmp = [Componente(i) for i in (2, 62, 48, 49, 1)]
+    >>> system = GibbsSystem(cmp)
+    >>> eq = system.equilibrium(1100, 101325, [1, 3, 0, 0, 0])
+    >>> print(" ".join("%0.4f" % x for x in eq.x))
+    0.0002 0.2780 0.1109 0.0557 0.5552
+    """
+
+    def __init__(self, componente, condensed=(), tol=5e-7):
+        self.componente = componente
+        self.elementos, self.A = elementMatrix(componente)
+        self.condensed = list(condensed)
+        self.gas = [i for i in range(len(componente))
+                    if i not in self.condensed]
+        self.tol = tol
+
+        # Heat capacity polynomials in J/kmolK and formation properties in
+        # J/kmol
+        self._cp = array([cmp.cp for cmp in componente], dtype=float)*4184
+        self._cpH = self._cp/arange(1, 7)
+        self._cpS = self._cp[:, 1:]/arange(1, 6)
+        self._H0 = dot(self._cpH, power.outer(Tref, arange(1, 7)))
+        self._S0 = self._cp[:, 0]*log(Tref)+dot(
+            self._cpS, power.outer(Tref, arange(1, 6)))
+        self.Hf = array([cmp.calor_formacion*cmp.M for cmp in componente])
+        Gf = array([cmp.energia_formacion*cmp.M for cmp in componente])
+        self.Sf = (self.Hf-Gf)/Tref
+
+        self._cache = OrderedDict()
+
+    def enthalpy(self, T):
+        """Molar enthalpy of components, heat of formation and ideal gas
+        sensible enthalpy, J/kmol"""
+        return self.Hf+dot(self._cpH, power.outer(T, arange(1, 7)))-self._H0
+
+    def cp(self, T):
+        """Ideal gas heat capacity of components, J/kmolK"""
+        return dot(self._cp, power.outer(T, arange(6)))
+
+    def mu0(self, T):
+        """Dimensionless standard chemical potential of components, g/RT"""
+        S = self.Sf+self._cp[:, 0]*log(T)+dot(
+            self._cpS, power.outer(T, arange(1, 6)))-self._S0
+        return (self.enthalpy(T)-T*S)/R/T
+
+    def equilibrium(self, T, P, n0, maxiter=200):
+        """Calculate the equilibrium composition
+
+        Parameters
+        ----------
+        T : float
+            Temperature, K
+        P : float
+            Pressure, Pa
+        n0 : array
+            Feed moles or molar flows of components
+
+        Returns
+        -------
+        Equilibrium instance
+        """
+        n0 = asarray(n0, dtype=float)
+        escala = n0.sum()
+        if escala <= 0:
+            raise ValueError("Feed without components")
+        key = (round(T, 6), round(P, 3), tuple(round(x/escala, 12) for x in n0))
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+            return self._scale(result, escala)
+
+        result = self._solve(T, P, n0/escala, maxiter)
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        while len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return self._scale(result, escala)
+
+    def _scale(self, result, escala):
+        """Return the equilibrium result referred to feed amount"""
+        return Equilibrium(result.T, result.P, result.n*escala, result.x,
+                           result.ngas*escala, result.pi, result.iterations)
+
+    def _estimate(self, T, P, b):
+        """Initial estimate of gas moles, the nearest cached result with the
+        same elements or the uniform distribution"""
+        mejor = None
+        for key, result in self._cache.items():
+            if result.elementos == tuple(b > 0):
+                d = abs(log(key[0]/T))+abs(log(key[1]/P))
+                if mejor is None or d < mejor[0]:
+                    mejor = (d, result)
+        if mejor is not None and mejor[0] < 0.5:
+            return mejor[1].n.copy()
+        return None
+
+    def _solve(self, T, P, n0, maxiter):
+        """Newton-Lagrange minimization for a normalized feed"""
+        A = self.A
+        b = A.dot(n0)
+        presentes = b > 1e-14
+
+        # Remove the elements not in feed and its species
+        libres = A[~presentes].toarray().any(axis=0)
+        gas = [j for j in self.gas if not libres[j]]
+        condensed = [j for j in self.condensed if not libres[j]]
+        Ag = A[presentes][:, gas]
+        Ac = A[presentes][:, condensed].toarray()
+        b = b[presentes]
+        E = len(b)
+
+        mu0 = self.mu0(T)
+        gg = mu0[gas]+log(P/Pref)
+        gc = mu0[condensed]
+
+        inicial = self._estimate(T, P, presentes)
+        if inicial is None:
+            nj = zeros(len(gas))+0.1/len(gas)
+            nc = zeros(len(condensed))
+        else:
+            nj = maximum(inicial[gas], 1e-10)
+            nc = inicial[condensed]
+        n = nj.sum()
+        activos = [k for k in range(len(condensed)) if nc[k] > 0]
+
+        lnnj = log(nj)
+        lnn = log(n)
+        for iteracion in range(1, maxiter+1):
+            nj = exp(lnnj)
+            mu = gg+lnnj-lnn
+            C = len(activos)
+            M = zeros((E+C+1, E+C+1))
+            rhs = zeros(E+C+1)
+
+            AgN = Ag.multiply(nj).tocsr()
+            M[:E, :E] = AgN.dot(Ag.T).toarray()
+            AgNj = asarray(AgN.sum(axis=1)).ravel()
+            M[:E, E:E+C] = Ac[:, activos]
+            M[:E, -1] = AgNj
+            rhs[:E] = b-AgNj-dot(Ac[:, activos], nc[activos]) + \
+                AgN.dot(mu)
+            M[E:E+C, :E] = Ac[:, activos].T
+            rhs[E:E+C] = gc[activos]
+            M[-1, :E] = AgNj
+            M[-1, -1] = nj.sum()-n
+            rhs[-1] = n-nj.sum()+dot(nj, mu)
+
+            try:
+                sol = solve(M, rhs)
+            except LinAlgError:
+                raise ValueError("Singular equilibrium matrix")
+            pi = sol[:E]
+            dnc = sol[E:E+C]
+            dlnn = sol[-1]
+            dlnnj = -mu+Ag.T.dot(pi)+dlnn
+
+            # Control factor of CEA to limit the step
+            lnx = lnnj-lnn
+            mayores = (lnx > _TRACE) & (dlnnj > 0)
+            maximo = 5*abs(dlnn)
+            if mayores.any():
+                maximo = max(maximo, dlnnj[mayores].max())
+            lamda = 1
+            if maximo > 2:
+                lamda = 2/maximo
+            trazas = (lnx <= _TRACE) & (dlnnj >= 0)
+            if trazas.any():
+                l2 = abs((-lnx[trazas]-_TRACE_STEP) /
+                         (dlnnj[trazas]-dlnn+1e-300))
+                lamda = min(lamda, l2.min())
+
+            lnnj += lamda*dlnnj
+            lnn += lamda*dlnn
+            nc[activos] += lamda*dnc
+            n = exp(lnn)
+
+            nt = nj.sum()
+            residuo = b-Ag.dot(exp(lnnj))-dot(Ac[:, activos], nc[activos])
+            convergido = (abs(residuo).max() < self.tol*1e-3 and
+                          dot(nj, abs(dlnnj))/nt < self.tol and
+                          n*abs(dlnn)/nt < self.tol and
+                          (not C or abs(dnc).max()/nt < self.tol))
+            if convergido:
+                # Remove the condensed phases with negative amount
+                negativos = [k for k in activos if nc[k] <= 0]
+                if negativos:
+                    for k in negativos:
+                        nc[k] = 0
+                        activos.remove(k)
+                    continue
+
+                # Add the unstable condensed phases
+                potencial = gc-dot(Ac.T, pi)
+                inestables = [k for k in range(len(condensed))
+                              if k not in activos and potencial[k] < -1e-8]
+                if inestables:
+                    k = inestables[potencial[inestables].argmin()]
+                    activos.append(k)
+                    nc[k] = 1e-6
+                    continue
+                break
+        else:
+            raise ValueError("Equilibrium not converged")
+
+        nj = exp(lnnj)
+        ntotal = zeros(len(self.componente))
+        ntotal[gas] = nj
+        ntotal[condensed] = nc
+        x = zeros(len(self.componente))
+        x[gas] = nj/nj.sum()
+        pitotal = zeros(len(presentes))
+        pitotal[presentes] = pi
+        result = Equilibrium(T, P, ntotal, x, nj.sum(), pitotal, iteracion)
+        result.elementos = tuple(presentes)
+        return result
+
+    def adiabatic(self, T0, P, n0, Q=0, tol=1e-6, maxiter=50):
+        """Calculate the equilibrium with energy balance
+
+        Parameters
+        ----------
+        T0 : float
+            Feed temperature, K
+        P : float
+            Pressure, Pa
+        n0 : array
+            Feed molar flows of components
+        Q : float
+            Heat added, in units of feed flow by J/kmol, W for kmol/s
+
+        Returns
+        -------
+        Equilibrium instance at outlet temperature
+        """
+        n0 = asarray(n0, dtype=float)
+        Hin = dot(n0, self.enthalpy(T0))+Q
+
+        def f(T):
+            eq = self.equilibrium(T, P, n0)
+            return dot(eq.n, self.enthalpy(T))-Hin, eq
+
+        # Newton method with the equilibrium heat capacity estimated from
+        # finite difference, the previous results are reused from cache
+        T = T0
+        for i in range(maxiter):
+            h, eq = f(T)
+            dT = max(1e-3*T, 0.01)
+            h2, eq2 = f(T+dT)
+            cp = (h2-h)/dT
+            if cp <= 0:
+                cp = dot(eq.n, self.cp(T))
+            paso = -h/cp
+            paso = max(min(paso, 300), -300)
+            T = T+paso
+            if abs(paso) < tol*T:
+                break
+        else:
+            raise ValueError("Adiabatic equilibrium not converged")
+        return self.equilibrium(T, P, n0)
+
+
+def getSystem(componente, condensed=()):
+    """Return the GibbsSystem of components, reusing the instance and its
+    cached results of previous calls with the same components
+
+    Parameters
+    ----------
+    componente : list
+        Componente instances of all possible species
+    condensed : list
+        Index in componente of species treated as pure condensed phases
+    """
+    key = (tuple(cmp.indice for cmp in componente), tuple(condensed))
+    system = _systems.get(key)
+    if system is None:
+        system = GibbsSystem(componente, condensed)
+        _systems[key] = system
+    _systems.move_to_end(key)
+    while len(_systems) > SYSTEMS_SIZE:
+        _systems.popitem(last=False)
+    return system
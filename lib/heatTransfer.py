@@ -23,8 +23,10 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 ###############################################################################
 
 
-from math import factorial
-from scipy import exp, log, pi, log10, tanh
+from numpy import (asarray, broadcast_arrays, clip, errstate, exp, interp,
+                   isfinite, linspace, log, log10, logspace, maximum, nan,
+                   ones, pi, tanh, where, zeros)
+from scipy.special import gammaln
 
 
 # Pipe Laminar flow
@@ -144,6 +146,15 @@ def h_tubeside_turbulent_VDI(Re, Pr, filas_tubos, alineados):
     return a*Re**m*Pr**0.34*F1*F2
 
 
+# Shell side
+def h_shellside_turbulent_Kern(Re, Pr):
+    """Coeficiente de transferencia de calor por calor sensible en la carcasa
+    en regimen turbulento, sin corrección de viscosidad en la pared
+    Kern - Process Heat Transfer pag 137
+    2e3<Re<1e6"""
+    return 0.36*Re**0.55*Pr**(1./3)
+
+
 # Double pipe
 def h_anulli_Laminar(Re, Pr, a, dhL=0, boundary=0):
     """VDI Heat Atlas G2 Pag.702"""
@@ -245,6 +256,18 @@ def h_tube_Condensation_Shah(fluid, Di):
     return Nul*((1-fluid.x)**0.8+3.8*fluid.x**0.76*(1-fluid.x)**0.04/fluid.Pr**0.38)
 
 
+def h_tube_Boiling_Kenning_Cooper(fluid, Di):
+    """Convective boiling inside tubes, without nucleate boiling contribution
+    Kenning, D.B.R. and Cooper, M.G. - Saturated flow boiling of water in
+    vertical tubes, Int. J. Heat Mass Transfer, 32(3), 445-458, 1989"""
+    G = fluid.caudalmasico*4/pi/Di**2
+    Re = Di*G*(1-fluid.x)/fluid.Liquido.mu
+    Nul = 0.023*Re**0.8*fluid.Liquido.Prandt**0.4
+    X = ((1-fluid.x)/fluid.x)**0.9*(fluid.Vapor.rho/fluid.Liquido.rho)**0.5 * \
+        (fluid.Liquido.mu/fluid.Vapor.mu)**0.1
+    return Nul*(1+1.8*X**-0.87)
+
+
 def h_tube_Condensation_Kosky(fluid, Di):
     """ref Pag 558 Kakac: Boiler..."""
     pass
@@ -266,6 +289,34 @@ def h_tube_Condensation_Traviss(fluid, Di, X):
 
 
 # Heat Exchanger design methods
+#   The functions accept arrays for NTU, C_, P and R and return arrays with
+#   the broadcasted shape, or a float for scalar input
+
+def _value(x):
+    """Return a float for 0-d arrays, the array otherwise"""
+    if x.ndim == 0:
+        return x[()]
+    return x
+
+
+def _crossflowUnmixed(NTU, C_):
+    """Series solution of effectiveness for crossflow with both fluids
+    unmixed"""
+    suma = zeros(NTU.shape)
+    lnNTU = log(NTU)
+    n = 1
+    while n < 200:
+        Pn = zeros(NTU.shape)
+        for j in range(1, n+1):
+            Pn += (n+1-j)*exp((n+j)*lnNTU-gammaln(j+1)-gammaln(n+2))
+        inc = C_**n*Pn
+        suma += inc
+        n += 1
+        if (inc < 1e-12).all():
+            break
+    return 1-exp(-NTU)-exp(-(1+C_)*NTU)*suma
+
+
 def efectividad(NTU, C_, flujo, **kwargs):
     """Calculo de la efectividad del cambiador
     Flujo vendra definido por su acronimo
@@ -279,60 +330,44 @@ def efectividad(NTU, C_, flujo, **kwargs):
     kwargs: Opciones adicionales:
         mixed: corriente mezclada para CrFSMix
         Cmin, Cmax
-    """
-    if C_ == 0:
-        ep = 1-exp(-NTU)
 
-    elif flujo == "PF":
-        if C_ == 1:
-            ep = (1-exp(-2*NTU))/2
-        else:
+    >>> print("%0.4f" % efectividad(1, 0.5, "CF"))
+    0.5647
+    >>> print(efectividad([0, 1, 2], [0.5, 1, 0], "PF"))
+    [0.         0.43233236 0.86466472]
+    """
+    NTU, C_ = broadcast_arrays(asarray(NTU, dtype=float),
+                               asarray(C_, dtype=float))
+    with errstate(divide="ignore", invalid="ignore", over="ignore"):
+        if flujo == "PF":
             ep = (1-exp(-NTU*(1+C_)))/(1+C_)
 
-    elif flujo == "CF":
-        if C_ == 1:
-            ep = NTU/(1+NTU)
-        else:
-            ep = (1-exp(-NTU*(1-C_)))/(1-C_*exp(-NTU*(1-C_)))
-
-    elif flujo == "CrFunMix":
-        def P(n, y):
-            suma = 0
-            for j in range(1, n+1):
-                suma += (n+1-j)/factorial(j)*y**(n+j)
-            return suma/factorial(n+1)
-        n = 1
-        suma = 0
-        while True:
-            inc = C_**n*P(n, NTU)
-            suma += inc
-            n += 1
-            if inc < 1e-12:
-                break
-        ep = 1-exp(-NTU)-exp(-(1+C_)*NTU)*suma
-
-    elif flujo == "CrFMix":
-        if C_ == 1:
-            ep = 1/(2/(1-exp(-NTU))-1/NTU)
-        else:
+        elif flujo == "CF":
+            ep = where(C_ == 1, NTU/(1+NTU),
+                       (1-exp(-NTU*(1-C_)))/(1-C_*exp(-NTU*(1-C_))))
+
+        elif flujo == "CrFunMix":
+            ep = _crossflowUnmixed(NTU, C_)
+
+        elif flujo == "CrFMix":
             ep = 1/(1/(1-exp(-NTU))+C_/(1-exp(-NTU*C_))-1/NTU)
 
-    elif flujo == "CrFSMix":
-        if C_ == 1:
-            ep = 1-exp(-(1-exp(-NTU)))
-        else:
+        elif flujo == "CrFSMix":
             if kwargs["mixed"] == "Cmin":
                 ep = 1-exp(-(1-exp(-NTU*C_))/C_)
             else:
                 ep = (1-exp(-C_*(1-exp(-NTU))))/C_
 
-    elif flujo == "1-2TEMAE":
-        if C_ == 1:
-            ep = 2/(2+2**0.5/tanh(2**0.5*NTU/2))
-        else:
+        elif flujo == "1-2TEMAE":
             ep = 2/((1+C_)+(1+C_**2)**0.5/tanh(NTU*(1+C_**2)**0.5/2))
 
-    return ep
+        else:
+            raise ValueError("Unknown flow arrangement %s" % flujo)
+
+        ep = where(C_ == 0, 1-exp(-NTU), ep)
+        ep = where(NTU == 0, 0, ep)
+
+    return _value(ep)
 
 
 def TemperatureEffectiveness(NTU, R, flujo, **kwargs):
@@ -358,217 +393,254 @@ def TemperatureEffectiveness(NTU, R, flujo, **kwargs):
     kwargs: Opciones adicionales:
         mixed: corriente mezclada para CrFSMix
             1, 2
+
+    >>> print("%0.4f" % TemperatureEffectiveness(1, 0.5, "CF"))
+    0.5647
+    >>> P = TemperatureEffectiveness([0.5, 1, 2], 1, "1-2TEMAE")
+    >>> print(" ".join("%0.4f" % p for p in P))
+    0.3244 0.4627 0.5568
     """
+    NTU, R = broadcast_arrays(asarray(NTU, dtype=float),
+                              asarray(R, dtype=float))
+    with errstate(divide="ignore", invalid="ignore", over="ignore"):
+        if flujo == "PF":
+            ep = (1-exp(-NTU*(1+R)))/(1+R)
 
-    if flujo == "PF":
-        if R == 1:
-            ep = NTU/(1+NTU)
-        else:
-            ep = (1-exp(-NTU*(1-R)))/(1-R*exp(-NTU*(1-R)))
+        elif flujo == "CF":
+            ep = where(R == 1, NTU/(1+NTU),
+                       (1-exp(-NTU*(1-R)))/(1-R*exp(-NTU*(1-R))))
 
-    elif flujo == "CF":
-        if R == 1:
-            ep = (1-exp(-2*NTU))/2.
-        else:
-            ep = (1-exp(-NTU*(1+R)))/(1+R)
+        elif flujo == "CrFunMix":
+            ep = 1-exp(NTU**0.22/R*(exp(-R*NTU**0.78)-1))
 
-    elif flujo == "CrFunMix":
-        ep = 1-exp(NTU**0.22/R*(exp(-R*NTU**0.78)-1))
-        #            def P(n, y):
-        #                suma=0
-        #                for j in range(1, n+1):
-        #                    suma+=(n+1-j)/factorial(j)*y**(n+j)
-        #                return suma/factorial(n+1)
-        #            n=1
-        #            suma=0
-        #            while True:
-        #                inc=R**n*P(n, NTU)
-        #                suma+=inc
-        #                n+=1
-        #                if inc<1e-12:
-        #                    break
-        #            ep=1-exp(-NTU)-exp(-(1+R)*NTU)*suma
-
-    elif flujo == "CrFMix":
-        K1 = 1-exp(-NTU)
-        if R == 1:
-            ep = 1/(2/K1-1/NTU)
-        else:
+        elif flujo == "CrFMix":
+            K1 = 1-exp(-NTU)
             K2 = 1-exp(-R*NTU)
             ep = 1/(1/K1+R/K2-1/NTU)
 
-    elif flujo == "CrFSMix":
-        K = 1-exp(-NTU)
-        if R == 1:
-            ep = 1-exp(-K)
-        else:
+        elif flujo == "CrFSMix":
             if kwargs["mixed"] == "1":
+                K = 1-exp(-NTU)
                 ep = (1-exp(-R*K))/R
             else:
                 K = 1-exp(-R*NTU)
                 ep = 1-exp(-K/R)
 
-    elif flujo == "1-2TEMAE":
-        if R == 1:
-            ep = 1/(1+1/tanh(NTU/2**0.5)/2**0.5)
-        else:
+        elif flujo == "1-2TEMAE":
             E = (1+R**2)**0.5
             ep = 2/(1+R+E/tanh(E*NTU/2))
 
-    elif flujo == "1-2TEMAE2":
-        E = exp(NTU)
-        if R == 2:
-            ep = 0.5*(1-(1+E**-2)/2/(1+NTU))
-        else:
+        elif flujo == "1-2TEMAE2":
+            E = exp(NTU)
             B = exp(-NTU*R/2.)
-            ep = 1/R*(1-(2-R)*(2.*E+R*B)/(2+R)/(2.*E-R/B))
-
-    elif flujo == "1-3TEMAE":
-        l1 = -3./2+(9./4+R*(R-1))**0.5
-        l2 = -3./2-(9./4+R*(R-1))**0.5
-        l3 = R
-        d = l1-l2
-        X1 = exp(l1*NTU/3.)/2/d
-        X2 = exp(l2*NTU/3.)/2/d
-        X3 = exp(l3*NTU/3.)/2/d
-        if R == 1:
-            A = -exp(-NTU)/18-exp(NTU/3)/2+(NTU+5)/9
-        else:
-            A = X1*(R+l1)*(R-l2)/2/l1-X3*d-X2*(R+l2)*(R-l1)/2/l2+1/(1-R)
-        B = X1*(R-l2)-X2*(R-l1)+X3*d
-        C = X2*(3*R+l1)-X1*(3*R+l2)+X3*d
-        ep = 1/R*(1-C/(A*C+B**2))
-
-    elif flujo == "1-4TEMAE":
-        if R == 1:
-            A = 1/tanh(5**0.5*NTU/4)
-            B = tanh(NTU/4)
-            ep = 4/(4+5**0.5*A+B)
-        else:
+            ep = where(R == 2, 0.5*(1-(1+E**-2)/2/(1+NTU)),
+                       1/R*(1-(2-R)*(2.*E+R*B)/(2+R)/(2.*E-R/B)))
+
+        elif flujo == "1-3TEMAE":
+            l1 = -3./2+(9./4+R*(R-1))**0.5
+            l2 = -3./2-(9./4+R*(R-1))**0.5
+            l3 = R
+            d = l1-l2
+            X1 = exp(l1*NTU/3.)/2/d
+            X2 = exp(l2*NTU/3.)/2/d
+            X3 = exp(l3*NTU/3.)/2/d
+            A = where(
+                R == 1, -exp(-NTU)/18-exp(NTU/3)/2+(NTU+5)/9,
+                X1*(R+l1)*(R-l2)/2/l1-X3*d-X2*(R+l2)*(R-l1)/2/l2+1/(1-R))
+            B = X1*(R-l2)-X2*(R-l1)+X3*d
+            C = X2*(3*R+l1)-X1*(3*R+l2)+X3*d
+            ep = 1/R*(1-C/(A*C+B**2))
+
+        elif flujo == "1-4TEMAE":
             D = (4+R**2)**0.5
             A = 1/tanh(D*NTU/4)
             B = tanh(NTU*R/4)
             ep = 4/(2*(1+R)+D*A+R*B)
 
-    elif flujo == "1-1TEMAG":
-        if R == 1:
-            B = NTU/(2+NTU)
-        else:
+        elif flujo == "1-1TEMAG":
             D = exp(-NTU*(1-R)/2)
-            B = (1-D)/(1-R*D)
-        A = 1/(1+R)*(1-exp(-NTU*(1+R)/2))
-        ep = A+B-A*B*(1+R)+R*A*B**2
+            B = where(R == 1, NTU/(2+NTU), (1-D)/(1-R*D))
+            A = 1/(1+R)*(1-exp(-NTU*(1+R)/2))
+            ep = A+B-A*B*(1+R)+R*A*B**2
 
-    elif flujo == "1-2TEMAG":
-        if R == 2:
+        elif flujo == "1-2TEMAG":
             alfa = exp(-NTU)
-            ep = (1+2*NTU-alfa**2)/(4+4*NTU-(1-alfa)**2)
-        else:
+            ep2 = (1+2*NTU-alfa**2)/(4+4*NTU-(1-alfa)**2)
             alfa = exp(-NTU*(2+R)/4)
             beta = exp(-NTU*(2-R)/2)
             A = -2*R*(1-alfa)**2/(2+R)
             B = (4-beta*(2+R))/(2-R)
-            ep = (B-alfa**2)/(A+2+R*B)
+            ep = where(R == 2, ep2, (B-alfa**2)/(A+2+R*B))
 
-    elif flujo == "1-1TEMAH":
-        A = 1/(1+R/2)*(1-exp(-NTU*(1+R/2)/2))
-        if R == 2:
-            B = NTU/(2+NTU)
-        else:
+        elif flujo == "1-1TEMAH":
+            A = 1/(1+R/2)*(1-exp(-NTU*(1+R/2)/2))
             D = exp(-NTU*(1-R/2)/2)
-            B = (1-D)/(1-R*D/2)
-        E = (A+B-A*B*R/2)/2
-        ep = E*(1+(1-B*R/2)*(1-A*R/2+A*B*R))-A*B*(1-B*R/2)
-
-    elif flujo == "1-2TEMAH":
-        if R == 4:
-            H = NTU
-            E = NTU/2
-        else:
+            B = where(R == 2, NTU/(2+NTU), (1-D)/(1-R*D/2))
+            E = (A+B-A*B*R/2)/2
+            ep = E*(1+(1-B*R/2)*(1-A*R/2+A*B*R))-A*B*(1-B*R/2)
+
+        elif flujo == "1-2TEMAH":
             beta = NTU*(4-R)/8
-            H = (1-exp(-2*beta))/(4/R-1)
-            E = (1-exp(-beta))/(4/R-1)
-        alfa = NTU*(4-R)/8
-        D = (1-exp(-alfa))/(4/R+1)
-        G = (1-D)**2*(D**2+E**2)+D**2*(1+E)**2
-        B = (1+H)*(1+E)**2
-        ep = 1/R*(1-(1-D)**4/(B-4*G/R))
-
-    elif flujo == "1-1TEMAJ":
-        A = exp(NTU)
-        if R == 2:
-            ep = 0.5*(1-(1+1/A**2)/2/(1+NTU))
-        else:
+            H = where(R == 4, NTU, (1-exp(-2*beta))/(4/R-1))
+            E = where(R == 4, NTU/2, (1-exp(-beta))/(4/R-1))
+            alfa = NTU*(4-R)/8
+            D = (1-exp(-alfa))/(4/R+1)
+            G = (1-D)**2*(D**2+E**2)+D**2*(1+E)**2
+            B = (1+H)*(1+E)**2
+            ep = 1/R*(1-(1-D)**4/(B-4*G/R))
+
+        elif flujo == "1-1TEMAJ":
+            A = exp(NTU)
             B = exp(-NTU*R/2)
-            ep = 1/R*(1-(2-R)*(2*A+R*B)/(2+R)/(2*A-R/B))
+            ep = where(R == 2, 0.5*(1-(1+1/A**2)/2/(1+NTU)),
+                       1/R*(1-(2-R)*(2*A+R*B)/(2+R)/(2*A-R/B)))
+
+        elif flujo == "1-2TEMAJ":
+            l = (1+R**2/4)**0.5
+            A = exp(NTU)
+            B = (A**l+1)/(A**l-1)
+            C = A**((1+l)/2)/(l-1+(1+l)*A**l)
+            D = 1+l*A**((l-1)/2)/(A**l-1)
+            ep = 1/(1+R/2+l*B-2*l*C*D)
+
+        elif flujo == "1-4TEMAJ":
+            l = (1+R**2/16)**0.5
+            A = exp(NTU)
+            B = (A**l+1)/(A**l-1)
+            C = A**((1+l)/2)/(l-1+(1+l)*A**l)
+            D = 1+l*A**((l-1)/2)/(A**l-1)
+            E = exp(R*NTU/2)
+            ep = 1/(1+R/4*(1+3*E)/(1+E)+l*B-2*l*C*D)
+
+        else:
+            raise ValueError("Unknown flow arrangement %s" % flujo)
 
-    elif flujo == "1-2TEMAJ":
-        l = (1+R**2/4)**0.5
-        A = exp(NTU)
-        B = (A**l+1)/(A**l-1)
-        C = A**((1+l)/2)/(l-1+(1+l)*A**l)
-        D = 1+l*A**((l-1)/2)/(A**l-1)
-        ep = 1/(1+R/2+l*B-2*l*C*D)
+        # With R=0 the fluid 2 is isothermal and all arrangements are
+        # equivalent
+        ep = where(R == 0, 1-exp(-NTU), ep)
+        ep = where(NTU == 0, 0, ep)
 
-    elif flujo == "1-4TEMAJ":
-        l = (1+R**2/16)**0.5
-        A = exp(NTU)
-        B = (A**l+1)/(A**l-1)
-        C = A**((1+l)/2)/(l-1+(1+l)*A**l)
-        D = 1+l*A**((l-1)/2)/(A**l-1)
-        E = exp(R*NTU/2)
-        ep = 1/(1+R/4*(1+3*E)/(1+E)+l*B-2*l*C*D)
+    return _value(ep)
 
-    return ep
 
+# Inverse tables of temperature effectiveness, the log(NTU) is tabulated in
+# a uniform grid of log(R) and t, with t=1-(1-P/Pmax)^0.5 to have more
+# points near the maximum temperature effectiveness of each R
+_TABLE_NTU = logspace(-3, 2, 501)
+_TABLE_R = (-2, 2, 161)
+_TABLE_T = 201
+_tables = {}
 
-def CorrectionFactor(P, R, flujo, **kwargs):
-    """Calculo de la factor de correccion
-    Flujo vendra definido por su acronimo
-        CF: Counter flow
-        PF: Parallel flow
-        CrFMix: Crossflow, both fluids mixed
-        CrFSMix: Crossflow, one fluid mixed, other unmixed
-        CrFunMix: Crossflow, both fluids unmixed
-        1-2TEMAE: 1-2 pass shell and tube exchanger
 
-    kwargs: Opciones adicionales:
-        mixed: corriente mezclada para CrFSMix
-            Cmin, Cmax
+class InverseTable(object):
+    """Inverse table of temperature effectiveness of a flow arrangement,
+    NTU as function of P and R, with fast bilinear interpolation
+
+    Only the rising branch of P(NTU) for each R is tabulated, the P values
+    greater than the maximum reachable temperature effectiveness have not
+    solution and return nan
     """
-    if flujo == "PF" or flujo == "CF":
-        f = 1
 
-    elif flujo == "CrFSMix":
-        if kwargs["mixed"] == "1":
-            f = log((1-R*P)/(1-P))/(1-1/R)/log(1+R*log(1-P))
-        else:
-            f = log((1-R*P)/(1-P))/(R-1)/log(1+log(1-R*P)/R)
+    def __init__(self, flujo, **kwargs):
+        self.flujo = flujo
+        self.kwargs = kwargs
+        lR = linspace(*_TABLE_R)
+        t = linspace(0, 1, _TABLE_T)
+        lNTU = log(_TABLE_NTU)
+        P = TemperatureEffectiveness(
+            _TABLE_NTU[None, :], 10**lR[:, None], flujo, **kwargs)
+        P = where(isfinite(P), P, 0)
+
+        self.Pmax = zeros(len(lR))
+        self.table = zeros((len(lR), _TABLE_T))
+        for i, row in enumerate(P):
+            imax = row.argmax()
+            rama = maximum.accumulate(row[:imax+1])
+            self.Pmax[i] = row[imax]
+            s = 1-(1-t)**2
+            self.table[i] = interp(s*self.Pmax[i], rama, lNTU[:imax+1])
+
+    def __call__(self, P, R):
+        """Interpolated NTU for the P and R values"""
+        P, R = broadcast_arrays(asarray(P, dtype=float),
+                                asarray(R, dtype=float))
+        lRmin, lRmax, nR = _TABLE_R
+        with errstate(divide="ignore", invalid="ignore"):
+            x = (log10(clip(R, 10**lRmin, 10**lRmax))-lRmin) / \
+                (lRmax-lRmin)*(nR-1)
+        i = clip(x.astype(int), 0, nR-2)
+        fx = x-i
+        Pmax = self.Pmax[i]*(1-fx)+self.Pmax[i+1]*fx
+        with errstate(divide="ignore", invalid="ignore"):
+            s = P/Pmax
+            y = (1-(1-clip(s, 0, 1))**0.5)*(_TABLE_T-1)
+        j = clip(y.astype(int), 0, _TABLE_T-2)
+        fy = y-j
+        tb = self.table
+        lNTU = (tb[i, j]*(1-fx)*(1-fy)+tb[i+1, j]*fx*(1-fy) +
+                tb[i, j+1]*(1-fx)*fy+tb[i+1, j+1]*fx*fy)
+        NTU = exp(lNTU)
+        NTU = where((s > 1+1e-9) | ~isfinite(s), nan, NTU)
+        return where(P <= 0, 0, NTU)
+
+
+def inverseTable(flujo, **kwargs):
+    """Return the inverse table of flow arrangement, it's calculated the
+    first time and saved for later use"""
+    key = (flujo, kwargs.get("mixed"))
+    if key not in _tables:
+        _tables[key] = InverseTable(flujo, **kwargs)
+    return _tables[key]
 
-    elif flujo == "1-2TEMAE":
-        if R == 1:
-            if P*(2+2**0.5) >= 2:
-                f = 0
-            else:
-                f = 2**0.5*P/(1-P)/log((2-P*(2-2**0.5))/(2-P*(2+2**0.5)))
-        else:
+
+def NTU_fPR(P, R, flujo, **kwargs):
+    """Calculo del numero de unidades de transferencia conocidos la
+    temperatura efectividad y la relación de capacidades caloríficas
+    Flujo vendra definido por su acronimo, ver TemperatureEffectiveness
+
+    Para los ordenamientos sin solución analítica se interpola en las tablas
+    inversas y se refina con el método de Newton.
+    Devuelve nan si la temperatura efectividad no es alcanzable
+
+    >>> print("%0.4f" % NTU_fPR(0.56473, 0.5, "CF"))
+    1.0000
+    >>> print("%0.4f" % NTU_fPR(0.4, 0.8, "1-2TEMAJ"))
+    0.6622
+    """
+    P, R = broadcast_arrays(asarray(P, dtype=float),
+                            asarray(R, dtype=float))
+    with errstate(divide="ignore", invalid="ignore"):
+        if flujo == "CF":
+            NTU = where(R == 1, P/(1-P), log((1-R*P)/(1-P))/(1-R))
+
+        elif flujo == "PF":
+            NTU = -log(1-P*(1+R))/(1+R)
+
+        elif flujo == "1-2TEMAE":
             E = (1+R**2)**0.5
-            if P*(1+R+E) >= 2:
-                f = 0
-            else:
-                f = E*log((1-R*P)/(1-P))/(1-R)/log((2-P*(1+R-E))/(2-P*(1+R+E)))
+            NTU = log((2-P*(1+R-E))/(2-P*(1+R+E)))/E
 
-    else:  # Para los ordenamientos de flujo sin solucion analitica
-        NTU = NTU_fPR(P, R, flujo, **kwargs)
-        if R == 1:
-            f = P/NTU/(1-P)
         else:
-            f = log((1-R*P)/(1-P))/NTU/(1-R)
+            NTU = inverseTable(flujo, **kwargs)(P, R)
 
-    return f
+            # Newton refinement in log(NTU) with the analytic equation
+            u = log(where(NTU > 0, NTU, 1))
+            h = 1e-6
+            for i in range(4):
+                f = TemperatureEffectiveness(exp(u), R, flujo, **kwargs)-P
+                df = (TemperatureEffectiveness(
+                    exp(u+h), R, flujo, **kwargs)-P-f)/h
+                du = clip(-f/df, -0.5, 0.5)
+                u = where(isfinite(du), u+du, u)
+            NTU = where(NTU > 0, exp(u), NTU)
 
+        NTU = where(~isfinite(NTU) | (NTU < 0), nan, NTU)
+        NTU = where(P == 0, 0, NTU)
 
-def NTU_fPR(P, R, flujo, **kwargs):
+    return _value(NTU)
+
+
+def CorrectionFactor(P, R, flujo, **kwargs):
     """Calculo de la factor de correccion
     Flujo vendra definido por su acronimo
         CF: Counter flow
@@ -577,32 +649,56 @@ def NTU_fPR(P, R, flujo, **kwargs):
         CrFSMix: Crossflow, one fluid mixed, other unmixed
         CrFunMix: Crossflow, both fluids unmixed
         1-2TEMAE: 1-2 pass shell and tube exchanger
+        and the others flows defined in TemperatureEffectiveness
 
     kwargs: Opciones adicionales:
         mixed: corriente mezclada para CrFSMix
             Cmin, Cmax
+
+    El factor es cero para temperaturas efectividad no alcanzables
+
+    >>> print("%0.4f" % CorrectionFactor(0.4, 1, "1-2TEMAE"))
+    0.9209
+    >>> print(CorrectionFactor([0.2, 0.9], 1, "1-2TEMAE"))
+    [0.98949508 0.        ]
     """
+    P, R = broadcast_arrays(asarray(P, dtype=float),
+                            asarray(R, dtype=float))
+    with errstate(divide="ignore", invalid="ignore"):
+        if flujo == "PF" or flujo == "CF":
+            f = ones(P.shape)
 
-    if flujo == "1-2TEMAE":
-        if R == 1:
-            NTU = log((1-P)/2-3*P)
-        else:
+        elif flujo == "CrFSMix":
+            if kwargs["mixed"] == "1":
+                f = log((1-R*P)/(1-P))/(1-1/R)/log(1+R*log(1-P))
+            else:
+                f = log((1-R*P)/(1-P))/(R-1)/log(1+log(1-R*P)/R)
+
+        elif flujo == "1-2TEMAE":
             E = (1+R**2)**0.5
-            NTU = log((2-P*(1+R-E))/(2-P*(1+R+E)))/E
+            f = where(
+                R == 1,
+                2**0.5*P/(1-P)/log((2-P*(2-2**0.5))/(2-P*(2+2**0.5))),
+                E*log((1-R*P)/(1-P))/(1-R)/log((2-P*(1+R-E))/(2-P*(1+R+E))))
+            f = where(P*(1+R+E) >= 2, 0, f)
 
-    else:
-        if R == 1:
-            NTU = P/(1-P)
-        else:
-            NTU = log((1-R/P)/(1-P))/(1-R)
+        else:  # Para los ordenamientos de flujo sin solucion analitica
+            NTU = NTU_fPR(P, R, flujo, **kwargs)
+            f = where(R == 1, P/NTU/(1-P), log((1-R*P)/(1-P))/NTU/(1-R))
+            f = where(isfinite(f), f, 0)
 
-    return NTU
+        f = where(P == 0, 1, f)
+
+    return _value(f)
 
 
 def Fi(P, R, flujo, **kwargs):
-    F = CorrectionFactor(P, R, flujo, **kwargs)
-    if R == 1:
-        Fi = F*(1-P)
-    else:
-        Fi = F*P*(1-R)/log((1-R*P)/(1-P))
-    return Fi
+    """Factor de corrección referido a la diferencia de temperaturas de
+    entrada, ψ=ΔTm/(T2i-T1i)"""
+    F = asarray(CorrectionFactor(P, R, flujo, **kwargs))
+    P, R = broadcast_arrays(asarray(P, dtype=float),
+                            asarray(R, dtype=float))
+    with errstate(divide="ignore", invalid="ignore"):
+        Fi = where(R == 1, F*(1-P), F*P*(1-R)/log((1-R*P)/(1-P)))
+        Fi = where(P == 0, 1, Fi)
+    return _value(Fi)
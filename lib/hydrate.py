@@ -0,0 +1,558 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Gas hydrate formation conditions
+#
+#   - K_Sloan: Vapor-solid equilibrium constants of hydrate formers
+#   - P_Sloan, T_Sloan: Katz K-value method with Sloan correlations
+#   - P_Motiee, T_Motiee: Gas gravity method, Motiee correlation
+#   - P_TowlerMokhatab, T_TowlerMokhatab: Gas gravity method, Towler and
+#       Mokhatab correlation
+#   - depression_Hammerschmidt: Temperature shift by thermodynamic inhibitor
+#   - depression_NielsenBucklin: Temperature shift for concentrated inhibitor
+#   - W_Hammerschmidt: Inhibitor concentration for a temperature shift
+#   - Hydrate: Hydrate formation curve of a gas with optional inhibitor
+#
+#   All the functions work with arrays in SI units, temperature in K and
+#   pressure in Pa, the composition and gas gravity are broadcasted with the
+#   state variables, so a full curve or a pipeline profile with thousands of
+#   points is solved in a single call. The K-value method solves the
+#   equilibrium condition Σyi/Ki = 1 with a vectorized scan and bisection.
+###############################################################################
+
+
+from numpy import (argmax, asarray, broadcast_arrays, errstate, exp,
+                   geomspace, linspace, log, log10, nan, ones, sqrt, stack,
+                   where)
+
+
+# Hydrate formers in Sloan K-value correlations and the pychemqt database
+# index of each one
+FORMERS = ["CH4", "C2H6", "C3H8", "i-C4H10", "n-C4H10", "N2", "CO2", "H2S"]
+FORMERS_ID = [2, 3, 4, 5, 6, 46, 49, 50]
+
+# Coefficients of Sloan correlations, by rows the terms of equation
+#   lnK = A + BT + CP + D/T + E/P + FPT + GT² + HP² + IP/T + J ln(P/T) +
+#       K/P² + LT/P + MT²/P + NP/T² + OT/P³ + QT³ + RP³/T² + ST⁴
+# with T in ºF and P in psia, by columns the hydrate formers
+_Sloan = asarray([
+    [1.63636, 6.41934, -7.8499, -2.17137, -37.211, 1.78857, 9.0242,
+     -4.7071],
+    [0, 0, 0, 0, 0.86564, 0, 0, 0.06192],
+    [0, 0, 0, 0, 0, -0.001356, 0, 0],
+    [31.6621, -290.283, 47.056, 0, 732.20, -6.187, -207.033, 82.627],
+    [-49.3534, 2629.10, 0, 0, 0, 0, 0, 0],
+    [5.31e-6, 0, -1.17e-6, 0, 0, 0, 4.66e-5, -7.39e-6],
+    [0, 0, 7.145e-4, 1.251e-3, 0, 0, -6.992e-3, 0],
+    [0, -9.0e-8, 0, 1.0e-8, 9.37e-6, 2.5e-7, -2.89e-6, 0],
+    [0.128525, 0.129759, 0, 0.166097, -1.07657, 0, -6.233e-3, 0.240869],
+    [-0.78338, -1.19703, 0.12348, -2.75945, 0, 0, 0, -0.64405],
+    [0, -8.46e4, 1.669e4, 0, 0, 0, 0, 0],
+    [0, -71.0352, 0, 0, -66.221, 0, 0, 0],
+    [0, 0.596404, 0.23319, 0, 0, 0, 0.27098, 0],
+    [-5.3569, -4.7437, 0, 0, 0, 0, 0, -12.704],
+    [0, 7.82e4, -4.48e4, -8.84e2, 9.17e5, 5.87e5, 0, 0],
+    [-2.3e-7, 0, 5.5e-6, 0, 0, 0, 8.82e-5, -1.3e-6],
+    [-2.0e-8, 0, 0, -5.4e-7, 4.98e-6, 1.0e-8, 2.55e-6, 0],
+    [0, 0, 0, -1.0e-8, -1.26e-6, 1.1e-7, 0, 0]])
+
+# Range of K-value method used in the solution, 32-60 ºF, 100-4000 psia
+TMIN, TMAX = 273.15, 288.71
+PMIN, PMAX = 689475.7, 27579029.
+
+# Points of scan grid and bisection iterations in K-value method
+POINTS = 48
+ITERATIONS = 40
+
+# Thermodynamic inhibitors, molecular weight and Hammerschmidt constant in
+# ºF, GPSA Engineering Data Book, Section 20
+INHIBITORS = {
+    "methanol": (32.042, 2335.),
+    "ethanol": (46.07, 2335.),
+    "MEG": (62.068, 2700.),
+    "DEG": (106.12, 2700.),
+    "TEG": (150.17, 2700.)}
+
+# Water molecular weight and air molecular weight for gas gravity
+M_WATER = 18.015
+M_AIR = 28.9625
+
+
+def _F(T):
+    """Convert temperature from K to ºF"""
+    return asarray(T, dtype=float)*1.8-459.67
+
+
+def _psi(P):
+    """Convert pressure from Pa to psi"""
+    return asarray(P, dtype=float)/6894.757
+
+
+def _return(x):
+    """Return a float for scalar results"""
+    if x.ndim == 0:
+        return float(x)
+    return x
+
+
+def K_Sloan(T, P):
+    """Vapor-solid equilibrium constants of hydrate formers with the Sloan
+    correlations
+
+    Parameters
+    ----------
+    T : array
+        Temperature, [K]
+    P : array
+        Pressure, [Pa]
+
+    Returns
+    -------
+    K : array
+        Equilibrium constants with the hydrate formers in last axis, in the
+        order of FORMERS
+
+    References
+    ----------
+    Sloan, E.D. Phase Equilibria of Natural Gas Hydrates. Paper presented at
+    the Gas Producers Association Annual Conference, New Orleans, 1984.
+    """
+    T, P = broadcast_arrays(_F(T), _psi(P))
+    with errstate(all="ignore"):
+        terms = [ones(T.shape), T, P, 1/T, 1/P, P*T, T**2, P**2, P/T,
+                 log(P/T), 1/P**2, T/P, T**2/P, P/T**2, T/P**3, T**3,
+                 P**3/T**2, T**4]
+        return exp(stack(terms, axis=-1) @ _Sloan)
+
+
+
+def _scan(func, lo, hi, shape):
+    """Vectorized search of the first root of an increasing function in the
+    interval [lo, hi], the function is evaluated in a logarithmic grid with
+    a single call and the change of sign refined by bisection
+
+    Parameters
+    ----------
+    func : function
+        Function of x with shape (..., n), the other arguments must be
+        broadcasted with a trailing axis
+    lo, hi : float
+        Search interval, must be positive
+    shape : tuple
+        Shape of result
+
+    Returns
+    -------
+    x : array
+        Root, nan if the function is positive in the lower limit or there
+        isn't any change of sign in interval
+    """
+    grid = geomspace(lo, hi, POINTS)
+    with errstate(invalid="ignore"):
+        ok = func(grid*ones(shape+(1,))) >= 0
+    i = argmax(ok, axis=-1)
+    valid = ok.any(axis=-1) & (i > 0)
+    i = where(valid, i, 1)
+    a = grid[i-1]
+    b = grid[i]
+    for it in range(ITERATIONS):
+        m = sqrt(a*b)
+        with errstate(invalid="ignore"):
+            up = func(m[..., None])[..., 0] >= 0
+        b = where(up, m, b)
+        a = where(up, a, m)
+    return where(valid, sqrt(a*b), nan)
+
+
+def P_Sloan(T, y):
+    """Hydrate formation pressure with the Katz K-value method using the
+    Sloan correlations, the first solution of Σyi/Ki = 1 in increasing
+    pressure is returned
+
+    Parameters
+    ----------
+    T : array
+        Temperature, [K]
+    y : array
+        Mole fraction of hydrate formers in dry gas, in FORMERS order, the
+        remaining fraction is considered non hydrate formers
+
+    Returns
+    -------
+    P : array
+        Hydrate formation pressure, nan outside the range of method, [Pa]
+
+    >>> y = [0.78, 0.06, 0.03, 0.01, 0.02, 0.06, 0.04, 0]
+    >>> print(" ".join("%0.3f" % p for p in P_Sloan([276, 282], y)*1e-6))
+    0.899 1.713
+    """
+    T = asarray(T, dtype=float)
+    y = asarray(y, dtype=float)
+    shape = (T*y[..., 0]).shape
+    Ti = T[..., None]
+    yi = y[..., None, :]
+
+    def f(P):
+        return (yi/K_Sloan(Ti, P)).sum(axis=-1)-1
+
+    P = _scan(f, PMIN, PMAX, shape)
+    return _return(where((T >= TMIN) & (T <= TMAX), P, nan))
+
+
+def T_Sloan(P, y):
+    """Hydrate formation temperature with the Katz K-value method using the
+    Sloan correlations
+
+    Parameters
+    ----------
+    P : array
+        Pressure, [Pa]
+    y : array
+        Mole fraction of hydrate formers in dry gas, in FORMERS order
+
+    Returns
+    -------
+    T : array
+        Hydrate formation temperature, nan outside the range of method, [K]
+
+    >>> y = [0.78, 0.06, 0.03, 0.01, 0.02, 0.06, 0.04, 0]
+    >>> print(" ".join("%0.2f" % t for t in T_Sloan([2e6, 3e6], y)))
+    283.32 286.15
+    """
+    P = asarray(P, dtype=float)
+    y = asarray(y, dtype=float)
+    shape = (P*y[..., 0]).shape
+    Pi = P[..., None]
+    yi = y[..., None, :]
+
+    def f(T):
+        return 1-(yi/K_Sloan(T, Pi)).sum(axis=-1)
+
+    T = _scan(f, TMIN, TMAX, shape)
+    return _return(where((P >= PMIN) & (P <= PMAX), T, nan))
+
+
+def T_Motiee(P, SG):
+    """Hydrate formation temperature with the gas gravity method, using the
+    Motiee correlation of Katz chart
+
+    Parameters
+    ----------
+    P : array
+        Pressure, [Pa]
+    SG : array
+        Gas specific gravity, [-]
+
+    Returns
+    -------
+    T : array
+        Hydrate formation temperature, [K]
+
+    References
+    ----------
+    Motiee, M. Estimate Possibility of Hydrate. Hydrocarbon Processing 70(7)
+    (1991) 98-99
+
+    >>> print("%0.2f" % T_Motiee(3e6, 0.7))
+    284.63
+    """
+    L = log10(_psi(P))
+    SG = asarray(SG, dtype=float)
+    t = -238.24469 + 78.99667*L - 5.352544*L**2 + 349.473877*SG - \
+        150.854675*SG**2 - 27.604065*SG*L
+    return _return((t+459.67)/1.8)
+
+
+def P_Motiee(T, SG):
+    """Hydrate formation pressure with the gas gravity method, inverse of
+    Motiee correlation in its increasing branch
+
+    Parameters
+    ----------
+    T : array
+        Temperature, [K]
+    SG : array
+        Gas specific gravity, [-]
+
+    Returns
+    -------
+    P : array
+        Hydrate formation pressure, nan over the maximum of curve, [Pa]
+
+    >>> print("%0.4f" % (P_Motiee(T_Motiee(3e6, 0.7), 0.7)*1e-6))
+    3.0000
+    """
+    SG = asarray(SG, dtype=float)
+    a = -5.352544
+    b = 78.99667-27.604065*SG
+    c = -238.24469+349.473877*SG-150.854675*SG**2-_F(T)
+    with errstate(invalid="ignore"):
+        L = (-b+sqrt(b**2-4*a*c))/2/a
+    return _return(10**L*6894.757)
+
+
+def T_TowlerMokhatab(P, SG):
+    """Hydrate formation temperature with the gas gravity method, using the
+    Towler-Mokhatab correlation
+
+    Parameters
+    ----------
+    P : array
+        Pressure, [Pa]
+    SG : array
+        Gas specific gravity, [-]
+
+    Returns
+    -------
+    T : array
+        Hydrate formation temperature, [K]
+
+    References
+    ----------
+    Towler, B.F., Mokhatab, S. Quickly Estimate Hydrate Formation
+    Conditions in Natural Gases. Hydrocarbon Processing 84(4) (2005) 61-62
+
+    >>> print("%0.2f" % T_TowlerMokhatab(3e6, 0.7))
+    284.76
+    """
+    lnP = log(_psi(P))
+    lnSG = log(SG)
+    t = 13.47*lnP + 34.27*lnSG - 1.675*lnP*lnSG - 20.35
+    return _return((t+459.67)/1.8)
+
+
+def P_TowlerMokhatab(T, SG):
+    """Hydrate formation pressure with the gas gravity method, inverse of
+    Towler-Mokhatab correlation
+
+    Parameters
+    ----------
+    T : array
+        Temperature, [K]
+    SG : array
+        Gas specific gravity, [-]
+
+    Returns
+    -------
+    P : array
+        Hydrate formation pressure, [Pa]
+
+    >>> print("%0.4f" % (P_TowlerMokhatab(T_TowlerMokhatab(3e6, 0.7), \
+                                           0.7)*1e-6))
+    3.0000
+    """
+    lnSG = log(SG)
+    lnP = (_F(T)+20.35-34.27*lnSG)/(13.47-1.675*lnSG)
+    return _return(exp(lnP)*6894.757)
+
+
+def depression_Hammerschmidt(W, inhibidor="methanol"):
+    """Hydrate temperature depression by a thermodynamic inhibitor with the
+    Hammerschmidt equation, valid for concentration up to 20-25% in weight
+
+    Parameters
+    ----------
+    W : array
+        Inhibitor concentration in aqueous phase, [%wt]
+    inhibidor : str
+        Inhibitor name, a key of INHIBITORS
+
+    Returns
+    -------
+    dT : array
+        Temperature depression, [K]
+
+    References
+    ----------
+    Hammerschmidt, E.G. Formation of Gas Hydrates in Natural Gas
+    Transmission Lines. Ind. Eng. Chem. 26(8) (1934) 851-855
+
+    >>> print("%0.2f" % depression_Hammerschmidt(20, "methanol"))
+    10.12
+    """
+    M, K = INHIBITORS[inhibidor]
+    W = asarray(W, dtype=float)
+    return _return(K*W/M/(100-W)/1.8)
+
+
+def depression_NielsenBucklin(W, inhibidor="methanol"):
+    """Hydrate temperature depression by a thermodynamic inhibitor with the
+    Nielsen-Bucklin equation, valid for concentrated solutions
+
+    Parameters
+    ----------
+    W : array
+        Inhibitor concentration in aqueous phase, [%wt]
+    inhibidor : str
+        Inhibitor name, a key of INHIBITORS
+
+    Returns
+    -------
+    dT : array
+        Temperature depression, [K]
+
+    References
+    ----------
+    Nielsen, R.B., Bucklin, R.W. Why Not Use Methanol for Hydrate Control?
+    Hydrocarbon Processing 62(4) (1983) 71-78
+
+    >>> print("%0.2f" % depression_NielsenBucklin(20, "methanol"))
+    9.47
+    """
+    M = INHIBITORS[inhibidor][0]
+    W = asarray(W, dtype=float)
+    nw = (100-W)/M_WATER
+    xw = nw/(nw+W/M)
+    return _return(-129.6*log(xw)/1.8)
+
+
+def W_Hammerschmidt(dT, inhibidor="methanol"):
+    """Inhibitor concentration in aqueous phase to get a hydrate temperature
+    depression, inverse of Hammerschmidt equation
+
+    Parameters
+    ----------
+    dT : array
+        Temperature depression, [K]
+    inhibidor : str
+        Inhibitor name, a key of INHIBITORS
+
+    Returns
+    -------
+    W : array
+        Inhibitor concentration in aqueous phase, [%wt]
+
+    >>> print("%0.2f" % W_Hammerschmidt(depression_Hammerschmidt(20)))
+    20.00
+    """
+    M, K = INHIBITORS[inhibidor]
+    dT = asarray(dT, dtype=float)*1.8
+    return _return(100*M*dT/(K+M*dT))
+
+
+class Hydrate(object):
+    """Hydrate formation curve of a natural gas
+
+    Parameters
+    ----------
+    gas : object
+        Gas definition, a Mezcla or Corriente instance with the full
+        composition, a petro.Natural_Gas instance, or the gas specific
+        gravity as float
+    metodo : str
+        Calculation method:
+            Motiee: Gas gravity method, Motiee correlation
+            TowlerMokhatab: Gas gravity method, Towler-Mokhatab correlation
+            Sloan: Katz K-value method with Sloan correlations, it needs the
+                full composition
+    inhibidor : str
+        Thermodynamic inhibitor, a key of INHIBITORS
+    W : float
+        Inhibitor concentration in aqueous phase, [%wt]
+    depresion : str
+        Equation for inhibitor depression, Hammerschmidt or NielsenBucklin
+
+    The water is excluded of composition, the curves are calculated in dry
+    basis, the inhibitor shift the uninhibited curve a constant temperature
+    depression:
+        Tinh(P) = T(P) - ΔT
+        Pinh(T) = P(T + ΔT)
+
+    >>> hyd = Hydrate(0.7, inhibidor="MEG", W=20)
+    >>> print("%0.2f %0.2f" % (hyd.dT, hyd.T(3e6)))
+    6.04 278.58
+    >>> print(hyd.risk([280, 290], [5e6, 5e6]))
+    [ True False]
+    """
+
+    METHODS = ("Motiee", "TowlerMokhatab", "Sloan")
+
+    def __init__(self, gas, metodo="Motiee", inhibidor=None, W=0,
+                 depresion="Hammerschmidt"):
+        if hasattr(gas, "mezcla"):
+            gas = gas.mezcla
+
+        self.y = None
+        if hasattr(gas, "ids"):
+            x = asarray(gas.fraccion, dtype=float)
+            M = asarray([cmp.M for cmp in gas.componente], dtype=float)
+            dry = asarray([i != 62 for i in gas.ids])
+            x = x*dry/(x*dry).sum()
+            self.SG = (x*M).sum()/M_AIR
+            self.y = asarray(
+                [x[gas.ids.index(i)] if i in gas.ids else 0
+                 for i in FORMERS_ID])
+        elif hasattr(gas, "SG"):
+            self.SG = gas.SG
+        else:
+            self.SG = float(gas)
+
+        if metodo not in self.METHODS:
+            raise ValueError("Unknown hydrate method %s" % metodo)
+        if metodo == "Sloan" and self.y is None:
+            raise ValueError("Sloan method needs the gas composition")
+        self.metodo = metodo
+
+        self.inhibidor = inhibidor
+        self.W = W
+        if inhibidor and W:
+            if depresion == "NielsenBucklin":
+                self.dT = depression_NielsenBucklin(W, inhibidor)
+            else:
+                self.dT = depression_Hammerschmidt(W, inhibidor)
+        else:
+            self.dT = 0
+
+    def T(self, P):
+        """Hydrate formation temperature at pressure P, [K]"""
+        if self.metodo == "Sloan":
+            T = T_Sloan(P, self.y)
+        elif self.metodo == "TowlerMokhatab":
+            T = T_TowlerMokhatab(P, self.SG)
+        else:
+            T = T_Motiee(P, self.SG)
+        return T-self.dT
+
+    def P(self, T):
+        """Hydrate formation pressure at temperature T, [Pa]"""
+        T = asarray(T, dtype=float)+self.dT
+        if self.metodo == "Sloan":
+            return P_Sloan(T, self.y)
+        elif self.metodo == "TowlerMokhatab":
+            return P_TowlerMokhatab(T, self.SG)
+        else:
+            return P_Motiee(T, self.SG)
+
+    def curve(self, Tmin=273.15, Tmax=298.15, n=51):
+        """Hydrate formation curve, return the temperature and pressure
+        arrays, [K], [Pa]"""
+        T = linspace(Tmin, Tmax, n)
+        return T, self.P(T)
+
+    def subcooling(self, T, P):
+        """Subcooling of the gas under the hydrate formation temperature at
+        its pressure, positive values in hydrate region, [K]"""
+        return self.T(P)-asarray(T, dtype=float)
+
+    def risk(self, T, P, margin=0):
+        """Check the hydrate risk in states with temperature T and pressure
+        P, as in pipeline profiles, with an optional safety margin, [K]"""
+        return self.subcooling(T, P) > -margin
@@ -0,0 +1,613 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Kinetic models of ideal reactors
+#
+#   - KineticSystem: Set of reactions with vectorized rates and enthalpies
+#   - Profile: Result of reactor integration as arrays
+#   - stoichiometric: Reactor with fixed conversion of reactions
+#   - pfr: Plug flow reactor
+#   - batch: Batch reactor at constant volume
+#   - cstr: Continuous stirred tank reactor at steady state
+#
+#   The balances are integrated with the stiff solvers of scipy (BDF, Radau,
+#   LSODA) using the analytic jacobian of the system. The component
+#   enthalpies use the ideal gas heat capacity polynomials of database, or a
+#   constant liquid heat capacity for liquid phase reactors, and the
+#   coefficients are calculated once for each KineticSystem so a instance
+#   can be reused for many reactor calculations in design studies.
+#
+#   The sign convention for heat is the heat added to the reactor.
+###############################################################################
+
+
+from numpy import (arange, array, asarray, concatenate, dot, errstate, exp,
+                   eye, isfinite, linspace, maximum, power, prod, where,
+                   zeros)
+from scipy.constants import R
+from scipy.integrate import solve_ivp
+from scipy.optimize import root
+
+
+R = R*1000  # J/kmolK
+Tref = 298.15
+
+
+class KineticSystem(object):
+    """Set of reactions over the components of a stream
+
+    Parameters
+    ----------
+    reactions : list
+        Reaction instances, the kinetic parameters Ko, Ei, n and orden are
+        used in kinetic reactors
+    componente : list
+        Componente instances of stream
+    gas : boolean
+        Gas phase reactor, concentration by ideal gas law and ideal gas
+        enthalpies, else liquid phase with constant heat capacities
+    T : float
+        Temperature to evaluate the liquid heat capacities, K
+
+    The stoichiometric coefficients are normalized with the key component of
+    each reaction, so the rate and heat of reaction of Reaction are referred
+    to reaction extent.
+
+    >>> from lib.compuestos import Componente
+    >>> from lib.reaction import Reaction
+    >>> cmp = [Componente(i) for i in (1, 47, 62)]
+    >>> rx = Reaction(comp=[1, 47, 62], coef=[-2, -1, 2], key=1)
+    >>> system = KineticSystem([rx], cmp)
+    >>> print(system.nu[:, 0])
+    [-2. -1.  2.]
+    >>> print("%0.4e" % system.heat(298.15)[0])
+    -4.8364e+08
+    """
+
+    def __init__(self, reactions, componente, gas=True, T=Tref):
+        self.ids = [cmp.indice for cmp in componente]
+        self.gas = gas
+        n = len(componente)
+        m = len(reactions)
+        self.nu = zeros((n, m))
+        self.orden = zeros((n, m))
+        self.Ko = zeros(m)
+        self.Ei = zeros(m)
+        self.n = zeros(m)
+        self.Hr = zeros(m)
+        self.key = zeros(m, dtype=int)
+        for j, rx in enumerate(reactions):
+            escala = abs(rx.coef[rx.kwargs["key"]])
+            self.key[j] = self.ids.index(rx.componentes[rx.kwargs["key"]])
+            for id, coef, orden in zip(rx.componentes, rx.coef, rx.orden):
+                if id not in self.ids:
+                    raise ValueError("Reaction component %i not in stream" % id)
+                i = self.ids.index(id)
+                self.nu[i, j] += coef/escala
+                self.orden[i, j] = orden
+            self.Ko[j] = rx.Ko
+            self.Ei[j] = rx.Ei
+            self.n[j] = rx.n
+            self.Hr[j] = rx.Hr
+
+        # Heat capacity polynomials in J/kmolK
+        self._cp = zeros((n, 6))
+        for i, cmp in enumerate(componente):
+            if gas:
+                self._cp[i] = array(cmp.cp)*4184
+            else:
+                self._cp[i, 0] = _cpLiquid(cmp, T)
+        self._cpH = self._cp/arange(1, 7)
+        self._dcp = self._cp[:, 1:]*arange(1, 6)
+        self._H0 = dot(self._cpH, power.outer(Tref, arange(1, 7)))
+
+    def cp(self, T):
+        """Heat capacity of components, J/kmolK"""
+        return dot(self._cp, power.outer(T, arange(6)).T)
+
+    def dcp(self, T):
+        """Temperature derivative of heat capacity of components"""
+        return dot(self._dcp, power.outer(T, arange(5)).T)
+
+    def enthalpy(self, T):
+        """Sensible enthalpy of components referred to 298.15 K, J/kmol"""
+        H = dot(self._cpH, power.outer(T, arange(1, 7)).T)
+        return (H.T-self._H0).T
+
+    def heat(self, T):
+        """Heat of reactions at temperature T, J/kmol of extent"""
+        return (self.Hr+dot(self.nu.T, self.enthalpy(T)).T).T
+
+    def constants(self, T):
+        """Kinetic constants of reactions at temperature T"""
+        T = asarray(T, dtype=float)
+        if T.ndim:
+            return self.Ko[:, None]*T**self.n[:, None]*exp(
+                -self.Ei[:, None]/R/T)
+        return self.Ko*T**self.n*exp(-self.Ei/R/T)
+
+    def rates(self, T, C):
+        """Kinetic rates of reactions, kmol/m³s of extent
+
+        Parameters
+        ----------
+        T : float or array
+            Temperature, K
+        C : array
+            Concentrations, kmol/m³, shape (components, ) or
+            (components, states) with T array with states length
+        """
+        C = maximum(asarray(C, dtype=float), 0)
+        if C.ndim == 2:
+            return self.constants(T)*prod(
+                C[:, None, :]**self.orden[:, :, None], axis=0)
+        return self.constants(T)*prod(C[:, None]**self.orden, axis=0)
+
+    def derivatives(self, T, C):
+        """Rates and its derivatives for a single state
+
+        Returns
+        -------
+        r : array
+            Rates of reactions
+        drdC : array
+            Derivatives with concentrations, shape (reactions, components)
+        drdT : array
+            Derivatives with temperature at constant concentrations
+        """
+        C = maximum(asarray(C, dtype=float), 0)
+        k = self.constants(T)
+        factor = C[:, None]**self.orden
+        r = k*prod(factor, axis=0)
+        with errstate(divide="ignore", invalid="ignore"):
+            dfactor = where(self.orden != 0,
+                            self.orden*C[:, None]**(self.orden-1), 0)
+        dfactor[~isfinite(dfactor)] = 0
+        drdC = zeros((len(k), len(C)))
+        for i in range(len(C)):
+            otros = factor.copy()
+            otros[i] = dfactor[i]
+            drdC[:, i] = k*prod(otros, axis=0)
+        drdT = r*(self.n/T+self.Ei/R/T**2)
+        return r, drdC, drdT
+
+
+def _cpLiquid(cmp, T):
+    """Liquid heat capacity from DIPPR equation, with the ideal gas heat
+    capacity when it isn't available, J/kmolK"""
+    try:
+        cp = cmp.DIPPR(T, cmp.capacidad_calorifica_liquido)
+    except (ValueError, ZeroDivisionError, TypeError):
+        cp = 0
+    if not isfinite(cp) or cp <= 0:
+        cp = cmp.Cp_ideal(T).JkgK*cmp.M
+    return cp
+
+
+class Profile(object):
+    """Result of a reactor calculation, the profiles are arrays along the
+    independent variable
+
+    Attributes
+    ----------
+    x : array
+        Reactor volume for pfr, m³, or time for batch reactor, s
+    F : array
+        Component molar flows, kmol/s, or moles for batch, kmol, with shape
+        (components, points)
+    T : array
+        Temperature, K
+    Q : array
+        Heat added to reactor from inlet, W, or from start for batch, J
+    C : array
+        Concentrations, kmol/m³
+    r : array
+        Rates of reactions, kmol/m³s
+    """
+
+    def __init__(self, x, F, T, Q, C, r, sol=None):
+        self.x = x
+        self.F = F
+        self.T = T
+        self.Q = Q
+        self.C = C
+        self.r = r
+        if sol is not None:
+            self.success = sol.success
+            self.message = sol.message
+            self.nfev = sol.nfev
+            self.njev = sol.njev
+        else:
+            self.success = True
+            self.message = ""
+            self.nfev = 0
+            self.njev = 0
+
+    def conversion(self, i):
+        """Conversion profile of component with index i"""
+        return 1-self.F[i]/self.F[i, 0]
+
+
+def _heatTerms(thermal, Q, UA, Text, scale):
+    """Heat terms of balance per unit of independent variable"""
+    if thermal == 2:
+        return Q/scale, 0, Text
+    elif thermal == 3:
+        return 0, UA/scale, Text
+    return 0, 0, Text
+
+
+def _integrate(system, y0, xmax, conc, dconc, escala, thermal, q, ua, Text,
+               cvshift, points, method, rtol, atol):
+    """Common integration of pfr and batch reactor balances
+
+    The state is [F, T, Q], with the balances:
+        dF/dx = escala·ν·r
+        Σ F·cp dT/dx = q + ua(Text-T) - escala·ΔHr·r
+        dQ/dx = q + ua(Text-T), or escala·ΔHr·r for isothermal reactor
+    """
+    n = len(system.ids)
+    nu = system.nu
+
+    def balance(F, T):
+        C = conc(F, T)
+        r, drdC, drdT = system.derivatives(T, C)
+        dCdF, dCdT = dconc(F, T, C)
+        drdF = dot(drdC, dCdF)
+        drdTt = drdT+dot(drdC, dCdT)
+        return r, drdF, drdTt
+
+    def fun(x, y):
+        F, T = y[:n], y[n]
+        r = system.rates(T, conc(F, T))
+        dF = escala*dot(nu, r)
+        reaccion = escala*dot(system.heat(T), r)
+        if thermal == 1:
+            return concatenate((dF, [0, reaccion]))
+        externo = q+ua*(Text-T)
+        S = dot(F, system.cp(T)-cvshift)
+        return concatenate((dF, [(externo-reaccion)/S, externo]))
+
+    def jac(x, y):
+        F, T = y[:n], y[n]
+        r, drdF, drdT = balance(F, T)
+        Hr = system.heat(T)
+        J = zeros((n+2, n+2))
+        J[:n, :n] = escala*dot(nu, drdF)
+        J[:n, n] = escala*dot(nu, drdT)
+        dRdF = escala*dot(Hr, drdF)
+        dRdT = escala*(dot(dot(nu.T, system.cp(T)), r)+dot(Hr, drdT))
+        if thermal == 1:
+            J[n+1, :n] = dRdF
+            J[n+1, n] = dRdT
+            return J
+        cp = system.cp(T)-cvshift
+        S = dot(F, cp)
+        E = q+ua*(Text-T)-escala*dot(Hr, r)
+        f = E/S
+        J[n, :n] = (-dRdF-f*cp)/S
+        J[n, n] = (-ua-dRdT-f*dot(F, system.dcp(T)))/S
+        J[n+1, n] = -ua
+        return J
+
+    xeval = linspace(0, xmax, points)
+    sol = solve_ivp(fun, (0, xmax), y0, method=method, t_eval=xeval,
+                    jac=jac, rtol=rtol, atol=atol)
+    if not sol.success:
+        raise ValueError(sol.message)
+
+    F = sol.y[:n]
+    T = sol.y[n]
+    C = array([conc(F[:, i], T[i]) for i in range(len(T))]).T
+    r = system.rates(T, C)
+    return Profile(sol.t, F, T, sol.y[n+1], C, r, sol)
+
+
+def pfr(system, F0, T0, P, V, thermal=0, Q=0, UA=0, Text=0, Qv=None,
+        points=51, method="BDF", rtol=1e-6, atol=1e-12):
+    """Plug flow reactor
+
+    Parameters
+    ----------
+    system : KineticSystem
+        Reactions in reactor
+    F0 : array
+        Inlet component molar flows, kmol/s
+    T0 : float
+        Inlet temperature, K
+    P : float
+        Pressure, Pa
+    V : float
+        Reactor volume, m³
+    thermal : integer
+        Thermal behaviour of reactor:
+            0 - Adiabatic
+            1 - Isothermal
+            2 - Fixed heat flux, Q
+            3 - Heat transfer with external fluid, UA and Text
+    Q : float
+        Heat added to reactor, W, distributed uniformly along reactor
+    UA : float
+        Product of global heat transfer coefficient and heat transfer area,
+        W/K
+    Text : float
+        Temperature of external fluid, K
+    Qv : float
+        Volumetric flow of liquid phase reactor, m³/s
+    points : integer
+        Number of points of profile
+    method : string
+        Integration method of scipy.integrate.solve_ivp, BDF, Radau or LSODA
+
+    Returns
+    -------
+    Profile instance along reactor volume
+
+    >>> from lib.compuestos import Componente
+    >>> from lib.reaction import Reaction
+    >>> cmp = [Componente(i) for i in (1, 47, 62, 46)]
+    >>> rx = Reaction(comp=[1, 47, 62], coef=[-2, -1, 2], key=1, tipo=3,
+    ...               Ko=1e9, Ei=8e7)
+    >>> system = KineticSystem([rx], cmp)
+    >>> p = pfr(system, [0.002, 0.001, 0, 0.01], 700, 101325, 10, thermal=1)
+    >>> print("%0.4f %0.1f" % (p.conversion(1)[-1], p.T[-1]))
+    0.0903 700.0
+    """
+    F0 = asarray(F0, dtype=float)
+    n = len(F0)
+    escalaF = F0.sum()
+    if system.gas:
+        def conc(F, T):
+            return F*P/(maximum(F.sum(), 1e-300)*R*T)
+
+        def dconc(F, T, C):
+            Ft = maximum(F.sum(), 1e-300)
+            dCdF = P/R/T/Ft*(eye(n)-F[:, None]/Ft)
+            return dCdF, -C/T
+    else:
+        def conc(F, T):
+            return F/Qv
+
+        def dconc(F, T, C):
+            return eye(n)/Qv, zeros(n)
+
+    q, ua, Text = _heatTerms(thermal, Q, UA, Text, V)
+    y0 = concatenate((F0, [T0, 0]))
+    return _integrate(system, y0, V, conc, dconc, 1, thermal, q, ua, Text,
+                      0, points, method, rtol, atol*escalaF)
+
+
+def batch(system, N0, T0, V, t, thermal=0, Q=0, UA=0, Text=0, points=51,
+          method="BDF", rtol=1e-6, atol=1e-12):
+    """Batch reactor with constant volume
+
+    Parameters
+    ----------
+    system : KineticSystem
+        Reactions in reactor
+    N0 : array
+        Initial component moles, kmol
+    T0 : float
+        Initial temperature, K
+    V : float
+        Reactor volume, m³
+    t : float
+        Reaction time, s
+    thermal, Q, UA, Text, points, method :
+        Same meaning as in pfr, with Q the heat rate added to reactor, W
+
+    Returns
+    -------
+    Profile instance along time, F attribute are the moles in reactor
+
+    The energy balance in gas phase use the ideal gas isochoric heat
+    capacities.
+    """
+    N0 = asarray(N0, dtype=float)
+    n = len(N0)
+
+    def conc(N, T):
+        return N/V
+
+    def dconc(N, T, C):
+        return eye(n)/V, zeros(n)
+
+    if system.gas:
+        cvshift = R
+    else:
+        cvshift = 0
+    q, ua, Text = _heatTerms(thermal, Q, UA, Text, 1)
+    y0 = concatenate((N0, [T0, 0]))
+    return _integrate(system, y0, t, conc, dconc, V, thermal, q, ua, Text,
+                      cvshift, points, method, rtol, atol*N0.sum())
+
+
+def cstr(system, F0, T0, P, V, thermal=0, Q=0, UA=0, Text=0, T=None, Qv=None,
+         method="BDF", tol=1e-10):
+    """Continuous stirred tank reactor at steady state
+
+    The steady state is searched integrating the startup of reactor filled
+    with feed, and refined by Newton method with analytic jacobian, so in
+    systems with multiple steady states the stable state reached from
+    startup is returned.
+
+    Parameters
+    ----------
+    system : KineticSystem
+        Reactions in reactor
+    F0 : array
+        Inlet component molar flows, kmol/s
+    T0 : float
+        Inlet temperature, K
+    P : float
+        Pressure, Pa
+    V : float
+        Reactor volume, m³
+    thermal, Q, UA, Text, Qv, method :
+        Same meaning as in pfr
+    T : float
+        Temperature of isothermal reactor, default inlet temperature
+
+    Returns
+    -------
+    Profile instance with the inlet and outlet states
+    """
+    F0 = asarray(F0, dtype=float)
+    n = len(F0)
+    nu = system.nu
+    if T is None:
+        T = T0
+    Hin = dot(F0, system.enthalpy(T0))
+    S0 = dot(F0, system.cp(T0))
+    escala = F0.sum()
+    if thermal != 2:
+        Q = 0
+    if thermal != 3:
+        UA = 0
+
+    if system.gas:
+        def conc(F, T):
+            return F*P/(maximum(F.sum(), 1e-300)*R*T)
+
+        def dconc(F, T, C):
+            Ft = maximum(F.sum(), 1e-300)
+            return P/R/T/Ft*(eye(n)-F[:, None]/Ft), -C/T
+    else:
+        def conc(F, T):
+            return F/Qv
+
+        def dconc(F, T, C):
+            return eye(n)/Qv, zeros(n)
+
+    def residual(y):
+        F, Tr = y[:n]*escala, y[n]
+        C = conc(F, Tr)
+        r, drdC, drdT = system.derivatives(Tr, C)
+        dCdF, dCdT = dconc(F, Tr, C)
+        drdF = dot(drdC, dCdF)
+        drdT = drdT+dot(drdC, dCdT)
+
+        G = zeros(n+1)
+        J = zeros((n+1, n+1))
+        G[:n] = (F0-F+V*dot(nu, r))/escala
+        J[:n, :n] = -eye(n)+V*dot(nu, drdF)
+        J[:n, n] = V*dot(nu, drdT)/escala
+        if thermal == 1:
+            G[n] = Tr-T
+            J[n, n] = 1
+        else:
+            H = system.enthalpy(Tr)
+            G[n] = (Hin+Q+UA*(Text-Tr)-dot(F, H)-V*dot(system.Hr, r))/S0
+            J[n, :n] = (-H-V*dot(system.Hr, drdF))*escala/S0
+            J[n, n] = (-UA-dot(F, system.cp(Tr))-V*dot(system.Hr, drdT))/S0
+        return G, J
+
+    def fun(t, y):
+        G, J = residual(y)
+        return G
+
+    def jac(t, y):
+        G, J = residual(y)
+        return J
+
+    y0 = concatenate((F0/escala, [T0]))
+    if thermal == 1:
+        y0[n] = T
+    startup = solve_ivp(fun, (0, 50), y0, method=method, jac=jac, rtol=1e-6,
+                        atol=1e-9)
+    sol = root(residual, startup.y[:, -1], jac=True, tol=tol)
+    if not sol.success or abs(sol.fun).max() > 1e-6:
+        raise ValueError(sol.message)
+
+    F, Tr = sol.x[:n]*escala, sol.x[n]
+    Qr = dot(F, system.enthalpy(Tr))+V*dot(system.Hr, system.rates(
+        Tr, conc(F, Tr)))-Hin
+    Fs = array([F0, F]).T
+    Ts = array([T0, Tr])
+    C = array([conc(F0, T0), conc(F, Tr)]).T
+    r = system.rates(Ts, C)
+    prof = Profile(array([0, V]), Fs, Ts, array([0, Qr]), C, r)
+    prof.nfev = startup.nfev+sol.nfev
+    prof.njev = startup.njev
+    return prof
+
+
+def stoichiometric(system, F0, T0, conversion, thermal=0, Q=0, T=None):
+    """Reactor with fixed conversion of reactions, the reactions are
+    calculated in order with the conversion referred to the key component
+    of each reaction
+
+    Parameters
+    ----------
+    system : KineticSystem
+        Reactions in reactor
+    F0 : array
+        Inlet component molar flows, kmol/s
+    T0 : float
+        Inlet temperature, K
+    conversion : array
+        Conversion of key component for each reaction
+    thermal : integer
+        0 - Adiabatic, 1 - Isothermal, 2 - Fixed heat
+    Q : float
+        Heat added to reactor, W
+    T : float
+        Temperature of isothermal reactor, default inlet temperature
+
+    Returns
+    -------
+    Profile instance with the inlet and outlet states
+    """
+    F0 = asarray(F0, dtype=float)
+    F = F0.copy()
+    extent = zeros(len(conversion))
+    for j, X in enumerate(conversion):
+        extent[j] = X*F[system.key[j]]
+        F += system.nu[:, j]*extent[j]
+    if F.min() < -1e-12*F0.sum():
+        raise ValueError("Conversion greater than the limiting reactant")
+    F = maximum(F, 0)
+
+    Hin = dot(F0, system.enthalpy(T0))
+    Hrx = dot(system.Hr, extent)
+    if thermal == 1:
+        if T is None:
+            T = T0
+        Qr = dot(F, system.enthalpy(T))+Hrx-Hin
+    else:
+        if thermal != 2:
+            Q = 0
+
+        # Newton method for the adiabatic outlet temperature
+        T = T0
+        for i in range(50):
+            f = dot(F, system.enthalpy(T))+Hrx-Hin-Q
+            dT = -f/dot(F, system.cp(T))
+            T += dT
+            if abs(dT) < 1e-8:
+                break
+        else:
+            raise ValueError("Outlet temperature not converged")
+        Qr = Q
+
+    Fs = array([F0, F]).T
+    return Profile(array([0, 1]), Fs, array([T0, T]), array([0, Qr]),
+                   zeros(Fs.shape), zeros((len(extent), 2)))
@@ -0,0 +1,170 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+# Index of fluids available in lib.mEoS, generated with writeIndex.
+# To add a fluid include its name in the group and run
+#   python3 lib/mEoS/__init__.py --index
+# Each fluid is a (name, id) tuple, the name is the module and class name
+
+GROUPS = [
+    ("Nobles", [
+        ("He", 212),
+        ("Ne", 107),
+        ("Ar", 98),
+        ("Kr", None),
+        ("Xe", 1),
+    ]),
+    ("Gases", [
+        ("H2", 1),
+        ("D2", None),
+        ("pH2", 1),
+        ("oH2", 1),
+        ("N2", 46),
+        ("O2", 47),
+        ("F2", 208),
+        ("H2O", 62),
+        ("D2O", None),
+        ("CO2", 49),
+        ("CO", 48),
+        ("N2O", 110),
+        ("SO2", 51),
+        ("COS", 219),
+        ("NH3", 63),
+        ("H2S", 50),
+    ]),
+    ("Alkanes", [
+        ("CH4", 2),
+        ("C2", 3),
+        ("C3", 4),
+        ("nC4", 6),
+        ("iC4", 5),
+        ("nC5", 8),
+        ("neoC5", 9),
+        ("iC5", 7),
+        ("nC6", 10),
+        ("iC6", 52),
+        ("nC7", 11),
+        ("nC8", 12),
+        ("iC8", 82),
+        ("nC9", 13),
+        ("nC10", 14),
+        ("nC11", 15),
+        ("nC12", 16),
+    ]),
+    ("Naphthenes", [
+        ("Cyclopropane", 258),
+        ("Cyclopentane", 36),
+        ("Cyclohexane", 38),
+        ("C1Cyclohexane", 39),
+        ("C3Cyclohexane", 184),
+    ]),
+    ("Alkenes", [
+        ("Benzene", 40),
+        ("Toluene", 41),
+        ("oXylene", 42),
+        ("mXylene", 43),
+        ("pXylene", 44),
+        ("EthylBenzene", 45),
+        ("Ethylene", 22),
+        ("Propylene", 23),
+        ("Butene_1", 24),
+        ("iButene", 27),
+        ("Cis_2_butene", 25),
+        ("Trans_2_butene", 26),
+        ("Propyne", 66),
+        ("C1Oleate", 39),
+        ("C1Linolenate", 39),
+        ("C1Linoleate", 39),
+        ("C1Palmitate", 39),
+        ("C1Stearate", 39),
+    ]),
+    ("Heteroatom", [
+        ("Methanol", 117),
+        ("Ethanol", 134),
+        ("Acetone", 140),
+        ("DME", 133),
+        ("DEE", 162),
+        ("DMC", None),
+        ("NF3", 60),
+        ("SF6", 1),
+        ("HCl", 104),
+    ]),
+    ("CFCs", [
+        ("CF3I", 645),
+        ("C4F10", 693),
+        ("C5F12", 693),
+        ("R11", 217),
+        ("R12", 216),
+        ("R13", 215),
+        ("R14", 218),
+        ("R21", 642),
+        ("R22", 220),
+        ("R23", 643),
+        ("R32", 645),
+        ("R40", 115),
+        ("R41", 225),
+        ("R113", 232),
+        ("R114", 231),
+        ("R115", 229),
+        ("R116", 236),
+        ("R123", 236),
+        ("R124", 236),
+        ("R125", 236),
+        ("R134a", 236),
+        ("R141b", 236),
+        ("R142b", 241),
+        ("R143a", 243),
+        ("R152a", 245),
+        ("R161", 247),
+        ("R218", 671),
+        ("R227ea", 671),
+        ("R236ea", 693),
+        ("R236fa", 671),
+        ("R245ca", 693),
+        ("R245fa", 671),
+        ("R365mfc", 671),
+        ("RC318", 692),
+        ("R1234yf", None),
+        ("R1234ze", 671),
+        ("R1216", 669),
+        ("R1233zd", None),
+        ("RE143a", 671),
+        ("RE245cb2", 671),
+        ("RE245fa2", 671),
+        ("RE347mcc", 671),
+    ]),
+    ("Siloxanes", [
+        ("D4", None),
+        ("D5", None),
+        ("D6", None),
+        ("MDM", None),
+        ("MD2M", 39),
+        ("MD3M", 39),
+        ("MD4M", None),
+        ("MM", 1376),
+    ]),
+    ("PseudoCompounds", [
+        ("Air", 475),
+        ("R404a", 62),
+        ("R407c", 62),
+        ("R410a", 62),
+        ("R507a", 62),
+    ]),
+]
@@ -24,10 +24,16 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 #   o   Ecuación de estado Setzmann-Wagner, basada en la energía de Helmholtz
 #   o   Ecuación MBWR
 #   o   Ecuación Peng-Robinson con translación de Peneloux
+#
+# The transport correlations of each fluid are compiled to coefficient arrays
+# when the class is defined, so they can be evaluated for arrays of states,
+# see MEoS.transport
 #############################################################################
 
 import os
 from itertools import product
+from numpy import (arange, array, asarray, broadcast_arrays, broadcast_to,
+                   empty, errstate, full, maximum, nan, ndindex, where)
 from PyQt5.QtWidgets import QApplication
 from scipy import exp, log, log10, sin, sinh, cosh, tanh, arctan
 try:
@@ -42,6 +48,168 @@ from lib.physics import R_atml
 from lib.thermo import ThermoAdvanced
 
 
+# Default collision integral coefficients for Lemmon and Younglove methods
+_COLLISION = {
+    1: [0.431, -0.4623, 0.08406, 0.005341, -0.00331],
+    2: [-3.0328138281, 16.918880086, -37.189364917, 41.288861858,
+        -24.615921140, 8.9488430959, -1.8739245042, 0.20966101390,
+        -0.009657043707]}
+
+# Chung viscosity correlation coefficients
+_ChungA0 = (6.32402, 0.12102e-2, 5.28346, 6.62263, 19.74540, -1.89992,
+            24.2745, 0.79716, -0.23816, 0.68629e-1)
+_ChungA1 = (50.4119, -0.11536e-2, 254.209, 38.0957, 7.63034, -12.5367,
+            3.44945, 1.11764, 0.67695e-1, 0.34793)
+_ChungA2 = (-51.6801, -0.62571e-2, -168.481, -8.46414, -14.3544, 4.98529,
+            -11.2913, 0.12348e-1, -0.8163, 0.59256)
+_ChungA3 = (1189.02, 0.37283e-1, 3898.27, 31.4178, 31.5267, -18.1507,
+            69.3466, -4.11661, 4.02528, -0.72663)
+
+
+def _compileTransport(corr):
+    """Return a copy of a transport correlation dict with the coefficient
+    lists converted to arrays, to evaluate the correlation for arrays of
+    states without python loops"""
+    if not corr:
+        return corr
+    coef = {}
+    for key, value in corr.items():
+        if isinstance(value, dict):
+            coef[key] = _compileTransport(value)
+        elif isinstance(value, (list, tuple)) and value and all(
+                isinstance(x, (int, float)) and not isinstance(x, bool)
+                for x in value):
+            coef[key] = array(value, dtype=float)
+        else:
+            coef[key] = value
+
+    # Collision integral coefficients and exponents
+    if coef.get("omega") in (1, 2):
+        b = array(coef.get("collision", _COLLISION[coef["omega"]]), float)
+        i = arange(len(b))
+        coef["_collision"] = b
+        if coef["omega"] == 1:
+            coef["_collision_t"] = i
+        else:
+            coef["_collision_t"] = (3.-i)/3.
+
+    # Dilute gas exponents in thermal conductivity correlations with
+    # Younglove form
+    if "b" in coef and "Nchapman" in coef:
+        coef["_b_t"] = (3.-arange(len(coef["b"])))/3.
+    return coef
+
+
+def _unsupported(coef, thermal=False):
+    """Return the reason a transport correlation is not available, or None
+    for supported correlations. The correlation forms that have not been
+    validated against the reference values of its source paper are kept
+    unsupported:
+
+        * Viscosity with the Younglove (eq=2) and Hanley (eq=3) forms, and
+          dilute gas with a n_polyden denominator out of eq=3
+        * Thermal conductivity with the Younglove (eq=2) form, the forms
+          without implementation, the critical enhancement forms 2 and 4
+          and the dilute gas denominator with exponents named coden
+
+    coef: Transport correlation dict
+    thermal: boolean to check a thermal conductivity correlation
+
+    The forms with reference values in its paper don't reproduce them, as
+    the argon viscosity of Younglove (1986), 270.0 μPa·s at 86 K and 0.1 MPa,
+    or the hydrogen thermal conductivity of Assael (2011), 185.67 mW/m·K at
+    298.15 K in the dilute gas limit, so the states using it raise:
+
+    >>> from lib.mEoS import Ar, H2
+    >>> Ar(T=86, P=1e5, visco=1)
+    Traceback (most recent call last):
+        ...
+    NotImplementedError: Ar viscosity Younglove (1986): viscosity form eq=3 \
+not validated
+    >>> H2(T=298.15, rho=0)
+    Traceback (most recent call last):
+        ...
+    NotImplementedError: H2 thermal conductivity Assael (2011): dilute gas \
+denominator not validated
+    """
+    eq = coef.get("eq")
+    if not thermal:
+        if eq in (2, 3):
+            return "viscosity form eq=%i not validated" % eq
+        if eq not in (0, 5, "ecs") and "n_polyden" in coef:
+            return "dilute gas denominator not validated"
+    else:
+        if eq not in (0, 1, 3, "ecs"):
+            return "thermal conductivity form eq=%s not validated" % eq
+        if coef.get("critical") in (2, 4):
+            return "critical enhancement form %i not validated" % \
+                coef["critical"]
+        if "noden" in coef and "toden" not in coef:
+            return "dilute gas denominator not validated"
+    return None
+
+
+def _terms(n, *args):
+    """Return the n·Πxᵉ terms of a correlation, the last axis of result is
+    the terms axis
+    n: array of coefficients
+    args: pairs of variable, scalar or array, and its array of exponents"""
+    # Truncate to the shortest coefficients list as zip does
+    m = min([len(n)]+[len(e) for e in args[1::2]])
+    value = n[:m]
+    for x, e in zip(args[::2], args[1::2]):
+        value = value*asarray(x, dtype=float)[..., None]**e[:m]
+    return value
+
+
+def _sum(n, *args):
+    """Sum of n·Πxᵉ terms of a correlation, see _terms"""
+    return _terms(n, *args).sum(axis=-1)
+
+
+def _sumExp(terms, c, x):
+    """Sum of terms where the accumulated value is multiplied by exp(-x^c)
+    for each term with c not zero, as the rational terms of residual
+    viscosity are evaluated"""
+    suma = 0
+    for i, ci in zip(range(terms.shape[-1]), c):
+        suma = suma+terms[..., i]
+        if ci:
+            suma = suma*exp(-x**ci)
+    return suma
+
+
+def _nonzero(x):
+    """Check a variable is not zero, for arrays all its values must be
+    not zero, used in the equation of state evaluation for arrays of states"""
+    return bool((asarray(x) != 0).all())
+
+
+def _derivative(z, x, y, fase, P, T):
+    """Calculate generic partial derivative: (δz/δx)y
+    where x, y, z can be: P, T, v, u, h, s, g, a
+    P and T are the pressure and temperature of phase, can be arrays"""
+    dT = {"P": P*fase.alfap,
+          "T": 1,
+          "v": 0,
+          "rho": 0,
+          "u": fase.cv,
+          "h": fase.cv+P*fase.v*fase.alfap,
+          "s": fase.cv/T,
+          "g": P*fase.v*fase.alfap-fase.s,
+          "a": -fase.s}
+    dv = {"P": -P*fase.betap,
+          "T": 0,
+          "v": 1,
+          "rho": -1,
+          "u": P*(T*fase.alfap-1),
+          "h": P*(T*fase.alfap-fase.v*fase.betap),
+          "s": P*fase.alfap,
+          "g": -P*fase.v*fase.betap,
+          "a": -P}
+    return (dv[z]*dT[y]-dT[z]*dv[y])/(dv[x]*dT[y]-dT[x]*dv[y])
+
+
 class MEoS(ThermoAdvanced):
     """General class for implement multiparameter equation of state
     Each child class must define parameters for do calculations:
@@ -99,6 +267,12 @@ class MEoS(ThermoAdvanced):
     _thermal = None
     _critical = None
 
+    # Precompiled transport correlations, and the selected ones
+    _compiledViscosity = ()
+    _compiledThermal = ()
+    _viscoCoef = None
+    _thermoCoef = None
+
     _test = []
 
     kwargs = {"T": 0.0,
@@ -116,7 +290,8 @@ class MEoS(ThermoAdvanced):
               "ref": None,
               "refvalues": None,
               "rho0": 0,
-              "T0": 0}
+              "T0": 0,
+              "lazy": False}
     status = 0
     msg = QApplication.translate("pychemqt", "Unknown Variables")
     __doi__ = {
@@ -137,6 +312,24 @@ class MEoS(ThermoAdvanced):
              "doi": "10.1007/s10765-005-2351-5"}
         }
 
+    def __init_subclass__(cls, **kwargs):
+        """Precompile the transport correlations of fluid"""
+        super().__init_subclass__(**kwargs)
+        if "_viscosity" in cls.__dict__:
+            cls._compiledViscosity = tuple(
+                _compileTransport(c) for c in cls._viscosity or ())
+            for coef in cls._compiledViscosity:
+                reason = coef and _unsupported(coef)
+                if reason:
+                    coef["unsupported"] = reason
+        if "_thermal" in cls.__dict__:
+            cls._compiledThermal = tuple(
+                _compileTransport(c) for c in cls._thermal or ())
+            for coef in cls._compiledThermal:
+                reason = coef and _unsupported(coef, thermal=True)
+                if reason:
+                    coef["unsupported"] = reason
+
     def __init__(self, **kwargs):
         """Incoming properties:
         T   -   Temperature, K
@@ -167,6 +360,9 @@ class MEoS(ThermoAdvanced):
             [Tref, Pref, ho, so]
         rho0: Initial value for iteration over density
         T0: Initial value for iteration over temperature
+        lazy: Boolean to calculate the derived properties (derivatives,
+            transport properties, dielectric constant...) only in its first
+            access, useful when only a few properties are needed
 
     Calculated properties:
         P         -   Pressure, MPa
@@ -332,14 +528,9 @@ class MEoS(ThermoAdvanced):
 
         return bool(self._mode)
 
-    def calculo(self):
-        T = self.kwargs["T"]
-        rho = self.kwargs["rho"]
-        P = self.kwargs["P"]
-        s = self.kwargs["s"]
-        h = self.kwargs["h"]
-        u = self.kwargs["u"]
-        x = self.kwargs["x"]
+    def _setEquation(self):
+        """Select the equation of state and the transport correlations to use
+        from the input parameters, return the index of equation"""
         eq = self.kwargs["eq"]
         visco = self.kwargs["visco"]
         thermal = self.kwargs["thermal"]
@@ -348,9 +539,6 @@ class MEoS(ThermoAdvanced):
 
         self._ref(ref, refvalues)
 
-        if self.id:
-            self.componente = compuestos.Componente(self.id)
-
         # Opcion de aceptar el nombre interno de la ecuacion
         if isinstance(eq, str) and eq in self.__class__.__dict__:
             eq = self.eq.index(self.__class__.__dict__[eq])
@@ -380,10 +568,27 @@ class MEoS(ThermoAdvanced):
             self._eq = self._ECS
             self._constants = self.eq[eq]
 
-        if self._viscosity:
-            self._viscosity = self._viscosity[visco]
-        if self._thermal:
-            self._thermal = self._thermal[thermal]
+        # Transport correlations, with its precompiled coefficients
+        if self.__class__._viscosity:
+            self._viscosity = self.__class__._viscosity[visco]
+            self._viscoCoef = self._compiledViscosity[visco]
+        if self.__class__._thermal:
+            self._thermal = self.__class__._thermal[thermal]
+            self._thermoCoef = self._compiledThermal[thermal]
+        return eq
+
+    def calculo(self):
+        T = self.kwargs["T"]
+        rho = self.kwargs["rho"]
+        P = self.kwargs["P"]
+        s = self.kwargs["s"]
+        h = self.kwargs["h"]
+        u = self.kwargs["u"]
+        x = self.kwargs["x"]
+        eq = self._setEquation()
+
+        if self.id:
+            self.componente = compuestos.Componente(self.id)
 
         propiedades = None
 
@@ -896,73 +1101,98 @@ class MEoS(ThermoAdvanced):
 
         fase.alfap = unidades.InvTemperature(estado["alfap"])
         fase.betap = unidades.Density(estado["betap"])
-        fase.joule = unidades.TemperaturePressure(
-            self.derivative("T", "P", "h", fase))
-        fase.Gruneisen = unidades.Dimensionless(
-            fase.v/fase.cv*self.derivative("P", "T", "v", fase))
+
+        # Derived properties, in lazy mode calculated only in the first
+        # access, the state variables are saved locally to be independent
+        # of later calculations of instance
+        P, T = self.P, self.T
+
+        def derivative(z, x, y):
+            return _derivative(z, x, y, fase, P, T)
+
+        prop = {}
+        prop["joule"] = lambda: unidades.TemperaturePressure(
+            derivative("T", "P", "h"))
+        prop["Gruneisen"] = lambda: unidades.Dimensionless(
+            fase.v/fase.cv*derivative("P", "T", "v"))
 
         if fase.rho:
-            fase.alfav = unidades.InvTemperature(
-                self.derivative("v", "T", "P", fase)/fase.v)
-            fase.kappa = unidades.InvPressure(
-                -self.derivative("v", "P", "T", fase)/fase.v)
-            fase.kappas = unidades.InvPressure(
-                -1/fase.v*self.derivative("v", "P", "s", fase))
-            fase.betas = unidades.TemperaturePressure(
-                self.derivative("T", "P", "s", fase))
-            fase.kt = unidades.Dimensionless(
-                -fase.v/self.P*self.derivative("P", "v", "T", fase))
-            fase.ks = unidades.Dimensionless(
-                -fase.v/self.P*self.derivative("P", "v", "s", fase))
-            fase.Ks = unidades.Pressure(
-                -fase.v*self.derivative("P", "v", "s", fase))
-            fase.Kt = unidades.Pressure(
-                -fase.v*self.derivative("P", "v", "T", fase))
-            fase.dhdT_rho = unidades.SpecificHeat(
-                self.derivative("h", "T", "rho", fase))
-            fase.dhdT_P = unidades.SpecificHeat(
-                self.derivative("h", "T", "P", fase))
-            fase.dhdP_T = unidades.EnthalpyPressure(
-                self.derivative("h", "P", "T", fase))  # deltat
-            fase.deltat = fase.dhdP_T
-            fase.dhdP_rho = unidades.EnthalpyPressure(
-                self.derivative("h", "P", "rho", fase))
-            fase.dhdrho_T = unidades.EnthalpyDensity(estado["dhdrho"])
-            fase.dhdrho_P = unidades.EnthalpyDensity(
+            prop["alfav"] = lambda: unidades.InvTemperature(
+                derivative("v", "T", "P")/fase.v)
+            prop["kappa"] = lambda: unidades.InvPressure(
+                -derivative("v", "P", "T")/fase.v)
+            prop["kappas"] = lambda: unidades.InvPressure(
+                -1/fase.v*derivative("v", "P", "s"))
+            prop["betas"] = lambda: unidades.TemperaturePressure(
+                derivative("T", "P", "s"))
+            prop["kt"] = lambda: unidades.Dimensionless(
+                -fase.v/P*derivative("P", "v", "T"))
+            prop["ks"] = lambda: unidades.Dimensionless(
+                -fase.v/P*derivative("P", "v", "s"))
+            prop["Ks"] = lambda: unidades.Pressure(
+                -fase.v*derivative("P", "v", "s"))
+            prop["Kt"] = lambda: unidades.Pressure(
+                -fase.v*derivative("P", "v", "T"))
+            prop["dhdT_rho"] = lambda: unidades.SpecificHeat(
+                derivative("h", "T", "rho"))
+            prop["dhdT_P"] = lambda: unidades.SpecificHeat(
+                derivative("h", "T", "P"))
+            prop["dhdP_T"] = lambda: unidades.EnthalpyPressure(
+                derivative("h", "P", "T"))  # deltat
+            prop["deltat"] = lambda: fase.dhdP_T
+            prop["dhdP_rho"] = lambda: unidades.EnthalpyPressure(
+                derivative("h", "P", "rho"))
+            prop["dhdrho_T"] = lambda: unidades.EnthalpyDensity(
+                estado["dhdrho"])
+            prop["dhdrho_P"] = lambda: unidades.EnthalpyDensity(
                 estado["dhdrho"]+fase.dhdT_rho/estado["drhodt"])
-            fase.dpdT_rho = unidades.PressureTemperature(
-                self.derivative("P", "T", "rho", fase))
-            fase.dpdrho_T = unidades.PressureDensity(estado["dpdrho"])
-            fase.drhodP_T = unidades.DensityPressure(1/estado["dpdrho"])
-            fase.drhodT_P = unidades.DensityTemperature(estado["drhodt"])
-
-            fase.Z_rho = unidades.SpecificVolume((fase.Z-1)/fase.rho)
-            fase.IntP = unidades.Pressure(
-                self.T*self.derivative("P", "T", "rho", fase)-self.P)
-            fase.hInput = unidades.Enthalpy(
-                fase.v*self.derivative("h", "v", "P", fase))
-
-            fase.virialB = unidades.SpecificVolume(estado["B"]/self.rhoc)
-            fase.virialC = unidades.SpecificVolume_square(
+            prop["dpdT_rho"] = lambda: unidades.PressureTemperature(
+                derivative("P", "T", "rho"))
+            prop["dpdrho_T"] = lambda: unidades.PressureDensity(
+                estado["dpdrho"])
+            prop["drhodP_T"] = lambda: unidades.DensityPressure(
+                1/estado["dpdrho"])
+            prop["drhodT_P"] = lambda: unidades.DensityTemperature(
+                estado["drhodt"])
+
+            prop["Z_rho"] = lambda: unidades.SpecificVolume(
+                (fase.Z-1)/fase.rho)
+            prop["IntP"] = lambda: unidades.Pressure(
+                T*derivative("P", "T", "rho")-P)
+            prop["hInput"] = lambda: unidades.Enthalpy(
+                fase.v*derivative("h", "v", "P"))
+
+            prop["virialB"] = lambda: unidades.SpecificVolume(
+                estado["B"]/self.rhoc)
+            prop["virialC"] = lambda: unidades.SpecificVolume_square(
                 estado["C"]/self.rhoc**2)
-            fase.invT = unidades.InvTemperature(-1/self.T)
+            prop["invT"] = lambda: unidades.InvTemperature(-1/T)
 
-        fase.mu = self._Viscosity(fase.rho, self.T, fase)
-        fase.k = self._ThCond(fase.rho, self.T, fase)
-        if fase.mu and fase.rho:
-            fase.nu = unidades.Diffusivity(fase.mu/fase.rho)
-        else:
-            fase.nu = unidades.Diffusivity(None)
-        if fase.k and fase.rho:
-            fase.alfa = unidades.Diffusivity(fase.k/fase.rho/fase.cp)
-        else:
-            fase.alfa = unidades.Diffusivity(None)
-        if fase.mu and fase.k:
-            fase.Prandt = unidades.Dimensionless(fase.mu*fase.cp/fase.k)
-        else:
-            fase.Prandt = unidades.Dimensionless(None)
-        fase.epsilon = unidades.Dimensionless(
-            self._Dielectric(fase.rho, self.T))
+        prop["mu"] = lambda: self._Viscosity(fase.rho, T, fase)
+        prop["k"] = lambda: self._ThCond(fase.rho, T, fase)
+
+        def nu():
+            if fase.mu and fase.rho:
+                return unidades.Diffusivity(fase.mu/fase.rho)
+            return unidades.Diffusivity(None)
+        prop["nu"] = nu
+
+        def alfa():
+            if fase.k and fase.rho:
+                return unidades.Diffusivity(fase.k/fase.rho/fase.cp)
+            return unidades.Diffusivity(None)
+        prop["alfa"] = alfa
+
+        def Prandt():
+            if fase.mu and fase.k:
+                return unidades.Dimensionless(fase.mu*fase.cp/fase.k)
+            return unidades.Dimensionless(None)
+        prop["Prandt"] = Prandt
+
+        prop["epsilon"] = lambda: unidades.Dimensionless(
+            self._Dielectric(fase.rho, T))
+
+        fase.setLazy(prop, self.kwargs["lazy"])
         fase.fraccion = [1]
         fase.fraccion_masica = [1]
 
@@ -1012,7 +1242,7 @@ class MEoS(ThermoAdvanced):
 
         propiedades["T"] = T
         propiedades["P"] = (1+delta*fird)*self.R*T*rho
-        if rho:
+        if _nonzero(rho):
             propiedades["v"] = 1./rho
         else:
             propiedades["v"] = float("inf")
@@ -1032,7 +1262,7 @@ class MEoS(ThermoAdvanced):
         propiedades["dpdrho"] = self.R*T*(1+2*delta*fird+delta**2*firdd)
         propiedades["drhodt"] = -rho*(1+delta*fird-delta*tau*firdt) / \
             (T*(1+2*delta*fird+delta**2*firdd))
-        if rho:
+        if _nonzero(rho):
             propiedades["dhdrho"] = self.R*T/rho * \
                 (tau*delta*(fiodt+firdt)+delta*fird+delta**2*firdd)
         else:
@@ -1488,7 +1718,7 @@ class MEoS(ThermoAdvanced):
         fiot=Fi0["ao_log"][1]/tau
         fiott=-Fi0["ao_log"][1]/tau**2
 
-        if delta:
+        if _nonzero(delta):
             fiod = 1/delta
             fiodd = -1/delta**2
         else:
@@ -1511,7 +1741,7 @@ class MEoS(ThermoAdvanced):
             fio += Fi0["tau*logtau"]*tau*log(tau)
             fiot += Fi0["tau*logtau"]*(log(tau)+1)
             fiot += Fi0["tau*logtau"]/tau
-        if "tau*logdelta" in Fi0 and delta:
+        if "tau*logdelta" in Fi0 and _nonzero(delta):
             fio += Fi0["tau*logdelta"]*tau*log(delta)
             fiot += Fi0["tau*logdelta"]*log(delta)
             fiod += Fi0["tau*logdelta"]*tau/delta
@@ -1537,7 +1767,7 @@ class MEoS(ThermoAdvanced):
 
         R_ = cp.get("R", self._constants["R"])
         factor = R_/self._constants["R"]
-        if delta:
+        if _nonzero(delta):
             fio = Fi0["ao_log"][0]*log(delta)+factor*fio
         else:
             fio *= factor
@@ -1599,7 +1829,7 @@ class MEoS(ThermoAdvanced):
         delta_0 = 1e-200
         fir = fird = firdd = firt = firtt = firdt = firdtt = B = C = 0
 
-        if delta:
+        if _nonzero(delta):
             # Polinomial terms
             nr1 = self._constants.get("nr1", [])
             d1 = self._constants.get("d1", [])
@@ -1845,25 +2075,7 @@ class MEoS(ThermoAdvanced):
     def derivative(self, z, x, y, fase):
         """Calculate generic partial derivative: (δz/δx)y
         where x, y, z can be: P, T, v, u, h, s, g, a"""
-        dT = {"P": self.P*fase.alfap,
-              "T": 1,
-              "v": 0,
-              "rho": 0,
-              "u": fase.cv,
-              "h": fase.cv+self.P*fase.v*fase.alfap,
-              "s": fase.cv/self.T,
-              "g": self.P*fase.v*fase.alfap-fase.s,
-              "a": -fase.s}
-        dv = {"P": -self.P*fase.betap,
-              "T": 0,
-              "v": 1,
-              "rho": -1,
-              "u": self.P*(self.T*fase.alfap-1),
-              "h": self.P*(self.T*fase.alfap-fase.v*fase.betap),
-              "s": self.P*fase.alfap,
-              "g": -self.P*fase.v*fase.betap,
-              "a": -self.P}
-        return (dv[z]*dT[y]-dT[z]*dv[y])/(dv[x]*dT[y]-dT[x]*dv[y])
+        return _derivative(z, x, y, fase, self.P, self.T)
 
     def _Dielectric(self, rho, T):
         if self._dielectric:
@@ -2066,12 +2278,14 @@ class MEoS(ThermoAdvanced):
             sigma = None
         return sigma
 
-    def _Omega(self):
+    def _Omega(self, T=None, coef=None):
         """Collision integral calculations
             0 - None
             1 - Lemmon: nitrogen. oxygen, argon, aire  and custom collison parameter, co2
             2 - Younglove: C1, C2, C3, iC4, nC4
             3 - CI0 from NIST:  Chung
+        T: Temperature, default the state temperature, can be an array
+        coef: Compiled viscosity correlation, default the selected one
         Ref:
             Lemmon, E.W. and Jacobsen, R.T, "Viscosity and Thermal Conductivity Equations for Nitrogen, Oxygen, Argon, and Air," Int. J. Thermophys., 25:21-69, 2004.
             Younglove, B.A. and Ely, J.F. (1987). Thermophysical properties of fluids. II. Methane, ethane, propane, isobutane and normal butane. J. Phys. Chem. Ref. Data  16: 577-798.
@@ -2079,225 +2293,194 @@ class MEoS(ThermoAdvanced):
             Fenghour, A., Wakeham, W.A., Vesovic, V., "The Viscosity of Carbon Dioxide," J. Phys. Chem. Ref. Data, 27:31-44, 1998.
             T-H. Chung, Ajlan, M., Lee, L.L. and Starling, K.E. "Generalized Multiparameter Correlation for Nonpolar and Polar Fluid Transport Properties" Ind. Eng. Chem. Res. 1998, 27, 671-679,
         """
-        if self._viscosity["omega"] == 1:
-            if "collision" in self._viscosity:
-                b = self._viscosity["collision"]
-            else:
-                b = [0.431, -0.4623, 0.08406, 0.005341, -0.00331]
-            T_ = log(self.T/self._viscosity["ek"])
-            suma = 0
-            for i, bi in enumerate(b):
-                suma += bi*T_**i
-            omega = exp(suma)
-        elif self._viscosity["omega"] == 2:
-            if "collision" in self._viscosity:
-                b = self._viscosity["collision"]
-            else:
-                b = [-3.0328138281, 16.918880086, -37.189364917, 41.288861858,
-                     -24.615921140, 8.9488430959, -1.8739245042, 0.20966101390,
-                     -0.009657043707]
-            T_ = self._viscosity["ek"]/self.T
-            suma = 0
-            for i, bi in enumerate(b):
-                suma += bi*T_**((3.-i)/3.)
-            omega = 1./suma
-        elif self._viscosity["omega"] == 3:
+        if T is None:
+            T = self.T
+        if coef is None:
+            coef = self._viscoCoef
+        T = asarray(T, dtype=float)
+
+        if coef["omega"] == 1:
+            T_ = log(T/coef["ek"])
+            omega = exp(_sum(coef["_collision"], T_, coef["_collision_t"]))
+        elif coef["omega"] == 2:
+            T_ = coef["ek"]/T
+            omega = 1./_sum(coef["_collision"], T_, coef["_collision_t"])
+        elif coef["omega"] == 3:
             # FIXME: reference from https://github.com/thorade/HelmholtzMedia/blob/master/Interfaces/PartialHelmholtzMedium/Transport/dynamicViscosity_dilute.mo#L27
-            T_ = self.T/self._viscosity.get("ek", self.Tc/1.2593)
+            T_ = T/coef.get("ek", self.Tc/1.2593)
             omega = 1.16145/T_**0.14874 + 0.52487/exp(0.77320*T_) + \
                 2.16178/exp(2.4378*T_) - \
                 6.435e-4*T_**0.14874*sin(18.0323*T_**-0.76830-7.27371)
         return omega
 
-    def _Visco0(self):
-        if self._viscosity["eq"] == 3:
-            Tc = self._viscosity.get("Tref", 1.)
-            rhoc = self._viscosity.get("rhoref", 1.)
-            tau = self.T/Tc
-            delta = self.rho/self.M/rhoc
-            muo = 0
-            for n, t in zip(self._viscosity["n_poly"], self._viscosity["t_poly"]):
-                muo += n*tau**t
-            if "n_polyden" in self._viscosity:
+    def _Visco0(self, T=None, rho=None, coef=None):
+        """Dilute gas viscosity, in μPa·s
+        T: Temperature, default the state temperature, can be an array
+        rho: Density, default the state density, can be an array
+        coef: Compiled viscosity correlation, default the selected one"""
+        if T is None:
+            T = self.T
+        if coef is None:
+            coef = self._viscoCoef
+        T = asarray(T, dtype=float)
+
+        if coef["eq"] == 3:
+            tau = T/coef.get("Tref", 1.)
+            muo = _sum(coef["n_poly"], tau, coef["t_poly"])
+            if "n_polyden" in coef:
+                if rho is None:
+                    rho = self.rho
+                delta = asarray(rho, dtype=float)/self.M/coef.get("rhoref", 1.)
                 den = 1
-                for n, t, d in zip(self._viscosity["n_polyden"], self._viscosity["t_polyden"], self._viscosity["d_polyden"]):
-                    den *= n*tau**t*delta**d
-                    muo /= den
-        elif self._viscosity["eq"] == 5:
-            omega = self._Omega()
-            Fc = 1-0.2756*self._viscosity["w"] + \
-                0.059035*self._viscosity["mur"]**4+self._viscosity["k"]
-            muo = 4.0795e-5*(self.M*self.T)**0.5*self.rhoc**(2./3.)/omega*Fc
+                for n, t, d in zip(coef["n_polyden"], coef["t_polyden"],
+                                   coef["d_polyden"]):
+                    den = den*n*tau**t*delta**d
+                    muo = muo/den
+        elif coef["eq"] == 5:
+            omega = self._Omega(T, coef)
+            Fc = 1-0.2756*coef["w"]+0.059035*coef["mur"]**4+coef["k"]
+            muo = 4.0795e-5*(self.M*T)**0.5*self.rhoc**(2./3.)/omega*Fc
         else:
-            omega = self._Omega()
-            Nchapman = self._viscosity.get("n_chapman", 0.0266958)
-            tchapman = self._viscosity.get("t_chapman", 0.5)
-            muo = Nchapman*(self.M*self.T)**tchapman/(self._viscosity["sigma"]**2*omega)
+            omega = self._Omega(T, coef)
+            Nchapman = coef.get("n_chapman", 0.0266958)
+            tchapman = coef.get("t_chapman", 0.5)
+            muo = Nchapman*(self.M*T)**tchapman/(coef["sigma"]**2*omega)
 
             # other adittional empirical terms
-            tau = self.T/self._viscosity["Tref"]
-            if "n_ideal" in self._viscosity:
-                for n, t in zip(self._viscosity["n_ideal"], self._viscosity["t_ideal"]):
-                    muo += n*tau**t
-            if "n_poly" in self._viscosity:
-                for n, t in zip(self._viscosity["n_poly"], self._viscosity["t_poly"]):
-                    muo += n*tau**t
-            if "n_polyden" in self._viscosity:
+            if "n_ideal" in coef or "n_poly" in coef or "n_polyden" in coef:
+                tau = T/coef["Tref"]
+            if "n_ideal" in coef:
+                muo = muo+_sum(coef["n_ideal"], tau, coef["t_ideal"])
+            if "n_poly" in coef:
+                muo = muo+_sum(coef["n_poly"], tau, coef["t_poly"])
+            if "n_polyden" in coef:
                 den = 1
-                for n, t, d in zip(self._viscosity["n_polyden"], self._viscosity["t_polyden"]):
-                    den *= n*tau**t
-                    muo /= den
+                for n, t in zip(coef["n_polyden"], coef["t_polyden"]):
+                    den = den*n*tau**t
+                    muo = muo/den
 
         return muo
 
-    def _Viscosity(self, rho, T, fase):
-        if self._viscosity:
-            if self._viscosity["eq"] == 0:
-                # Hardcoded method
-                mu = self.__getattribute__(self._viscosity["method"])(rho, T, fase)*1e6
-
-            elif self._viscosity["eq"] == 1:
-                muo = self._Visco0()
-
-                if rho > 0:
-                    # second virial
-                    Tc = self._viscosity.get("Tref_virial", self.Tc)
-                    etar = self._viscosity.get("etaref_virial", 1.)
-                    tau = T/Tc
-                    mud = 0
-                    if "n_virial" in self._viscosity:
-                        muB = 0
-                        for n, t in zip(self._viscosity["n_virial"],
-                                        self._viscosity["t_virial"]):
-                            muB += n*tau**t
-                        mud = etar*muB*rho/self.M*muo
-
-                    Tc = self._viscosity.get("Tref_res", self.Tc)
-                    rhoc = self._viscosity.get("rhoref_res", self.rhoc)
-                    mured = self._viscosity.get("etaref_res", 1.)
-                    tau = Tc/T
-                    delta = rho/rhoc
-                    if abs(delta-1) <= 0.001:
-                        expdel = rho/self.rhoc
-                    else:
-                        expdel = delta
-
-                    mur = 0
-                    # close-packed density;
-                    if "n_packed" in self._viscosity:
-                        del0 = 0
-                        for n, t in zip(self._viscosity["n_packed"],
-                                        self._viscosity["t_packed"]):
-                            del0 += n*tau**t
-                    else:
-                        del0 = 1.
-
-                    # polynomial term
-                    if "n_poly" in self._viscosity:
-                        for n, t, d, c, g in zip(
-                            self._viscosity["n_poly"], self._viscosity["t_poly"],
-                            self._viscosity["d_poly"], self._viscosity["c_poly"],
-                            self._viscosity["g_poly"]):
-                            vis = n*tau**t*delta**d*del0**g
-                            if c:
-                                vis *= exp(-expdel**c)
-                            mur += vis
-                    # numerator of rational poly; denominator of rat. poly;
-                    num = 0
-                    if "n_num" in self._viscosity:
-                        for n, t, d, c, g in zip(
-                            self._viscosity["n_num"], self._viscosity["t_num"],
-                            self._viscosity["d_num"], self._viscosity["c_num"],
-                            self._viscosity["g_num"]):
-                            num += n*tau**t*delta**d*del0**g
-                            if c:
-                                num *= exp(-expdel**c)
-                    if "n_den" in self._viscosity:
-                        den = 0
-                        for n, t, d, c, g in zip(
-                            self._viscosity["n_den"], self._viscosity["t_den"],
-                            self._viscosity["d_den"], self._viscosity["c_den"],
-                            self._viscosity["g_den"]):
-                            den += n*tau**t*delta**d*del0**g
-                            if c:
-                                den *= exp(-expdel**c)
-                    else:
-                        den = 1.
-                    mur += num/den
-
-                    # numerator of exponential; denominator of exponential
-                    num = 0
-                    if "n_numexp" in self._viscosity:
-                        for n, t, d, c, g in zip(
-                            self._viscosity["n_numexp"], self._viscosity["t_numexp"],
-                            self._viscosity["d_numexp"], self._viscosity["c_numexp"],
-                            self._viscosity["g_numexp"]):
-                            num += n*tau**t*delta**d*del0**g
-                    if "n_denexp" in self._viscosity:
-                        den = 0
-                        for n, t, d, c, g in zip(
-                            self._viscosity["n_denexp"], self._viscosity["t_denexp"],
-                            self._viscosity["d_denexp"], self._viscosity["c_denexp"],
-                            self._viscosity["g_denexp"]):
-                            den += n*tau**t*delta**d*del0**g
-                        else:
-                            den = 1.
-                    if "n_numexp" in self._viscosity:
-                        mur += exp(num/den)
-
-                    mur *= mured
+    def _Viscosity(self, rho, T, fase=None):
+        """Viscosity calculation, return a unidades.Viscosity instance"""
+        mu = self._viscosityArray(rho, T, fase)
+        if mu is not None:
+            mu = float(mu)
+        return unidades.Viscosity(mu, "muPas")
+
+    def _viscosityArray(self, rho, T, fase=None, coef=None):
+        """Viscosity calculation in μPa·s, rho and T can be arrays
+        fase: Phase with the thermodynamic properties, only necessary for
+            correlation with terms dependent of thermodynamic derivatives
+        coef: Compiled viscosity correlation, default the selected one
+        The hardcoded correlations of fluids are only available for scalar
+        input, see transport method to array evaluation of that"""
+        if coef is None:
+            coef = self._viscoCoef
+        if not coef:
+            return None
+        if "unsupported" in coef:
+            raise NotImplementedError("%s viscosity %s: %s" % (
+                self.__class__.__name__, coef.get("__name__"),
+                coef["unsupported"]))
+        if coef["eq"] == 0:
+            # Hardcoded method
+            return self.__getattribute__(coef["method"])(rho, T, fase)*1e6
+
+        rho = asarray(rho, dtype=float)
+        T = asarray(T, dtype=float)
+        with errstate(all="ignore"):
+            if coef["eq"] == 1:
+                muo = self._Visco0(T, rho, coef)
+
+                # second virial
+                mud = 0
+                if "n_virial" in coef:
+                    tau = T/coef.get("Tref_virial", self.Tc)
+                    muB = _sum(coef["n_virial"], tau, coef["t_virial"])
+                    mud = coef.get("etaref_virial", 1.)*muB*rho/self.M*muo
+
+                tau = coef.get("Tref_res", self.Tc)/T
+                delta = rho/coef.get("rhoref_res", self.rhoc)
+                expdel = where(abs(delta-1) <= 0.001, rho/self.rhoc, delta)
+
+                # close-packed density;
+                if "n_packed" in coef:
+                    del0 = _sum(coef["n_packed"], tau, coef["t_packed"])
                 else:
-                    mud, mur = 0, 0
-                mu = muo+mud+mur
+                    del0 = 1.
 
-            elif self._viscosity["eq"] == 2:
-                muo = self._Visco0()
-                f = self._viscosity["F"]
-                e = self._viscosity["E"]
+                # polynomial term
+                mur = 0
+                if "n_poly" in coef:
+                    terms = _terms(coef["n_poly"], tau, coef["t_poly"], delta,
+                                   coef["d_poly"], del0, coef["g_poly"])
+                    c = coef["c_poly"][:terms.shape[-1]]
+                    terms = terms[..., :len(c)]
+                    factor = where(c != 0, exp(-asarray(expdel)[..., None]**c),
+                                   1.)
+                    mur = (terms*factor).sum(axis=-1)
+
+                # numerator of rational poly; denominator of rat. poly;
+                num = 0
+                if "n_num" in coef:
+                    terms = _terms(coef["n_num"], tau, coef["t_num"], delta,
+                                   coef["d_num"], del0, coef["g_num"])
+                    num = _sumExp(terms, coef["c_num"], expdel)
+                den = 1.
+                if "n_den" in coef:
+                    terms = _terms(coef["n_den"], tau, coef["t_den"], delta,
+                                   coef["d_den"], del0, coef["g_den"])
+                    den = _sumExp(terms, coef["c_den"], expdel)
+                mur = mur+num/den
+
+                # numerator of exponential; denominator of exponential
+                if "n_numexp" in coef:
+                    num = _sum(coef["n_numexp"], tau, coef["t_numexp"], delta,
+                               coef["d_numexp"], del0, coef["g_numexp"])
+                    den = 1.
+                    if "n_denexp" in coef:
+                        den = _sum(coef["n_denexp"], tau, coef["t_denexp"],
+                                   delta, coef["d_denexp"], del0,
+                                   coef["g_denexp"])
+                    mur = mur+exp(num/den)
+
+                mur = mur*coef.get("etaref_res", 1.)
+                mu = muo+where(rho > 0, mud+mur, 0)
+
+            elif coef["eq"] == 2:
+                muo = self._Visco0(T, rho, coef)
+                f = coef["F"]
+                e = coef["E"]
                 mu1 = f[0]+f[1]*(f[2]-log(T/f[3]))**2
 
                 rhom = rho/self.M
                 G = e[0]+e[1]/T
-                H = rhom**0.5*(rhom-self._viscosity["rhoc"])/self._viscosity["rhoc"]
-                F = G+(e[2]+e[3]*T**-1.5)*rhom**0.1+H*(e[4]+e[5]/self.T+e[6]/self.T**2)
+                H = rhom**0.5*(rhom-coef["rhoc"])/coef["rhoc"]
+                F = G+(e[2]+e[3]*T**-1.5)*rhom**0.1+H*(e[4]+e[5]/T+e[6]/T**2)
                 mu2 = exp(F)-exp(G)
                 mu = muo+mu1*rhom+mu2
 
-            elif self._viscosity["eq"] == 3:
-                Tc = self._viscosity.get("Tref", 1.)
-                rhoc = self._viscosity.get("rhoref", 1.)
-                muref = self._viscosity.get("muref", 1.)
-                tau = T/Tc
-                delta = rho/self.M/rhoc
+            elif coef["eq"] == 3:
+                tau = T/coef.get("Tref", 1.)
+                delta = rho/self.M/coef.get("rhoref", 1.)
+                muo = self._Visco0(T, rho, coef)
+                muo = muo+_sum(coef["n_num"], tau, coef["t_num"], delta,
+                               coef["d_num"])
+                mu = muo*coef.get("muref", 1.)
 
-                muo = self._Visco0()
-
-                mur = 0
-                for n, t, d in zip(self._viscosity["n_num"],
-                                   self._viscosity["t_num"], self._viscosity["d_num"]):
-                    muo += n*tau**t*delta**d
-                if "n_den" in self._viscosity:
-                    den = 1
-                    for n, t, d in zip(self._viscosity["n_den"],
-                                       self._viscosity["t_den"], self._viscosity["d_den"]):
-                        den *= n*tau**t*delta**d
-                    mur /= den
-
-                mu = (muo+mur)*muref
-
-            elif self._viscosity["eq"] == 4:
-                muo = self._Visco0()
-                mur = 0
+            elif coef["eq"] == 4:
+                muo = self._Visco0(T, rho, coef)
                 Gamma = self.Tc/T
                 psi1 = exp(Gamma)-1.0
                 psi2 = exp(Gamma**2)-1.0
-                a = self._viscosity["a"]
-                b = self._viscosity["b"]
-                c = self._viscosity["c"]
-                A = self._viscosity["A"]
-                B = self._viscosity["B"]
-                C = self._viscosity["C"]
-                D = self._viscosity["D"]
+                a = coef["a"]
+                b = coef["b"]
+                c = coef["c"]
+                A = coef["A"]
+                B = coef["B"]
+                C = coef["C"]
+                D = coef["D"]
                 ka = (a[0]+a[1]*psi1+a[2]*psi2)*Gamma
                 kaa = (A[0]+A[1]*psi1+A[2]*psi2)*Gamma**3
                 kr = (b[0]+b[1]*psi1+b[2]*psi2)*Gamma
@@ -2305,271 +2488,273 @@ class MEoS(ThermoAdvanced):
                 ki = (c[0]+c[1]*psi1+c[2]*psi2)*Gamma
                 kii = (C[0]+C[1]*psi1+C[2]*psi2)*Gamma**3
 
-                Prep = T*fase.dpdT_rho.barK
-                Patt = self.P.bar-Prep
-                Pid = rho*self.R*self.T/1e5
+                # Pressure terms in bar
+                P = self._pressure(fase)
+                Prep = T*fase.dpdT_rho/1e5
+                Patt = P/1e5-Prep
+                Pid = rho*self.R*T/1e5
                 delPr = Prep-Pid
-                mur = kr*delPr + ka*Patt + krr*delPr**2 + kaa*Patt**2 + ki*Pid + kii*Pid**2 + D[0]*Prep**3*Gamma**2
-
-                mu = (muo+mur*1e3)
-
-            elif self._viscosity["eq"] == 5:
-                a0 = (6.32402, 0.12102e-2, 5.28346, 6.62263, 19.74540,
-                      -1.89992, 24.2745, 0.79716, -0.23816, 0.68629e-1)
-                a1 = (50.4119, -0.11536e-2, 254.209, 38.0957, 7.63034,
-                      -12.5367, 3.44945, 1.11764, 0.67695e-1, 0.34793)
-                a2 = (-51.6801, -0.62571e-2, -168.481, -8.46414, -14.3544,
-                      4.98529, -11.2913, 0.12348e-1, -0.8163, 0.59256)
-                a3 = (1189.02, 0.37283e-1, 3898.27, 31.4178, 31.5267,
-                      -18.1507, 69.3466, -4.11661, 4.02528, -0.72663)
+                mur = kr*delPr + ka*Patt + krr*delPr**2 + kaa*Patt**2 + \
+                    ki*Pid + kii*Pid**2 + D[0]*Prep**3*Gamma**2
+
+                mu = muo+mur*1e3
+
+            elif coef["eq"] == 5:
+                w = coef["w"]
+                mur = coef["mur"]
+                k = coef["k"]
                 A = [None]
                 for i in range(10):
-                    A.append(a0[i]+a1[i]*self._viscosity["w"]+a2[i]*self._viscosity["mur"]**4+a3[i]*self._viscosity["k"])
+                    A.append(_ChungA0[i]+_ChungA1[i]*w+_ChungA2[i]*mur**4 +
+                             _ChungA3[i]*k)
 
-                muo = self._Visco0()
+                muo = self._Visco0(T, rho, coef)
                 Y = rho/self.rhoc/6
-                T_ = self.T/self._viscosity.get("ek", self.Tc/1.2593)
+                T_ = T/coef.get("ek", self.Tc/1.2593)
                 G1 = (1-0.5*Y)/(1-Y)**3
-                G2 = (A[1]*(1-exp(-A[4]*Y))/Y+A[2]*G1*exp(A[5]*Y)+A[3]*G1)/(A[1]*A[4]+A[2]+A[3])
+                G2 = (A[1]*(1-exp(-A[4]*Y))/Y+A[2]*G1*exp(A[5]*Y)+A[3]*G1) / \
+                    (A[1]*A[4]+A[2]+A[3])
                 muk = muo*(1/G2+A[6]*Y)
-                mup = 36.344e-6*(self.M*self.Tc)**0.5*self.rhoc**(2./3.)*A[7]*Y**2*G2*exp(A[8]+A[9]/T_+A[10]/T_**2)
+                mup = 36.344e-6*(self.M*self.Tc)**0.5*self.rhoc**(2./3.) * \
+                    A[7]*Y**2*G2*exp(A[8]+A[9]/T_+A[10]/T_**2)
                 mu = muk+mup
 
-            elif self._viscosity["eq"] == "ecs":
-#                rhoc=self._constants.get("rhoref", self.rhoc)
-#                Tc=self._constants.get("Tref", self.Tc)
-#                delta=rho/rhoc
-#                tau=Tc/T
-#
-#                fio, fiot, fiott, fiod, fiodd, fiodt=self._phi0(self._constants["cp"], tau, delta)
-#
-#                ref=self._constants["ref"](eq=self._constants["eq"])
-#                Tr=T/Tc
-#                rhor=rho/rhoc
-#
-#                psi=1+(self.f_acent-ref.f_acent)*(self._constants["ft"][0]+self._constants["ft"][1]*log(Tr))
-#                for n, m in zip(self._constants["ft_add"], self._constants["ft_add_exp"]):
-#                    psi+=n*Tr**m
-#                for n, m in zip(self._constants["fd"], self._constants["fd_exp"]):
-#                    psi+=n*rhor**m
-#                T0=T*ref.Tc/self.Tc/psi
-#
-#                phi=ref.Zc/self.Zc*(1+(self.f_acent-ref.f_acent)*(self._constants["ht"][0]+self._constants["ht"][1]*log(Tr)))
-#                for n, m in zip(self._constants["ht_add"], self._constants["ht_add_exp"]):
-#                    phi+=n*Tr**m
-#                for n, m in zip(self._constants["hd"], self._constants["hd_exp"]):
-#                    phi+=n*rhor**m
-#                rho0=rho*ref.rhoc/self.rhoc*phi
-#
-#                ref_rhoc=ref._constants.get("rhoref", ref.rhoc)
-#                ref_Tc=ref._constants.get("Tref", ref.Tc)
-#                deltaref=rho0/ref_rhoc
-#                tauref=ref_Tc/T0
-#                fir, firt, firtt, fird, firdd, firdt, firdtt, B, C=ref._phir(tauref, deltaref)
-
-                Tr = T/self.Tc
-                rhor = rho/self.rhoc
-
-                fint = 0
-                for n, m in zip(self._viscosity["fint"], self._viscosity["fint_t"]):
-                    fint += n*T**m
-
-                psi = 0
-                for n, t, d in zip(self._viscosity["psi"], self._viscosity["psi_t"], self._viscosity["psi_d"]):
-                    psi += n*Tr**t*rhor**d
-
+            else:
+                # TODO: Extended corresponding states, "ecs"
                 mu = None
 
-        else:
-            mu = None
-        return unidades.Viscosity(mu, "muPas")
-
-    def _KCritical(self, rho, T, fase):
-        """Enchancement thermal conductivity calculation for critical region"""
-        if self._thermal["critical"] == 0:
-            tc = 0
-
-        elif self._thermal["critical"] == 1:
+        return mu
+
+    def _pressure(self, fase):
+        """Return the pressure of phase, the saturated phases have not its
+        own pressure defined so use the state pressure"""
+        if hasattr(fase, "P"):
+            return fase.P
+        return self.P
+
+    def _KCritical(self, rho, T, fase=None, coef=None):
+        """Enchancement thermal conductivity calculation for critical region
+        rho and T can be arrays
+        fase: Phase with the thermodynamic properties and viscosity
+        coef: Compiled thermal conductivity correlation, default the
+            selected one"""
+        if coef is None:
+            coef = self._thermoCoef
+        rho = asarray(rho, dtype=float)
+        T = asarray(T, dtype=float)
+
+        if coef["critical"] == 0:
+            tc = 0*rho
+
+        elif coef["critical"] == 1:
             tc = 0
-            if "crit_num_n" in self._thermal:
-                Tref = self._thermal["crit_num_Tref"]
+            if "crit_num_n" in coef:
+                Tref = coef["crit_num_Tref"]
                 if Tref < 0:
                     tau = Tref/T
                 else:
                     tau = T/Tref
-                delta = rho/self.M/self._thermal["crit_num_rhoref"]
-
-                for n, alfa, t, beta, d in zip(self._thermal["crit_num_n"], self._thermal["crit_num_alfa"], self._thermal["crit_num_t"], self._thermal["crit_num_beta"], self._thermal["crit_num_d"]):
-                    tc += n*(tau+alfa)**t*(delta+beta)**d
-
-                if "crit_den_n" in self._thermal:
-                    den = 0
-                    for n, alfa, t, beta, d, c in zip(self._thermal["crit_den_n"], self._thermal["crit_den_alfa"], self._thermal["crit_den_t"], self._thermal["crit_den_beta"], self._thermal["crit_den_d"], self._thermal["crit_den_c"]):
-                        if c == 99:
-                            tcmax = max(tau, alfa-tau)
-                            den += n*tcmax**t*(delta+beta)**d
-                        else:
-                            den += n*(tau+alfa)**t*(delta+beta)**d
-                    tc /= den
-
-            if "crit_exp_n" in self._thermal:
-                Tref = self._thermal["crit_exp_Tref"]
+                delta = rho/self.M/coef["crit_num_rhoref"]
+                tc = _sum(coef["crit_num_n"], tau+coef["crit_num_alfa"],
+                          coef["crit_num_t"], delta+coef["crit_num_beta"],
+                          coef["crit_num_d"])
+
+                if "crit_den_n" in coef:
+                    # Terms with c=99 use max(tau, alfa-tau) as variable
+                    alfa = coef["crit_den_alfa"]
+                    tau_ = asarray(tau)[..., None]
+                    var = where(coef["crit_den_c"] == 99,
+                                maximum(tau_, alfa-tau_), tau_+alfa)
+                    den = (coef["crit_den_n"]*var**coef["crit_den_t"] *
+                           (asarray(delta)[..., None]+coef["crit_den_beta"]) **
+                           coef["crit_den_d"]).sum(axis=-1)
+                    tc = tc/den
+
+            if "crit_exp_n" in coef:
+                Tref = coef["crit_exp_Tref"]
                 if Tref < 0:
                     tau = Tref/T
                 else:
                     tau = T/Tref
-                delta = rho/self.M/self._thermal["crit_exp_rhoref"]
-                expo = 0
-                for n, alfa, t, beta, d, c in zip(self._thermal["crit_exp_n"], self._thermal["crit_exp_alfa"], self._thermal["crit_exp_t"], self._thermal["crit_exp_beta"], self._thermal["crit_exp_d"], self._thermal["crit_exp_c"]):
-                    expo += n*(tau+alfa)**t*(delta+beta)**d
-                tc *= exp(expo)
-
-            tc *= self._thermal["crit_num_k"]
-
-        elif self._thermal["critical"] == 2:
-            X = self._thermal["X"]
-            xi = self.Pc*rho/self.rhoc**2/self.derivative("P", "rho", "T", fase)
-            normterm = X[3]*Boltzmann/self.Pc*(T*fase.dpdT*self.rhoc/rho)**2*xi**X[2]
+                delta = rho/self.M/coef["crit_exp_rhoref"]
+                expo = _sum(coef["crit_exp_n"], tau+coef["crit_exp_alfa"],
+                            coef["crit_exp_t"], delta+coef["crit_exp_beta"],
+                            coef["crit_exp_d"])
+                tc = tc*exp(expo)
+
+            tc = tc*coef["crit_num_k"]
+
+        elif coef["critical"] == 2:
+            X = coef["X"]
+            P = self._pressure(fase)
+            xi = self.Pc*rho/self.rhoc**2 / \
+                _derivative("P", "rho", "T", fase, P, T)
+            normterm = X[3]*Boltzmann/self.Pc * \
+                (T*fase.dpdT_rho*self.rhoc/rho)**2*xi**X[2]
             delT = abs(T-self.Tc)/self.Tc
             delrho = abs(rho-self.rhoc)/self.rhoc
             expterm = exp(-(X[0]*delT**4+X[1]*delrho**4))
-            mu = self._Viscosity()
-            tc = normterm*expterm/(6*pi*mu*self._thermal["Z"])
-
-        elif self._thermal["critical"] == 3:
-            qd = self._thermal["qd"]
-            Tref = self._thermal["Tcref"]
-            x_T = self.Pc*rho/self.rhoc**2*self.derivative("rho", "P", "T", fase)
-            x_Tr = self.Pc*rho/self.rhoc**2*self.derivative("rho", "P", "T", fase)*Tref/T
+            tc = normterm*expterm/(6*pi*fase.mu*coef["Z"])
+
+        elif coef["critical"] == 3:
+            qd = coef["qd"]
+            Tref = coef["Tcref"]
+            P = self._pressure(fase)
+            x_T = self.Pc*rho/self.rhoc**2 * \
+                _derivative("rho", "P", "T", fase, P, T)
+            x_Tr = x_T*Tref/T
             delchi = x_T-x_Tr
-            if delchi <= 0:
-                tc = 0
-            else:
-                Xi = self._thermal["Xio"]*(delchi/self._thermal["gam0"])**(self._thermal["gnu"]/self._thermal["gamma"])
-                omega = 2/pi*((fase.cp-fase.cv)/fase.cp*arctan(Xi/qd)+fase.cv/fase.cp*Xi/qd)
-                omega0 = 2/pi*(1-exp(-1/(1./qd/Xi+Xi**2*qd**2/3*(self.rhoc/rho)**2)))
-                tc = rho/self.M*fase.cp*Boltzmann*self._thermal["R0"]*T/(6*pi*Xi*fase.mu)*(omega-omega0)
-
-        elif self._thermal["critical"] == 4:
+            Xi = coef["Xio"]*(delchi/coef["gam0"])**(coef["gnu"]/coef["gamma"])
+            omega = 2/pi*((fase.cp-fase.cv)/fase.cp*arctan(Xi/qd) +
+                          fase.cv/fase.cp*Xi/qd)
+            omega0 = 2/pi*(1-exp(-1/(1./qd/Xi+Xi**2*qd**2/3*(self.rhoc/rho)**2)))
+            tc = rho/self.M*fase.cp*Boltzmann*coef["R0"]*T / \
+                (6*pi*Xi*fase.mu)*(omega-omega0)
+            tc = where(delchi <= 0, 0, tc)
+
+        elif coef["critical"] == 4:
             rhom = rho/self.M
-            Xt = (rhom*self._thermal["Pcref"]/self._thermal["rhocref"]**2/self.derivative("P", "rho", "T", fase))**self._thermal["expo"]
-            parterm = self._thermal["alfa"]*Boltzmann/self._thermal["Pcref"]*(T*fase.dpdT*self._thermal["rhocref"]/rhom)**2*Xt*1e21
-            delT = abs(T-self._thermal["Tcref"])/self._thermal["Tcref"]
-            delrho = abs(rhom-self._thermal["rhocref"])/self._thermal["rhocref"]
-            expterm = exp(-(self._thermal["alfa"]*delT**2+self._thermal["beta"]*delrho**4))
-            tc = parterm*expterm/(6*pi*self._thermal["Xio"]*fase.mu.muPas)*self._thermal["kcref"]
-
-        elif self._thermal["critical"] == "NH3":
+            P = self._pressure(fase)
+            Xt = (rhom*coef["Pcref"]/coef["rhocref"]**2 /
+                  _derivative("P", "rho", "T", fase, P, T))**coef["expo"]
+            parterm = coef["alfa"]*Boltzmann/coef["Pcref"] * \
+                (T*fase.dpdT_rho*coef["rhocref"]/rhom)**2*Xt*1e21
+            delT = abs(T-coef["Tcref"])/coef["Tcref"]
+            delrho = abs(rhom-coef["rhocref"])/coef["rhocref"]
+            expterm = exp(-(coef["alfa"]*delT**2+coef["beta"]*delrho**4))
+            tc = parterm*expterm/(6*pi*coef["Xio"]*fase.mu*1e6)*coef["kcref"]
+
+        elif coef["critical"] == "NH3":
             tr = abs(T-405.4)/405.4
-            trr = tr
-            if 404.4 < T < 406.5 and (rho/self.M<9.6 or rho/self.M>18): #to avoid infinite value in critical region
-                trr = 0.002
+            # to avoid infinite value in critical region
+            trr = where((404.4 < T) & (T < 406.5) &
+                        ((rho/self.M < 9.6) | (rho/self.M > 18)), 0.002, tr)
             etab = 1.0e-5*(2.6+1.6*tr)
             dPT = 1.0e5*(2.18-0.12/exp(17.8*tr))
-            if trr == 0.0:
-                tcrhoc = 1.e20
-                dtcid = tcrhoc
-                xcon = -1.e20
-            else:
-                tcrhoc = 1.2*1.38066e-23*T**2*dPT**2*0.423e-8/trr**1.24*\
-                    (1.0+1.429*tr**0.5)/(6.0*pi*etab*(1.34e-10/trr**0.63*(1.0+1.0*tr**0.5)))
-                dtcid = tcrhoc*exp(-36.0*tr**2)
-                xcon = 0.61*235+16.5*log(trr)
-            if rho/self.rhoc < 0.6:
-                tccsw = dtcid*xcon**2/(xcon**2+(141.0-0.96*235.0)**2)
-                tc = tccsw*rho**2/141.0**2
-            else:
-                tc = dtcid*xcon**2/(xcon**2+(rho-0.96*235.0)**2)
-
-        elif self._thermal["critical"] == "CH4":
+            tcrhoc = 1.2*1.38066e-23*T**2*dPT**2*0.423e-8/trr**1.24 * \
+                (1.0+1.429*tr**0.5)/(6.0*pi*etab*(1.34e-10/trr**0.63 *
+                                                  (1.0+1.0*tr**0.5)))
+            dtcid = where(trr == 0, 1.e20, tcrhoc*exp(-36.0*tr**2))
+            xcon = where(trr == 0, -1.e20, 0.61*235+16.5*log(trr))
+            tccsw = dtcid*xcon**2/(xcon**2+(141.0-0.96*235.0)**2)
+            tc = where(rho/self.rhoc < 0.6, tccsw*rho**2/141.0**2,
+                       dtcid*xcon**2/(xcon**2+(rho-0.96*235.0)**2))
+
+        elif coef["critical"] == "CH4":
             tau = self.Tc/T
             delta = rho/self.rhoc
             ts = (self.Tc-T)/self.Tc
             ds = (self.rhoc-rho)/self.rhoc
-            xt = 0.28631*delta*tau/self.derivative("P", "rho", "T", fase)
+            P = self._pressure(fase)
+            xt = 0.28631*delta*tau/_derivative("P", "rho", "T", fase, P, T)
             ftd = exp(-2.646*abs(ts)**0.5+2.678*ds**2-0.637*ds)
             tc = 91.855/fase.mu/tau**2*fase.dpdT_rho**2*xt**0.4681*ftd*1e-3
 
         return tc
 
-    def _ThCond(self, rho, T, fase):
-        """Thermal conductivity calculation"""
-        if self._thermal:
-            if self._thermal["eq"] == 0:
-                k = self.__getattribute__(self._thermal["method"])(rho, T, fase)
+    def _ThCond(self, rho, T, fase=None):
+        """Thermal conductivity calculation, return a
+        unidades.ThermalConductivity instance"""
+        k = self._thermalArray(rho, T, fase)
+        if k is not None:
+            k = float(k)
+        return unidades.ThermalConductivity(k)
 
-            elif self._thermal["eq"] == 1:
+    def _thermalArray(self, rho, T, fase=None, coef=None):
+        """Thermal conductivity calculation in W/m·K, rho and T can be arrays
+        fase: Phase with the thermodynamic properties and viscosity, only
+            necessary for correlations with terms dependent of that
+        coef: Compiled thermal conductivity correlation, default the
+            selected one
+        The hardcoded correlations of fluids are only available for scalar
+        input, see transport method to array evaluation of that"""
+        if coef is None:
+            coef = self._thermoCoef
+        if not coef:
+            return None
+        if "unsupported" in coef:
+            raise NotImplementedError(
+                "%s thermal conductivity %s: %s" % (
+                    self.__class__.__name__, coef.get("__name__"),
+                    coef["unsupported"]))
+        if coef["eq"] == 0:
+            # Hardcoded method
+            return self.__getattribute__(coef["method"])(rho, T, fase)
+
+        rho = asarray(rho, dtype=float)
+        T = asarray(T, dtype=float)
+        with errstate(all="ignore"):
+            if coef["eq"] == 1:
                 # Dilute gas terms
                 kg = 0
-                if "no" in self._thermal:
-                    tau = self._thermal["Tref"]/T
-                    for n, c in zip(self._thermal["no"], self._thermal["co"]):
-                        if c == -99:
-                            cpi = 1.+n*(self.cp0.kJkgK-2.5*self.R.kJkgK)
-                            kg *= cpi
-                        elif c == -98:
-                            muo = self._Visco0()
-                            cpi = self.cp0-R
-                            kg += n*cpi*muo
-                        elif c == -97:
-                            muo = self._Visco0()
-                            kg += n*muo
-                        elif c == -96:
-                            cpi = self.cp0/self.R-2.5
-                            muo = self._Visco0()
-                            kg = (kg*cpi+15./4.)*self.R.kJkgK*muo/self.M
-                        else:
-                            kg += n*tau**c
-
-                    if "noden" in self._thermal:
-                        den = 0
-                        for n, t in zip(self._thermal["noden"], self._thermal["toden"]):
-                            den += n*tau**t
-                        kg /= den
-
-                    kg *= self._thermal["kref"]
+                if "no" in coef:
+                    tau = coef["Tref"]/T
+                    if (coef["co"] < -90).any():
+                        kg = self._ThCond0(rho, T, fase, coef)
+                    else:
+                        kg = _sum(coef["no"], tau, coef["co"])
+
+                    if "noden" in coef:
+                        # Exponents named as toden or coden in fluid files
+                        t = coef.get("toden", coef.get("coden"))
+                        kg = kg/_sum(coef["noden"], tau, t)
+
+                    kg = kg*coef["kref"]
 
                 # Backgraund terms
                 kb = 0
-                kc = 0
-                if rho > 0:
-                    if "nb" in self._thermal:
-                        tau = self._thermal["Trefb"]/T
-                        delta = rho/self.M/self._thermal["rhorefb"]
-                        for n, t, d, c in zip(self._thermal["nb"], self._thermal["tb"], self._thermal["db"], self._thermal["cb"]):
+                if "nb" in coef:
+                    tau = coef["Trefb"]/T
+                    delta = rho/self.M/coef["rhorefb"]
+                    cb = coef["cb"]
+                    if (cb == -99).any():
+                        kb = 0
+                        for n, t, d, c in zip(coef["nb"], coef["tb"],
+                                              coef["db"], cb):
                             if c == -99:
-                                if tau < 1:
-                                    th = (1.-tau)**(1./3.)
-                                    kb /= exp(-1.880284*th**1.062 -
-                                              2.8526531*th**2.5-3.000648*th**4.5 -
-                                              5.251169*th**7.5-13.191869*th**12.5 -
-                                              37.553961*th**23.5)
+                                th = (1.-tau)**(1./3.)
+                                kb = where(tau < 1, kb/exp(
+                                    -1.880284*th**1.062-2.8526531*th**2.5 -
+                                    3.000648*th**4.5-5.251169*th**7.5 -
+                                    13.191869*th**12.5-37.553961*th**23.5),
+                                    kb)
+                            elif c != 0:
+                                kb = kb+n*tau**t*delta**d*exp(-delta**c)
                             else:
-                                if c != 0:
-                                    kb += n*tau**t*delta**d*exp(-delta**c)
-                                else:
-                                    kb += n*tau**t*delta**d
-
-                        if "nbden" in self._thermal:
-                            den = 0
-                            for n, t, d in zip(self._thermal["nbden"], self._thermal["tbden"], self._thermal["dbden"]):
-                                den += n*tau**t*delta**d
-                            kb /= den
-
-                        kb *= self._thermal["krefb"]
-
-                    # Critical enhancement
-                    kc = self._KCritical(rho, T, fase)
+                                kb = kb+n*tau**t*delta**d
+                    else:
+                        terms = _terms(coef["nb"], tau, coef["tb"], delta,
+                                       coef["db"])
+                        cb = cb[:terms.shape[-1]]
+                        terms = terms[..., :len(cb)]
+                        factor = where(cb != 0,
+                                       exp(-asarray(delta)[..., None]**cb), 1.)
+                        kb = (terms*factor).sum(axis=-1)
 
-                k = kg+kb+kc
+                    if "nbden" in coef:
+                        kb = kb/_sum(coef["nbden"], tau, coef["tbden"], delta,
+                                     coef["dbden"])
 
-            elif self._thermal["eq"] == 2:
-                self._viscosity = self._thermal["visco"]
-                muo = self._Visco0()
-                G = self._thermal["G"]
-                kg = 1e-3*muo/self.M*(3.75*self.R+(self.cp0.kJkgK-2.5*self.R)*(G[0]+G[1]*self._viscosity["ek"]/T))
+                    kb = kb*coef["krefb"]
 
-                E = self._thermal["E"]
+                # Critical enhancement
+                kc = 0
+                if (rho > 0).any():
+                    kc = self._KCritical(rho, T, fase, coef)
+
+                k = kg+where(rho > 0, kb+kc, 0)
+
+            elif coef["eq"] == 2:
+                visco = coef["visco"]
+                muo = self._Visco0(T, rho, visco)
+                cp0 = getattr(fase, "cp0", None)
+                if cp0 is None:
+                    cp0 = self.cp0
+                G = coef["G"]
+                kg = 1e-3*muo/self.M*(3.75*self.R+(cp0/1000-2.5*self.R) *
+                                      (G[0]+G[1]*visco["ek"]/T))
+
+                E = coef["E"]
                 F0 = E[0]+E[1]/T+E[2]/T**2
                 F1 = E[3]+E[4]/T+E[5]/T**2
                 F2 = E[6]+E[7]/T
@@ -2577,47 +2762,191 @@ class MEoS(ThermoAdvanced):
                 kb = (F0+F1*rhom)*rhom/(1+F2*rhom)
 
                 # Critical enhancement
-                kc = self._KCritical(rho, T, fase)
+                kc = self._KCritical(rho, T, fase, coef)
 
                 k = kg+kb+kc
 
-            elif self._thermal["eq"] == 3:
-                T_ = self._thermal["ek"]/T
+            elif coef["eq"] == 3:
+                T_ = coef["ek"]/T
                 rhom = rho/self.M
-                suma = 0
-                for i, bi in enumerate(self._thermal["b"]):
-                    suma += bi*T_**((3.-i)/3.)
-                ko = self._thermal["Nchapman"]*T**self._thermal["tchapman"]/(self._thermal["sigma"]**2/suma)
+                suma = _sum(coef["b"], T_, coef["_b_t"])
+                ko = coef["Nchapman"]*T**coef["tchapman"] / \
+                    (coef["sigma"]**2/suma)
 
-                f = self._thermal["F"]
-                e = self._thermal["E"]
+                f = coef["F"]
+                e = coef["E"]
                 k1 = f[0]+f[1]*(f[2]-log(T/f[3]))**2
                 kg = ko+k1*rhom
 
                 G = e[0]+e[1]/T
-                H = rhom**0.5*(rhom-self._thermal["rhoc"])/self._thermal["rhoc"]
+                H = rhom**0.5*(rhom-coef["rhoc"])/coef["rhoc"]
                 F = G+(e[2]+e[3]*T**-1.5)*rhom**0.1+H*(e[4]+e[5]/T+e[6]/T**2)
                 kb = exp(F)-exp(G)
 
-                bl = self._thermal["ff"]*(self._thermal["rm"]**5*rho/1000.*Avogadro/self.M*self._thermal["Nchapman"]/T)**0.5
-                y = 6.0*pi*fase.mu/100000.*bl*(Boltzmann*T*rho/1000.*Avogadro/self.M)**0.5
-                deltaL = 0.0
-                der = self.derivative("P", "rho", "T", fase)
-                if der > 0:
-                    deltaL = Boltzmann*(T*fase.dpdT_rho)**2/(rho/1000.*der)**0.5/y
-                else:
-                    deltaL = 0.0
-                kc = deltaL*exp(-18.66*((rho-self.rhoc)/self.rhoc)**4-4.25*((T-self.Tc)/self.Tc)**2)
+                bl = coef["ff"]*(coef["rm"]**5*rho/1000.*Avogadro/self.M *
+                                 coef["Nchapman"]/T)**0.5
+                y = 6.0*pi*fase.mu/100000.*bl * \
+                    (Boltzmann*T*rho/1000.*Avogadro/self.M)**0.5
+                P = self._pressure(fase)
+                der = _derivative("P", "rho", "T", fase, P, T)
+                deltaL = where(der > 0, Boltzmann*(T*fase.dpdT_rho)**2 /
+                               (rho/1000.*der)**0.5/y, 0.0)
+                kc = deltaL*exp(-18.66*((rho-self.rhoc)/self.rhoc)**4 -
+                                4.25*((T-self.Tc)/self.Tc)**2)
 
                 k = kg+kb+kc
 
-            elif self._thermal["eq"] == "ecs":
+            else:
+                # TODO: Extended corresponding states, "ecs"
                 k = None
-                # TODO:
 
+        return k
+
+    def _ThCond0(self, rho, T, fase, coef):
+        """Dilute gas thermal conductivity for correlations with special
+        terms dependent of ideal gas heat capacity or dilute viscosity,
+        the terms are evaluated in order"""
+        cp0 = getattr(fase, "cp0", None)
+        if cp0 is None:
+            cp0 = self.cp0
+        tau = coef["Tref"]/T
+        kg = 0
+        for n, c in zip(coef["no"], coef["co"]):
+            if c == -99:
+                cpi = 1.+n*(cp0/1000-2.5*self.R.kJkgK)
+                kg = kg*cpi
+            elif c == -98:
+                muo = self._Visco0(T, rho)
+                cpi = cp0-R
+                kg = kg+n*cpi*muo
+            elif c == -97:
+                muo = self._Visco0(T, rho)
+                kg = kg+n*muo
+            elif c == -96:
+                cpi = cp0/self.R-2.5
+                muo = self._Visco0(T, rho)
+                kg = (kg*cpi+15./4.)*self.R.kJkgK*muo/self.M
+            else:
+                kg = kg+n*tau**c
+        return kg
+
+    def transport(self, rho, T):
+        """Calculate the transport properties for arrays of density and
+        temperature, without the full state calculation
+
+        Parameters
+        ----------
+        rho : float or array
+            Density, kg/m³
+        T : float or array
+            Temperature, K
+
+        Returns
+        -------
+        mu : array
+            Viscosity, Pa·s, nan if not available
+        k : array
+            Thermal conductivity, W/m·K, nan if not available
+
+        The correlations not supported raise NotImplementedError, see
+        _unsupported
+
+        Examples
+        --------
+        Dilute gas viscosity of ammonia, reference values from Fenghour
+        (1995), Appendix II
+
+        >>> from lib.mEoS import NH3
+        >>> states = [NH3(T=T, P=P) for T, P in ((300, 1e5), (490, 1e6),
+        ...                                      (550, 1e5))]
+        >>> mu, k = states[0].transport([st.rho for st in states],
+        ...                             [st.T for st in states])
+        >>> " ".join("%0.2f" % x for x in mu*1e6)
+        '10.16 17.49 19.79'
+        >>> " ".join("%0.2f" % st.mu.muPas for st in states)
+        '10.16 17.49 19.79'
+        """
+        if "_eq" not in self.__dict__:
+            self._setEquation()
+        rho, T = broadcast_arrays(asarray(rho, dtype=float),
+                                  asarray(T, dtype=float))
+
+        # Hardcoded correlation of fluid, only evaluable state by state
+        if self._viscoCoef and self._viscoCoef["eq"] == 0 or \
+                self._thermoCoef and self._thermoCoef["eq"] == 0:
+            mu = empty(rho.shape)
+            k = empty(rho.shape)
+            for i in ndindex(rho.shape):
+                st = self._new(T=T[i], rho=rho[i], eq=self.kwargs["eq"],
+                               visco=self.kwargs["visco"],
+                               thermal=self.kwargs["thermal"])
+                # Two phases states have not global transport properties
+                stmu = getattr(st, "mu", None)
+                stk = getattr(st, "k", None)
+                mu[i] = nan if stmu is None else stmu
+                k[i] = nan if stk is None else stk
+            return mu, k
+
+        fase = self._transportState(rho, T)
+        mu = self._viscosityArray(rho, T, fase)
+        if mu is None:
+            mu = full(rho.shape, nan)
         else:
-            k = None
-        return unidades.ThermalConductivity(k)
+            mu = broadcast_to(mu*1e-6, rho.shape).copy()
+        fase.mu = mu
+
+        k = self._thermalArray(rho, T, fase)
+        if k is None:
+            k = full(rho.shape, nan)
+        else:
+            k = broadcast_to(k, rho.shape).copy()
+        return mu, k
+
+    def _transportState(self, rho, T):
+        """Calculate the thermodynamic properties needed in transport
+        correlations for arrays of density and temperature"""
+        fase = ThermoAdvanced()
+        fase.rho = rho
+        fase.T = T
+
+        # Ideal gas heat capacity
+        tau = self.Tc/T
+        fiott = self._phi0(self._constants["cp"], tau, 0)[2]
+        fase.cp0 = self.R*(-tau**2*fiott+1)
+
+        # Only some correlations need the residual helmholtz derivatives
+        visco = self._viscoCoef
+        thermal = self._thermoCoef
+        if visco and visco["eq"] == 4 or thermal and (
+                thermal["eq"] in (2, 3) or thermal["eq"] == 1 and
+                thermal.get("critical") in (2, 3, 4, "CH4")):
+
+            # The helmholtz equations without non analytic or special terms
+            # can be evaluated directly with arrays, else state by state
+            if self._eq == self._Helmholtz and (rho > 0).all() and \
+                    not self._constants.get("nr4") and \
+                    not self._constants.get("nr5"):
+                with errstate(all="ignore"):
+                    estado = self._Helmholtz(rho, T)
+
+                def prop(key, factor=1):
+                    return broadcast_to(estado[key], rho.shape)*factor
+            else:
+                estados = [self._eq(r, t) for r, t in zip(rho.flat, T.flat)]
+
+                def prop(key, factor=1):
+                    values = [estado[key] for estado in estados]
+                    return array(values, dtype=float).reshape(rho.shape)*factor
+
+            fase.P = prop("P")
+            fase.v = prop("v")
+            fase.s = prop("s", 1000)
+            fase.cp = prop("cp", 1000)
+            fase.cv = prop("cv", 1000)
+            fase.alfap = prop("alfap")
+            fase.betap = prop("betap")
+            fase.dpdT_rho = _derivative("P", "T", "rho", fase, fase.P, T)
+        return fase
 
     @classmethod
     def properties(cls):
@@ -0,0 +1,337 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Persistent on-disk cache of computed meos plot datasets
+#
+#   - cacheKey: Return the content-addressed key of a plot dataset
+#   - flatten: Convert a nested plot data dict in a flat array and index
+#   - unflatten: Rebuild the nested plot data dict from array and index
+#   - PlotCache: Disk storage of datasets with LRU eviction by size, the
+#     datasets of open plot windows are held out of eviction
+#
+#   Each dataset is saved in a folder named with its key, with a unique
+#   uncompressed float64 array (data.npy) with all lines concatenated, so it
+#   can be loaded with memory mapping, and a json index (index.json) with the
+#   position of each property line in that array.
+###############################################################################
+
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+from numpy import array, float64, isnan, load, nan, save
+
+from lib.config import conf_dir
+
+
+CACHE_DIR = os.path.join(conf_dir, "mEoS_cache")
+# Default maximum disk size for cache in MB
+CACHE_SIZE = 200
+
+# Version of storage format, change when the layout changes to invalidate
+# previous stored datasets
+_VERSION = 1
+
+
+def cacheKey(fluid, eq=0, visco=0, thermal=0, reference=None, lines=None,
+             points=0):
+    """Return the content-addressed key of a plot dataset
+
+    Parameters
+    ----------
+    fluid : class
+        meos subclass of fluid
+    eq : integer
+        Index of equation of state used
+    visco : integer
+        Index of viscosity correlation used
+    thermal : integer
+        Index of thermal conductivity correlation used
+    reference : list
+        Reference state definition, [name, T, P, h, s]
+    lines : dict
+        Values of isolines calculated, {"Isotherm": [...], ...}
+    points : integer
+        Number of points for each isoline section
+
+    Returns
+    -------
+    key : string
+        sha1 hexdigest of the dataset definition
+
+    >>> class Fake(object):
+    ...     pass
+    >>> k1 = cacheKey(Fake, 0, lines={"Isobar": [1e5]}, points=10)
+    >>> k2 = cacheKey(Fake, 0, lines={"Isobar": [1e5]}, points=10)
+    >>> k3 = cacheKey(Fake, 1, lines={"Isobar": [1e5]}, points=10)
+    >>> k1 == k2, k1 == k3
+    (True, False)
+    """
+    if lines is None:
+        lines = {}
+    definition = {
+        "version": _VERSION,
+        "fluid": "%s.%s" % (fluid.__module__, fluid.__name__),
+        "eq": eq,
+        "visco": visco,
+        "thermal": thermal,
+        "reference": reference,
+        "lines": {key: [repr(float(v)) for v in value]
+                  for key, value in lines.items()},
+        "points": points}
+    txt = json.dumps(definition, sort_keys=True)
+    return hashlib.sha1(txt.encode("utf-8")).hexdigest()
+
+
+def _float(value):
+    """Convert a stored property value to float, nan for undefined values"""
+    if value is None:
+        return nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return nan
+
+
+def flatten(data):
+    """Convert a nested plot data dict in a flat array and index
+
+    The plot data dict has the structure used in tools.UI_Tables:
+        data[line][property] = list
+        data[line][value][property] = list
+    with other non property entries (config) saved in index directly
+
+    Returns
+    -------
+    values : array
+        Array with all property values concatenated, undefined as nan
+    index : dict
+        Dict with the structure of data and the offsets in values array
+
+    >>> values, index = flatten({"P": {1e5: {"T": [300, None]}},
+    ...                          "config": {"eq": 0}})
+    >>> list(values[:1]), index["lines"]
+    ([300.0], [['P', 100000.0, 'T', 0, 2]])
+    """
+    values = []
+    lines = []
+    sections = []
+    extra = {}
+    for line, section in data.items():
+        if line == "config" or not isinstance(section, dict):
+            extra[line] = section
+            continue
+        sections.append(line)
+        for key, item in section.items():
+            if isinstance(item, dict):
+                for prop, serie in item.items():
+                    lines.append([line, float(key), prop, len(values),
+                                  len(serie)])
+                    values.extend(_float(v) for v in serie)
+            else:
+                lines.append([line, None, key, len(values), len(item)])
+                values.extend(_float(v) for v in item)
+
+    index = {"version": _VERSION, "sections": sections, "lines": lines,
+             "extra": extra}
+    return array(values, dtype=float64), index
+
+
+def unflatten(values, index, mutable=False):
+    """Rebuild the nested plot data dict from array and index
+
+    Parameters
+    ----------
+    values : array
+        Array with values, can be a memory mapped array
+    index : dict
+        Index dict as returned by flatten
+    mutable : boolean
+        If True return the property data as list with None for undefined
+        values, as the calculation return it, else the data is returned as
+        a view of values array
+
+    >>> values, index = flatten({"P": {1e5: {"T": [300, None]}}})
+    >>> unflatten(values, index, mutable=True)
+    {'P': {100000.0: {'T': [300.0, None]}}}
+    """
+    data = {line: {} for line in index["sections"]}
+    for line, key, prop, start, length in index["lines"]:
+        serie = values[start:start+length]
+        if mutable:
+            serie = [None if isnan(v) else float(v) for v in serie]
+        section = data[line]
+        if key is not None:
+            section = section.setdefault(key, {})
+        section[prop] = serie
+    for key, value in index.get("extra", {}).items():
+        data[key] = value
+    return data
+
+
+class PlotCache(object):
+    """Disk storage of plot datasets with LRU eviction by disk size
+
+    The entries are identified by the key returned by cacheKey, the last use
+    of entry is tracked with the modification time of its index file. The
+    entries held by open plot windows are never evicted, the windows edit
+    its data in place
+
+    >>> import tempfile
+    >>> cache = PlotCache(tempfile.mkdtemp(), size=0)
+    >>> cache.set("old", {"Isotherm": {"300": {"T": [300, 300]}}})
+    >>> cache.hold("old")
+    >>> cache.set("new", {"Isotherm": {"400": {"T": [400, 400]}}})
+    >>> "old" in cache, "new" in cache
+    (True, True)
+
+    Edit the held dataset like an open plot window adding a line
+    >>> data = cache.get("old", mutable=True)
+    >>> data["Isobar"] = {"1e5": {"T": [350, 360]}}
+    >>> cache.set("old", data)
+    >>> sorted(cache.get("old"))
+    ['Isobar', 'Isotherm']
+
+    When the window is closed its entry can be evicted
+    >>> cache.release("old")
+    >>> cache.evict()
+    >>> "old" in cache
+    False
+    >>> cache.clear()
+    """
+
+    # Number of open windows holding each key, shared by all instances
+    _held = {}
+
+    def __init__(self, path=CACHE_DIR, size=CACHE_SIZE):
+        """
+        path: folder to save the cache
+        size: maximum disk size of cache, in MB
+        """
+        self.path = path
+        self.size = size*1024**2
+
+    def _folder(self, key):
+        return os.path.join(self.path, key)
+
+    def __contains__(self, key):
+        return os.path.isfile(os.path.join(self._folder(key), "index.json"))
+
+    def get(self, key, mutable=False):
+        """Return the dataset saved with key, None if it isn't available
+        mutable: return data as lists to let edit it, else the data are
+        memory mapped from disk"""
+        folder = self._folder(key)
+        try:
+            with open(os.path.join(folder, "index.json")) as archivo:
+                index = json.load(archivo)
+            if index.get("version") != _VERSION:
+                return None
+            values = load(os.path.join(folder, "data.npy"), mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+
+        # Update last use of entry for LRU policy
+        os.utime(os.path.join(folder, "index.json"))
+        return unflatten(values, index, mutable)
+
+    def set(self, key, data):
+        """Save dataset with key, evicting the older entries if the cache
+        size overflow"""
+        values, index = flatten(data)
+        folder = self._folder(key)
+        os.makedirs(folder, exist_ok=True)
+
+        # The data file can be memory mapped by a previous get, so it's never
+        # overwritten in place, it's written to a temporary file and replaced
+        # atomically
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        with os.fdopen(fd, "wb") as archivo:
+            save(archivo, values)
+        os.replace(tmp, os.path.join(folder, "data.npy"))
+
+        # Index file is written the last, to consider valid the entry only
+        # when the data is fully saved
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        with os.fdopen(fd, "w") as archivo:
+            json.dump(index, archivo)
+        os.replace(tmp, os.path.join(folder, "index.json"))
+        self.evict(keep=key)
+
+    def hold(self, key):
+        """Protect the entry of an open window from eviction"""
+        self._held[key] = self._held.get(key, 0)+1
+
+    def release(self, key):
+        """Let evict the entry again when its window is closed"""
+        count = self._held.get(key, 0)-1
+        if count > 0:
+            self._held[key] = count
+        else:
+            self._held.pop(key, None)
+
+    def remove(self, key):
+        """Remove entry from cache"""
+        shutil.rmtree(self._folder(key), ignore_errors=True)
+
+    def entries(self):
+        """Return a list of entries in cache, [(lastUse, size, key)], sorted
+        from the older to the newer use"""
+        entries = []
+        if not os.path.isdir(self.path):
+            return entries
+        for key in os.listdir(self.path):
+            folder = self._folder(key)
+            try:
+                last = os.path.getmtime(os.path.join(folder, "index.json"))
+                size = sum(os.path.getsize(os.path.join(folder, f))
+                           for f in os.listdir(folder))
+            except OSError:
+                continue
+            entries.append((last, size, key))
+        entries.sort()
+        return entries
+
+    def evict(self, keep=None):
+        """Remove the least recently used entries until the cache size is
+        under the limit, the entries held by open windows are kept
+        keep: key of entry to never remove"""
+        entries = self.entries()
+        total = sum(size for last, size, key in entries)
+        for last, size, key in entries:
+            if total <= self.size:
+                break
+            if key == keep or key in self._held:
+                continue
+            self.remove(key)
+            total -= size
+
+    def clear(self):
+        """Remove all entries"""
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,672 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Rigorous stage by stage model of distillation columns, MESH equations
+#
+#   - thomas: Tridiagonal systems solver, vectorized over components
+#   - blockThomas: Block tridiagonal systems solver
+#   - Column: Rigorous column solved with the inside-out algorithm
+#
+#   The MESH equations (Material balance, Equilibrium, Summation and entHalpy
+#   balance) are solved with the inside-out algorithm:
+#     - Outer loop: the K values and enthalpies of each stage are calculated
+#       with the EoS classes defined in lib.EoS and used to fit simple models
+#       of each stage, relative volatilities with a temperature dependent
+#       base K and linear component enthalpies.
+#     - Inner loop: the MESH equations with the simple models are solved
+#       simultaneously by Newton-Raphson (Naphtali-Sandholm formulation),
+#       the jacobian has block tridiagonal structure and is solved by blocks.
+#   The outer loop ends when the simple models match the rigorous values in
+#   the temperature profile of inner loop solution.
+#
+#   Naphtali, L.M., Sandholm, D.P. Multicomponent separation calculations by
+#   linearization. AIChE Journal 17(1) (1971) 148-153
+#   Boston, J.F., Sullivan, S.L. A new class of solution methods for
+#   multicomponent, multistage separation processes. Can. J. Chem. Eng. 52
+#   (1974) 52-63
+###############################################################################
+
+
+from copy import copy
+
+from numpy import (abs, arange, array, clip, empty, errstate, exp, eye,
+                   isfinite, log, maximum, ones, where, zeros)
+from numpy.linalg import solve
+from scipy.constants import R
+from scipy.optimize import brentq
+
+from lib import EoS
+from lib.config import getMainWindowConfig
+
+
+def thomas(a, b, c, d):
+    """Solve tridiagonal systems with Thomas algorithm, the arrays can have
+    additional dimensions to solve several independent systems at once
+
+    Parameters
+    ----------
+    a : array
+        Subdiagonal, a[0] is not used
+    b : array
+        Diagonal
+    c : array
+        Superdiagonal, c[-1] is not used
+    d : array
+        Right hand side
+
+    >>> x = thomas(array([0, 1.]), array([2, 2.]), array([1, 0.]),
+    ...            array([3, 3.]))
+    >>> print("%0.1f %0.1f" % tuple(x))
+    1.0 1.0
+    """
+    N = len(b)
+    cp = empty(b.shape)
+    dp = empty(b.shape)
+    cp[0] = c[0]/b[0]
+    dp[0] = d[0]/b[0]
+    for j in range(1, N):
+        m = b[j]-a[j]*cp[j-1]
+        cp[j] = c[j]/m
+        dp[j] = (d[j]-a[j]*dp[j-1])/m
+
+    x = empty(b.shape)
+    x[-1] = dp[-1]
+    for j in range(N-2, -1, -1):
+        x[j] = dp[j]-cp[j]*x[j+1]
+    return x
+
+
+def blockThomas(A, B, C, D):
+    """Solve a block tridiagonal system
+
+    Parameters
+    ----------
+    A : array
+        Subdiagonal blocks, shape (N, n, n), A[0] is not used
+    B : array
+        Diagonal blocks, shape (N, n, n)
+    C : array
+        Superdiagonal blocks, shape (N, n, n), C[-1] is not used
+    D : array
+        Right hand side, shape (N, n)
+
+    Returns
+    -------
+    X : array
+        Solution, shape (N, n)
+
+    >>> from numpy import concatenate, allclose
+    >>> from numpy.random import RandomState
+    >>> rnd = RandomState(1)
+    >>> A, C = rnd.rand(4, 2, 2), rnd.rand(4, 2, 2)
+    >>> B = rnd.rand(4, 2, 2)+4*eye(2)
+    >>> D = rnd.rand(4, 2)
+    >>> M = zeros((8, 8))
+    >>> for j in range(4):
+    ...     M[2*j:2*j+2, 2*j:2*j+2] = B[j]
+    ...     if j:
+    ...         M[2*j:2*j+2, 2*j-2:2*j] = A[j]
+    ...     if j < 3:
+    ...         M[2*j:2*j+2, 2*j+2:2*j+4] = C[j]
+    >>> allclose(blockThomas(A, B, C, D).ravel(), solve(M, D.ravel()))
+    True
+    """
+    N, n = D.shape
+    Cp = empty((N, n, n))
+    Dp = empty((N, n))
+    M = B[0]
+    rhs = D[0]
+    for j in range(N):
+        if j:
+            M = B[j]-A[j].dot(Cp[j-1])
+            rhs = D[j]-A[j].dot(Dp[j-1])
+        if j < N-1:
+            # Factorize once for both right hand sides
+            sol = solve(M, array([*C[j].T, rhs]).T)
+            Cp[j] = sol[:, :n]
+            Dp[j] = sol[:, n]
+        else:
+            Dp[j] = solve(M, rhs)
+
+    X = empty((N, n))
+    X[-1] = Dp[-1]
+    for j in range(N-2, -1, -1):
+        X[j] = Dp[j]-Cp[j].dot(X[j+1])
+    return X
+
+
+def _Hv(cmp, T):
+    """Heat of vaporization of component, [J/kmol], clipped to the range of
+    DIPPR correlation as in Mezcla.Hv_DIPPR"""
+    Tmin, Tmax = cmp.calor_vaporizacion[-2:]
+    T = min(max(T, Tmin), Tmax)
+    Hv = cmp.DIPPR(T, cmp.calor_vaporizacion)
+
+    # Near the critical point the correlation can return complex or nan
+    # values
+    Hv = complex(Hv).real
+    if Hv > 0:
+        return Hv
+    return 0.
+
+
+def _mixture(mezcla, z):
+    """Copy of mixture with other composition, only the values used in EoS
+    calculation are updated, so the components are not loaded again from
+    database in each stage"""
+    new = copy(mezcla)
+    new.fraccion = list(z)
+    new.Mixing_Rule = getattr(new, mezcla.Mixing_Rule.__name__)
+    return new
+
+
+class Column(object):
+    """Rigorous stage by stage model of a distillation column with condenser
+    and reboiler, solved with the inside-out algorithm
+
+    The stages are counted from the top, the stage 1 is the condenser and
+    the stage N is the reboiler. The column specifications are the reflux
+    ratio and the distillate molar flow.
+
+    Parameters
+    ----------
+    feeds : list
+        List of (stage, Corriente) with the feed streams
+    N : integer
+        Number of stages, including condenser and reboiler
+    R : float
+        Reflux ratio
+    D : float
+        Distillate molar flow, [kmol/s]
+    P : float
+        Pressure at top of column, [Pa]
+    DeltaP : float
+        Pressure drop from top to bottom of column, [Pa]
+    condenser : integer
+        Condenser type:
+            0 - Total, liquid distillate
+            1 - Partial, vapor distillate
+    K : class
+        EoS class used to calculate the K values, default from
+        configuration
+    H : class
+        EoS class used to calculate the enthalpy departures, default from
+        configuration
+    tol : float
+        Tolerance in K values and temperatures of outer loop
+    maxiter : integer
+        Maximum number of outer loop iterations
+
+    Calculated values (after solve):
+        T: Temperature profile, [K]
+        P: Pressure profile, [Pa]
+        L, V: Liquid and vapor molar flows leaving each stage, [kmol/s]
+        x, y: Liquid and vapor molar fraction profiles
+        K: K values profile
+        Qc, Qr: Condenser and reboiler duty, [W]
+        distillate, bottom: Component molar flows of products, [kmol/s]
+        iterations: Number of outer loop iterations
+    """
+    def __init__(self, feeds, N, R, D, P, DeltaP=0, condenser=0, K=None,
+                 H=None, tol=1e-5, maxiter=30):
+        if N < 3:
+            raise ValueError("Column need at least one stage")
+        self.N = N
+        self.R = R
+        self.Dspec = D
+        self.condenser = condenser
+        self.tol = tol
+        self.maxiter = maxiter
+
+        Config = getMainWindowConfig()
+        if K is None:
+            K = EoS.K[Config.getint("Thermo", "K")]
+        if H is None:
+            H = EoS.H[Config.getint("Thermo", "H")]
+        self.Kmodel = K
+        self.Hmodel = H
+
+        stream = feeds[0][1]
+        self.mezcla = stream.mezcla
+        self.ids = stream.ids
+        self.componente = stream.componente
+        C = len(self.ids)
+        self.C = C
+        self.Tc = array([cmp.Tc for cmp in self.componente], dtype=float)
+        self.Pc = array([cmp.Pc for cmp in self.componente], dtype=float)
+        self.w = array([cmp.f_acent for cmp in self.componente], dtype=float)
+
+        self.P = P+DeltaP*arange(N)/(N-1)
+
+        # Feed component molar flows and enthalpy of each stage
+        self.f = zeros((N, C))
+        self.HF = zeros(N)
+        for stage, feed in feeds:
+            if not 1 <= stage <= N:
+                raise ValueError("Feed stage out of column")
+            j = stage-1
+            F = array(feed.caudalunitariomolar, dtype=float)
+            self.f[j] += F
+            self.HF[j] += self._feedEnthalpy(feed, F)
+
+        self.F = self.f.sum()
+        self.Bspec = self.F-D
+        if D <= 0 or self.Bspec <= 0:
+            raise ValueError("Distillate flow out of range")
+        if R <= 0:
+            raise ValueError("Reflux ratio must be positive")
+
+        # Liquid side draw ratio, the distillate in total condenser
+        self.su = zeros(N)
+        if not condenser:
+            self.su[0] = 1/R
+        self.sw = zeros(N)
+
+        # Scale factors of equations
+        self._scaleH = max(_Hv(cmp, T) for cmp, T in zip(
+            self.componente, self.Tc*0.7))
+
+    def _componentEnthalpy(self, T):
+        """Ideal gas and liquid component enthalpies at temperatures T
+        and its temperature derivatives, [J/kmol]"""
+        T = array(T, dtype=float, ndmin=1)
+        hV = empty((len(T), self.C))
+        hL = empty((len(T), self.C))
+        dhV = empty((len(T), self.C))
+        dhL = empty((len(T), self.C))
+        dT = 0.1
+        for i, cmp in enumerate(self.componente):
+            for j, t in enumerate(T):
+                h0 = cmp.Entalpia_ideal(t)*cmp.M
+                h1 = cmp.Entalpia_ideal(t+dT)*cmp.M
+                hv0 = _Hv(cmp, t)
+                hv1 = _Hv(cmp, t+dT)
+                hV[j, i] = h0
+                hL[j, i] = h0-hv0
+                dhV[j, i] = (h1-h0)/dT
+                dhL[j, i] = (h1-hv1-h0+hv0)/dT
+        return hV, hL, dhV, dhL
+
+    def _departure(self, eos, T):
+        """Vapor and liquid enthalpy departures, [J/kmol]"""
+        dep = -R*T*array(eos.H_exc, dtype=float)*1000
+        return where(isfinite(dep), dep, 0)
+
+    def _feedEnthalpy(self, feed, F):
+        """Enthalpy flow of feed with the column enthalpy model, [W]"""
+        hV, hL = self._componentEnthalpy(feed.T)[:2]
+        x = float(feed.x)
+        if 0 < x < 1:
+            fV = F.sum()*x*array(feed.Gas.fraccion, dtype=float)
+            fL = F-fV
+        elif x >= 1:
+            fV, fL = F, 0*F
+        else:
+            fV, fL = 0*F, F
+
+        depV = depL = 0
+        if getattr(feed, "H_exc", None) is not None:
+            depV, depL = -R*feed.T*array(feed.H_exc, dtype=float)*1000
+            if not isfinite(depV):
+                depV = 0
+            if not isfinite(depL):
+                depL = 0
+        return (fV*(hV[0]+depV)).sum()+(fL*(hL[0]+depL)).sum()
+
+    def _wilson(self, T):
+        """Wilson K values estimation, shape (N, C)"""
+        T = array(T, dtype=float)[:, None]
+        return self.Pc/self.P[:, None]*exp(
+            5.37*(1+self.w)*(1-self.Tc/T))
+
+    # Simple models
+    def _fitK(self, T, K, y, Tprev=None, Kprev=None):
+        """Fit the simple model of K values in each stage:
+            K = alfa·Kb,   ln Kb = A + B/T
+        with Kb the vapor composition weighted mean. The slope B is
+        estimated with the Wilson correlation, and updated with the secant of
+        rigorous values of two outer loop iterations when available"""
+        lnK = log(K)
+        lnKb = (y*lnK).sum(axis=1)
+        self.alfa = exp(lnK-lnKb[:, None])
+
+        Bw = -(y*5.37*(1+self.w)*self.Tc).sum(axis=1)
+        if Kprev is None:
+            B = Bw
+        else:
+            lnKbprev = (y*log(Kprev)).sum(axis=1)
+            with errstate(divide="ignore", invalid="ignore"):
+                Bs = (lnKb-lnKbprev)/(1/T-1/Tprev)
+                valid = (abs(T-Tprev) > 1e-3) & (Bs/Bw > 0.2) & (Bs/Bw < 5)
+            B = where(valid, Bs, self.B)
+        self.B = B
+        self.A = lnKb-B/T
+
+    def _fitH(self, T, depV, depL):
+        """Linear component enthalpies in each stage around T"""
+        hV, hL, dhV, dhL = self._componentEnthalpy(T)
+        self.T0 = T.copy()
+        self.aV = hV+depV[:, None]
+        self.aL = hL+depL[:, None]
+        self.bV = dhV
+        self.bL = dhL
+
+    def _simple(self, T):
+        """K values and enthalpies from the simple models at temperatures T,
+        and its temperature derivatives"""
+        Kb = exp(self.A+self.B/T)
+        K = self.alfa*Kb[:, None]
+        dK = -K*(self.B/T**2)[:, None]
+        dT = (T-self.T0)[:, None]
+        hV = self.aV+self.bV*dT
+        hL = self.aL+self.bL*dT
+        return K, dK, hV, hL, self.bV, self.bL
+
+    def _bubble(self, x):
+        """Bubble temperature of liquid with simple model"""
+        Kb = 1/(self.alfa*x).sum(axis=1)
+        return self.B/(log(Kb)-self.A)
+
+    # Inner loop
+    def _equations(self, X, jacobian=True):
+        """MESH equations of simple model and its block jacobian"""
+        N, C = self.N, self.C
+        v = X[:, :C]
+        l = X[:, C:2*C]
+        T = X[:, -1]
+        V = v.sum(axis=1)
+        L = l.sum(axis=1)
+        su = self.su[:, None]
+        sw = self.sw[:, None]
+        K, dK, hV, hL, dhV, dhL = self._simple(T)
+
+        lin = zeros((N, C))
+        lin[1:] = l[:-1]
+        vin = zeros((N, C))
+        vin[:-1] = v[1:]
+        HLin = zeros(N)
+        HLin[1:] = (l*hL).sum(axis=1)[:-1]
+        HVin = zeros(N)
+        HVin[:-1] = (v*hV).sum(axis=1)[1:]
+
+        M = (1+su)*l+(1+sw)*v-lin-vin-self.f
+        E = K*(V/L)[:, None]*l-v
+        H = (1+self.su)*(l*hL).sum(axis=1)+(1+self.sw)*(v*hV).sum(
+            axis=1)-HLin-HVin-self.HF
+        H /= self._scaleH
+
+        # Specifications replace the energy balance of condenser and
+        # reboiler, with total condenser there are no vapor distillate and
+        # the condenser temperature is the bubble point
+        if self.condenser:
+            H[0] = L[0]-self.R*V[0]
+        else:
+            E[0] = v[0]
+            H[0] = (K[0]*l[0]).sum()/L[0]-1
+        H[-1] = L[-1]-self.Bspec
+
+        F = empty((N, 2*C+1))
+        F[:, :C] = M
+        F[:, C:2*C] = E
+        F[:, -1] = H
+        if not jacobian:
+            return F
+
+        n = 2*C+1
+        I = eye(C)
+        A = zeros((N, n, n))
+        B = zeros((N, n, n))
+        Cm = zeros((N, n, n))
+
+        # Material balances
+        B[:, :C, :C] = (1+sw)[:, :, None]*I
+        B[:, :C, C:2*C] = (1+su)[:, :, None]*I
+        A[:, :C, C:2*C] = -I
+        Cm[:, :C, :C] = -I
+
+        # Equilibrium relations
+        B[:, C:2*C, :C] = (K*l/L[:, None])[:, :, None]-I
+        B[:, C:2*C, C:2*C] = (K*(V/L)[:, None])[:, :, None]*I - \
+            (K*l*(V/L**2)[:, None])[:, :, None]
+        B[:, C:2*C, -1] = dK*(V/L)[:, None]*l
+
+        # Energy balances
+        B[:, -1, :C] = (1+sw)*hV/self._scaleH
+        B[:, -1, C:2*C] = (1+su)*hL/self._scaleH
+        B[:, -1, -1] = ((1+su)*l*dhL+(1+sw)*v*dhV).sum(axis=1)/self._scaleH
+        A[1:, -1, C:2*C] = -hL[:-1]/self._scaleH
+        A[1:, -1, -1] = -(l*dhL).sum(axis=1)[:-1]/self._scaleH
+        Cm[:-1, -1, :C] = -hV[1:]/self._scaleH
+        Cm[:-1, -1, -1] = -(v*dhV).sum(axis=1)[1:]/self._scaleH
+
+        # Specification rows
+        for j in (0, N-1):
+            A[j, -1] = 0
+            B[j, -1] = 0
+            Cm[j, -1] = 0
+        if self.condenser:
+            B[0, -1, :C] = -self.R
+            B[0, -1, C:2*C] = 1
+        else:
+            B[0, C:2*C] = 0
+            B[0, C:2*C, :C] = I
+            B[0, -1, C:2*C] = K[0]/L[0]-(K[0]*l[0]).sum()/L[0]**2
+            B[0, -1, -1] = (dK[0]*l[0]).sum()/L[0]
+        B[-1, -1, C:2*C] = 1
+        return F, A, B, Cm
+
+    def _newton(self, X, tol=1e-9, maxiter=50):
+        """Solve the MESH equations of simple models by Newton-Raphson"""
+        C = self.C
+        flows = slice(0, 2*C)
+        for it in range(maxiter):
+            F, A, B, Cm = self._equations(X)
+            error = abs(F).max()/self.F
+            if error < tol:
+                break
+            dX = blockThomas(A, B, Cm, -F)
+
+            # Limit the temperature change and avoid negative flows
+            t = min(1, 25/max(abs(dX[:, -1]).max(), 1e-10))
+            Xn = X+t*dX
+            Xn[:, flows] = where(Xn[:, flows] < 0, 0.1*X[:, flows],
+                                 Xn[:, flows])
+            if not self.condenser:
+                Xn[0, :C] = 0
+            X = Xn
+        else:
+            raise ValueError("Inner loop don't converge")
+        return X
+
+    # Initialization
+    def _initial(self):
+        """Initial estimation of profiles, constant molar overflow and
+        bubble point method with Wilson K values"""
+        N, C = self.N, self.C
+        D, B = self.Dspec, self.Bspec
+        z = self.f.sum(axis=0)/self.F
+        Tf = brentq(lambda T: (z*self._wilson([T]*N)[0]).sum()-1, 10, 5000)
+
+        # Estimation of products by volatility order
+        d = zeros(C)
+        rest = D
+        Kf = self._wilson([Tf]*N)[0]
+        for i in Kf.argsort()[::-1]:
+            d[i] = min(rest, z[i]*self.F)
+            rest -= d[i]
+        b = z*self.F-d
+        xd = d/D
+        xb = b/B
+        Tt = brentq(lambda T: (xd*self._wilson([T]*N)[0]).sum()-1, 10, 5000)
+        Tb = brentq(lambda T: (xb*self._wilson([T]*N)[-1]).sum()-1, 10,
+                    5000)
+        T = Tt+(Tb-Tt)*arange(N)/(N-1)
+
+        # Constant molar overflow profiles
+        Lr = self.R*D
+        if self.condenser:
+            Vtop = D
+        else:
+            Vtop = 0
+        L = zeros(N)
+        V = zeros(N)
+        Lcum = Lr
+        Vcum = Lr+D
+        for j in range(N):
+            Lcum += self.f[j].sum()*(j > 0)
+            L[j] = Lcum if j else Lr
+            V[j] = Vcum if j else Vtop
+        L[-1] = B
+        V[-1] = L[-2]-B
+        V = maximum(V, 1e-3*self.F)
+        L = maximum(L, 1e-3*self.F)
+
+        # Simple model from Wilson correlation, weighted with feed
+        y = ones((N, C))*z
+        self._fitK(T, self._wilson(T), y)
+        self._fitH(T, zeros(N), zeros(N))
+
+        # Bubble point method iterations to refine compositions
+        for it in range(5):
+            K = self._simple(T)[0]
+            S = K*(V/L)[:, None]
+            a = -ones((N, C))
+            b = (1+self.su)[:, None]+(1+self.sw)[:, None]*S
+            c = zeros((N, C))
+            c[:-1] = -S[1:]
+            l = thomas(a, b, c, self.f)
+            l = maximum(l, 0)
+            x = l/l.sum(axis=1)[:, None]
+            T = self._bubble(x)
+        v = S*l
+        if not self.condenser:
+            v[0] = 0
+
+        X = empty((N, 2*C+1))
+        X[:, :C] = v
+        X[:, C:2*C] = l
+        X[:, -1] = T
+        return X
+
+    # Outer loop
+    def _rigorous(self, T, x, y, L, V, K):
+        """K values and enthalpy departures of stages with the EoS, the
+        values not available are taken from K, the simple model values"""
+        N = self.N
+        K = K.copy()
+        depV = zeros(N)
+        depL = zeros(N)
+        for j in range(N):
+            z = (L[j]*x[j]+V[j]*y[j])/(L[j]+V[j])
+            mezcla = _mixture(self.mezcla, z)
+            P = self.P[j]/101325
+            try:
+                eos = self.Kmodel(T[j], P, mezcla)
+                Ki = array(eos.Ki, dtype=float)
+            except Exception:
+                # The flash of EoS can fail far from the solution, keep the
+                # simple model values for that stage
+                continue
+            valid = isfinite(Ki) & (Ki > 0)
+            K[j] = where(valid, Ki, K[j])
+            try:
+                if self.Hmodel is self.Kmodel:
+                    eosH = eos
+                else:
+                    eosH = self.Hmodel(T[j], P, mezcla)
+                depV[j], depL[j] = self._departure(eosH, T[j])
+            except Exception:
+                pass
+        return K, depV, depL
+
+    def solve(self):
+        """Solve the column"""
+        C = self.C
+        X = self._initial()
+        X = self._newton(X)
+
+        Told = Kold = None
+        for it in range(1, self.maxiter+1):
+            v = X[:, :C]
+            l = X[:, C:2*C]
+            T = X[:, -1]
+            L = l.sum(axis=1)
+            V = v.sum(axis=1)
+            x = l/L[:, None]
+            y = v/maximum(V, 1e-300)[:, None]
+            Ks = self._simple(T)[0]
+            if not self.condenser:
+                # Total condenser, incipient vapor of distillate
+                y[0] = Ks[0]*x[0]/(Ks[0]*x[0]).sum()
+
+            K, depV, depL = self._rigorous(T, x, y, L, V, Ks)
+
+            # Convergence check, simple model match the rigorous values
+            if it > 1:
+                error = abs(log(K/Ks)).max()
+                if error < self.tol and abs(T-Told).max() < self.tol*T.max():
+                    break
+                self._fitK(T, K, clip(y, 0, 1), Told, Kold)
+            else:
+                self._fitK(T, K, clip(y, 0, 1))
+            Told = T.copy()
+            Kold = K
+            self._fitH(T, depV, depL)
+            X = self._newton(X)
+        else:
+            raise ValueError("Outer loop don't converge")
+
+        self.iterations = it
+        self._solution(X)
+
+    def _solution(self, X):
+        """Set the calculated values of converged profiles"""
+        C = self.C
+        v = X[:, :C]
+        l = X[:, C:2*C]
+        T = X[:, -1]
+        K, dK, hV, hL = self._simple(T)[:4]
+        self.T = T
+        self.L = l.sum(axis=1)
+        self.V = v.sum(axis=1)
+        self.x = l/self.L[:, None]
+        self.y = K*self.x
+        self.y /= self.y.sum(axis=1)[:, None]
+        self.K = K
+        self.l = l
+        self.v = v
+
+        # Duties from energy balances of condenser and reboiler
+        HL = (l*hL).sum(axis=1)
+        HV = (v*hV).sum(axis=1)
+        self.Qc = (1+self.su[0])*HL[0]+HV[0]-HV[1]-self.HF[0]
+        self.Qr = HL[-1]+HV[-1]-HL[-2]-self.HF[-1]
+
+        if self.condenser:
+            self.distillate = v[0]
+        else:
+            self.distillate = self.su[0]*l[0]
+        self.bottom = l[-1]
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -32,9 +32,10 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 ###############################################################################
 
 
+from numpy import array, eye, ndim, tensordot
 from scipy import roots, log, sqrt, log10, exp, sin, zeros
 
-from lib.compuestos import Componente
+from lib.compuestos import Componente, componentes, toUnidad
 from lib.physics import R_atml, R
 from lib import unidades, config
 from lib.elemental import Elemental
@@ -152,6 +153,12 @@ def _mix_from_molarflow_and_massfraction(molarFlow, massFraction, cmps):
     return kw
 
 
+def _expand(values, T):
+    """Add to an array of component values the axes of temperature array to
+    broadcast them with the properties calculated at T"""
+    return values.reshape(values.shape+(1,)*ndim(T))
+
+
 class Mezcla(config.Entity):
     """
     Class to model mixure calculation, component, physics properties, mix rules
@@ -188,7 +195,7 @@ class Mezcla(config.Entity):
 
         self.kwargs = Mezcla.kwargs.copy()
         self.kwargs.update(kwargs)
-        if self.kwargs["ids"]:
+        if self.kwargs.get("ids"):
             self.ids = self.kwargs.get("ids")
         else:
             Config = config.getMainWindowConfig()
@@ -197,7 +204,7 @@ class Mezcla(config.Entity):
                 self.ids = eval(txt)
             else:
                 self.ids = txt
-        self.componente = [Componente(int(i)) for i in self.ids]
+        self.componente = componentes(self.ids)
         fraccionMolar = self.kwargs.get("fraccionMolar", None)
         fraccionMasica = self.kwargs.get("fraccionMasica", None)
         caudalMasico = self.kwargs.get("caudalMasico", None)
@@ -345,6 +352,31 @@ class Mezcla(config.Entity):
         """reduced pressure"""
         return P/self.ppc
 
+    def componentProperty(self, name, *args):
+        """Evaluate a property for all components of mixture
+
+        Parameters
+        ----------
+        name : str
+            Name of Componente method, i.e. Mu_Gas, or attribute for the
+            constant properties, i.e. Tc
+        args : list
+            Arguments of method, the temperature can be an array
+
+        Returns
+        -------
+        values : array
+            Property values in SI units, with the components in first axis
+            and the temperatures, if given as array, in the following axes
+        """
+        values = []
+        for cmp in self.componente:
+            value = getattr(cmp, name)
+            if callable(value):
+                value = value(*args)
+            values.append(value)
+        return array(values, dtype=float)
+
     def Kij(self, T=0, EOS=None):
         """Calculate binary interaction matrix for component of mixture,
         use bip data from dat/bip directory
@@ -834,22 +866,15 @@ class Mezcla(config.Entity):
     def _lib_Costald(self):
         """Library for saturated liquid density by Costald method,
         Value in mol/l"""
+        x = array(self.fraccion)
+        Vc = self.componentProperty("Vc")
+        Tc = self.componentProperty("Tc")
+
         # eq 6A3.1-2
-        suma1 = 0
-        suma2 = 0
-        suma3 = 0
-        for i in range(len(self.componente)):
-            suma1 += self.fraccion[i]*self.componente[i].Vc
-            suma2 += self.fraccion[i]*self.componente[i].Vc**(2./3)
-            suma3 += self.fraccion[i]*self.componente[i].Vc**(1./3)
-        Vm = (suma1+3*suma2*suma3)/4
+        Vm = (x.dot(Vc)+3*x.dot(Vc**(2./3))*x.dot(Vc**(1./3)))/4
 
-        # eq 6A3.1-5
-        suma = 0
-        for i in range(len(self.componente)):
-            for j in range(len(self.componente)):
-                suma += self.fraccion[i]*self.fraccion[j]*sqrt(self.componente[i].Vc*self.componente[j].Vc*self.componente[i].Tc*self.componente[j].Tc)
-        Tmc = suma/Vm
+        # eq 6A3.1-5, the double sum of xi*xj*(Vci*Vcj*Tci*Tcj)^0.5 factorized
+        Tmc = x.dot(sqrt(Vc*Tc))**2/Vm
         return Vm, Tmc
 
     def RhoL_Costald(self, T):
@@ -863,7 +888,8 @@ class Mezcla(config.Entity):
         Vrd = (-0.296123+0.386914*Tr-0.0427258*Tr**2-0.0480645*Tr**3)/(Tr-1.00001)    #eq 6A3.2-8
 
         # eq 6A3.2-1
-        return unidades.Density(1/(Vm*Vr0*(1-self.f_acent_mod*Vrd))*self.M, "gl")
+        return toUnidad(unidades.Density,
+                        1/(Vm*Vr0*(1-self.f_acent_mod*Vrd))*self.M, "gl")
 
     def RhoL_Tait_Costald(self, T, P):
         """Calculate saturated liquid density by Tait-Costald method,
@@ -924,9 +950,8 @@ class Mezcla(config.Entity):
     def Tension(self,T):
         """Calculate surface tension at low pressure,
         API procedure 10A2.1, pag 991"""
-        tension = sum([xi*cmp.Tension(T) for xi, cmp in
-                       zip(self.fraccion, self.componente)])
-        return unidades.Tension(tension)
+        tension = self.componentProperty("Tension", T)
+        return toUnidad(unidades.Tension, tensordot(self.fraccion, tension, 1))
 
     def Tension_superficial_presion(self,T, parachor, fraccion_liquido, fraccion_vapor):
         """Calculate surface tension at high pressure,
@@ -955,36 +980,33 @@ class Mezcla(config.Entity):
 
     def Mu_Liquido(self, T, P):
         """Calculate liquid viscosity, API procedure 11A3.1, pag 1051"""
-        suma = 0
-        for xi, cmp in zip(self.fraccion, self.componente):
-            suma += xi*cmp.Mu_Liquido(T, P)**(1./3)
-        return unidades.Viscosity(suma**3)
+        mu = self.componentProperty("Mu_Liquido", T, P)
+        suma = tensordot(self.fraccion, mu**(1./3), 1)
+        return toUnidad(unidades.Viscosity, suma**3)
 
     def Mu_Gas_Wilke(self, T):
-        """Calculate gases viscosity, API procedure 11B2.1, pag 1102"""
-        mui=[cmp.Mu_Gas(T, 1) for cmp in self.componente]
-
-        kij = []
-        for i in range(len(self.componente)):
-            kiji = []
-            for j in range(len(self.componente)):
-                if i == j:
-                    kiji.append(0)
-                else:
-                    kiji.append((1+(mui[i]/mui[j])**0.5*(self.componente[j].M/self.componente[i].M)**0.25)**2/8**0.5/(1+self.componente[i].M/self.componente[j].M)**0.5)
-            kij.append(kiji)
-
-        suma = []
-        for i in range(len(self.componente)):
-            sumai = 0
-            if self.fraccion[i]!=0:
-                for j in range(len(self.componente)):
-                    sumai += kij[i][j]*self.fraccion[j]/self.fraccion[i]
-            suma.append(sumai)
-        mu = 0
-        for i in range(len(self.componente)):
-            mu += mui[i]/(1.+suma[i])
-        return unidades.Viscosity(mu)
+        """Calculate gases viscosity, API procedure 11B2.1, pag 1102
+        The temperature can be an array, the value is then returned as array
+        in SI units"""
+        n = len(self.componente)
+        x = array(self.fraccion)
+        mu = self.componentProperty("Mu_Gas", T, 1)
+        M = _expand(self.componentProperty("M"), T)
+        Mi = M[:, None]
+        Mj = M[None, :]
+
+        # Matrix with i in first axis and j in second axis, the diagonal terms
+        # are excluded of sum
+        kij = (1+(mu[:, None]/mu[None, :])**0.5*(Mj/Mi)**0.25)**2 / \
+            8**0.5/(1+Mi/Mj)**0.5
+        kij *= _expand(1-eye(n), T)
+
+        xij = zeros((n, n))
+        for i in range(n):
+            if x[i] != 0:
+                xij[i] = x/x[i]
+        suma = (kij*_expand(xij, T)).sum(axis=1)
+        return toUnidad(unidades.Viscosity, (mu/(1.+suma)).sum(axis=0))
 
     def Mu_Gas_Stiel(self, T, P, rhoG=0, muo=0):
         """Calculate gas viscosity at high pressure, API procedure 11B4.1, pag 1107"""
@@ -1050,44 +1072,25 @@ class Mezcla(config.Entity):
         return unidades.ThermalConductivity(k)
 
     def ThCond_Gas(self, T, P):
-        """Calculate gas thermal conductivity, API procedure 12A2.1, pag 1145"""
-        ki = []
-        S = []
-        mu = []
-        for cmp in self.componente:
-            ki.append(cmp.ThCond_Gas(T, P))
-            if cmp.indice == 1:
-                S.append(78.8888889)
-            else:
-                S.append(1.5*cmp.Tb)
-            mu.append(cmp.Mu_Gas(T, P))
-
-        Sij = []
-        for i in range(len(self.componente)):
-            Siji = []
-            for j in range(len(self.componente)):
-                Siji.append(sqrt(S[i]*S[j]))
-            Sij.append(Siji)
-
-        Aij = []
-        for i in range(len(self.componente)):
-            Aiji = []
-            for j in range(len(self.componente)):
-                Aiji.append(0.25*(1+sqrt(mu[i]/mu[j]*(self.componente[j].M/self.componente[i].M)**0.75*(1+S[i]/T)/(1+S[j]/T)))**2*(1+Sij[i][j]/T)/(1+S[i]/T))
-            Aij.append(Aiji)
-
-        sumaj = []
-        for i in range(len(self.componente)):
-            suma = 0
-            for j in range(len(self.componente)):
-                suma += Aij[i][j]*self.fraccion[j]
-            sumaj.append(suma)
-
-        k = 0
-        for i in range(len(self.componente)):
-            k += ki[i]*self.fraccion[i]/sumaj[i]
-
-        return unidades.ThermalConductivity(k)
+        """Calculate gas thermal conductivity, API procedure 12A2.1, pag 1145
+        The temperature can be an array, the value is then returned as array
+        in SI units"""
+        x = _expand(array(self.fraccion), T)
+        ki = self.componentProperty("ThCond_Gas", T, P)
+        mu = self.componentProperty("Mu_Gas", T, P)
+        M = _expand(self.componentProperty("M"), T)
+        S = [78.8888889 if cmp.indice == 1 else 1.5*cmp.Tb
+             for cmp in self.componente]
+        S = _expand(array(S), T)
+
+        # Matrix with i in first axis and j in second axis
+        Si = S[:, None]
+        Sj = S[None, :]
+        Aij = 0.25*(1+sqrt(mu[:, None]/mu[None, :]*(M[None, :]/M[:, None])**0.75 *
+                           (1+Si/T)/(1+Sj/T)))**2*(1+sqrt(Si*Sj)/T)/(1+Si/T)
+        sumaj = (Aij*x[None, :]).sum(axis=1)
+        k = (ki*x/sumaj).sum(axis=0)
+        return toUnidad(unidades.ThermalConductivity, k)
 
     def Solubilidad_agua(self, T):
         """Método de cálculo de la solubilidad de agua en el componente, API procedure 9A1.1, 9A1.5, pag 897
@@ -1205,7 +1208,7 @@ class Mezcla(config.Entity):
         if mezcla:
             self._bool = True
             self.ids = mezcla["ids"]
-            self.componente = [Componente(int(i)) for i in self.ids]
+            self.componente = componentes(self.ids)
             self.fraccion = [unidades.Dimensionless(x) for x in mezcla["fraction"]]
             self.fraccion_masica = [unidades.Dimensionless(x) for x in mezcla["massFraction"]]
             self.caudalunitariomasico = [unidades.MassFlow(x) for x in mezcla["massUnitFlow"]]
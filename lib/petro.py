@@ -24,14 +24,17 @@ import time
 
 from PyQt5.QtWidgets import QApplication
 from scipy import exp, sqrt, log10, log
-from scipy.optimize import fsolve, leastsq
+from scipy.optimize import leastsq
 from numpy.linalg import solve
-from numpy import array
+from numpy import (absolute, arange, array, asarray, broadcast_arrays,
+                   errstate, inf, isfinite, nan, select, tensordot, where,
+                   zeros)
 
 from . import unidades
 from .physics import R_atml, R_Btu
 from .compuestos import Componente, newComponente
 from .config import conf_dir
+from .hydrate import P_Sloan, T_Sloan
 
 
 def prop_Ahmed(propiedad, n_carbonos):
@@ -84,6 +87,16 @@ def prop_Riazi_Daubert(propiedad, Tb, g):
         x=unidades.SpecificVolume(x, "ft3lb")
     return x
 
+# Riazi-Daubert (1987) coefficients a-f, by rows, for M, Tc [K], Pc [bar],
+# Vc [cm³/g], I and CH, by columns, as function of Tb and SG
+RD_Tb_SG = array([
+    [1032.1, 9.5232, 3.195846e5, 6.049e-2, 0.0243, 3.47028],
+    [9.78e-4, -9.314e-4, -8.505e-3, -2.6422e-3, 7.0294e-4, 1.485e-2],
+    [-9.53384, -0.54444, -4.8014, -0.26404, 2.46832, 16.9402],
+    [2.e-3, 6.48e-4, 5.749e-3, 1.971e-3, -1.0268e-3, -0.012491],
+    [0.97476, 0.81067, -0.4844, 0.7506, 0.05721, -2.72522],
+    [6.51274, 0.53691, 4.0846, -1.2028, -0.7199, -6.79769]])
+
 def prop_Riazi_Daubert_Tb_SG(propiedad, Tb, g):
     """
     Riazi, M. R., and T. E. Daubert. “Characterization Parameters for Petroleum Fractions.” Industrial Engineering and Chemical Research 26, no. 24 (1987): 755–759.
@@ -97,12 +110,7 @@ def prop_Riazi_Daubert_Tb_SG(propiedad, Tb, g):
     Tb: punto de ebullición , K
     g: gravedad específica
     """
-    a=[1032.1, 9.5232, 3.195846e5, 6.049e-2, 0.0243, 3.47028][propiedad]
-    b=[9.78e-4, -9.314e-4, -8.505e-3, -2.6422e-3, 7.0294e-4, 1.485e-2][propiedad]
-    c=[-9.53384, -0.54444, -4.8014, -0.26404, 2.46832, 16.9402][propiedad]
-    d=[2.e-3, 6.48e-4, 5.749e-3, 1.971e-3, -1.0268e-3, -0.012491][propiedad]
-    e=[0.97476, 0.81067, -0.4844, 0.7506, 0.05721, -2.72522][propiedad]
-    f=[6.51274, 0.53691, 4.0846, -1.2028, -0.7199, -6.79769][propiedad]
+    a, b, c, d, e, f = RD_Tb_SG[:, propiedad]
     x=a*Tb.K**e*g**f*exp(b*Tb.K+c*g+d*Tb.K*g)
     if propiedad==1:
         x=unidades.Temperature(x)
@@ -407,52 +415,18 @@ def Hydrates_Sloan(prop, T=None, P=None, y=[]):
     T: temperatura
     P: presión
     y: composición, array con las fracciones molares de los componentes subceptibles de formar hidratos, [CH4, C2H6, C3H8, i-C4H10, n-C4H10, N2, CO2, H2S]
+    La curva completa de formación de hidratos se calcula con lib.hydrate
     """
     T=unidades.Temperature(T)
     P=unidades.Pressure(P, "atm")
-    A0=[1.63636, 6.41934, -7.8499, -2.17137, -37.211, 1.78857, 9.0242, -4.7071]
-    A1=[0.0,  0.0,  0.0,  0.0,  0.86564,  0.0,  0.0,  0.06192]
-    A2=[0.0,  0.0,  0.0,  0.0,  0.0,  -0.001356,  0.0,  0.0]
-    A3=[31.6621,  -290.283,  47.056,  0.0,  732.20,  -6.187,  -207.033,  82.627]
-    A4=[-49.3534,  2629.10,  0.0,  0.0,  0.0,  0.0,  0.0,  0.0]
-    A5=[5.31e-6, 0.0, -1.17e-6, 0.0, 0.0, 0.0, 4.66e-5, -7.39e-6]
-    A6=[0.0, 0.0, 7.145e-4, 1.251e-3, 0.0, 0.0, -6.992e-3, 0.0]
-    A7=[0.0, -9.0e-8, 0.0, 1.0e-8, 9.37e-6, 2.5e-7, -2.89e-6, 0.0]
-    A8=[0.128525,  0.129759,  0.0,  0.166097,  -1.07657,  0.0,  -6.233e-3,  0.240869]
-    A9=[-0.78338, -1.19703,  0.12348, -2.75945, 0.0, 0.0, 0.0, -0.64405]
-    A10=[0.0, -8.46e4, 1.669e4, 0.0, 0.0, 0.0, 0.0, 0.0]
-    A11=[0.0, -71.0352, 0.0, 0.0, -66.221, 0.0, 0.0, 0.0]
-    A12=[0.0, 0.596404, 0.23319, 0.0, 0.0, 0.0, 0.27098, 0.0]
-    A13=[-5.3569, -4.7437, 0.0, 0.0, 0.0, 0.0, 0.0, -12.704]
-    A14=[0.0, 7.82e4, -4.48e4, -8.84e2, 9.17e5, 5.87e5, 0.0, 0.0]
-    A15=[-2.3e-7, 0.0, 5.5e-6, 0.0, 0.0, 0.0, 8.82e-5, -1.3e-6]
-    A16=[-2.0e-8, 0.0, 0.0, -5.4e-7, 4.98e-6, 1.0e-8, 2.55e-6, 0.0]
-    A17=[0.0, 0.0, 0.0, -1.0e-8, -1.26e-6, 1.1e-7, 0.0, 0.0]
-
-    def ft(T):
-        suma=1
-        k=[]
-        for i in range(len(y)):
-            k.append(exp(A0[i]+A1[i]*T+A2[i]*P.psi+A3[i]/T+A4[i]/P.psi+A5[i]*P.psi*T+A6[i]*T**2+A7[i]*P.psi**2+A8[i]*P.psi/T+A9[i]*log(P.psi/T)+A10[i]/P.psi**2+A11[i]*T/P.psi+A12[i]*T**2/P.psi+A13[i]*P.psi/T**2+A14[i]*T/P.psi**3+A15[i]*T**3+A16[i]*P.psi**3/T**2+A17[i]*T**4))
-            suma-=y[i]/k[i]
-        return suma
-
-    def fp(P):
-        suma=1
-        k=[]
-        for i in range(len(y)):
-            k.append(exp(A0[i]+A1[i]*T.F+A2[i]*P+A3[i]/T.F+A4[i]/P+A5[i]*P*T.F+A6[i]*T.F**2+A7[i]*P**2+A8[i]*P/T.F+A9[i]*log(P/T.F)+A10[i]/P**2+A11[i]*T.F/P+A12[i]*T.F**2/P+A13[i]*P/T.F**2+A14[i]*T.F/P**3+A15[i]*T.F**3+A16[i]*P**3/T.F**2+A17[i]*T.F**4))
-            suma-=y[i]/k[i]
-        return suma
-
     if prop=="T":
-        t=fsolve(ft, T.F)
+        t=T_Sloan(P, y)
         hidrate=t>T
-        lim=unidades.Temperature(t, "F")
+        lim=unidades.Temperature(t)
     else:
-        p=fsolve(fp, P.psi)
-        hidrate=p>P
-        lim=unidades.Pressure(p, "psi")
+        p=P_Sloan(T, y)
+        hidrate=P>p
+        lim=unidades.Pressure(p)
 
     return lim, hidrate
 
@@ -526,122 +500,227 @@ def Viscosidad_from_kinematic(tipo, mu):
     return parametros[0]*mu+1/(parametros[1]+parametros[2]*mu+parametros[3]*mu**2+parametros[4]*mu**3)
 
 
+def _Z_array(Tr, Pr):
+    """Convert the reduced conditions to broadcasted float arrays"""
+    Tr, Pr = broadcast_arrays(asarray(Tr, dtype=float),
+                              asarray(Pr, dtype=float))
+    return Tr, Pr
+
+
+def _Z_return(Z):
+    """Return a float for scalar input, array else"""
+    if Z.ndim == 0:
+        return float(Z)
+    return Z
+
+
+def _newton(f, x0, args=(), lo=0., hi=inf, tol=1e-10, maxiter=100):
+    """Vectorized Newton-Raphson solver, the steps that go out of the
+    (lo, hi) interval are replaced by a bisection with the bound, the values
+    without convergence are returned as nan. In each iteration only the
+    values not converged yet are evaluated
+
+    Parameters
+    ----------
+    f : function
+        Return the function value and its analytic derivative, f(x, *args)
+    x0 : array
+        Initial values
+    args : tuple
+        Arrays with the parameters of function, with the shape of x0
+    lo, hi : float
+        Bounds of solution
+    tol : float
+        Relative tolerance in solution
+    maxiter : int
+        Maximum number of iterations
+    """
+    x0 = asarray(x0, dtype=float)
+    x = x0.ravel().copy()
+    args = [asarray(arg, dtype=float).ravel() for arg in args]
+    result = zeros(x.shape)+nan
+    active = arange(x.size)
+    with errstate(all="ignore"):
+        for i in range(maxiter):
+            xi = x[active]
+            fx, dfx = f(xi, *[arg[active] for arg in args])
+            step = fx/dfx
+            x_new = xi-step
+            x_new = where(x_new <= lo, (xi+lo)/2, x_new)
+            x_new = where(x_new >= hi, (xi+hi)/2, x_new)
+            x[active] = x_new
+
+            converged = absolute(step) <= tol*absolute(x_new)
+            done = converged | ~isfinite(x_new)
+            ok = converged & isfinite(x_new)
+            result[active[ok]] = x_new[ok]
+            active = active[~done]
+            if not active.size:
+                break
+    return result.reshape(x0.shape)
+
+
+def _Z_DAK_form(g, A):
+    """Exponential term of Dranchuk equations and its derivative,
+    (1+A·g²)·g²·exp(-A·g²)"""
+    e = exp(-A*g**2)
+    return (1+A*g**2)*g**2*e, 2*g*e*(1+A*g**2-A**2*g**4)
+
+
 def Z_Papay(Tr, Pr):
     """Papay, J. “A Termelestechnologiai Parameterek Valtozasa a Gazlelepk Muvelese Soran.” OGIL  MUSZ, Tud, Kuzl. [Budapest] (1985): 267–273."""
-    return 1-3.53*Pr/10**(0.9813*Tr)+0.274*Pr**2/10**(0.8157*Tr)
+    Tr, Pr = _Z_array(Tr, Pr)
+    return _Z_return(1-3.53*Pr/10**(0.9813*Tr)+0.274*Pr**2/10**(0.8157*Tr))
 
 def Z_Hall_Yarborough(Tr, Pr):
-    """Hall, K. R., and L. Yarborough. “A New Equation of State for Z-factor Calculations.” Oil and Gas Journal (June 18, 1973): 82–92."""
-    X1=-0.06125*Pr/Tr*exp(-1.2*(1-1/Tr)**2)
-    X2=14.76/Tr-9.76/Tr**2+4.58/Tr**3
-    X3=90.7/Tr-242.2/Tr**2+42.4/Tr**3
-    X4=2.18+2.82/Tr
-    def f(Y):
-        return X1+(Y+Y**2+Y**3-Y**4)/(1-Y)**3-X2*Y**2+X3*Y**X4
-    Yo=0.0125*Pr/Tr*exp(-1.2*(1-1/Tr)**2)
-    Y=fsolve(f, Yo, full_output=True)
-    if Y[2]==1:
-        return 0.06125*Pr/Tr/Y[0]*exp(-1.2*(1-1/Tr)**2)
-    else:
-        return float("nan")
+    """Hall, K. R., and L. Yarborough. “A New Equation of State for Z-factor Calculations.” Oil and Gas Journal (June 18, 1973): 82–92.
+
+    >>> print("%0.4f" % Z_Hall_Yarborough(1.5, 2))
+    0.8208
+    >>> print(" ".join("%0.4f" % z for z in Z_Hall_Yarborough(1.5, [2, 5])))
+    0.8208 0.8068
+    """
+    Tr, Pr = _Z_array(Tr, Pr)
+    t = exp(-1.2*(1-1/Tr)**2)
+    X1 = -0.06125*Pr/Tr*t
+    X2 = 14.76/Tr-9.76/Tr**2+4.58/Tr**3
+    X3 = 90.7/Tr-242.2/Tr**2+42.4/Tr**3
+    X4 = 2.18+2.82/Tr
+
+    def f(Y, X1, X2, X3, X4):
+        fY = X1+(Y+Y**2+Y**3-Y**4)/(1-Y)**3-X2*Y**2+X3*Y**X4
+        dfY = (1+4*Y+4*Y**2-4*Y**3+Y**4)/(1-Y)**4-2*X2*Y+X3*X4*Y**(X4-1)
+        return fY, dfY
+
+    Yo = 0.0125*Pr/Tr*t
+    Y = _newton(f, Yo, (X1, X2, X3, X4), 0, 1)
+    with errstate(all="ignore"):
+        Z = 0.06125*Pr/Tr/Y*t
+    return _Z_return(Z)
 
 def Z_Dranchuk_Abu_Kassem(Tr, Pr):
-    """Dranchuk, P. M., and J. H. Abu-Kassem. “Calculate of Z-factors for Natural Gases Using Equations-of-State.” Journal of Canadian Petroleum Technology (July–September 1975): 34–36."""
-    R1=0.3265-1.07/Tr-0.5339/Tr**3+0.01569/Tr**4-0.05165/Tr**5
-    R2=0.27*Pr/Tr
-    R3=0.5475-0.7361/Tr+0.1844/Tr**2
-    R4=0.1056*(-0.7361/Tr+0.1844/Tr**2)
-    R5=0.6134/Tr**3
-    def f(g):
-        return R1*g-R2/g+R3*g**2-R4*g**5+R5*(1+0.721*g**2)*g**2*exp(-0.721*g**2)+1
-    go=0.27*Pr/Tr
-    g=fsolve(f, go, full_output=True)
-    if g[2]==1:
-        return 0.27*Pr/Tr/g[0]
-    else:
-        return float("nan")
+    """Dranchuk, P. M., and J. H. Abu-Kassem. “Calculate of Z-factors for Natural Gases Using Equations-of-State.” Journal of Canadian Petroleum Technology (July–September 1975): 34–36.
+
+    >>> print("%0.4f" % Z_Dranchuk_Abu_Kassem(1.5, 2))
+    0.8215
+    """
+    Tr, Pr = _Z_array(Tr, Pr)
+    R1 = 0.3265-1.07/Tr-0.5339/Tr**3+0.01569/Tr**4-0.05165/Tr**5
+    R2 = 0.27*Pr/Tr
+    R3 = 0.5475-0.7361/Tr+0.1844/Tr**2
+    R4 = 0.1056*(-0.7361/Tr+0.1844/Tr**2)
+    R5 = 0.6134/Tr**3
+
+    def f(g, R1, R2, R3, R4, R5):
+        e, de = _Z_DAK_form(g, 0.721)
+        fg = R1*g-R2/g+R3*g**2-R4*g**5+R5*e+1
+        dfg = R1+R2/g**2+2*R3*g-5*R4*g**4+R5*de
+        return fg, dfg
+
+    go = 0.27*Pr/Tr
+    g = _newton(f, go, (R1, R2, R3, R4, R5))
+    return _Z_return(0.27*Pr/Tr/g)
 
 def Z_Dranchuk_Purvis_Robinson(Tr, Pr):
-    """Dranchuk, P. M., R. A. Purvis, and D. B. Robinson. “Computer Calculations of Natural Gas Compressibility Factors Using the Standing and Katz Correlation.” Technical Series, no. IP 74-008. Alberta, Canada: Institute of Petroleum, 1974."""
-    T1=0.31506237-1.0467099/Tr-0.5783272/Tr**3
-    T2=0.53530771-0.61232032/Tr
-    T3=0.61232032*0.10488813/Tr
-    T4=0.68157001/Tr**3
-    T5=0.27*Pr/Tr
-    def f(g):
-        return 1+T1*g+T2*g**2+T3*g**5+T4*g**2*(1+0.68446549*g**2)*exp(-0.68446549*g**2)-T5/g
-    go=0.27*Pr/Tr
-    g=fsolve(f, go, full_output=True)
-    if g[2]==1:
-        return 0.27*Pr/Tr/g[0]
-    else:
-        return float("nan")
+    """Dranchuk, P. M., R. A. Purvis, and D. B. Robinson. “Computer Calculations of Natural Gas Compressibility Factors Using the Standing and Katz Correlation.” Technical Series, no. IP 74-008. Alberta, Canada: Institute of Petroleum, 1974.
+
+    >>> print("%0.4f" % Z_Dranchuk_Purvis_Robinson(1.5, 2))
+    0.8206
+    """
+    Tr, Pr = _Z_array(Tr, Pr)
+    T1 = 0.31506237-1.0467099/Tr-0.5783272/Tr**3
+    T2 = 0.53530771-0.61232032/Tr
+    T3 = 0.61232032*0.10488813/Tr
+    T4 = 0.68157001/Tr**3
+    T5 = 0.27*Pr/Tr
+
+    def f(g, T1, T2, T3, T4, T5):
+        e, de = _Z_DAK_form(g, 0.68446549)
+        fg = 1+T1*g+T2*g**2+T3*g**5+T4*e-T5/g
+        dfg = T1+2*T2*g+5*T3*g**4+T4*de+T5/g**2
+        return fg, dfg
+
+    go = 0.27*Pr/Tr
+    g = _newton(f, go, (T1, T2, T3, T4, T5))
+    return _Z_return(0.27*Pr/Tr/g)
 
 def Z_Beggs_Brill(Tr, Pr):
-    A=1.39*(Tr-0.92)**0.5-0.36*Tr-0.101
-    B=(0.62-0.23*Tr)*Pr+(0.066/(Tr-0.86)-0.037)*Pr**2+0.32/10**(9*(Tr-1.))*Pr**6
-    C=0.132-0.32*log10(Tr)
-    D=10.**(0.3106-0.49*Tr+0.1824*Tr**2)
-    return A+(1.-A)/exp(B)+C*Pr**D
+    Tr, Pr = _Z_array(Tr, Pr)
+    with errstate(all="ignore"):
+        A=1.39*(Tr-0.92)**0.5-0.36*Tr-0.101
+        B=(0.62-0.23*Tr)*Pr+(0.066/(Tr-0.86)-0.037)*Pr**2+0.32/10**(9*(Tr-1.))*Pr**6
+        C=0.132-0.32*log10(Tr)
+        D=10.**(0.3106-0.49*Tr+0.1824*Tr**2)
+        Z = A+(1.-A)/exp(B)+C*Pr**D
+    return _Z_return(Z)
 
 def Z_ShellOil(Tr, Pr):
-    Za=-0.101-0.36*Tr+1.3868*(Tr-0.919)**0.5
-    Zb=0.021+0.04275/(Tr-0.65)
-    Zc=0.6222-0.224*Tr
-    Zd=0.0657/(Tr-0.86)-0.037
-    Ze=0.32*exp(-19.53*(Tr-1))
-    Zf=0.122*exp(-11.3*(Tr-1))
-    Zg=Pr*(Zc+Zd*Pr+Ze*Pr**4)
-    return Za+Zb*Pr+(1-Za)*exp(-Zg)-Zf*(Pr/10)**4
+    Tr, Pr = _Z_array(Tr, Pr)
+    with errstate(all="ignore"):
+        Za=-0.101-0.36*Tr+1.3868*(Tr-0.919)**0.5
+        Zb=0.021+0.04275/(Tr-0.65)
+        Zc=0.6222-0.224*Tr
+        Zd=0.0657/(Tr-0.86)-0.037
+        Ze=0.32*exp(-19.53*(Tr-1))
+        Zf=0.122*exp(-11.3*(Tr-1))
+        Zg=Pr*(Zc+Zd*Pr+Ze*Pr**4)
+        Z = Za+Zb*Pr+(1-Za)*exp(-Zg)-Zf*(Pr/10)**4
+    return _Z_return(Z)
 
 def Z_Sarem(Tr, Pr):
     """Sarem, A.M.: "Z-Factor Equation Developed for Use in Digital Computers", Oil and Gas J. (Sept. 18, 1961) 118."""
+    Tr, Pr = _Z_array(Tr, Pr)
     x=(2.*Pr-15)/14.8
     y=(2.*Tr-4)/1.9
-    Aij=[[2.1433504, 0.0831762, -0.0214670, -0.0008714, 0.0042846, -0.0016595],
+    Aij=array([[2.1433504, 0.0831762, -0.0214670, -0.0008714, 0.0042846, -0.0016595],
             [0.3312352, -0.1340361, 0.0668810,  -0.0271743,  0.0088512,  -0.002152],
             [0.1057287,  -0.0503937,  0.0050925,  0.0105513,  -0.0073182,  0.0026960],
             [0.0521840,  0.0443121,  -0.0193294,  0.0058973,  0.0015367,  -0.0028327],
             [0.0197040,  -0.0263834, 0.019262,  -0.0115354,  0.0042910,  -0.0081303],
-            [0.0053096,  0.0089178,  -0.0108948,  0.0095594,  -0.0060114, 0.0031175]]
-    P=[lambda a: 0.7071068, lambda a: 1.224745*a, lambda a: 0.7905695*(3*a**2-1), lambda a: 0.9354145*(5*a**3-3*a), lambda a: 0.265165*(35*a**4-30*a**2+3), lambda a: 0.293151*(63*a**5-70*a**3+15*a)]
-    z=0.
-    for i in range(6):
-        for j in range(6):
-            z+=Aij[i][j]*P[i](x)*P[j](y)
-    return z
+            [0.0053096,  0.0089178,  -0.0108948,  0.0095594,  -0.0060114, 0.0031175]])
+
+    def P(a):
+        """Legendre polynomials normalized, stacked in first axis"""
+        return array([0.7071068+0*a, 1.224745*a, 0.7905695*(3*a**2-1),
+                      0.9354145*(5*a**3-3*a), 0.265165*(35*a**4-30*a**2+3),
+                      0.293151*(63*a**5-70*a**3+15*a)])
+
+    z = (tensordot(Aij, P(x), axes=(0, 0))*P(y)).sum(axis=0)
+    return _Z_return(z)
+
+# Gopal coefficients, Z = Pr*(a*Tr+b)+c*Tr+d, by Pr range and Tr range
+_Gopal = [[[1.6643, -2.2114, -0.3647, 1.4385],
+           [0.0522, -0.8511, -0.0364, 1.0490],
+           [0.1391, -0.2988, 0.0007, 0.9969],
+           [0.0295, -0.0825, 0.0009, 0.9967]],
+          [[-1.3570, 1.4942, 4.6315, -4.7009],
+           [0.1717, -0.3232, 0.5869, 0.1229],
+           [0.0984, -0.2053, 0.0621, 0.8580],
+           [0.0211, -0.0527, 0.0127, 0.9549]],
+          [[-0.3278, 0.4752, 1.8223, -1.9036],
+           [-0.2521, 0.3871, 1.6087, -1.6635],
+           [-0.0284, 0.0625, 0.4714, -0.0011],
+           [0.0041, 0.0039, 0.0607, 0.7927]]]
 
 def Z_Gopal(Tr, Pr):
     """Gopal, V.N.: "Gas Z-Factor Equations Developed for Computer", Oil and Gas J. (Aug. 8, 1977) 58-60."""
-    if Pr<=1.2:
-        if Tr<=1.2:
-           return Pr*( 1.6643 *Tr - 2.2114)- 0.3647 *Tr + 1.4385
-        elif 1.2<=Tr<1.4:
-            return Pr*( 0.0522 *Tr - 0.8511 )- 0.0364 *Tr + 1.0490
-        elif 1.4<=Tr<2.0:
-            return Pr*( 0.1391 *Tr - 0.2988)+ 0.0007 *Tr + 0.9969
-        elif 2.0<=Tr<3.0:
-            return Pr*( 0.0295 *Tr - 0.0825 )+ 0.0009 *Tr + 0.9967
-    elif 1.2<=Pr<2.8:
-        if Tr<=1.2:
-            return Pr*(-1.3570 *Tr + 1.4942)+ 4.6315 *Tr - 4.7009
-        elif 1.2<=Tr<1.4:
-            return Pr*( 0.1717 *Tr - 0.3232)+ 0.5869 *Tr + 0.1229
-        elif 1.4<=Tr<2.0:
-            return Pr*( 0.0984 *Tr - 0.2053 )+ 0.0621 *Tr + 0.8580
-        elif 2.0<=Tr<3.0:
-            return Pr*( 0.0211 *Tr - 0.0527)+ 0.0127 *Tr + 0.9549
-    elif 2.8<=Pr<5.4:
-        if Tr<=1.2:
-            return Pr*(-0.3278 *Tr + 0.4752 )+ 1.8223 *Tr - 1.9036
-        elif 1.2<=Tr<1.4:
-            return Pr*(-0.2521 *Tr + 0.3871 )+ 1.6087 *Tr - 1.6635
-        elif 1.4<=Tr<2.0:
-            return Pr*(-0.0284 *Tr + 0.0625 )+ 0.4714 *Tr - 0.0011
-        elif 2.0<=Tr<3.0:
-            return Pr*( 0.0041 *Tr + 0.0039)+ 0.0607 *Tr + 0.7927
-    else:
-        return Pr*( 0.711+ 3.66 *Tr)**-1.4667-1.637/(0.319*Tr+0.522)+2.071
+    Tr, Pr = _Z_array(Tr, Pr)
+    rangePr = [Pr <= 1.2, Pr < 2.8, Pr < 5.4]
+    rangeTr = [Tr <= 1.2, Tr < 1.4, Tr < 2.0, Tr < 3.0]
+    conditions = []
+    choices = []
+    for i, cPr in enumerate(rangePr):
+        for j, cTr in enumerate(rangeTr):
+            a, b, c, d = _Gopal[i][j]
+            conditions.append(cPr & cTr)
+            choices.append(Pr*(a*Tr+b)+c*Tr+d)
+        # Out of Tr range of correlation
+        conditions.append(cPr)
+        choices.append(nan)
+    with errstate(all="ignore"):
+        conditions.append(Pr >= 5.4)
+        choices.append(Pr*(0.711+3.66*Tr)**-1.4667-1.637/(0.319*Tr+0.522)+2.071)
+    return _Z_return(select(conditions, choices, nan))
 
 Z_list=Z_Hall_Yarborough, Z_Dranchuk_Abu_Kassem, Z_Dranchuk_Purvis_Robinson, Z_ShellOil, Z_Beggs_Brill, Z_Sarem, Z_Gopal, Z_Papay
 
@@ -0,0 +1,525 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Pinch analysis of heat exchanger networks
+#
+#   - PinchStream: Hot or cold process stream with its enthalpy curve
+#   - equipmentStreams: Process streams of heat exchanger equipments
+#   - Pinch: Composite and grand composite curves and utility targets
+#   - targets: Minimum utility targets for a range of ΔTmin
+#   - Match: Result of screening of a hot-cold stream match
+#   - matches: Screening of the feasible matches at both sides of pinch
+#
+#   The heat content of each stream is tabulated once as a piecewise linear
+#   function of temperature, with the saturation points for streams with
+#   phase change, using the cached fluid profiles of exchangerProfile. The
+#   problem table algorithm is evaluated for all the ΔTmin values at the
+#   same time as array operations, the intervals of shifted temperature
+#   are the union of the breakpoints of all streams.
+#
+#   Linnhoff, B., Hindmarsh, E. The pinch design method for heat exchanger
+#   networks. Chem. Eng. Sci. 38(5) (1983) 745-763
+#   Kemp, I.C. Pinch Analysis and Process Integration, 2nd Edition.
+#   Butterworth-Heinemann (2007)
+###############################################################################
+
+
+from concurrent.futures import ThreadPoolExecutor
+
+from numpy import (append, argmax, array, array_split, asarray, atleast_1d,
+                   concatenate, diff, interp, maximum, minimum, nan,
+                   searchsorted, take_along_axis, unique, where, zeros)
+
+from lib import unidades
+from lib.exchangerProfile import getProfile
+
+
+# Temperature separation of the points of isothermal phase change, K
+_DT = 1e-6
+
+
+class PinchStream(object):
+    """Process stream to heat or cool in a heat exchanger network
+
+    The stream can be defined with a constant heat capacity flow rate or
+    with a Corriente instance, in that case the heat content curve include
+    the phase change in the temperature range
+
+    Parameters
+    ----------
+    Tin : float
+        Supply temperature, [K]
+    Tout : float
+        Target temperature, [K]
+    mCp : float
+        Heat capacity flow rate, [W/K]
+    stream : Corriente
+        Inlet stream, alternative to mCp
+    outlet : Corriente
+        Outlet stream, optional, its enthalpy is used as target so it's
+        possible define a isothermal phase change
+    name : string
+        Name of stream to show in reports
+
+    Attributes
+    ----------
+    T : array
+        Temperature of curve points in increasing order, [K]
+    H : array
+        Heat content over the lower temperature of stream, [W]
+    duty : float
+        Heat to remove or to add to stream, [W]
+    hot : boolean
+        True for streams to cool
+    """
+
+    def __init__(self, Tin=None, Tout=None, mCp=None, stream=None,
+                 outlet=None, name=""):
+        if stream is not None:
+            Tin = stream.T
+        if outlet is not None:
+            Tout = outlet.T
+        if Tin is None or Tout is None:
+            raise ValueError("Supply and target temperatures are needed")
+        self.name = name
+        self.Tin = unidades.Temperature(Tin)
+        self.Tout = unidades.Temperature(Tout)
+
+        if stream is not None:
+            T, H, hot = self._curve(stream, outlet, Tout)
+        elif mCp is not None:
+            T = array([min(Tin, Tout), max(Tin, Tout)], dtype=float)
+            H = array([0, mCp*(T[1]-T[0])])
+            hot = Tin > Tout
+        else:
+            raise ValueError("Stream or heat capacity flow rate are needed")
+
+        # Isothermal segments separated for the interpolation
+        for i in range(1, len(T)):
+            if T[i] <= T[i-1]:
+                T[i] = T[i-1]+_DT
+        self.T = T
+        self.H = H
+        self.hot = hot
+        self.duty = unidades.Power(H[-1])
+
+    @staticmethod
+    def _curve(stream, outlet, Tout):
+        """Heat content curve from the fluid profile of stream"""
+        hin = stream.h/stream.caudalmasico
+        Tmin, Tmax = min(stream.T, Tout), max(stream.T, Tout)
+        if Tmax-Tmin < 1:
+            Tmin, Tmax = Tmin-0.5, Tmax+0.5
+        profile = getProfile(stream, Tmin, Tmax)
+        if outlet is not None:
+            hout = outlet.h/outlet.caudalmasico
+        else:
+            hout = float(profile.enthalpy(Tout))
+
+        hot = hin > hout
+        hmin, hmax = min(hin, hout), max(hin, hout)
+        h = profile.data["h"]
+        inside = (h > hmin) & (h < hmax)
+        h = concatenate(([hmin], h[inside], [hmax]))
+        T = interp(h, profile.data["h"], profile.data["T"])
+        return T, (h-hmin)*stream.caudalmasico, hot
+
+    def heat(self, T):
+        """Heat content at temperatures T over the lower temperature of
+        stream, [W]"""
+        return interp(T, self.T, self.H, left=0, right=self.H[-1])
+
+    def mCp(self, T, upper=True):
+        """Heat capacity flow rate of the curve segment at temperature T,
+        the segment over T with upper, the segment below otherwise, [W/K]"""
+        side = "right" if upper else "left"
+        i = searchsorted(self.T, T, side=side)
+        i = minimum(maximum(i, 1), len(self.T)-1)
+        return (self.H[i]-self.H[i-1])/(self.T[i]-self.T[i-1])
+
+
+def equipmentStreams(equipos):
+    """Return the PinchStream of the process streams of heat exchangers,
+    Heat_Exchanger, Hairpin or Shell_Tube, with the inlet stream as supply
+    and outlet stream as target of each side. Equipments not calculated
+    are skipped"""
+    streams = []
+    for equipo in equipos:
+        if not equipo.status:
+            continue
+        entradas = equipo.kwargsInput
+        if not entradas:
+            entradas = ("entradaTubo", "entradaCarcasa")
+        for key, salida in zip(entradas, equipo.salida):
+            entrada = equipo.kwargs[key]
+            if not entrada or salida is None or salida.h == entrada.h:
+                continue
+            name = "%s %s" % (equipo.__class__.__name__, key)
+            streams.append(PinchStream(stream=entrada, outlet=salida,
+                                       name=name))
+    return streams
+
+
+def _cascade(hot, cold, dTmin):
+    """Problem table algorithm for an array of ΔTmin
+
+    Parameters
+    ----------
+    hot : list
+        Hot streams, PinchStream instances
+    cold : list
+        Cold streams, PinchStream instances
+    dTmin : array
+        Minimum approach temperature, [K]
+
+    Returns
+    -------
+    t : array
+        Shifted temperatures of interval boundaries, one row for each ΔTmin,
+        in increasing order, [K]
+    R : array
+        Heat flow cascaded across each boundary with the minimum hot
+        utility, the grand composite curve, [W]
+    """
+    dT = asarray(dTmin, dtype=float)[:, None]
+    Th = concatenate([s.T for s in hot]+[zeros(0)])
+    Tc = concatenate([s.T for s in cold]+[zeros(0)])
+    t = concatenate((Th[None, :]-dT/2, Tc[None, :]+dT/2), axis=1)
+
+    # The surplus curve is piecewise linear with changes of slope at the
+    # breakpoints of streams, independent of ΔTmin, so it's integrated
+    # from the lower boundary once sorted the shifted temperatures
+    dh = concatenate([-_slopes(s) for s in hot]+[zeros(0)])
+    dc = concatenate([_slopes(s) for s in cold]+[zeros(0)])
+    order = t.argsort(axis=1)
+    t = take_along_axis(t, order, axis=1)
+    slope = concatenate((dh, dc))[order].cumsum(axis=1)
+    F = zeros(t.shape)
+    F[:, 1:] = (slope[:, :-1]*diff(t, axis=1)).cumsum(axis=1)
+
+    # Heat available above each boundary, hot released minus cold absorbed
+    surplus = F+sum(s.H[-1] for s in hot)-sum(s.H[-1] for s in cold)
+    Qh = maximum(-surplus.min(axis=1), 0)
+    return t, surplus+Qh[:, None]
+
+
+def _slopes(stream):
+    """Changes of heat capacity flow rate at the breakpoints of stream"""
+    mCp = diff(stream.H)/diff(stream.T)
+    return diff(concatenate(([0], mCp, [0])))
+
+
+class Pinch(object):
+    """Pinch analysis of a set of process streams for a ΔTmin
+
+    Parameters
+    ----------
+    streams : list
+        PinchStream instances
+    dTmin : float
+        Minimum approach temperature, [K]
+
+    Attributes
+    ----------
+    Qh : float
+        Minimum hot utility, [W]
+    Qc : float
+        Minimum cold utility, [W]
+    Qrec : float
+        Maximum heat recovery, [W]
+    Tpinch : float
+        Pinch shifted temperature, None without pinch, [K]
+    TpinchHot : float
+        Pinch temperature of hot streams, [K]
+    TpinchCold : float
+        Pinch temperature of cold streams, [K]
+    hotComposite : tuple
+        Hot composite curve, (H, T) arrays, [W], [K]
+    coldComposite : tuple
+        Cold composite curve shifted with the cold utility, (H, T), [W], [K]
+    grandComposite : tuple
+        Grand composite curve, (H, T*), [W], [K]
+    problemTable : list
+        Intervals of shifted temperature (T*upper, T*lower, surplus, heat
+        flow cascaded below), [K], [K], [W], [W]
+    units : integer
+        Minimum number of exchanger units of maximum energy recovery network
+
+    >>> streams = [PinchStream(293.15, 408.15, mCp=2e3), \
+                   PinchStream(443.15, 333.15, mCp=3e3), \
+                   PinchStream(353.15, 413.15, mCp=4e3), \
+                   PinchStream(423.15, 303.15, mCp=1.5e3)]
+    >>> p = Pinch(streams, 10)
+    >>> print("%0.1f %0.1f %0.2f" % (p.Qh.kW, p.Qc.kW, p.Tpinch.C))
+    20.0 60.0 85.00
+    >>> print(p.units)
+    7
+    """
+
+    def __init__(self, streams, dTmin):
+        self.streams = streams
+        self.dTmin = unidades.DeltaT(dTmin)
+        self.hot = [s for s in streams if s.hot]
+        self.cold = [s for s in streams if not s.hot]
+
+        t, R = _cascade(self.hot, self.cold, [dTmin])
+        t, R = t[0], R[0]
+        Hh = sum(s.H[-1] for s in self.hot)
+        Hc = sum(s.H[-1] for s in self.cold)
+        self.Qh = unidades.Power(R[-1])
+        self.Qc = unidades.Power(R[0])
+        self.Qrec = unidades.Power(Hc-R[-1])
+
+        # The pinch is the boundary with no heat flow, the hotter one, the
+        # threshold problems with a null utility have not pinch
+        zero = R <= 1e-9*max(Hh, Hc, 1)
+        zero[0] = zero[-1] = False
+        if zero.any():
+            i = len(R)-1-argmax(zero[::-1])
+            self.Tpinch = unidades.Temperature(t[i])
+            self.TpinchHot = unidades.Temperature(t[i]+dTmin/2)
+            self.TpinchCold = unidades.Temperature(t[i]-dTmin/2)
+        else:
+            self.Tpinch = None
+            self.TpinchHot = None
+            self.TpinchCold = None
+
+        self.grandComposite = (R, t)
+        self.problemTable = [(t[i+1], t[i], R[i+1]-R[i], R[i])
+                             for i in range(len(t)-1)[::-1]]
+        self.hotComposite = self._composite(self.hot, 0)
+        self.coldComposite = self._composite(self.cold, R[0])
+        self.units = self._units()
+
+    @staticmethod
+    def _composite(streams, H0):
+        """Composite curve of streams starting at heat flow H0"""
+        if not streams:
+            return zeros(0), zeros(0)
+        T = unique(concatenate([s.T for s in streams]))
+        H = sum(s.heat(T) for s in streams)
+        return H+H0, T
+
+    def _units(self):
+        """Minimum number of units by Euler rule, applied at each side of
+        pinch for maximum energy recovery designs"""
+        if self.Tpinch is None:
+            regions = [(-1e300, 1e300)]
+        else:
+            regions = [(self.Tpinch, 1e300), (-1e300, self.Tpinch)]
+        units = 0
+        for lower, upper in regions:
+            N = 0
+            for s in self.streams:
+                shift = -self.dTmin/2 if s.hot else self.dTmin/2
+                if min(upper, s.T[-1]+shift)-max(lower, s.T[0]+shift) > _DT:
+                    N += 1
+            if lower == -1e300 and self.Qc > 0:
+                N += 1
+            if upper == 1e300 and self.Qh > 0:
+                N += 1
+            if N:
+                units += N-1
+        return units
+
+
+def targets(streams, dTmin, workers=None):
+    """Minimum utility targets of a set of streams for a range of ΔTmin
+
+    Parameters
+    ----------
+    streams : list
+        PinchStream instances
+    dTmin : array
+        Minimum approach temperatures, [K]
+    workers : integer
+        Number of threads to split the ΔTmin values, the calculation is done
+        in the calling thread by default
+
+    Returns
+    -------
+    Qh : array
+        Minimum hot utility, [W]
+    Qc : array
+        Minimum cold utility, [W]
+    Tpinch : array
+        Pinch shifted temperature, nan for threshold problems, [K]
+
+    >>> streams = [PinchStream(293.15, 408.15, mCp=2e3), \
+                   PinchStream(443.15, 333.15, mCp=3e3), \
+                   PinchStream(353.15, 413.15, mCp=4e3), \
+                   PinchStream(423.15, 303.15, mCp=1.5e3)]
+    >>> Qh, Qc, Tp = targets(streams, [5, 10, 20])
+    >>> print(" ".join("%0.1f" % q for q in Qh/1e3))
+    0.0 20.0 65.0
+    """
+    hot = [s for s in streams if s.hot]
+    cold = [s for s in streams if not s.hot]
+    dTmin = atleast_1d(asarray(dTmin, dtype=float))
+
+    def problem(dT):
+        t, R = _cascade(hot, cold, dT)
+        zero = R <= 1e-9*R.max(axis=1)[:, None]
+        zero[:, 0] = zero[:, -1] = False
+        row = t.shape[1]-1-argmax(zero[:, ::-1], axis=1)
+        Tpinch = where(zero.any(axis=1), t[range(len(dT)), row], nan)
+        return R[:, -1], R[:, 0], Tpinch
+
+    if workers and workers > 1 and len(dTmin) > 1:
+        chunks = [c for c in array_split(dTmin, workers) if len(c)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(problem, chunks))
+        return tuple(concatenate(r) for r in zip(*results))
+    return problem(dTmin)
+
+
+class Match(object):
+    """Result of screening of a hot-cold stream match
+
+    Attributes
+    ----------
+    hot : PinchStream
+        Hot stream
+    cold : PinchStream
+        Cold stream
+    region : string
+        Side of pinch, "above" or "below"
+    Q : float
+        Maximum heat exchanged respecting ΔTmin, [W]
+    pinch : boolean
+        True if both streams reach the pinch, so the match must follow the
+        mCp rule of pinch design method
+    feasible : boolean
+        Mathing rule of pinch, mCp of hot stream lower than the cold stream
+        above pinch, greater below, always True away from pinch
+    """
+
+    def __init__(self, hot, cold, region, Q, pinch, feasible):
+        self.hot = hot
+        self.cold = cold
+        self.region = region
+        self.Q = unidades.Power(Q)
+        self.pinch = pinch
+        self.feasible = feasible
+
+
+def _segment(stream, lower, upper):
+    """Portion of stream curve between temperatures, (T, H) with H relative
+    to the lower point"""
+    lower = max(lower, stream.T[0])
+    upper = min(upper, stream.T[-1])
+    if upper-lower <= _DT:
+        return None
+    inside = (stream.T > lower) & (stream.T < upper)
+    T = concatenate(([lower], stream.T[inside], [upper]))
+    H = stream.heat(T)
+    return T, H-H[0]
+
+
+def _maxDuty(hot, cold, dTmin):
+    """Maximum heat exchanged in countercurrent between two curve portions
+    respecting the minimum approach temperature
+
+    The match with duty Q is feasible if for all heat c absorbed by cold
+    stream Q ≤ f(c) = Hh + c - Hh(Tc(c)+ΔTmin), so the maximum duty is the
+    minimum of max(c, f(c)), f is piecewise linear so it is calculated in
+    the breakpoints and the crossing of c and f at each segment"""
+    Th, Hh = hot
+    Tc, Hc = cold
+    c = unique(concatenate((Hc, interp(Th-dTmin, Tc, Hc, left=0,
+                                       right=Hc[-1]))))
+    Tcold = interp(c, Hc, Tc)
+    f = Hh[-1]+c-interp(Tcold+dTmin, Th, Hh, left=0, right=Hh[-1])
+
+    candidates = maximum(c, f)
+    d = f-c
+    cross = (d[:-1] > 0) & (d[1:] < 0)
+    x = where(cross, d[:-1]/(d[:-1]-d[1:]+1e-300), 0)
+    crossing = (c[:-1]+x*diff(c))[cross]
+    return max(0, min(append(candidates, crossing).min(), Hh[-1], Hc[-1]))
+
+
+def matches(streams, dTmin, pinch=None):
+    """Screening of the matches of hot and cold streams at both sides of
+    pinch, giving for each pair the maximum heat exchanged respecting ΔTmin
+    and the checking of mCp rule of pinch design method at the pinch
+
+    Parameters
+    ----------
+    streams : list
+        PinchStream instances
+    dTmin : float
+        Minimum approach temperature, [K]
+    pinch : Pinch
+        Pinch analysis of streams, calculated if not given
+
+    Returns
+    -------
+    matches : list
+        Match instances with heat exchanged, in decreasing order of heat
+
+    >>> streams = [PinchStream(293.15, 408.15, mCp=2e3), \
+                   PinchStream(443.15, 333.15, mCp=3e3), \
+                   PinchStream(353.15, 413.15, mCp=4e3), \
+                   PinchStream(423.15, 303.15, mCp=1.5e3)]
+    >>> m = matches(streams, 10)[0]
+    >>> print(m.region, "%0.0f" % m.Q.kW, m.feasible)
+    above 240 True
+    """
+    if pinch is None:
+        pinch = Pinch(streams, dTmin)
+    if pinch.Tpinch is None:
+        regions = [("above", -1e300, 1e300, -1e300, 1e300)]
+    else:
+        Th, Tc = pinch.TpinchHot, pinch.TpinchCold
+        regions = [("above", Th, 1e300, Tc, 1e300),
+                   ("below", -1e300, Th, -1e300, Tc)]
+
+    result = []
+    for region, hlow, hup, clow, cup in regions:
+        for hot in pinch.hot:
+            hotSegment = _segment(hot, hlow, hup)
+            if hotSegment is None:
+                continue
+            for cold in pinch.cold:
+                coldSegment = _segment(cold, clow, cup)
+                if coldSegment is None:
+                    continue
+                Q = _maxDuty(hotSegment, coldSegment, dTmin)
+                if Q <= 0:
+                    continue
+
+                atPinch = pinch.Tpinch is not None
+                if region == "above":
+                    atPinch &= hotSegment[0][0] <= hlow+_DT
+                    atPinch &= coldSegment[0][0] <= clow+_DT
+                    feasible = not atPinch or \
+                        hot.mCp(hlow) <= cold.mCp(clow)
+                else:
+                    atPinch &= hotSegment[0][-1] >= hup-_DT
+                    atPinch &= coldSegment[0][-1] >= cup-_DT
+                    feasible = not atPinch or \
+                        hot.mCp(hup, False) >= cold.mCp(cup, False)
+                result.append(Match(hot, cold, region, Q, bool(atPinch),
+                                    bool(feasible)))
+
+    result.sort(key=lambda m: -m.Q)
+    return result
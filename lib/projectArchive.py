@@ -0,0 +1,312 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Compressed project file format, alternative to json .pcq files
+#
+#   The archive is a zip file with:
+#       - manifest.json: Format version and order of sections and entities
+#       - project.json: The small sections, configuration, PFD...
+#       - <section>/<key>.json: A record by equipment, stream and other window
+#       - arrays/<n>.npy: Numeric data of records as binary numpy arrays
+#
+#   - ProjectArchive: Read only mapping with the project data, the entities are
+#       only decoded when accessed
+#   - writeArchive: Save a project dict in archive format
+#   - isArchive: Check if a file is a project archive
+#   - load: Load a project file in any format
+#   - save: Save a project file, format chosen by extension
+#   - convert: Convert a project file between json and archive format
+#
+#   The conversion between formats is lossless, ProjectArchive.toJSON return
+#   the same dict as json.load of the original .pcq file
+#
+#   TODO: The project loading in main window still read all entities of
+#   archive at load, the equipment, streams and windows aren't materialized
+#   on demand yet, so the archive format save disk space and load time of
+#   json parsing but not memory
+###############################################################################
+
+
+from collections.abc import Mapping
+from io import BytesIO
+import json
+import zipfile
+
+from numpy import array, load as npload, save as npsave
+
+
+# Archive format version
+VERSION = 1
+
+# Extension of archive project files
+EXTENSION = "pcqz"
+
+# Sections saved with a record by entity
+SECTIONS = ("equipment", "stream", "other")
+
+# Minimum number of values of a list to be saved as binary array
+MIN_ARRAY = 16
+
+# Key used to reference the binary arrays inside the records
+ARRAY_KEY = "__array__"
+
+
+def _shape(obj):
+    """Shape of a nested rectangular list of floats, None if the list can't
+    be saved without loss as a numpy float array
+
+    >>> _shape([[1., 2.], [3., 4.]])
+    (2, 2)
+    >>> _shape([1., 2, 3.]) is None
+    True
+    """
+    if not obj:
+        return None
+    if all(type(x) is float for x in obj):
+        return (len(obj), )
+    if not all(type(x) is list for x in obj):
+        return None
+    shape = _shape(obj[0])
+    if shape is None:
+        return None
+    for x in obj[1:]:
+        if _shape(x) != shape:
+            return None
+    return (len(obj), )+shape
+
+
+def _extract(obj, arrays):
+    """Replace in obj the numeric lists by references to binary arrays, the
+    arrays are appended to the arrays list"""
+    if isinstance(obj, dict):
+        return {key: _extract(value, arrays) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        obj = list(obj)
+        shape = _shape(obj)
+        if shape is not None:
+            size = 1
+            for n in shape:
+                size *= n
+            if size >= MIN_ARRAY:
+                name = "arrays/%i.npy" % len(arrays)
+                arrays.append((name, array(obj, dtype=float)))
+                return {ARRAY_KEY: name}
+        return [_extract(value, arrays) for value in obj]
+    return obj
+
+
+class ProjectArchive(Mapping):
+    """Read only view of a project archive, with the same structure of the
+    dict saved in json project files
+
+    The sections with a record by entity are returned as mappings, each
+    entity is read and decoded only when accessed, so a reader needing only
+    some entities, like a stream, don't decode the full project. The file is
+    open until close() is called, or use it as context manager.
+
+    Parameters
+    ----------
+    fname : str
+        Path of project archive
+    """
+
+    def __init__(self, fname):
+        self.fname = fname
+        self._zip = zipfile.ZipFile(fname, "r")
+        self.manifest = self._readJSON("manifest.json")
+        if self.manifest["version"] > VERSION:
+            self.close()
+            raise ValueError("Unsupported project archive version %i" %
+                             self.manifest["version"])
+        self._project = self._readJSON("project.json")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the archive file"""
+        self._zip.close()
+
+    def _readJSON(self, name):
+        return json.loads(self._zip.read(name).decode("utf-8"))
+
+    def _readArray(self, name):
+        return npload(BytesIO(self._zip.read(name))).tolist()
+
+    def _restore(self, obj):
+        """Replace the binary array references by the original lists"""
+        if isinstance(obj, dict):
+            if len(obj) == 1 and ARRAY_KEY in obj:
+                return self._readArray(obj[ARRAY_KEY])
+            return {key: self._restore(value) for key, value in obj.items()}
+        if isinstance(obj, list):
+            return [self._restore(value) for value in obj]
+        return obj
+
+    def entity(self, section, key):
+        """Read a single entity of a section"""
+        if key not in self.manifest["sections"][section]:
+            raise KeyError(key)
+        name = "%s/%s.json" % (section, key)
+        return self._restore(self._readJSON(name))
+
+    def __getitem__(self, key):
+        if key in self.manifest["sections"]:
+            return _Section(self, key)
+        if key in self._project:
+            return self._project[key]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.manifest["keys"])
+
+    def __len__(self):
+        return len(self.manifest["keys"])
+
+    def toJSON(self):
+        """Materialize the full project as a dict, as the saved with json"""
+        data = {}
+        for key in self:
+            value = self[key]
+            if isinstance(value, _Section):
+                value = {k: value[k] for k in value}
+            data[key] = value
+        return data
+
+
+class _Section(Mapping):
+    """Lazy mapping of entities of a section of archive"""
+
+    def __init__(self, archive, section):
+        self._archive = archive
+        self._section = section
+        self._keys = archive.manifest["sections"][section]
+
+    def __getitem__(self, key):
+        return self._archive.entity(self._section, str(key))
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+
+def writeArchive(data, fname):
+    """Save a project in archive format
+
+    Parameters
+    ----------
+    data : dict
+        Project data as saved in json format, the keys are converted to
+        strings as in json files
+    fname : str
+        Path of archive file
+    """
+    manifest = {"version": VERSION, "keys": [], "sections": {}}
+    project = {}
+    arrays = []
+    with zipfile.ZipFile(fname, "w", zipfile.ZIP_DEFLATED) as zf:
+        for key, value in data.items():
+            key = str(key)
+            manifest["keys"].append(key)
+            if key in SECTIONS and isinstance(value, dict):
+                keys = []
+                for entity, record in value.items():
+                    entity = str(entity)
+                    keys.append(entity)
+                    record = _extract(record, arrays)
+                    zf.writestr("%s/%s.json" % (key, entity),
+                                json.dumps(record))
+                manifest["sections"][key] = keys
+            else:
+                project[key] = value
+
+        for name, values in arrays:
+            stream = BytesIO()
+            npsave(stream, values)
+            zf.writestr(name, stream.getvalue())
+
+        zf.writestr("project.json", json.dumps(project))
+        zf.writestr("manifest.json", json.dumps(manifest))
+
+
+def isArchive(fname):
+    """Check if fname is a project archive"""
+    return zipfile.is_zipfile(fname)
+
+
+def load(fname):
+    """Load a project file, the archive files are returned as ProjectArchive
+    and the json files as dict"""
+    if isArchive(fname):
+        return ProjectArchive(fname)
+    with open(fname, "r") as file:
+        return json.load(file)
+
+
+def save(data, fname):
+    """Save a project dict to file, in archive format if the file has the
+    archive extension, else in json format"""
+    if fname.split(".")[-1] == EXTENSION:
+        writeArchive(data, fname)
+    else:
+        with open(fname, "w") as file:
+            json.dump(data, file, indent=4)
+
+
+def convert(source, target):
+    """Convert a project file between json and archive format, the format of
+    target file is chosen by extension
+
+    >>> import os
+    >>> import tempfile
+    >>> folder = tempfile.mkdtemp()
+    >>> pcq = os.path.join(folder, "project.pcq")
+    >>> project = {"config": {"Thermo": {"K": "0"}}, \
+                   "PFD": {"x": 0, "y": 0}, \
+                   "stream": {"1": {"T": 300.0, "ids": [62, 2]}}, \
+                   "equipment": {"e1": {"profile": [float(i) for i in \
+                                                    range(20)]}}, \
+                   "other": {}}
+    >>> save(project, pcq)
+    >>> convert(pcq, os.path.join(folder, "project.pcqz"))
+    >>> isArchive(os.path.join(folder, "project.pcqz"))
+    True
+    >>> back = os.path.join(folder, "back.pcq")
+    >>> convert(os.path.join(folder, "project.pcqz"), back)
+    >>> with open(pcq) as f1, open(back) as f2:
+    ...     json.load(f1) == json.load(f2)
+    True
+    """
+    data = load(source)
+    if isinstance(data, ProjectArchive):
+        with data:
+            data = data.toJSON()
+    save(data, target)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,352 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Particle size distribution
+#
+#   - classLimits: Limits of classes of a discrete distribution
+#   - PSD: Discrete mass distribution with array representation
+#   - RosinRammler: Rosin-Rammler-Sperling-Bennet distribution
+#   - LogNormal: Log-normal distribution
+#   - GGS: Gates-Gaudin-Schuhmann distribution
+#
+#   The distributions are in mass basis, the cumulative function is the mass
+#   fraction of particles smaller than the diameter. The discrete classes
+#   are delimited by the geometric mean of consecutive diameters, and the
+#   mass is supposed uniformly distributed in log(d) inside each class.
+#   All the operations work with numpy arrays, so streams with hundreds of
+#   size classes are handled without python loops.
+###############################################################################
+
+
+from numpy import (argsort, asarray, bincount, concatenate, diff, exp,
+                   interp, log, minimum, sqrt, unique)
+from numpy import polyfit
+from scipy.special import erf, erfinv, gamma
+
+
+def classLimits(diametros):
+    """Limits of classes of a discrete distribution, the geometric mean of
+    consecutive diameters, the extreme classes are symmetric in log scale
+    and a single class cover a factor two of diameters
+
+    Parameters
+    ----------
+    diametros : array
+        Class diameters in increasing order, [m]
+
+    Returns
+    -------
+    limits : array
+        Class limits, with length len(diametros)+1, [m]
+
+    >>> print(" ".join("%0.0f" % x for x in classLimits([10, 40, 90])))
+    5 20 60 135
+    """
+    d = asarray(diametros, dtype=float)
+    if len(d) == 1:
+        return d[0]*asarray([0.5**0.5, 2**0.5])
+    m = sqrt(d[1:]*d[:-1])
+    return concatenate(([d[0]**2/m[0]], m, [d[-1]**2/m[-1]]))
+
+
+class PSD(object):
+    """Discrete particle size distribution
+
+    Parameters
+    ----------
+    diametros : array
+        Class diameters, [m]
+    fracciones : array
+        Mass fraction of classes, normalized in the instance
+
+    The classes are sorted by diameter, the attributes are:
+        d: class diameters, [m]
+        x: mass fractions, [-]
+        F: cumulative mass fraction undersize, [-]
+
+    >>> psd = PSD([10e-6, 20e-6, 40e-6, 80e-6], [0.1, 0.4, 0.3, 0.2])
+    >>> print("%0.1f %0.2f %0.2f" % (psd.mean()*1e6, psd.sauter()*1e6, \
+                                      psd.quantile(0.5)*1e6))
+    37.0 25.00 28.28
+    >>> E, under, over = psd.split([0, 0.2, 0.6, 1])
+    >>> print("%0.2f %0.4f %0.4f" % (E, under.x[1], over.x[3]))
+    0.46 0.5926 0.4348
+    """
+
+    def __init__(self, diametros, fracciones):
+        d = asarray(diametros, dtype=float)
+        x = asarray(fracciones, dtype=float)
+        order = argsort(d, kind="stable")
+        self.d = d[order]
+        x = x[order]
+        total = x.sum()
+        if total > 0:
+            x = x/total
+        self.x = x
+        self.F = minimum(x.cumsum(), 1)
+
+    def __len__(self):
+        return len(self.d)
+
+    def __repr__(self):
+        return "PSD with %i classes and mean diameter %g m" % (
+            len(self), self.mean())
+
+    def moment(self, k):
+        """Moment of order k of mass distribution, Σxi·di^k"""
+        return (self.x*self.d**k).sum()
+
+    def mean(self):
+        """Mass mean diameter, [m]"""
+        return self.moment(1)
+
+    def sauter(self):
+        """Sauter mean diameter d32, [m]"""
+        return 1/self.moment(-1)
+
+    def cdf(self, d):
+        """Cumulative mass fraction undersize at diameters d, interpolated
+        in log scale between class limits"""
+        limits = classLimits(self.d)
+        F = concatenate(([0], self.F))
+        return interp(log(d), log(limits), F, left=0, right=1)
+
+    def quantile(self, p):
+        """Diameter with a cumulative mass fraction p undersize, [m]"""
+        limits = classLimits(self.d)
+        F = concatenate(([0], self.F))
+        return exp(interp(p, F, log(limits)))
+
+    def partition(self, eta):
+        """Split the distribution with the efficiency of each class, eta can
+        have several leading dimensions with the classes in last axis
+
+        Returns
+        -------
+        E : array
+            Global efficiency
+        xp : array
+            Mass fractions of passing classes
+        xr : array
+            Mass fractions of retained classes
+        """
+        eta = asarray(eta, dtype=float)
+        retenido = self.x*eta
+        pasa = self.x-retenido
+        E = retenido.sum(axis=-1)
+        Ep = 1-E
+        xr = retenido/where0(E)[..., None]
+        xp = pasa/where0(Ep)[..., None]
+        return E, xp, xr
+
+    def split(self, eta):
+        """Split the distribution with the efficiency of each class, return
+        the global efficiency and the passing and retained distributions"""
+        E, xp, xr = self.partition(eta)
+        return E, PSD(self.d, xp), PSD(self.d, xr)
+
+    def rebin(self, diametros):
+        """Redistribute the distribution in other class diameters"""
+        F = self.cdf(classLimits(diametros))
+        return PSD(diametros, diff(F))
+
+    def scale(self, factor):
+        """Distribution with the diameters multiplied by factor"""
+        return PSD(self.d*factor, self.x)
+
+    @classmethod
+    def mix(cls, psds, masas):
+        """Mix distributions, the class diameters are joined
+
+        Parameters
+        ----------
+        psds : list
+            PSD instances
+        masas : array
+            Mass, or mass flow, of each distribution
+        """
+        d = concatenate([psd.d for psd in psds])
+        w = concatenate([psd.x*m for psd, m in zip(psds, masas)])
+        dm, index = unique(d, return_inverse=True)
+        return cls(dm, bincount(index, weights=w))
+
+
+def where0(x):
+    """Replace zeros to avoid division errors"""
+    x = asarray(x, dtype=float)
+    return x+(x == 0)
+
+
+class _Distribution(object):
+    """Common functionality of analytic distributions, the child classes
+    define cdf, quantile, moment and the linearization used in fit"""
+
+    def discretize(self, diametros):
+        """Discrete distribution with the class diameters"""
+        F = self.cdf(classLimits(diametros))
+        x = diff(F)
+        x[0] += F[0]
+        x[-1] += 1-F[-1]
+        return PSD(diametros, x)
+
+    def mean(self):
+        """Mass mean diameter, [m]"""
+        return self.moment(1)
+
+    def sauter(self):
+        """Sauter mean diameter d32, [m]"""
+        return 1/self.moment(-1)
+
+    @classmethod
+    def fit(cls, psd):
+        """Fit the distribution to a discrete distribution with the
+        linearized cumulative function, the class upper limits are used"""
+        d = classLimits(psd.d)[1:]
+        valid = (psd.F > 1e-6) & (psd.F < 1-1e-6)
+        X, Y = cls._linear(d[valid], psd.F[valid])
+        a, b = polyfit(X, Y, 1)
+        return cls._fromLinear(a, b)
+
+
+class RosinRammler(_Distribution):
+    """Rosin-Rammler-Sperling-Bennet distribution
+
+    .. math::
+        F = 1-\\exp\\left(-\\left(d/d_{63}\\right)^n\\right)
+
+    Parameters
+    ----------
+    d63 : float
+        Characteristic diameter, [m]
+    n : float
+        Uniformity index, [-]
+
+    >>> rr = RosinRammler(50e-6, 2)
+    >>> print("%0.2f %0.2f" % (rr.quantile(0.5)*1e6, rr.mean()*1e6))
+    41.63 44.31
+    >>> from numpy import logspace
+    >>> fit = RosinRammler.fit(rr.discretize(logspace(-6, -3.5, 100)))
+    >>> print("%0.2f %0.3f" % (fit.d63*1e6, fit.n))
+    50.00 2.000
+    """
+
+    def __init__(self, d63, n):
+        self.d63 = d63
+        self.n = n
+
+    def cdf(self, d):
+        return 1-exp(-(asarray(d)/self.d63)**self.n)
+
+    def quantile(self, p):
+        return self.d63*(-log(1-asarray(p)))**(1/self.n)
+
+    def moment(self, k):
+        return self.d63**k*gamma(1+k/self.n)
+
+    @staticmethod
+    def _linear(d, F):
+        return log(d), log(-log(1-F))
+
+    @classmethod
+    def _fromLinear(cls, a, b):
+        return cls(exp(-b/a), a)
+
+
+class LogNormal(_Distribution):
+    """Log-normal distribution
+
+    .. math::
+        F = \\frac{1}{2}\\left[1+\\text{erf}\\left(\\frac{\\ln(d/d_{50})}
+        {\\sqrt{2}\\sigma}\\right)\\right]
+
+    Parameters
+    ----------
+    d50 : float
+        Median diameter, [m]
+    sigma : float
+        Standard deviation of ln(d), [-]
+
+    >>> ln = LogNormal(30e-6, 0.5)
+    >>> print("%0.2f %0.2f" % (ln.quantile(0.8413)*1e6, ln.mean()*1e6))
+    49.46 33.99
+    """
+
+    def __init__(self, d50, sigma):
+        self.d50 = d50
+        self.sigma = sigma
+
+    def cdf(self, d):
+        return 0.5*(1+erf(log(asarray(d)/self.d50)/2**0.5/self.sigma))
+
+    def quantile(self, p):
+        return self.d50*exp(2**0.5*self.sigma*erfinv(2*asarray(p)-1))
+
+    def moment(self, k):
+        return self.d50**k*exp(k**2*self.sigma**2/2)
+
+    @staticmethod
+    def _linear(d, F):
+        return log(d), 2**0.5*erfinv(2*F-1)
+
+    @classmethod
+    def _fromLinear(cls, a, b):
+        return cls(exp(-b/a), 1/a)
+
+
+class GGS(_Distribution):
+    """Gates-Gaudin-Schuhmann distribution
+
+    .. math::
+        F = \\left(d/d_{max}\\right)^m
+
+    Parameters
+    ----------
+    dmax : float
+        Maximum diameter, [m]
+    m : float
+        Distribution modulus, [-]
+
+    >>> ggs = GGS(100e-6, 0.8)
+    >>> print("%0.2f %0.2f" % (ggs.quantile(0.5)*1e6, ggs.mean()*1e6))
+    42.04 44.44
+    """
+
+    def __init__(self, dmax, m):
+        self.dmax = dmax
+        self.m = m
+
+    def cdf(self, d):
+        F = (asarray(d)/self.dmax)**self.m
+        return minimum(F, 1)
+
+    def quantile(self, p):
+        return self.dmax*asarray(p)**(1/self.m)
+
+    def moment(self, k):
+        return self.m*self.dmax**k/(self.m+k)
+
+    @staticmethod
+    def _linear(d, F):
+        return log(d), log(F)
+
+    @classmethod
+    def _fromLinear(cls, a, b):
+        return cls(exp(-b/a), a)
@@ -0,0 +1,518 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Vectorized psychrometric procedures with ideal gas model, this module only
+# depend of numpy so it can be used without graphical interface, as in
+# lib.psyBatch. lib.psycrometry define the psychrometric states using it.
+#
+#    Simple calculation procedures:
+#     - _Pbar: Calculate atmospheric pressure for a specified altitude
+#     - _height: Calculate altitude for a specified atmospheric pressure
+#     - _Tbar: Calculate standard Tdb for a specified altitude
+#     - _lnPsat: Logarithm of saturation pressure and its derivative
+#     - _Psat: Calculate saturation pressure for a specified Tdb
+#     - _Tsat: CAlculate saturation pressure for a specified pressure
+#     - _W: Saturation humidty calculation procedure
+#     - _h: Specific enthalpy calculation procedure
+#     - _v: Specific volume calculation procedure
+#     - _W_twb: Humidity ratio calculation procedure
+#     - _Tdb: Dry bulb temperature calculation procedure
+#     - _Tdb_V: Tdb calculation procedure from specified volume
+#     - _W_V: Humidity ratio calculation procedure from  specified volume
+#     - _tdp: Dew point temperature calculation procedure
+#     - _twb: Wet bulb temperature calculation procedure
+#
+#    All procedures accept float or array inputs, the iterative ones are
+#    solved with a vectorized newton method
+#
+#    - arrayInputs: Check and broadcast the input variables of arrays
+#    - idealProperties: Properties with ideal gas model for a input mode
+#    - idealArray: Properties with ideal gas model for array inputs
+###############################################################################
+
+
+from numpy import (asarray, broadcast_arrays, broadcast_to, errstate, exp,
+                   log, nan, where)
+
+
+# Input variables pairs of each calculation mode
+VAR_NAME = [
+    ("tdb", "w"),
+    ("tdb", "HR"),
+    ("tdb", "twb"),
+    ("tdb", "tdp"),
+    ("tdp", "HR"),
+    ("twb", "HR")
+    ]
+
+
+def _Pbar(Z):
+    """
+    ASHRAE Fundamentals Handbook pag 1.1 eq. 3
+    input:
+        Z: altitude, m
+    return
+        standard atmosphere barometric pressure, Pa
+    """
+    return 101325.*(1-2.25577e-5*Z)**5.256
+
+
+def _height(P):
+    """
+    Inverted _Pbar function
+    input:
+        standard atmosphere barometric pressure, Pa
+    return
+        Z: altitude, m
+    """
+    P_atm = P/101325.
+    return 1/2.25577e-5*(1-exp(log(P_atm)/5.2559))
+
+
+def _Tbar(self, Z):
+    """
+    ASHRAE Fundamentals Handbook pag 1.2 eq. 4
+    input:
+        Z: altitude, m
+    return
+        standard atmosphere dry bulb temperature, K
+    """
+    return 288.15-0.0065*Z
+
+
+def _lnPsat(Tdb, ice=None):
+    """
+    ASHRAE Fundamentals Handbook pag 1.2 eq. 4-5, logarithm of saturation
+    pressure and its temperature derivative, used in the vectorized solvers
+    input:
+        Tdb: Dry bulb temperature, K, float or array
+        ice: boolean array to force the over ice correlation, optional,
+            by default the correlation is chosen by temperature
+    return:
+        lnP: logarithm of saturation pressure, Pa
+        dlnP: derivative of lnP with temperature, 1/K
+    """
+    T = asarray(Tdb, dtype=float)
+    if ice is None:
+        ice = T < 273.15
+
+    # Over ice, 173.15 ≤ T < 273.15
+    C1 = -5674.5359
+    C2 = 6.3925247
+    C3 = -0.009677843
+    C4 = 0.00000062215701
+    C5 = 2.0747825E-09
+    C6 = -9.484024E-13
+    C7 = 4.1635019
+
+    # Over liquid water, 273.15 ≤ T ≤ 473.15
+    C8 = -5800.2206
+    C9 = 1.3914993
+    C10 = -0.048640239
+    C11 = 0.000041764768
+    C12 = -0.000000014452093
+    C13 = 6.5459673
+
+    with errstate(invalid="ignore", divide="ignore"):
+        lnPi = C1/T + C2 + C3*T + C4*T**2 + C5*T**3 + C6*T**4 + C7*log(T)
+        dlnPi = -C1/T**2 + C3 + 2*C4*T + 3*C5*T**2 + 4*C6*T**3 + C7/T
+        lnPw = C8/T + C9 + C10*T + C11*T**2 + C12*T**3 + C13*log(T)
+        dlnPw = -C8/T**2 + C10 + 2*C11*T + 3*C12*T**2 + C13/T
+    return where(ice, lnPi, lnPw), where(ice, dlnPi, dlnPw)
+
+
+def _checkBound(valid):
+    """Raise the out of bound exception for scalar inputs, the array inputs
+    return nan for the invalid items"""
+    if valid.ndim == 0 and not valid:
+        raise NotImplementedError("Incoming out of bound")
+
+
+def _Psat(Tdb):
+    """
+    ASHRAE Fundamentals Handbook pag 1.2 eq. 4
+    input:
+        Dry bulb temperature, K
+    return:
+        Saturation pressure, Pa
+    """
+    T = asarray(Tdb, dtype=float)
+    valid = (173.15 <= T) & (T <= 473.15)
+    _checkBound(valid)
+    lnP, dlnP = _lnPsat(T)
+    pws = where(valid, exp(lnP), nan)
+    return pws[()]
+
+
+def _Tsat(Pv):
+    """
+    ASHRAE Fundamentals Handbook pag 1.2 eq. 4, inverted for calculate Tdb
+    input:
+        Saturation pressure, Pa
+    return:
+        Dry bulb temperature, K
+    """
+    Pv = asarray(Pv, dtype=float)
+    Pv_min = _Psat(173.15)
+    Pv_lim = _Psat(273.15)
+    Pv_max = _Psat(473.15)
+    valid = (Pv_min <= Pv) & (Pv <= Pv_max)
+    _checkBound(valid)
+
+    # Newton iteration in logarithmic form, vectorized for all points
+    ice = Pv < Pv_lim
+    with errstate(invalid="ignore", divide="ignore"):
+        lnPv = log(where(valid, Pv, Pv_lim))
+    t = where(ice, 250., 300.)
+    for i in range(50):
+        lnP, dlnP = _lnPsat(t, ice)
+        dt = (lnP-lnPv)/dlnP
+        t = t-dt
+        if not (abs(dt) > 1e-10).any():
+            break
+
+    t = where(valid, t, nan)
+    return t[()]
+
+
+def _W(P, Tdb):
+    """
+    ASHRAE Fundamentals Handbook pag 1.12 eq. 22
+    input:
+        Dry bulb temperature, K
+    return:
+        Saturation pressure, Pa
+    Saturation humidity calculation procedure"""
+    pv = _Psat(Tdb)
+    return 0.62198*pv/(P-pv)
+
+
+def _h(Tdb, W):
+    """
+    ASHRAE Fundamentals Handbook pag 1.13 eq. 32
+    input:
+        Dry bulb temperature, K
+        Humidity ratio, kg water/kg dry air
+    return:
+        Specific enthalpy, kJ/kg (dry air)
+    """
+    T_c = Tdb-273.15
+    return 1.006*T_c + W*(2501 + 1.805*T_c)
+
+
+def _v(P, Tdb, W):
+    """
+    ASHRAE Fundamentals Handbook pag 1.13 eq. 28
+    input:
+        Dry bulb temperature, K
+        Humidity ratio, kg water/kg dry air
+        Barometric pressure, Pa
+    return:
+        Specific volume, m3/kg (dry air)
+    """
+    P_kpa = P/1000
+    return 0.2871*Tdb*(1+1.6078*W)/P_kpa
+
+
+def _W_twb(tdb, twb, P):
+    """
+    ASHRAE Fundamentals Handbook pag 1.13 eq. 35-37
+    input:
+        dry bulb temperature, K
+        wet bulb temperature, K
+        barometric Pressure, Pa
+    return:
+        humidity ratio, kg H2O/kg air
+    """
+    tdb = asarray(tdb, dtype=float)
+    tdb_C = tdb - 273.15
+    twb_C = twb - 273.15
+    Pvs = _Psat(twb)
+    Ws = 0.62198*Pvs/(P-Pvs)
+    w = where(
+        tdb >= 0,
+        ((2501-2.381*twb_C)*Ws-1.006*(tdb-twb))/(2501+1.805*tdb_C-4.186*twb_C),
+        ((2830-0.24*twb_C)*Ws-1.006*(tdb-twb))/(2830+1.86*tdb_C-2.1*twb_C))
+    return w[()]
+
+
+def _Tdb(twb, w, P):
+    """
+    ASHRAE Fundamentals Handbook pag 1.13 eq. 35-37 inverted to calculate Tdb
+    input:
+        wet bulb temperature, K
+        humidity ratio, kg H2O/kg air
+        saturated humidity ratio, kg H2O/kg air
+    return:
+        dry bulb temperature, K
+    """
+    tw = twb-273.15
+    ws = _W(P, twb)
+    td = ((2501-2.381*tw)*ws+1.006*tw-w*(2501-4.186*tw))/(w*1.805+1.006)
+    return td+273.15
+
+
+def _Tdb_V(v, P):
+    """
+    Function to calculate isochor line
+    input:
+        specified volume, m3/kg air
+        barometric pressure, Pa
+    return
+        dry bulb temperature, K
+    """
+    v = asarray(v, dtype=float)
+    P_kpa = P/1000
+
+    # Newton iteration vectorized for all volumes, starting from the dry air
+    # temperature, the saturation temperature is always lower
+    ts = v*P_kpa/0.2871
+    for i in range(50):
+        lnPvs, dlnPvs = _lnPsat(ts)
+        Pvs = exp(lnPvs)
+        w = 0.62198*Pvs/(P-Pvs)
+        dw = 0.62198*P*Pvs*dlnPvs/(P-Pvs)**2
+        f = v-0.2871*ts*(1+1.6078*w)/P_kpa
+        df = -0.2871*(1+1.6078*w+1.6078*ts*dw)/P_kpa
+        dt = f/df
+        ts = ts-dt
+        if not (abs(dt) > 1e-10).any():
+            break
+    return ts[()]
+
+
+def _W_V(Td, P, v):
+    """
+    Function to calculate isochor line
+    input:
+        dry bulb temperature, K
+        barometric pressure, Pa
+        specified volume, m3/kg air
+    return
+        humidity ratio, kg H2O/kg air
+    """
+    P_kpa = P/1000
+    return (v*P_kpa-0.2871*Td)/(0.2871*1.6078*Td)
+
+
+def _tdp(Pw):
+    """
+    ASHRAE Fundamentals Handbook pag 1.13 eq. 39-40
+    input:
+        water vapor partial pressure, Pa
+    return:
+        dew point temperature, K
+    """
+    C14 = 6.54
+    C15 = 14.526
+    C16 = 0.7389
+    C17 = 0.09486
+    C18 = 0.4569
+
+    Pw = asarray(Pw, dtype=float)
+    with errstate(invalid="ignore", divide="ignore"):
+        a = log(Pw/1000.)
+        Tdp1 = C14 + C15*a + C16*a**2 + C17*a**3 + C18*(Pw/1000.)**0.1984
+        Tdp2 = 6.09 + 12.608*a + 0.4959*a**2
+    liquid = (0 <= Tdp1) & (Tdp1 <= 93)
+    ice = ~liquid & (Tdp2 < 0)
+    _checkBound(liquid | ice)
+
+    t = where(liquid, Tdp1, where(ice, Tdp2, nan))
+    return t[()]+273.15
+
+
+def _twb(tdb, W, P):
+    """
+    ASHRAE Fundamentals Handbook pag 1.13 eq. 35-37
+    input:
+        dry bulb temperature, K
+        humidity ratio, kg H2O/kg air
+        saturated humidity ratio, kg H2O/kg air
+    return:
+        wet bulb temperature, K
+    """
+    tdb, W = broadcast_arrays(asarray(tdb, dtype=float),
+                              asarray(W, dtype=float))
+    tdb_C = tdb - 273.15
+
+    # Coefficients of humidity ratio equation, eq 35 over liquid water and
+    # eq 37 over ice
+    liquid = tdb >= 0
+    a = where(liquid, 2501., 2830.)
+    b = where(liquid, 2.326, 0.24)
+    d = where(liquid, 4.186, 2.1)
+
+    # Newton iteration vectorized for all points, starting from dry bulb
+    # temperature the iteration converge monotonically
+    twb = tdb.copy()
+    for i in range(50):
+        lnPvs, dlnPvs = _lnPsat(twb)
+        Pvs = exp(lnPvs)
+        Ws = 0.62198*Pvs/(P-Pvs)
+        dWs = 0.62198*P*Pvs*dlnPvs/(P-Pvs)**2
+        twb_C = twb - 273.15
+        N = (a-b*twb_C)*Ws-1.006*(tdb_C-twb_C)
+        dN = -b*Ws+(a-b*twb_C)*dWs+1.006
+        D = a+1.86*tdb_C-d*twb_C
+        f = N/D-W
+        df = (dN*D+d*N)/D**2
+        dt = f/df
+        twb = twb-dt
+        if not (abs(dt) > 1e-8).any():
+            break
+
+    return twb[()]
+
+
+def arrayInputs(kwargs):
+    """Check the input variables for array calculation
+    return:
+        mode: input variables definition
+        P: barometric pressure array broadcasted to the inputs shape
+        inputs: dict with the input variables as arrays
+    """
+    inputs = {}
+    for key in ("tdb", "twb", "tdp", "w", "HR"):
+        if kwargs.get(key) is not None:
+            inputs[key] = asarray(kwargs[key], dtype=float)
+
+    if "tdb" in inputs and "w" in inputs:
+        mode = 0
+    elif "tdb" in inputs and "HR" in inputs:
+        mode = 1
+    elif "tdb" in inputs and "twb" in inputs:
+        mode = 2
+    elif "tdb" in inputs and "tdp" in inputs:
+        mode = 3
+    elif "tdp" in inputs and "HR" in inputs:
+        mode = 4
+    else:
+        raise ValueError("Unknown variables")
+
+    if kwargs.get("P") is not None:
+        P = asarray(kwargs["P"], dtype=float)
+    elif kwargs.get("z") is not None:
+        P = _Pbar(asarray(kwargs["z"], dtype=float))
+    else:
+        P = asarray(101325.)
+
+    var = [key for key in ("tdb", "twb", "tdp", "w", "HR")
+           if key in inputs and key in VAR_NAME[mode]]
+    arrays = broadcast_arrays(P, *[inputs[key] for key in var])
+    P = arrays[0]
+    inputs = dict(zip(var, arrays[1:]))
+    return mode, P, inputs
+
+
+def idealProperties(mode, P, tdb=0, twb=0, tdp=0, w=None, HR=None):
+    """Psychrometric properties calculation, it works with float and array
+    inputs
+    mode: input variables definition, see VAR_NAME
+    return:
+        tdp, tdb, twb, P, Pvs, Pv, ws, w, HR, v, h
+    """
+    if mode == 0:
+        # Tdb and w
+        Pvs = _Psat(tdb)
+        ws = 0.62198*Pvs/(P-Pvs)
+        Pv = w*P/(0.62198+w)
+        HR = Pv/Pvs*100
+        v = _v(P, tdb, w)
+        h = _h(tdb, w)
+        tdp = _tdp(Pv)
+        twb = _twb(tdb, w, P)
+
+    elif mode == 1:
+        # Tdb and HR
+        Pvs = _Psat(tdb)
+        ws = 0.62198*Pvs/(P-Pvs)
+        Pv = Pvs*HR/100
+        w = 0.62198*Pv/(P-Pv)
+        v = _v(P, tdb, w)
+        h = _h(tdb, w)
+        tdp = _tdp(Pv)
+        twb = _twb(tdb, w, P)
+
+    elif mode == 2:
+        # Tdb and Twb
+        Pvs = _Psat(tdb)
+        ws = 0.62198*Pvs/(P-Pvs)
+        w = _W_twb(tdb, twb, P)
+        Pv = w*P/(0.62198+w)
+        HR = Pv/Pvs*100
+        v = _v(P, tdb, w)
+        h = _h(tdb, w)
+        tdp = _tdp(Pv)
+
+    elif mode == 3:
+        # Tdb and Tdp
+        Pv = _Psat(tdp)
+        w = 0.62198*Pv/(P-Pv)
+        Pvs = _Psat(tdb)
+        ws = 0.62198*Pvs/(P-Pvs)
+        HR = Pv/Pvs*100
+        v = _v(P, tdb, w)
+        h = _h(tdb, w)
+        twb = _twb(tdb, w, P)
+
+    elif mode == 4:
+        # Tdp and HR, with HR=0 the state is dry air at tdp
+        Pv = _Psat(tdp)
+        wet = asarray(HR) > 0
+        with errstate(divide="ignore", invalid="ignore"):
+            w = where(wet, 0.62198*Pv/(P-Pv), 0)[()]
+            Pvs = where(wet, Pv/HR*100, Pv)[()]
+        ws = 0.62198*Pvs/(P-Pvs)
+        tdb = _Tsat(Pvs)
+        v = _v(P, tdb, w)
+        h = _h(tdb, w)
+        twb = _twb(tdb, w, P)
+
+    return tdp, tdb, twb, P, Pvs, Pv, ws, w, HR, v, h
+
+
+def idealArray(**kwargs):
+    """Vectorized calculation of psychrometric properties, the inputs are
+    the same as the PsyState kwargs with float or array values"""
+    mode, P, inputs = arrayInputs(kwargs)
+    tdp, tdb, twb, P, Pvs, Pv, ws, w, HR, v, h = idealProperties(
+        mode, P, **inputs)
+
+    prop = {}
+    prop["tdp"] = tdp
+    prop["tdb"] = tdb
+    prop["twb"] = twb
+    prop["P"] = P
+    prop["Pvs"] = Pvs
+    prop["Pv"] = Pv
+    prop["ws"] = ws
+    prop["w"] = w
+    prop["HR"] = HR
+    prop["mu"] = w/ws*100
+    prop["v"] = v
+    prop["rho"] = 1/v
+    prop["h"] = h*1000
+    prop["Xa"] = 1/(1+w/0.62198)
+    prop["Xw"] = 1-prop["Xa"]
+    for key, value in prop.items():
+        prop[key] = broadcast_to(value, P.shape).copy()
+    return prop
@@ -0,0 +1,452 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Bulk psychrometric processing of weather files, without graphical interface
+#
+#   - readCSV: Read a csv file with psychrometric data in chunks
+#   - readEPW: Read a EnergyPlus weather file in chunks
+#   - calculator: Vectorized calculation function of a psychrometric model
+#   - process: Calculate psychrometric properties of chunks
+#   - CSVWriter: Incremental csv output
+#   - ColumnarWriter: Incremental columnar binary output
+#   - readColumnar: Load a columnar output as memory mapped arrays
+#   - run: Full pipeline from input file to output file
+#   - main: Command line interface
+#
+#   With the ideal gas model the processing don't need the graphical library
+#
+#   Usage from command line:
+#       python3 lib/psyBatch.py weather.epw -o result.csv
+#       python3 lib/psyBatch.py data.csv --celsius -o result --format columnar
+###############################################################################
+
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+# Standalone use from command line, define the pychemqt path as the main
+# program does at startup
+if "pychemqt" not in os.environ:
+    path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+    sys.path.append(path)
+    os.environ["pychemqt"] = path + os.sep
+
+from numpy import array, asarray, float64, memmap, nan  # noqa
+
+# The ideal gas model don't need the graphical library, lib.psycrometry is
+# only imported for the other models
+from lib import config, psyArray  # noqa
+
+
+# Input variables, with their interpretation in input files
+INPUTS = ("tdb", "twb", "tdp", "w", "HR", "P", "z")
+TEMPERATURES = ("tdb", "twb", "tdp")
+
+# Calculated properties in output, all in SI units
+PROPERTIES = ("tdb", "twb", "tdp", "P", "Pvs", "Pv", "ws", "w", "HR", "mu",
+              "v", "rho", "h", "Xa", "Xw")
+UNITS = {"tdb": "K", "twb": "K", "tdp": "K", "P": "Pa", "Pvs": "Pa",
+         "Pv": "Pa", "ws": "kgw/kgda", "w": "kgw/kgda", "HR": "%", "mu": "%",
+         "v": "m3/kgda", "rho": "kgda/m3", "h": "J/kgda", "Xa": "-", "Xw": "-"}
+
+CHUNKSIZE = 8760
+
+
+def _float(value):
+    """Convert a text field to float, nan for missing or invalid values"""
+    try:
+        return float(value)
+    except ValueError:
+        return nan
+
+
+def readCSV(filename, chunksize=CHUNKSIZE, celsius=False, delimiter=","):
+    """Read a csv file with psychrometric data in chunks
+
+    The file must have a header row with the name of columns, the columns
+    with name in INPUTS are used, others are ignored:
+        tdb, twb, tdp: temperatures, in K or ºC with celsius option
+        w: humidity ratio, kg water/kg dry air
+        HR: relative humidity, %
+        P: barometric pressure, Pa
+        z: altitude, m
+
+    Parameters
+    ----------
+    filename : string
+        Path of file
+    chunksize : integer
+        Number of rows in each chunk
+    celsius : boolean
+        Temperatures in file are in ºC
+    delimiter : string
+        Delimiter of columns
+
+    Returns
+    -------
+    Generator of dict with the input variables as arrays
+    """
+    with open(filename, newline="") as archivo:
+        reader = csv.reader(archivo, delimiter=delimiter)
+        header = [col.strip() for col in next(reader)]
+        columns = [(i, col) for i, col in enumerate(header) if col in INPUTS]
+        if not columns:
+            raise ValueError("No psychrometric variables in file header")
+
+        rows = []
+        for row in reader:
+            if not row:
+                continue
+            rows.append([_float(row[i]) if i < len(row) else nan
+                         for i, col in columns])
+            if len(rows) == chunksize:
+                yield _chunk(rows, columns, celsius)
+                rows = []
+        if rows:
+            yield _chunk(rows, columns, celsius)
+
+
+def _chunk(rows, columns, celsius):
+    """Convert a list of rows in a dict of arrays"""
+    data = array(rows, dtype=float64)
+    chunk = {}
+    for j, (i, col) in enumerate(columns):
+        chunk[col] = data[:, j]
+        if celsius and col in TEMPERATURES:
+            chunk[col] = chunk[col]+273.15
+    return chunk
+
+
+def readEPW(filename, chunksize=CHUNKSIZE):
+    """Read a EnergyPlus weather file (epw) in chunks
+
+    The file has 8 header lines, the first with the location, and a hourly
+    data line with the fields:
+        6: dry bulb temperature, ºC
+        7: dew point temperature, ºC
+        8: relative humidity, %
+        9: atmospheric station pressure, Pa
+    The state is defined with dry bulb temperature and relative humidity,
+    the missing pressure values (999999) are replaced by the standard
+    pressure at the location elevation
+
+    Returns
+    -------
+    Generator of dict with the input variables as arrays
+    """
+    with open(filename, newline="") as archivo:
+        reader = csv.reader(archivo)
+        location = next(reader)
+        try:
+            Pbar = psyArray._Pbar(float(location[9]))
+        except (IndexError, ValueError):
+            Pbar = 101325.
+        for i in range(7):
+            next(reader)
+
+        rows = []
+        for row in reader:
+            if len(row) < 10:
+                continue
+            rows.append([_float(row[6]), _float(row[8]), _float(row[9])])
+            if len(rows) == chunksize:
+                yield _chunkEPW(rows, Pbar)
+                rows = []
+        if rows:
+            yield _chunkEPW(rows, Pbar)
+
+
+def _chunkEPW(rows, Pbar):
+    """Convert a list of epw rows in a dict of arrays, with the missing
+    values codes as nan"""
+    data = array(rows, dtype=float64)
+    tdb, HR, P = data.T
+    tdb[tdb >= 99.9] = nan
+    HR[HR >= 999] = nan
+    P[P >= 999999] = Pbar
+    return {"tdb": tdb+273.15, "HR": HR, "P": P}
+
+
+def _environment():
+    """Define the availability of optional modules as the main program does
+    at startup, lib.psycrometry need it in standalone use"""
+    from tools.dependences import optional_modules
+    for module, use in optional_modules:
+        if module in os.environ:
+            continue
+        try:
+            __import__(module)
+            os.environ[module] = "True"
+        except ImportError:
+            os.environ[module] = ""
+
+
+def calculator(model=None):
+    """Return the vectorized calculation function of a psychrometric model
+
+    Parameters
+    ----------
+    model : class or str
+        PsyState subclass, or name of model, ideal or coolprop, by default
+        the model defined in preferences
+
+    The ideal gas model is calculated with lib.psyArray, the other models
+    import lib.psycrometry and with it the graphical library
+    """
+    if model is None:
+        Preferences = config.Preferences
+        if not Preferences.getboolean("Psychr", "virial", fallback=False):
+            model = "ideal"
+    if model == "ideal":
+        return psyArray.idealArray
+
+    _environment()
+    from lib import psycrometry
+    if model is None:
+        model = psycrometry.PsychroState
+    elif model == "coolprop":
+        model = psycrometry.PsyCoolprop
+    return model.calculateArray
+
+
+def process(chunks, model=None):
+    """Calculate the psychrometric properties of each chunk
+
+    Parameters
+    ----------
+    chunks : iterable
+        Iterable with dict of input variables arrays
+    model : class or str
+        PsyState subclass or name of model to use in calculation, default
+        PsychroState defined in preferences, see calculator
+
+    Returns
+    -------
+    Generator of dict with the properties arrays
+    """
+    calculate = calculator(model)
+    for chunk in chunks:
+        yield calculate(**chunk)
+
+
+class CSVWriter(object):
+    """Incremental csv output of calculated properties"""
+    def __init__(self, filename, properties=PROPERTIES, delimiter=","):
+        self.properties = properties
+        self.rows = 0
+        self._file = open(filename, "w", newline="")
+        self._writer = csv.writer(self._file, delimiter=delimiter)
+        self._writer.writerow(
+            ["%s [%s]" % (key, UNITS[key]) for key in properties])
+
+    def write(self, prop):
+        """Append a chunk of properties"""
+        columns = [prop[key] for key in self.properties]
+        for row in zip(*columns):
+            self._writer.writerow(["%g" % value for value in row])
+        self.rows += len(columns[0])
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ColumnarWriter(object):
+    """Incremental columnar binary output of calculated properties
+
+    The output is a folder with a raw little-endian float64 file for each
+    property, <property>.f8, and a columns.json file with the row count,
+    the properties and its units. It can be load with readColumnar"""
+    def __init__(self, path, properties=PROPERTIES):
+        self.path = path
+        self.properties = properties
+        self.rows = 0
+        os.makedirs(path, exist_ok=True)
+        self._files = {}
+        for key in properties:
+            self._files[key] = open(os.path.join(path, key+".f8"), "wb")
+
+    def write(self, prop):
+        """Append a chunk of properties"""
+        for key in self.properties:
+            asarray(prop[key], dtype="<f8").tofile(self._files[key])
+        self.rows += len(prop[self.properties[0]])
+
+    def close(self):
+        for archivo in self._files.values():
+            archivo.close()
+        index = {"rows": self.rows,
+                 "columns": list(self.properties),
+                 "units": {key: UNITS[key] for key in self.properties}}
+        with open(os.path.join(self.path, "columns.json"), "w") as archivo:
+            json.dump(index, archivo, indent=4)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def readColumnar(path):
+    """Load a columnar output as memory mapped arrays
+    return:
+        dict with the property arrays"""
+    with open(os.path.join(path, "columns.json")) as archivo:
+        index = json.load(archivo)
+    data = {}
+    for key in index["columns"]:
+        if index["rows"]:
+            data[key] = memmap(os.path.join(path, key+".f8"), dtype="<f8",
+                               mode="r", shape=(index["rows"], ))
+        else:
+            data[key] = array([], dtype=float64)
+    return data
+
+
+def run(filename, output, fmt="csv", chunksize=CHUNKSIZE, celsius=False,
+        properties=PROPERTIES, model=None):
+    """Full pipeline from input file to output file, the memory use is
+    bounded by chunksize
+
+    Parameters
+    ----------
+    filename : string
+        Input file, epw files are recognized by extension, others are read
+        as csv
+    output : string
+        Output file for csv format or folder for columnar format
+    fmt : string
+        Output format, csv or columnar
+    chunksize : integer
+        Number of rows processed in each step
+    celsius : boolean
+        Temperatures in csv input file are in ºC
+    properties : list
+        Properties to save in output
+    model : class or str
+        PsyState subclass or name of model to use in calculation
+
+    Returns
+    -------
+    rows : integer
+        Number of processed rows
+
+    Example with a csv input file in ºC, processed in chunks of two rows
+
+    >>> import os
+    >>> import tempfile
+    >>> folder = tempfile.mkdtemp()
+    >>> data = os.path.join(folder, "data.csv")
+    >>> with open(data, "w") as archivo:
+    ...     n = archivo.write("tdb,HR,P\\n25,50,101325\\n30,,101325\\n"
+    ...                       "35,20,90000\\n")
+    >>> out = os.path.join(folder, "out.csv")
+    >>> run(data, out, chunksize=2, celsius=True, properties=("tdb", "w"),
+    ...     model="ideal")
+    3
+    >>> with open(out) as archivo:
+    ...     print(archivo.read().strip())
+    tdb [K],w [kgw/kgda]
+    298.15,0.0098816
+    303.15,nan
+    308.15,0.00787716
+
+    The columnar output is loaded as memory mapped arrays
+    >>> col = os.path.join(folder, "columnar")
+    >>> run(data, col, fmt="columnar", chunksize=2, celsius=True,
+    ...     model="ideal")
+    3
+    >>> result = readColumnar(col)
+    >>> print(type(result["h"]).__name__, result["h"].shape)
+    memmap (3,)
+    >>> print("%0.1f %0.1f" % (result["h"][0], result["twb"][2]))
+    50309.8 291.4
+    """
+    if os.path.splitext(filename)[1].lower() == ".epw":
+        chunks = readEPW(filename, chunksize)
+    else:
+        chunks = readCSV(filename, chunksize, celsius)
+
+    if fmt == "columnar":
+        writer = ColumnarWriter(output, properties)
+    else:
+        writer = CSVWriter(output, properties)
+
+    with writer:
+        for prop in process(chunks, model):
+            writer.write(prop)
+    return writer.rows
+
+
+def main(argv=None):
+    """Command line interface
+
+    >>> import os
+    >>> import tempfile
+    >>> folder = tempfile.mkdtemp()
+    >>> data = os.path.join(folder, "data.csv")
+    >>> with open(data, "w") as archivo:
+    ...     n = archivo.write("tdb,twb\\n300,290\\n")
+    >>> main([data, "-o", os.path.join(folder, "out"), "-f", "columnar",
+    ...       "-m", "ideal", "-p", "tdb,HR"])
+    1 rows processed
+    >>> print("%0.2f" % readColumnar(os.path.join(folder, "out"))["HR"][0])
+    35.78
+    """
+    models = ("ideal", "coolprop")
+    parser = argparse.ArgumentParser(
+        description="Bulk psychrometric calculation of weather files")
+    parser.add_argument("input", help="Input file, csv or epw")
+    parser.add_argument("-o", "--output", required=True,
+                        help="Output file, or folder for columnar format")
+    parser.add_argument("-f", "--format", choices=("csv", "columnar"),
+                        default="csv", help="Output format")
+    parser.add_argument("-c", "--chunksize", type=int, default=CHUNKSIZE,
+                        help="Number of rows calculated in each step")
+    parser.add_argument("--celsius", action="store_true",
+                        help="Temperatures in csv input are in ºC")
+    parser.add_argument("-m", "--model", choices=sorted(models),
+                        help="Psychrometric model, default from preferences")
+    parser.add_argument("-p", "--properties", default=",".join(PROPERTIES),
+                        help="Comma separated list of output properties")
+    args = parser.parse_args(argv)
+
+    properties = [p.strip() for p in args.properties.split(",") if p.strip()]
+    for key in properties:
+        if key not in PROPERTIES:
+            parser.error("Unknown property %s" % key)
+
+    rows = run(args.input, args.output, args.format, args.chunksize,
+               args.celsius, properties, args.model)
+    print("%i rows processed" % rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,22 +21,9 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 ###############################################################################
 # Module for psychrometry calculation
 #
-#    Simple calculation procedures:
-#     - _Pbar: Calculate atmospheric pressure for a specified altitude
-#     - _height: Calculate altitude for a specified atmospheric pressure
-#     - _Tbar: Calculate standard Tdb for a specified altitude
-#     - _Psat: Calculate saturation pressure for a specified Tdb
-#     - _Tsat: CAlculate saturation pressure for a specified pressure
-#     - _W: Saturation humidty calculation procedure
-#     - _h: Specific enthalpy calculation procedure
-#     - _v: Specific volume calculation procedure
-#     - _W_twb: Humidity ratio calculation procedure
-#     - _Tdb: Dry bulb temperature calculation procedure
-#     - _Tdb_V: Tdb calculation procedure from specified volume
-#     - _W_V: Humidity ratio calculation procedure from  specified volume
-#     - _tdp: Dew point temperature calculation procedure
-#     - _twb: Wet bulb temperature calculation procedure
-
+#    The calculation procedures and the vectorized ideal gas model are defined
+#    in lib.psyArray, without graphical interface dependences
+#
 #    - PsyState: Psychrometric state general class with common functionality
 #    - PsyIdeal: Psychrometric state model using idial gas equation
 #    - PsyVirial: Unimplemented
@@ -51,8 +38,8 @@ import logging
 import os
 
 from PyQt5.QtWidgets import QApplication
-from scipy.optimize import fsolve
-from scipy import log, exp, arange, concatenate, linspace
+from numpy import (arange, asarray, concatenate, empty, errstate, linspace,
+                   ndindex, outer, where)
 
 try:
     from CoolProp.HumidAirProp import HAProps, HAProps_Aux
@@ -60,284 +47,12 @@ except:
     pass
 
 from lib.config import conf_dir
+from lib.psyArray import (VAR_NAME, _Pbar, _Psat, _W, _Tdb, _Tdb_V, _W_V,
+                          _tdp, arrayInputs, idealProperties, idealArray)
 from lib.unidades import (Temperature, Pressure, Dimensionless, SpecificVolume,
                           Density, Enthalpy)
 
 
-def _Pbar(Z):
-    """
-    ASHRAE Fundamentals Handbook pag 1.1 eq. 3
-    input:
-        Z: altitude, m
-    return
-        standard atmosphere barometric pressure, Pa
-    """
-    return 101325.*(1-2.25577e-5*Z)**5.256
-
-
-def _height(P):
-    """
-    Inverted _Pbar function
-    input:
-        standard atmosphere barometric pressure, Pa
-    return
-        Z: altitude, m
-    """
-    P_atm = P/101325.
-    return 1/2.25577e-5*(1-exp(log(P_atm)/5.2559))
-
-
-def _Tbar(self, Z):
-    """
-    ASHRAE Fundamentals Handbook pag 1.2 eq. 4
-    input:
-        Z: altitude, m
-    return
-        standard atmosphere dry bulb temperature, K
-    """
-    return 288.15-0.0065*Z
-
-
-def _Psat(Tdb):
-    """
-    ASHRAE Fundamentals Handbook pag 1.2 eq. 4
-    input:
-        Dry bulb temperature, K
-    return:
-        Saturation pressure, Pa
-    """
-    if 173.15 <= Tdb < 273.15:
-        C1 = -5674.5359
-        C2 = 6.3925247
-        C3 = -0.009677843
-        C4 = 0.00000062215701
-        C5 = 2.0747825E-09
-        C6 = -9.484024E-13
-        C7 = 4.1635019
-        pws = exp(C1/Tdb + C2 + C3*Tdb + C4*Tdb**2 + C5*Tdb**3 + C6*Tdb**4 +
-                  C7*log(Tdb))
-    elif 273.15 <= Tdb <= 473.15:
-        C8 = -5800.2206
-        C9 = 1.3914993
-        C10 = -0.048640239
-        C11 = 0.000041764768
-        C12 = -0.000000014452093
-        C13 = 6.5459673
-        pws = exp(C8/Tdb + C9 + C10*Tdb + C11*Tdb**2 + C12*Tdb**3 +
-                  C13*log(Tdb))
-    else:
-        raise NotImplementedError("Incoming out of bound")
-
-    return pws
-
-
-def _Tsat(Pv):
-    """
-    ASHRAE Fundamentals Handbook pag 1.2 eq. 4, inverted for calculate Tdb
-    input:
-        Saturation pressure, Pa
-    return:
-        Dry bulb temperature, K
-    """
-    Pv_min = _Psat(173.15)
-    Pv_lim = _Psat(273.15)
-    Pv_max = _Psat(473.15)
-    if Pv_min <= Pv < Pv_lim:
-        C1 = -5674.5359
-        C2 = 6.3925247
-        C3 = -0.009677843
-        C4 = 0.00000062215701
-        C5 = 2.0747825E-09
-        C6 = -9.484024E-13
-        C7 = 4.1635019
-
-        def f(T):
-            return Pv - exp(C1/T+C2+C3*T+C4*T**2+C5*T**3+C6*T**4+C7*log(T))
-        t = fsolve(f, 250)[0]
-
-    elif Pv_lim <= Pv <= Pv_max:
-        C8 = -5800.2206
-        C9 = 1.3914993
-        C10 = -0.048640239
-        C11 = 0.000041764768
-        C12 = -0.000000014452093
-        C13 = 6.5459673
-
-        def f(T):
-            return Pv - exp(C8/T+C9+C10*T+C11*T**2+C12*T**3+C13*log(T))
-        t = fsolve(f, 300)[0]
-
-    else:
-        raise NotImplementedError("Incoming out of bound")
-
-    return t
-
-
-def _W(P, Tdb):
-    """
-    ASHRAE Fundamentals Handbook pag 1.12 eq. 22
-    input:
-        Dry bulb temperature, K
-    return:
-        Saturation pressure, Pa
-    Saturation humidity calculation procedure"""
-    pv = _Psat(Tdb)
-    return 0.62198*pv/(P-pv)
-
-
-def _h(Tdb, W):
-    """
-    ASHRAE Fundamentals Handbook pag 1.13 eq. 32
-    input:
-        Dry bulb temperature, K
-        Humidity ratio, kg water/kg dry air
-    return:
-        Specific enthalpy, kJ/kg (dry air)
-    """
-    T_c = Tdb-273.15
-    return 1.006*T_c + W*(2501 + 1.805*T_c)
-
-
-def _v(P, Tdb, W):
-    """
-    ASHRAE Fundamentals Handbook pag 1.13 eq. 28
-    input:
-        Dry bulb temperature, K
-        Humidity ratio, kg water/kg dry air
-        Barometric pressure, Pa
-    return:
-        Specific volume, m3/kg (dry air)
-    """
-    P_kpa = P/1000
-    return 0.2871*Tdb*(1+1.6078*W)/P_kpa
-
-
-def _W_twb(tdb, twb, P):
-    """
-    ASHRAE Fundamentals Handbook pag 1.13 eq. 35-37
-    input:
-        dry bulb temperature, K
-        wet bulb temperature, K
-        barometric Pressure, Pa
-    return:
-        humidity ratio, kg H2O/kg air
-    """
-    tdb_C = tdb - 273.15
-    twb_C = twb - 273.15
-    Pvs = _Psat(twb)
-    Ws = 0.62198*Pvs/(P-Pvs)
-    if tdb >= 0:
-        w = ((2501-2.381*twb_C)*Ws-1.006*(tdb-twb)) / \
-            (2501+1.805*tdb_C-4.186*twb_C)
-    else:
-        w = ((2830-0.24*twb_C)*Ws-1.006*(tdb-twb))/(2830+1.86*tdb_C-2.1*twb_C)
-    return w
-
-
-def _Tdb(twb, w, P):
-    """
-    ASHRAE Fundamentals Handbook pag 1.13 eq. 35-37 inverted to calculate Tdb
-    input:
-        wet bulb temperature, K
-        humidity ratio, kg H2O/kg air
-        saturated humidity ratio, kg H2O/kg air
-    return:
-        dry bulb temperature, K
-    """
-    tw = twb-273.15
-    ws = _W(P, twb)
-    td = ((2501-2.381*tw)*ws+1.006*tw-w*(2501-4.186*tw))/(w*1.805+1.006)
-    return td+273.15
-
-
-def _Tdb_V(v, P):
-    """
-    Function to calculate isochor line
-    input:
-        specified volume, m3/kg air
-        barometric pressure, Pa
-    return
-        dry bulb temperature, K
-    """
-    P_kpa = P/1000
-
-    def f(Tdb):
-        w = _W(P, Tdb)
-        return v-0.2871*Tdb*(1+1.6078*w)/P_kpa
-    ts = fsolve(f, 300)
-    return ts
-
-
-def _W_V(Td, P, v):
-    """
-    Function to calculate isochor line
-    input:
-        dry bulb temperature, K
-        barometric pressure, Pa
-        specified volume, m3/kg air
-    return
-        humidity ratio, kg H2O/kg air
-    """
-    P_kpa = P/1000
-    return (v*P_kpa-0.2871*Td)/(0.2871*1.6078*Td)
-
-
-def _tdp(Pw):
-    """
-    ASHRAE Fundamentals Handbook pag 1.13 eq. 39-40
-    input:
-        water vapor partial pressure, Pa
-    return:
-        dew point temperature, K
-    """
-    C14 = 6.54
-    C15 = 14.526
-    C16 = 0.7389
-    C17 = 0.09486
-    C18 = 0.4569
-
-    a = log(Pw/1000.)
-    Tdp1 = C14 + C15*a + C16*a**2 + C17*a**3 + C18*(Pw/1000.)**0.1984
-    Tdp2 = 6.09 + 12.608*a + 0.4959*a**2
-    if 0 <= Tdp1 <= 93:
-        t = Tdp1
-    elif Tdp2 < 0:
-        t = Tdp2
-    else:
-        print(Pw, Tdp1, Tdp2)
-        raise NotImplementedError("Incoming out of bound")
-
-    return t+273.15
-
-
-def _twb(tdb, W, P):
-    """
-    ASHRAE Fundamentals Handbook pag 1.13 eq. 35-37
-    input:
-        dry bulb temperature, K
-        humidity ratio, kg H2O/kg air
-        saturated humidity ratio, kg H2O/kg air
-    return:
-        wet bulb temperature, K
-    """
-    tdb_C = tdb - 273.15
-
-    def f(twb):
-        Pvs = _Psat(twb)
-        Ws = 0.62198*Pvs/(P-Pvs)
-        twb_C = twb - 273.15
-        if tdb >= 0:
-            w = ((2501.-2.326*twb_C)*Ws-1.006*(tdb_C-twb_C)) / \
-                (2501.+1.86*tdb_C-4.186*twb_C)-W
-        else:
-            w = ((2830-0.24*twb_C)*Ws-1.006*(tdb-twb)) / \
-                (2830+1.86*tdb_C-2.1*twb_C)
-        return w
-
-    twb = fsolve(f, tdb)[0]
-    return twb
-
-
 class PsyState(object):
     """
     Class to model a psychrometric state with properties
@@ -384,14 +99,7 @@ class PsyState(object):
         QApplication.translate("pychemqt", "T dew point, Relative humidity"),
         QApplication.translate("pychemqt", "T wet bulb, Relative humidity")
         ]
-    VAR_NAME = [
-        ("tdb", "w"),
-        ("tdb", "HR"),
-        ("tdb", "twb"),
-        ("tdb", "tdp"),
-        ("tdp", "HR"),
-        ("twb", "HR")
-        ]
+    VAR_NAME = VAR_NAME
 
 #        QApplication.translate("pychemqt", "T dry bulb, Enthalpy"))
 #        QApplication.translate("pychemqt", "Tª bulbo seco, Densidad"))
@@ -477,6 +185,32 @@ class PsyState(object):
         self.Xa = 1/(1+self.w/0.62198)
         self.Xw = 1-self.Xa
 
+    # Check the input variables for array calculation
+    _arrayInputs = staticmethod(arrayInputs)
+
+    @classmethod
+    def calculateArray(cls, **kwargs):
+        """Calculate the psychrometric properties for array inputs, the
+        inputs are the same as the kwargs of instance with float or array
+        values, broadcasted between them
+        return:
+            dict with array of properties, with the names of attributes of
+            instance: tdp, tdb, twb, P, Pvs, Pv, ws, w, HR, mu, v, rho, h, Xa,
+            Xw, in SI units
+
+        This generic procedure calculate point by point, the subclass with
+        vectorized calculation must override it"""
+        mode, P, inputs = cls._arrayInputs(kwargs)
+        keys = ("tdp", "tdb", "twb", "P", "Pvs", "Pv", "ws", "w", "HR", "mu",
+                "v", "rho", "h", "Xa", "Xw")
+        prop = {key: empty(P.shape) for key in keys}
+        for index in ndindex(*P.shape):
+            kw = {key: value[index] for key, value in inputs.items()}
+            state = cls(P=P[index], **kw)
+            for key in keys:
+                prop[key][index] = state.__getattribute__(key)
+        return prop
+
     @classmethod
     def calculatePlot(cls):
         """Funtion to calculate point in chart, each child class must define
@@ -509,163 +243,77 @@ class PsyIdeal(PsyState):
         twb = self.kwargs.get("twb", 0)
         w = self.kwargs.get("w", None)
         HR = self.kwargs.get("HR", None)
-        h = self.kwargs.get("h", None)
-        v = self.kwargs.get("v", 0)
-
-        if self.mode == 0:
-            # Tdb and w
-            Pvs = _Psat(tdb)
-            ws = 0.62198*Pvs/(P-Pvs)
-            Pv = w*P/(0.62198+w)
-            HR = Pv/Pvs*100
-            v = _v(P, tdb, w)
-            h = _h(tdb, w)
-            tdp = _tdp(Pv)
-            twb = _twb(tdb, w, P)
-
-        elif self.mode == 1:
-            # Tdb and HR
-            Pvs = _Psat(tdb)
-            ws = 0.62198*Pvs/(P-Pvs)
-            Pv = Pvs*HR/100
-            w = 0.62198*Pv/(P-Pv)
-            v = _v(P, tdb, w)
-            h = _h(tdb, w)
-            tdp = _tdp(Pv)
-            twb = _twb(tdb, w, P)
-
-        elif self.mode == 2:
-            # Tdb and Twb
-            Pvs = _Psat(tdb)
-            ws = 0.62198*Pvs/(P-Pvs)
-            w = _W_twb(tdb, twb, P)
-            Pv = w*P/(0.62198+w)
-            HR = Pv/Pvs*100
-            v = _v(P, tdb, w)
-            h = _h(tdb, w)
-            tdp = _tdp(Pv)
-
-        elif self.mode == 3:
-            # Tdb and Tdp
-            Pv = _Psat(tdp)
-            w = 0.62198*Pv/(P-Pv)
-            Pvs = _Psat(tdb)
-            ws = 0.62198*Pvs/(P-Pvs)
-            HR = Pv/Pvs*100
-            v = _v(P, tdb, w)
-            h = _h(tdb, w)
-            twb = _twb(tdb, w, P)
-
-        elif self.mode == 4:
-            # Tdp and HR
-            Pv = _Psat(tdp)
-            if HR:
-                w = 0.62198*Pv/(P-Pv)
-                Pvs = Pv/HR*100
-            else:
-                w = 0
-                Pvs = Pv
-            ws = 0.62198*Pvs/(P-Pvs)
-            tdb = _Tsat(Pvs)
-            v = _v(P, tdb, w)
-            h = _h(tdb, w)
-            twb = _twb(tdb, w, P)
-
-        elif self.mode == 5:
-            # Tdp and Twb
-            # Pv = _Psat(tdp)
-            pass
-
-        elif self.mode == 6:
-            # Tdb and h
-            pass
-#            self.Tdb = tdb
-#            self.h = Enthalpy(h, "kJkg")
-#            f = lambda w: self.Entalpia(self.Tdb, w).kJkg-h
-#            self.w = fsolve(f, 0.001)
-#            self.Hs = self.Humedad_Absoluta(tdb)
-#            self.twb = self.Tw(tdb, self.w)
-#            self.HR = self.w/self.Hs*100
-#            self.Xa = 1/(1+self.w*self.aire.M/self.agua.M)
-#            self.Xw = 1-self.Xa
-#            self.V = self.Volumen(tdb, self.Xa)
-#            self.rho = Density(1/self.V)
+        return self._calculate(self.mode, P, tdb, twb, tdp, w, HR)
 
-        return tdp, tdb, twb, P, Pvs, Pv, ws, w, HR, v, h
+    # Psychrometric properties calculation for a input mode, it works with
+    # float and array inputs
+    _calculate = staticmethod(idealProperties)
+
+    @classmethod
+    def calculateArray(cls, **kwargs):
+        """Vectorized calculation of psychrometric properties, the inputs are
+        the same as the PsyState kwargs with float or array values"""
+        return idealArray(**kwargs)
 
     @classmethod
     def calculatePlot(cls, parent):
-        """Funtion to calculate point in chart"""
+        """Funtion to calculate point in chart, each isoline family is
+        calculated in a unique vectorized pass"""
         Preferences = ConfigParser()
         Preferences.read(conf_dir+"pychemqtrc")
         parent.setProgressValue(0)
 
         data = {}
         P = parent.inputs.P.value
-        t = cls.LineList("isotdb", Preferences)
+        t = asarray(cls.LineList("isotdb", Preferences), dtype=float)
 
         # Saturation line
-        Hs = []
-        Pvs = []
-        for ti in t:
-            Pv = _Psat(ti)
-            Pvs.append(Pv)
-            Hs.append(0.62198*Pv/(P-Pv))
-            parent.setProgressValue(5*len(Hs)/len(t))
+        Pvs = _Psat(t)
+        Hs = 0.62198*Pvs/(P-Pvs)
         data["t"] = t
-        data["Hs"] = Hs
+        data["Hs"] = list(Hs)
+        parent.setProgressValue(5)
 
         # left limit of isow lines
-        H = cls.LineList("isow", Preferences)
-        th = []
-        for w in H:
-            if w:
-                Pv = w*P/(0.62198+w)
-                th.append(Temperature(_tdp(Pv)).config())
-            else:
-                tmin = Preferences.getfloat("Psychr", "isotdbStart")
-                th.append(Temperature(tmin).config())
+        H = asarray(cls.LineList("isow", Preferences), dtype=float)
+        tmin = Preferences.getfloat("Psychr", "isotdbStart")
+        with errstate(divide="ignore", invalid="ignore"):
+            tdp = where(H > 0, _tdp(H*P/(0.62198+H)), tmin)
+        th = [Temperature(ti).config() for ti in tdp]
         data["H"] = H
         data["th"] = th
 
         # Humidity ratio lines
         hr = cls.LineList("isohr", Preferences)
+        pv = outer(asarray(hr, dtype=float)/100, Pvs)
+        W = 0.62198*pv/(P-pv)
         Hr = {}
-        cont = 0
-        for i in hr:
-            Hr[i] = []
-            for pvs in Pvs:
-                pv = pvs*i/100
-                Hr[i].append(0.62198*pv/(P-pv))
-                cont += 1
-                parent.setProgressValue(5+10*cont/len(hr)/len(Hs))
+        for i, W_hr in zip(hr, W):
+            Hr[i] = list(W_hr)
         data["Hr"] = Hr
+        parent.setProgressValue(15)
 
         # Twb
         lines = cls.LineList("isotwb", Preferences)
         Twb = {}
-        cont = 0
-        for T in lines:
+        for cont, T in enumerate(lines):
             H = concatenate((arange(_W(P, T), 0, -0.001), [0.]))
-            Tw = []
-            for h in H:
-                Tw.append(Temperature(_Tdb(T, h, P)).config())
-            cont += 1
-            parent.setProgressValue(15+75*cont/len(lines))
+            Tw = [Temperature(ti).config() for ti in _Tdb(T, H, P)]
             Twb[T] = (H, Tw)
+            parent.setProgressValue(15+75*(cont+1)/len(lines))
         data["Twb"] = Twb
 
         # v
         lines = cls.LineList("isochor", Preferences)
         V = {}
-        for cont, v in enumerate(lines):
-            ts = _Tdb_V(v, P)
-            T = linspace(ts, v*P/287.055, 50)
-            Td = [Temperature(ti).config() for ti in T]
-            _W_V
-            H = [_W_V(ti, P, v) for ti in T]
-            parent.setProgressValue(90+10*cont/len(lines))
-            V[v] = (Td, H)
+        if len(lines):
+            ts = _Tdb_V(asarray(lines, dtype=float), P)
+            for cont, (v, tsi) in enumerate(zip(lines, ts)):
+                T = linspace(tsi, v*P/287.055, 50)
+                Td = [Temperature(ti).config() for ti in T]
+                H = list(_W_V(T, P, v))
+                parent.setProgressValue(90+10*cont/len(lines))
+                V[v] = (Td, H)
         data["v"] = V
 
         return data
@@ -916,7 +564,7 @@ class PsyRefprop(PsyState):
 Preferences = ConfigParser()
 Preferences.read(conf_dir+"pychemqtrc")
 
-if Preferences.getboolean("Psychr", "virial"):
+if Preferences.getboolean("Psychr", "virial", fallback=False):
     if Preferences.getboolean("Psychr", "coolprop") and \
        os.environ["CoolProp"] == "True":
         PsychroState = PsyCoolprop
@@ -0,0 +1,490 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Pump and piping system operating point calculation
+#
+#   - PumpCurve: Pump characteristic curves fitted as polynomials
+#   - Series: Pumps working in series
+#   - Parallel: Pumps working in parallel
+#   - Valve: Control valve with inherent flow characteristic
+#   - SystemCurve: Resistance curve of a piping system
+#   - OperatingPoint: Result of the pump and system curves intersection
+#   - operatingPoint: Calculate the operating point
+#
+#   The curves are evaluated with arrays, the flow, the speed ratio and the
+#   valve opening are broadcasted together, so a study over a grid of speeds
+#   and valve positions is solved in a single call. The speed changes
+#   follow the affinity laws, Perry 10.25, Table 10.7:
+#       Q = s·Q0, h = s²·h0, η = η0, NPSHr = s²·NPSHr0
+###############################################################################
+
+
+from numpy import (asarray, broadcast_arrays, errstate, full, interp,
+                   linspace, log, maximum, nan, polyfit, polyval, roots,
+                   where, zeros_like)
+from scipy.constants import g, pi
+
+
+# Number of points used to tabulate the combined pump curves
+POINTS = 201
+
+# Iterations of bisection method in operating point calculation, enough to
+# reach double precision from any initial bracket
+ITERATIONS = 60
+
+
+def f_churchill(Re, eD):
+    """Darcy friction factor with Churchill (1977) correlation valid for all
+    flow regimes, array version of lib.friction.f_churchill"""
+    A = (2.457*log(1/(0.27*eD+(7./Re)**0.9)))**16
+    B = (37530./Re)**16
+    return 8.*((8./Re)**12+(A+B)**-1.5)**(1./12)
+
+
+class _Curve(object):
+    """Common speed scaling of pump curves, the child class must define
+    the curves at reference speed in _head, _eta and _npsh methods and the
+    flow with zero head in Qrunout"""
+    Qrunout = None
+
+    def head(self, Q, speed=1.):
+        """Head at flow and speed ratio, [m]"""
+        Q, speed = broadcast_arrays(asarray(Q, dtype=float),
+                                    asarray(speed, dtype=float))
+        return speed**2*self._head(Q/speed)
+
+    def efficiency(self, Q, speed=1.):
+        """Efficiency at flow and speed ratio, [-]"""
+        Q, speed = broadcast_arrays(asarray(Q, dtype=float),
+                                    asarray(speed, dtype=float))
+        return self._eta(Q/speed)
+
+    def NPSHr(self, Q, speed=1.):
+        """Net positive suction head required at flow and speed ratio, [m]"""
+        Q, speed = broadcast_arrays(asarray(Q, dtype=float),
+                                    asarray(speed, dtype=float))
+        return speed**2*self._npsh(Q/speed)
+
+    def power(self, Q, rho, speed=1.):
+        """Brake power at flow and speed ratio, [W]"""
+        with errstate(divide="ignore", invalid="ignore"):
+            return rho*g*Q*self.head(Q, speed)/self.efficiency(Q, speed)
+
+    def Qmax(self, speed=1.):
+        """Flow with zero head at speed ratio, [m³/s]"""
+        return self.Qrunout*asarray(speed, dtype=float)
+
+    def inverse(self, H):
+        """Flow at reference speed for the head, zero flow over shutoff head,
+        the curve is tabulated in the stable branch from the maximum head"""
+        if not hasattr(self, "_Qtab"):
+            Q = linspace(0, self.Qrunout, POINTS)
+            H0 = self._head(Q)
+            imax = H0.argmax()
+            self._Qtab = Q[imax:][::-1]
+            self._Htab = H0[imax:][::-1]
+        return interp(H, self._Htab, self._Qtab, left=self._Qtab[0],
+                      right=0)
+
+
+class PumpCurve(_Curve):
+    """Pump characteristic curves at the reference speed fitted as
+    polynomials
+
+    Parameters
+    ----------
+    Q : array
+        Volumetric flow, [m³/s]
+    h : array
+        Head, [m]
+    eta : array, optional
+        Efficiency, [-]
+    NPSH : array, optional
+        Net positive suction head required, [m]
+    N : float, optional
+        Reference speed, [rpm]
+    D : float, optional
+        Reference impeller diameter, [m]
+    deg : int
+        Degree of fitted polynomials
+
+    >>> pump = PumpCurve([0, 0.01, 0.02, 0.03], [50, 48, 42, 32], \
+                         [0, 0.6, 0.75, 0.7], N=2900)
+    >>> print("%0.2f %0.2f" % (pump.head(0.02), pump.head(0.02, 0.8)))
+    42.00 24.00
+    >>> print("%0.3f %0.2f" % (pump.efficiency(0.02), pump.Qmax()))
+    0.787 0.05
+    """
+
+    def __init__(self, Q, h, eta=None, NPSH=None, N=None, D=None, deg=2):
+        self.Q = asarray(Q, dtype=float)
+        self.h = asarray(h, dtype=float)
+        self.eta = eta
+        self.NPSH = NPSH
+        self.N = N
+        self.D = D
+        self.deg = deg
+
+        self._h = polyfit(self.Q, self.h, deg)
+        if eta is None:
+            self._e = None
+        else:
+            self._e = polyfit(self.Q, asarray(eta, dtype=float), deg)
+        if NPSH is None:
+            self._n = None
+        else:
+            self._n = polyfit(self.Q, asarray(NPSH, dtype=float), deg)
+
+        # Runout flow as the first positive root of head polynomial
+        Qr = [r.real for r in roots(self._h)
+              if abs(r.imag) < 1e-12 and r.real > 0]
+        if Qr:
+            self.Qrunout = min(Qr)
+        else:
+            self.Qrunout = 1.5*self.Q.max()
+
+    def _head(self, Q):
+        return polyval(self._h, Q)
+
+    def _eta(self, Q):
+        if self._e is None:
+            return full(Q.shape, nan)
+        return polyval(self._e, Q)
+
+    def _npsh(self, Q):
+        if self._n is None:
+            return full(Q.shape, nan)
+        return polyval(self._n, Q)
+
+    def affinity(self, N=None, D=None):
+        """Pump curve at other speed or impeller diameter with the affinity
+        laws
+
+        Parameters
+        ----------
+        N : float, optional
+            Speed, [rpm]
+        D : float, optional
+            Impeller diameter, [m]
+
+        Returns
+        -------
+        curve : PumpCurve
+            Curve at the new conditions
+        """
+        r = 1.
+        if N is not None:
+            r *= N/self.N
+        else:
+            N = self.N
+        if D is not None:
+            r *= D/self.D
+        else:
+            D = self.D
+
+        NPSH = self.NPSH
+        if NPSH is not None:
+            NPSH = asarray(NPSH)*r**2
+        return PumpCurve(self.Q*r, self.h*r**2, self.eta, NPSH, N, D,
+                         self.deg)
+
+    @classmethod
+    def fromCharacteristic(cls, curva, rho=1000.):
+        """Pump curve from the characteristic curve used in Pump equipment
+
+        Parameters
+        ----------
+        curva : list
+            [Diameter, rpm, [Q1,..Qn], [h1,...,hn], [Pot1,...,Potn],
+            [NPSH1,...NPSHn]], with flow in m³/s, head in m and power in W
+        rho : float
+            Liquid density to calculate the efficiency, [kg/m³]
+        """
+        D, N, Q, h, Pot, NPSH = curva
+        Q = asarray(Q, dtype=float)
+        h = asarray(h, dtype=float)
+        eta = None
+        if len(Pot):
+            eta = rho*g*Q*h/asarray(Pot, dtype=float)
+        if not len(NPSH) or not any(NPSH):
+            NPSH = None
+        return cls(Q, h, eta, NPSH, N, D)
+
+
+class Series(_Curve):
+    """Pumps working in series, the heads are added at the same flow
+
+    >>> pump = PumpCurve([0, 0.01, 0.02, 0.03], [50, 48, 42, 32], \
+                         [0, 0.6, 0.75, 0.7])
+    >>> print("%0.1f" % Series(pump, pump).head(0.02))
+    84.0
+    """
+
+    def __init__(self, *pumps):
+        self.pumps = pumps
+        self.Qrunout = min(p.Qrunout for p in pumps)
+
+    def _head(self, Q):
+        return sum(p._head(Q) for p in self.pumps)
+
+    def _eta(self, Q):
+        h = [p._head(Q) for p in self.pumps]
+        with errstate(divide="ignore", invalid="ignore"):
+            return sum(h)/sum(hi/p._eta(Q) for hi, p in zip(h, self.pumps))
+
+    def _npsh(self, Q):
+        # Only the first pump see the suction conditions
+        return self.pumps[0]._npsh(Q)
+
+
+class Parallel(_Curve):
+    """Pumps working in parallel, the flows are added at the same head, the
+    pumps with shutoff head lower than the working head give zero flow
+
+    >>> pump = PumpCurve([0, 0.01, 0.02, 0.03], [50, 48, 42, 32], \
+                         [0, 0.6, 0.75, 0.7])
+    >>> print("%0.2f" % Parallel(pump, pump).head(0.04))
+    42.00
+    """
+
+    def __init__(self, *pumps):
+        self.pumps = pumps
+        self.Qrunout = sum(p.Qrunout for p in pumps)
+
+        # Combined curve tabulated by head
+        Hmax = max(p._head(linspace(0, p.Qrunout, POINTS)).max()
+                   for p in pumps)
+        self._Htab = linspace(Hmax, 0, POINTS)
+        self._Qtab = sum(p.inverse(self._Htab) for p in pumps)
+
+    def _head(self, Q):
+        return interp(Q, self._Qtab, self._Htab, right=0)
+
+    def _flows(self, Q):
+        H = self._head(Q)
+        return [p.inverse(H) for p in self.pumps]
+
+    def _eta(self, Q):
+        q = self._flows(Q)
+        with errstate(divide="ignore", invalid="ignore"):
+            return Q/sum(where(qi > 0, qi/p._eta(qi), 0)
+                         for qi, p in zip(q, self.pumps))
+
+    def _npsh(self, Q):
+        # The pumps share the suction, so the most demanding one is used
+        q = self._flows(Q)
+        return maximum.reduce([where(qi > 0, p._npsh(qi), 0)
+                               for qi, p in zip(q, self.pumps)])
+
+
+class Valve(object):
+    """Control valve with inherent flow characteristic
+
+    Parameters
+    ----------
+    Kv : float
+        Flow coefficient with valve fully open, [m³/h·bar^-0.5]
+    characteristic : str
+        Inherent characteristic, linear, equal (percentage) or quick (opening)
+    R : float
+        Rangeability of equal percentage characteristic
+
+    The head loss is independent of the density with the flow coefficient
+    definition, Q = Kv·f(x)·(ΔP/SG)^0.5 with ΔP in bar
+
+    >>> valve = Valve(50, "equal")
+    >>> print("%0.3f %0.3f" % (valve.head(0.01), valve.head(0.01, 0.5)))
+    5.286 264.310
+    """
+
+    def __init__(self, Kv, characteristic="linear", R=50.):
+        self.Kv = Kv
+        self.characteristic = characteristic
+        self.R = R
+
+    def fraction(self, opening):
+        """Fraction of flow coefficient at the valve opening"""
+        opening = asarray(opening, dtype=float)
+        if self.characteristic == "linear":
+            return opening
+        elif self.characteristic == "equal":
+            return self.R**(opening-1)
+        elif self.characteristic == "quick":
+            return opening**0.5
+        raise ValueError("Unknown valve characteristic %s" %
+                         self.characteristic)
+
+    def head(self, Q, opening=1.):
+        """Head loss in valve, [m]"""
+        with errstate(divide="ignore"):
+            return 1e2/g*(3600*asarray(Q)/self.Kv/self.fraction(opening))**2
+
+
+class SystemCurve(object):
+    """Resistance curve of a piping system
+
+    Parameters
+    ----------
+    rho : float
+        Liquid density, [kg/m³]
+    mu : float
+        Liquid viscosity, [Pa·s]
+    H0 : float
+        Static head, elevation and pressure difference between the
+        system ends, [m]
+    valve : Valve, optional
+        Control valve in system
+
+    The pipes are added with addPipe or from Pipe equipments with fromPipes
+
+    >>> system = SystemCurve(998, 1e-3, 20)
+    >>> system.addPipe(100, 0.1, 4.6e-5, 5)
+    >>> print("%0.3f %0.3f" % (system.head(0), system.head(0.02)))
+    20.000 27.713
+    """
+
+    def __init__(self, rho, mu, H0=0, valve=None):
+        self.rho = rho
+        self.mu = mu
+        self.H0 = H0
+        self.valve = valve
+        self.pipes = []
+
+    def addPipe(self, L, Di, e=0, K=0):
+        """Add a pipe segment
+
+        Parameters
+        ----------
+        L : float
+            Length, [m]
+        Di : float
+            Internal diameter, [m]
+        e : float
+            Roughness, [m]
+        K : float
+            Total fittings coefficient, [-]
+        """
+        self.pipes.append((L, Di, e, K))
+
+    @classmethod
+    def fromPipes(cls, pipes, H0=0, valve=None):
+        """System curve from calculated Pipe equipments, the elevation
+        change of pipes is added to the static head"""
+        system = cls(pipes[0].rho, pipes[0].mu, H0, valve)
+        for pipe in pipes:
+            system.H0 += pipe.kwargs["h"]
+            system.addPipe(pipe.L, pipe.Di, pipe.rugosidad, pipe.K)
+        return system
+
+    def head(self, Q, opening=1.):
+        """Head required by system at flow and valve opening, [m]"""
+        Q = abs(asarray(Q, dtype=float))
+        H = self.H0
+        for L, Di, e, K in self.pipes:
+            V = Q/(pi/4*Di**2)
+            with errstate(divide="ignore", invalid="ignore"):
+                f = f_churchill(self.rho*V*Di/self.mu, e/Di)
+                H = H + where(V > 0, (f*L/Di+K)*V**2/2/g, 0)
+        if self.valve is not None:
+            H = H + self.valve.head(Q, opening)
+        return H
+
+
+class OperatingPoint(object):
+    """Result of operating point calculation, all attributes are arrays with
+    the broadcasted shape of input, nan when the pump can't overcome the
+    system static head
+
+    Attributes
+    ----------
+    Q : array
+        Volumetric flow, [m³/s]
+    H : array
+        Head, [m]
+    eta : array
+        Pump efficiency, [-]
+    power : array
+        Brake power, [W]
+    energy : array
+        Specific energy by pumped volume, [J/m³]
+    NPSHr : array
+        Net positive suction head required, [m]
+    """
+
+    def __init__(self, pump, system, Q, speed, opening):
+        self.speed = speed
+        self.opening = opening
+        self.Q = Q
+        self.H = pump.head(Q, speed)
+        self.eta = pump.efficiency(Q, speed)
+        self.power = pump.power(Q, system.rho, speed)
+        with errstate(divide="ignore", invalid="ignore"):
+            self.energy = self.power/Q
+        self.NPSHr = pump.NPSHr(Q, speed)
+
+
+def operatingPoint(pump, system, speed=1., opening=1.):
+    """Calculate the intersection of pump and system curves
+
+    Parameters
+    ----------
+    pump : PumpCurve, Series or Parallel
+        Pump curve
+    system : SystemCurve
+        System curve
+    speed : array
+        Speed ratio over pump reference speed, [-]
+    opening : array
+        Valve opening, [-]
+
+    Returns
+    -------
+    point : OperatingPoint
+        Results broadcasted with speed and opening
+
+    >>> pump = PumpCurve([0, 0.01, 0.02, 0.03], [50, 48, 42, 32], \
+                         [0, 0.6, 0.75, 0.7])
+    >>> system = SystemCurve(998, 1e-3, 20, Valve(100, "equal"))
+    >>> system.addPipe(100, 0.1, 4.6e-5, 5)
+    >>> op = operatingPoint(pump, system)
+    >>> print("%0.5f %0.2f %0.3f" % (op.Q, op.H, op.eta))
+    0.02395 38.53 0.787
+    >>> op = operatingPoint(pump, system, [[1], [0.8]], [1, 0.8, 0.6])
+    >>> print(op.Q.shape)
+    (2, 3)
+    """
+    speed, opening = broadcast_arrays(asarray(speed, dtype=float),
+                                      asarray(opening, dtype=float))
+
+    # Bisection in the flow range of pump curve
+    Qa = zeros_like(speed)
+    Qb = pump.Qmax(speed)
+    for i in range(ITERATIONS):
+        Q = (Qa+Qb)/2
+        f = pump.head(Q, speed)-system.head(Q, opening)
+        Qa = where(f > 0, Q, Qa)
+        Qb = where(f > 0, Qb, Q)
+    Q = (Qa+Qb)/2
+
+    # Without flow when the shutoff head is lower than system static head
+    shutoff = pump.head(zeros_like(speed), speed)
+    Q = where(shutoff > system.head(zeros_like(speed), opening), Q, nan)
+    return OperatingPoint(pump, system, Q, speed, opening)
@@ -25,15 +25,15 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 ###############################################################################
 
 
-from math import exp, log
-import sqlite3
+from math import log
 
-from numpy import polyval
+from numpy import asarray, exp, maximum, prod
+from scipy.constants import R
 from scipy.optimize import fsolve
 from PyQt5.QtWidgets import QApplication
 
 from lib import unidades
-from lib.sql import databank_name
+from lib.sql import getDatabank
 
 
 class Reaction(object):
@@ -53,7 +53,11 @@ class Reaction(object):
               "Hr": 0.0,
               "formula": False,
               "conversion": None,
-              "keq": None}
+              "keq": None,
+              "Ko": 0.0,
+              "Ei": 0.0,
+              "n": 0.0,
+              "orden": None}
     kwargsValue = ("Hr",)
     kwargsList = ("tipo", "fase", "key", "base")
     kwargsCheck = ("customHr", "formula")
@@ -84,7 +88,8 @@ class Reaction(object):
                 0   -   Mol
                 1   -   Mass
                 2   -   Partial pressure
-            Hr: Heat of reaction, calculate from heat of formation if no input
+            Hr: Heat of reaction per kmol of key component, calculate from
+                heat of formation if no input
             formula: boolean to show compound names in formules
             tipo: Kind of reaction
                 0   -   Stequiometric, without equilibrium or kinetic calculations
@@ -96,6 +101,16 @@ class Reaction(object):
             keq: equilibrium constant for reation with tipo=1
                 -it is float if it don't depend with temperature
                 -it is array if it depends with temperature
+            Ko: Preexponential factor of kinetic constant, reaction with
+                tipo=3, units kmol/m³s with concentrations in kmol/m³
+            Ei: Activation energy, J/kmol
+            n: Temperature exponent of kinetic constant
+            orden: array with reaction order of each component, default the
+                stequiometric coefficient of reactants
+
+        The kinetic rate is defined as the rate of disappearance of key
+        component divided by its stequiometric coefficient:
+            r = Ko·T^n·exp(-Ei/RT)·ΠCi^orden_i
         """
         self.kwargs = Reaction.kwargs.copy()
         if kwargs:
@@ -131,7 +146,9 @@ class Reaction(object):
         elif self.kwargs["tipo"] == 2:
             pass
         elif self.kwargs["tipo"] == 3:
-            pass
+            if not self.kwargs["Ko"]:
+                self.msg = QApplication.translate("pychemqt", "undefined kinetic constant")
+                self.status = 3
 
         return True
 
@@ -146,16 +163,23 @@ class Reaction(object):
         self.formulas = self.kwargs["formula"]
         self.keq = self.kwargs["keq"]
 
-        databank = sqlite3.connect(databank_name).cursor()
-        databank.execute("select nombre, peso_molecular, formula, \
-                         calor_formacion_gas from compuestos where id  IN \
-                         %s" % str(tuple(self.componentes)))
+        orden = self.kwargs["orden"]
+        if orden is None:
+            orden = [-c if c < 0 else 0 for c in self.coef]
+        self.orden = orden
+        self.Ko = self.kwargs["Ko"]
+        self.Ei = self.kwargs["Ei"]
+        self.n = self.kwargs["n"]
+
+        # Bulk query, the rows are returned in the components order
+        rows = getDatabank().getColumns(self.componentes, (
+            "nombre", "peso_molecular", "formula", "calor_formacion_gas"))
         nombre = []
         peso_molecular = []
         formula = []
         calor_reaccion = 0
         check_estequiometria = 0
-        for i, compuesto in enumerate(databank):
+        for i, compuesto in enumerate(rows):
             nombre.append(compuesto[0])
             peso_molecular.append(compuesto[1])
             formula.append(compuesto[2])
@@ -167,8 +191,10 @@ class Reaction(object):
         if self.calor:
             self.Hr = self.kwargs.get("Hr", 0)
         else:
+            # Heat of reaction referred to the key component, base is the
+            # kind of reaction basis, not a component index
             self.Hr = unidades.MolarEnthalpy(calor_reaccion/abs(
-                self.coef[self.base]), "Jkmol")
+                self.coef[self.kwargs["key"]]), "Jkmol")
         self.error = round(check_estequiometria, 1)
         self.state = self.error == 0
         self.text = self._txt(self.formulas)
@@ -222,10 +248,31 @@ class Reaction(object):
         return fraccion, h
 
 
-#    def cinetica(self, tipo, Ko, Ei):
-#        """Método que define la velocidad de reacción"""
-#
-#
+    def constante(self, T):
+        """Kinetic constant of reaction, modified Arrhenius equation
+        T: Temperature, K, it can be a array"""
+        T = asarray(T, dtype=float)
+        return self.Ko*T**self.n*exp(-self.Ei/R/1000/T)
+
+    def rate(self, T, C):
+        """Kinetic rate of reaction, kmol/m³s of key component per its
+        stequiometric coefficient
+        T: Temperature, K, it can be a array
+        C: Concentration of reaction components, kmol/m³, array with the
+            components in first dimension and the states in the others
+
+        >>> r = Reaction(comp=[1, 47, 62], coef=[-2, -1, 2], tipo=3, key=1,
+        ...              Ko=1e3, Ei=2e7)
+        >>> print("%0.4f" % r.rate(500, [0.1, 0.2, 0]))
+        0.0163
+        >>> print(r.rate([500, 600], [[0.1, 0.1], [0.2, 0.2], [0, 0]]).shape)
+        (2,)
+        """
+        C = maximum(asarray(C, dtype=float), 0)
+        orden = asarray(self.orden, dtype=float)
+        orden = orden.reshape(orden.shape+(1,)*(C.ndim-1))
+        return self.constante(T)*prod(C**orden, axis=0)
+
     def _txt(self, nombre=False):
         """Function to get text representation for reaction"""
         if nombre:
@@ -21,6 +21,10 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 ###############################################################################
 # Module with solid  definition
 #   -Solid: Solid entity
+#
+#   The particle size distribution is stored as a lib.psd.PSD instance, the
+#   list attributes diametros, fracciones and fracciones_acumuladas are
+#   derived from it for compatibility
 ###############################################################################
 
 
@@ -31,6 +35,7 @@ from PyQt5.QtWidgets import QApplication
 
 from lib.compuestos import Componente
 from lib.config import Entity, getMainWindowConfig
+from lib.psd import PSD
 from lib.unidades import Density, MassFlow, Length, Temperature
 
 
@@ -106,20 +111,22 @@ class Solid(Entity):
         self.diametros = diametros
         self.fracciones = fraccion
         if self.status == 2:
-            self.diametros = [Length(i, "m", magnitud="ParticleDiameter")
-                              for i in diametros]
-            self.fracciones = fraccion
-            diametro_medio = 0
-            self.fracciones_acumuladas = [0]
-            for di, xi in zip(diametros, fraccion):
-                diametro_medio += di*xi
-                self.fracciones_acumuladas.append(
-                    xi+self.fracciones_acumuladas[-1])
-            del self.fracciones_acumuladas[0]
+            self._setPSD(PSD(diametros, fraccion))
+            diametro_medio = self.psd.mean()
+        else:
+            self.psd = PSD([diametro_medio], [1])
         self.diametro_medio = Length(diametro_medio,
                                      magnitud="ParticleDiameter")
         self.RhoS(self.kwargs.get("T", 300))
 
+    def _setPSD(self, psd):
+        """Define the list attributes of distribution from a PSD instance"""
+        self.psd = psd
+        self.diametros = [Length(d, "m", magnitud="ParticleDiameter")
+                          for d in psd.d]
+        self.fracciones = psd.x.tolist()
+        self.fracciones_acumuladas = psd.F.tolist()
+
     def RhoS(self, T):
         densidad = 0
         for i in range(len(self.ids)):
@@ -199,31 +206,67 @@ class Solid(Entity):
 
     def Separar(self, etas):
         """Split solid with efficiency array input
-        return two array with solids filtered and no filtered"""
-        rendimiento_global = 0
-        for i, fraccion in enumerate(self.fracciones):
-            rendimiento_global += etas[i]*fraccion
-
-        G_skip = MassFlow(self.caudal*(1-rendimiento_global))
-        G_sep = MassFlow(self.caudal*rendimiento_global)
-        if rendimiento_global == 1:
+        return two solids, the no filtered and the filtered"""
+        rendimiento_global, f_gas, f_solid = self.psd.partition(etas)
+        if rendimiento_global >= 1:
             return None, self
-        elif rendimiento_global == 0:
+        elif rendimiento_global <= 0:
             return self, None
         else:
-            f_gas = []
-            f_solid = []
-            for i in range(len(self.diametros)):
-                f_gas.append(self.caudal*self.fracciones[i]*(1-etas[i])/G_skip)
-                f_solid.append(self.caudal*self.fracciones[i]*etas[i]/G_sep)
-            S_skip = Solid(caudalSolido=[G_skip],
-                           distribucion_diametro=self.diametros,
-                           distribucion_fraccion=f_gas)
-            S_sep = Solid(caudalSolido=[G_sep],
-                          distribucion_diametro=self.diametros,
-                          distribucion_fraccion=f_solid)
+            S_skip = self.clone(1-rendimiento_global, f_gas)
+            S_sep = self.clone(rendimiento_global, f_solid)
             return S_skip, S_sep
 
+    def clone(self, fraccion=1, fracciones=None, diametros=None):
+        """Create a new solid with the same components
+        fraccion: Fraction of solid flow
+        fracciones: Mass fraction of classes, default the same
+        diametros: Class diameters, default the same"""
+        if fracciones is None:
+            fracciones = self.psd.x
+        if diametros is None:
+            diametros = self.psd.d
+        kwargs = {"caudalSolido": [q*fraccion for q in self.caudalUnitario],
+                  "solids": self.ids}
+        if self.status == 2:
+            kwargs["distribucion_diametro"] = list(diametros)
+            kwargs["distribucion_fraccion"] = list(fracciones)
+        else:
+            kwargs["diametroMedio"] = diametros[0]
+        return Solid(**kwargs)
+
+    @classmethod
+    def mezclar(cls, solidos):
+        """Mix several solids, the components flows are added and the
+        particle distributions joined weighted with the solid flow, the
+        solids defined only with the mean diameter are joined as a class
+
+        >>> s1 = Solid(caudalSolido=[1], distribucion_diametro=[1e-5, 2e-5], \
+                       distribucion_fraccion=[0.5, 0.5], solids=[638])
+        >>> s2 = Solid(caudalSolido=[3], diametroMedio=4e-5, solids=[638])
+        >>> s = Solid.mezclar([s1, s2])
+        >>> print("%0.2f %0.1f" % (s.caudal, s.diametro_medio.micra))
+        4.00 33.8
+        """
+        solidos = [s for s in solidos if s and s.status]
+        if not solidos:
+            return None
+
+        ids = []
+        for solido in solidos:
+            for i in solido.ids:
+                if i not in ids:
+                    ids.append(i)
+        caudal = [0]*len(ids)
+        for solido in solidos:
+            for i, q in zip(solido.ids, solido.caudalUnitario):
+                caudal[ids.index(i)] += q
+
+        psd = PSD.mix([s.psd for s in solidos], [s.caudal for s in solidos])
+        return cls(caudalSolido=caudal, solids=ids,
+                   distribucion_diametro=psd.d.tolist(),
+                   distribucion_fraccion=psd.x.tolist())
+
     def writeStatetoJSON(self, solid):
         if self.status:
             solid["status"] = self.status
@@ -249,6 +292,10 @@ class Solid(Entity):
             self.fracciones = solid["fracciones"]
             self.fracciones_acumuladas = solid["fracciones_acumuladas"]
             self.diametro_medio = Length(solid["diametro_medio"])
+            if self.diametros:
+                self.psd = PSD(solid["diametros"], self.fracciones)
+            else:
+                self.psd = PSD([self.diametro_medio], [1])
             self.rho = Density(solid["rho"])
             self.T = Temperature(solid["T"])
         else:
@@ -20,32 +20,398 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 
 ###############################################################################
 # Module for properties database function
+#   -Databank: Read access to the component databank
+#   -getDatabank: Shared databank of program
+#   -getElement: Get element from database
+#   -getElements: Get several elements from database in a single query
+#   -SearchIndex: Full text and property range search of components
+#   -getSearchIndex: Shared search index of program
 #   -transformElement
 #   -inserElementsFromArray: Insert element to a database
 #   -updateElement: Update element with indice in database
 #   -deleteElement: Delete Element with indice from custom Database
-#   -getElement: Get element from database
 #   -copyElement: Create a copy of element of indice in custom Database
+#
+#   The bundled databank, dat/databank.db, is open in read only mode, with a
+#   connection for each thread. The custom databank of user, with the
+#   components with index over 1000, is overlaid to it.
+#   All queries are parametrized, sqlite keep the compiled statements in the
+#   cache of each connection so the repeated queries aren't compiled again.
 ###############################################################################
 
 
 import os
 import sqlite3
+import threading
+from urllib.request import pathname2url
 
+from lib.firstrun import (INDEX_DIPPR, INDEX_PROPERTIES, checkIndex,
+                          createIndex, updateIndex)
 
-databank_name = os.path.join(os.environ["pychemqt"], 'dat', 'databank.db')
-databank = sqlite3.connect(databank_name).cursor()
-databank.execute("SELECT COUNT(*) AS Total FROM compuestos")
-N_comp = databank.fetchone()[0]
 
+databank_name = os.path.join(os.environ["pychemqt"], 'dat', 'databank.db')
 conf_dir = os.path.join(os.path.expanduser('~'), ".pychemqt")
 databank_Custom_name = conf_dir + os.sep + 'databank.db'
-if os.path.isfile(databank_Custom_name):
-    databank_Custom = sqlite3.connect(databank_Custom_name).cursor()
-    databank_Custom.execute("SELECT COUNT(*) AS Total FROM compuestos")
-    N_comp_Custom = databank_Custom.fetchone()[0]
-else:
-    N_comp_Custom = 0
+index_name = conf_dir + os.sep + 'databank_index.db'
+
+# First index of components in custom databank
+CUSTOM = 1000
+
+# Prepared statements cached by connection
+CACHED_STATEMENTS = 256
+
+# Properties of search index available for range queries
+INDEX_RANGES = [prop[0] for prop in INDEX_PROPERTIES]
+
+
+def _dump(conn):
+    """Serialize the content of a database connection"""
+    if hasattr(conn, "serialize"):
+        return conn.serialize()
+    return "\n".join(conn.iterdump())
+
+
+def _load(data):
+    """Create a in-memory database connection from serialized content"""
+    conn = sqlite3.connect(":memory:", check_same_thread=False,
+                           cached_statements=CACHED_STATEMENTS)
+    if isinstance(data, bytes):
+        conn.deserialize(data)
+    else:
+        conn.executescript(data)
+    return conn
+
+
+class Databank(object):
+    """Read access to the component databank, with the custom databank
+    overlaid for the index over 1000
+
+    Parameters
+    ----------
+    name : str
+        Path of bundled databank, open in read only mode
+    custom : str
+        Path of custom databank, optional
+
+    The connections of file databanks are created by thread in first use.
+    A snapshot() of databank is a copy in memory, independent of files, it
+    can be pickled to send it to worker processes.
+
+    >>> db = Databank()
+    >>> [row[0] for row in db.getColumns([62, 2, 62], ["nombre"])]
+    ['Water', 'Methane', 'Water']
+    >>> db.getColumns([62], ["peso_molecular", "formula"])
+    [(18.015, 'H2O')]
+    >>> db.getElement(5000) is None
+    True
+    >>> snap = db.snapshot()
+    >>> snap.count() == db.count()
+    True
+    """
+
+    def __init__(self, name=databank_name, custom=databank_Custom_name):
+        self.name = name
+        self.custom = custom
+        self._local = threading.local()
+        self._memory = None
+        self._columns = None
+
+    # Connections
+    def _connect(self, name, readonly):
+        if readonly:
+            uri = "file:%s?mode=ro" % pathname2url(os.path.abspath(name))
+        else:
+            uri = "file:%s" % pathname2url(os.path.abspath(name))
+        return sqlite3.connect(uri, uri=True,
+                               cached_statements=CACHED_STATEMENTS)
+
+    def _connections(self):
+        """Connections to bundled and custom databank of current thread"""
+        if self._memory is not None:
+            return self._memory
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = (self._connect(self.name, True), None)
+
+        # The custom databank is created in the first run of program
+        if conns[1] is None and self.custom and os.path.isfile(self.custom):
+            conns = (conns[0], self._connect(self.custom, False))
+        self._local.conns = conns
+        return conns
+
+    def close(self):
+        """Close the connections of current thread"""
+        conns = getattr(self._local, "conns", None)
+        if conns is not None:
+            for conn in conns:
+                if conn is not None:
+                    conn.close()
+            self._local.conns = None
+
+    def snapshot(self):
+        """Copy in memory of databank"""
+        db = Databank(None, None)
+        memory = []
+        for conn in self._connections():
+            if conn is None:
+                memory.append(None)
+            else:
+                copy = sqlite3.connect(":memory:", check_same_thread=False,
+                                       cached_statements=CACHED_STATEMENTS)
+                conn.backup(copy)
+                memory.append(copy)
+        db._memory = tuple(memory)
+        return db
+
+    def __getstate__(self):
+        state = {"name": self.name, "custom": self.custom, "memory": None}
+        if self._memory is not None:
+            state["memory"] = [conn and _dump(conn) for conn in self._memory]
+        return state
+
+    def __setstate__(self, state):
+        self.__init__(state["name"], state["custom"])
+        if state["memory"] is not None:
+            self._memory = tuple(data and _load(data)
+                                 for data in state["memory"])
+
+    # Queries
+    def execute(self, query, params=(), custom=False):
+        """Execute a parametrized query in the bundled or custom databank,
+        return a list with the rows"""
+        conn = self._connections()[custom]
+        if conn is None:
+            return []
+        return conn.execute(query, params).fetchall()
+
+    @property
+    def columns(self):
+        """Name of columns of compuestos table"""
+        if self._columns is None:
+            rows = self.execute("PRAGMA table_info(compuestos)")
+            self._columns = [row[1] for row in rows]
+        return self._columns
+
+    def _select(self, columns):
+        if columns is None:
+            return "*"
+        for column in columns:
+            if column not in self.columns:
+                raise ValueError("Unknown databank column %s" % column)
+        return ", ".join(["id"]+list(columns))
+
+    def _fetch(self, ids, columns=None):
+        """Rows of ids by index, with bulk queries to each databank"""
+        select = self._select(columns)
+        rows = {}
+        for custom in (False, True):
+            indices = sorted({int(i) for i in ids if (i > CUSTOM) == custom})
+            if not indices:
+                continue
+            query = "SELECT %s FROM compuestos WHERE id IN (%s)" % (
+                select, ", ".join("?"*len(indices)))
+            for row in self.execute(query, indices, custom):
+                rows[row[0]] = row if columns is None else row[1:]
+        return rows
+
+    def getElement(self, indice):
+        """Get element from databank, None if it doesn't exist"""
+        query = "SELECT * FROM compuestos WHERE id == ?"
+        rows = self.execute(query, (int(indice), ), indice > CUSTOM)
+        if rows:
+            return rows[0]
+
+    def getElements(self, ids):
+        """Get several elements from databank in a single query for each
+        databank, the rows are returned in the order of ids"""
+        rows = self._fetch(ids)
+        return [rows.get(int(i)) for i in ids]
+
+    def getColumns(self, ids, columns):
+        """Get the values of columns for several elements, the rows are
+        returned in the order of ids"""
+        rows = self._fetch(ids, columns)
+        return [rows.get(int(i)) for i in ids]
+
+    def components(self, columns=None, custom=True):
+        """Iterate over all the components, the bundled databank first and
+        the custom after, the rows have the id and the columns values"""
+        select = self._select(columns)
+        query = "SELECT %s FROM compuestos ORDER BY id" % select
+        for db in (False, True) if custom else (False, ):
+            for row in self.execute(query, (), db):
+                yield row
+
+    def search(self, text):
+        """Index of components with text in name or formula"""
+        query = "SELECT id FROM compuestos WHERE nombre LIKE ? OR " \
+            "formula LIKE ? ORDER BY id"
+        pattern = "%"+text+"%"
+        ids = []
+        for db in (False, True):
+            ids += [row[0] for row in self.execute(query, (pattern, )*2, db)]
+        return ids
+
+    def count(self, custom=False):
+        """Number of components of bundled or custom databank"""
+        rows = self.execute("SELECT COUNT(*) FROM compuestos", (), custom)
+        if rows:
+            return rows[0][0]
+        return 0
+
+
+_databank = None
+
+
+def getDatabank():
+    """Shared databank of program"""
+    global _databank
+    if _databank is None:
+        _databank = Databank()
+    return _databank
+
+
+def getElement(indice):
+    """Get element from database
+    indice: index in databank of element"""
+    return getDatabank().getElement(indice)
+
+
+def getElements(ids):
+    """Get several elements from database in a single query
+    ids: index in databank of elements"""
+    return getDatabank().getElements(ids)
+
+
+class SearchIndex(object):
+    """Indexed search of components in bundled and custom databank
+
+    The index is a separate database in the configuration folder, created by
+    lib.firstrun.createIndex, with a full text index of name, formula,
+    synonyms and CAS number, and the properties Tc, Pc, Tb, Tf and M in SI
+    units with B-tree indexes for range queries. It includes flags for the
+    DIPPR correlations available for each component.
+
+    >>> index = getSearchIndex()
+    >>> 62 in index.search("water")
+    True
+    >>> index.search("7732-18")
+    [62]
+    >>> ids = index.query(Tb=(300, 400), dippr=["CpG"])
+    >>> 140 in ids, 2 in ids
+    (True, False)
+    >>> index.query("butane", Tc=(None, 420))
+    [5]
+    """
+
+    def __init__(self, name=index_name):
+        self.name = name
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(
+                self.name, cached_statements=CACHED_STATEMENTS)
+        return conn
+
+    def close(self):
+        """Close the connection of current thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @staticmethod
+    def _match(text):
+        """Full text query with every word of text as prefix"""
+        words = text.split()
+        return " ".join('"%s"*' % word.replace('"', '""') for word in words)
+
+    def search(self, text, limit=None):
+        """Index of components with text in name, formula, synonyms or CAS
+        number, sorted by relevance. Every word of text is searched as
+        prefix of a word of component"""
+        match = self._match(text)
+        if not match:
+            return []
+        query = "SELECT rowid FROM text WHERE text MATCH ? ORDER BY rank"
+        params = (match, )
+        if limit:
+            query += " LIMIT ?"
+            params += (limit, )
+        return [row[0] for row in self._connection().execute(query, params)]
+
+    def query(self, text=None, dippr=(), custom=True, **ranges):
+        """Index of components meeting all the conditions, in index order
+
+        Parameters
+        ----------
+        text : str
+            Text to search in name, formula, synonyms or CAS number
+        dippr : list
+            DIPPR correlations the components must have, any of rhoS, rhoL,
+            Pv, Hv, CpS, CpL, CpG, muL, muG, ThcondL, ThcondG, tension
+        custom : bool
+            Include the components of custom databank
+        ranges : tuple
+            Range of properties as keyword arguments with a tuple (min, max)
+            in SI units, a None limit is open, available properties are
+            Tc, Pc, Tb, Tf and M, i.e. Tb=(300, 400)
+        """
+        conditions = []
+        params = []
+        for prop, (lo, hi) in ranges.items():
+            if prop not in INDEX_RANGES:
+                raise ValueError("Unknown indexed property %s" % prop)
+            if lo is not None:
+                conditions.append("%s >= ?" % prop)
+                params.append(lo)
+            if hi is not None:
+                conditions.append("%s <= ?" % prop)
+                params.append(hi)
+        for eq in dippr:
+            if eq not in INDEX_DIPPR:
+                raise ValueError("Unknown DIPPR correlation %s" % eq)
+            conditions.append("%s == 1" % eq)
+        if not custom:
+            conditions.append("custom == 0")
+        if text:
+            match = self._match(text)
+            if match:
+                conditions.append(
+                    "id IN (SELECT rowid FROM text WHERE text MATCH ?)")
+                params.append(match)
+
+        query = "SELECT id FROM properties"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id"
+        return [row[0] for row in self._connection().execute(query, params)]
+
+
+_index = None
+
+
+def getSearchIndex():
+    """Shared search index of program, created or rebuilt if it doesn't
+    exist or the bundled databank has changed"""
+    global _index
+    if _index is None:
+        if not checkIndex(index_name, databank_name):
+            createIndex(index_name, databank_name, databank_Custom_name)
+        _index = SearchIndex()
+    return _index
+
+
+def _updateIndex(ids):
+    """Keep the search index in sync with the changes in custom databank"""
+    if ids:
+        updateIndex(index_name, databank_Custom_name, ids)
+
+
+N_comp = getDatabank().count()
+N_comp_Custom = getDatabank().count(custom=True)
 
 
 def transformElement(elemento):
@@ -176,13 +542,15 @@ def inserElementsFromArray(name, lista):
     numero = curs.fetchone()[0]
     if name == databank_Custom_name:
         numero += 1000
-    query = "INSERT INTO compuestos VALUES "
     for indice, elemento in enumerate(lista):
         vals = transformElement(elemento)
         vals.insert(0, numero+indice+1)
-        curs.execute(query+str(tuple(vals)))
+        query = "INSERT INTO compuestos VALUES (%s)" % ", ".join("?"*len(vals))
+        curs.execute(query, vals)
     conn.commit()
     conn.close()
+    if name == databank_Custom_name:
+        _updateIndex(range(numero+1, numero+len(lista)+1))
 
 
 def updateElement(elemento, indice):
@@ -233,41 +601,22 @@ def updateElement(elemento, indice):
     conn = sqlite3.connect(databank_Custom_name)
     curs = conn.cursor()
     for variable, valor in zip(variables, vals):
-        if isinstance(valor, int):
-            curs.execute('UPDATE compuestos SET %s=%i WHERE id==%i'
-                         % (variable, valor, indice))
-        elif isinstance(valor, float):
-            curs.execute('UPDATE compuestos SET %s=%f WHERE id==%i'
-                         % (variable, valor, indice))
-        elif isinstance(valor, str):
-            valor = '"'+valor+'"'
-            curs.execute('UPDATE compuestos SET %s=%s WHERE id==%i'
-                         % (variable, valor, indice))
+        if isinstance(valor, (int, float, str)):
+            curs.execute("UPDATE compuestos SET %s=? WHERE id==?" % variable,
+                         (valor, indice))
     conn.commit()
     conn.close()
+    _updateIndex([indice])
 
 
 def deleteElement(indice):
     """Delete Element with indice from custom Database"""
     conn = sqlite3.connect(databank_Custom_name)
     curs = conn.cursor()
-    curs.execute("DELETE FROM compuestos WHERE id=%i" % indice)
+    curs.execute("DELETE FROM compuestos WHERE id==?", (indice, ))
     conn.commit()
     conn.close()
-
-
-def getElement(indice):
-    """Get element from database
-    indice: index in databank of element"""
-    if indice > 1000:
-        db_Custom = sqlite3.connect(databank_Custom_name).cursor()
-        db_Custom.execute("select * from compuestos where id==%i" % indice)
-        componente = db_Custom.fetchone()
-    else:
-        db = sqlite3.connect(databank_name).cursor()
-        db.execute("select * from compuestos where id==%i" % indice)
-        componente = db.fetchone()
-    return componente
+    _updateIndex([indice])
 
 
 def copyElement(indice):
@@ -276,7 +625,10 @@ def copyElement(indice):
     vals = elemento[1:]
     conn = sqlite3.connect(databank_Custom_name)
     curs = conn.cursor()
-    curs.execute("INSERT INTO compuestos VALUES" +
-                 str((1001+N_comp_Custom, ) + vals))
+    numero = getDatabank().count(custom=True)
+    vals = (CUSTOM+1+numero, ) + vals
+    query = "INSERT INTO compuestos VALUES (%s)" % ", ".join("?"*len(vals))
+    curs.execute(query, vals)
     conn.commit()
     conn.close()
+    _updateIndex([vals[0]])
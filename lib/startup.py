@@ -0,0 +1,182 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Startup instrumentation of pychemqt, used with --profile-startup option
+#
+#   - StartupProfiler: Record the import time of modules and the duration of
+#       initialization stages
+#   - parseTotal: Read the total startup time from a report
+#
+#   This module can't import any other pychemqt or external library, it must
+#   be loaded before any other to measure the full startup.
+###############################################################################
+
+
+import re
+import sys
+import time
+
+
+class _TimedLoader(object):
+    """Loader wrapper to measure the execution time of a module"""
+
+    def __init__(self, loader, name, profiler):
+        self._loader = loader
+        self._name = name
+        self._profiler = profiler
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter(self._name)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._exit(self._name)
+
+
+class StartupProfiler(object):
+    """Record the import time of each module and the duration of the
+    initialization stages of program
+
+    The imports are measured with a finder inserted in sys.meta_path which
+    wraps the loader of each module. For each module is saved the self time
+    and the cumulative time including the imports made from it, as the
+    python -X importtime option.
+
+    >>> profiler = StartupProfiler()
+    >>> profiler.install()
+    >>> profiler.stage("Import")
+    >>> import lib.psd
+    >>> profiler.finish()
+    >>> "lib.psd" in profiler.modules
+    True
+    >>> profiler.stages[0][0]
+    'Import'
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.end = None
+        self.modules = {}
+        self.stages = []
+        self._stage = None
+        self._stack = []
+        self._installed = False
+
+    # Import hook
+    def install(self):
+        """Insert the profiler as first finder of sys.meta_path"""
+        if not self._installed:
+            sys.meta_path.insert(0, self)
+            self._installed = True
+
+    def uninstall(self):
+        """Remove the profiler of import system"""
+        if self._installed:
+            sys.meta_path.remove(self)
+            self._installed = False
+
+    def find_spec(self, fullname, path=None, target=None):
+        """Finder protocol, search the spec with the remaining finders and
+        replace its loader with a timed wrapper"""
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, fullname, self)
+        return spec
+
+    def _enter(self, name):
+        self._stack.append([name, time.perf_counter(), 0])
+
+    def _exit(self, name):
+        name, t0, children = self._stack.pop()
+        cumulative = time.perf_counter()-t0
+        self.modules[name] = (cumulative-children, cumulative)
+        if self._stack:
+            self._stack[-1][2] += cumulative
+
+    # Initialization stages
+    def stage(self, name):
+        """Start a new initialization stage, closing the previous one"""
+        now = time.perf_counter()
+        self._closeStage(now)
+        self._stage = (name, now)
+
+    def _closeStage(self, now):
+        if self._stage is not None:
+            name, t0 = self._stage
+            self.stages.append((name, now-t0))
+            self._stage = None
+
+    def finish(self):
+        """End the profiling, close the current stage and remove the hook"""
+        self.end = time.perf_counter()
+        self._closeStage(self.end)
+        self.uninstall()
+
+    @property
+    def total(self):
+        """Total elapsed time since profiler creation, [s]"""
+        end = self.end if self.end is not None else time.perf_counter()
+        return end-self.start
+
+    def report(self, limit=30):
+        """Text report of startup with the stages and the slowest modules
+
+        Parameters
+        ----------
+        limit : int
+            Number of modules to show, sorted by self time
+        """
+        lines = ["Startup time: %0.3f s" % self.total, "",
+                 "%10s  %s" % ("Time [s]", "Stage")]
+        for name, t in self.stages:
+            lines.append("%10.3f  %s" % (t, name))
+
+        lines += ["", "%10s %10s  %s" % ("Self [s]", "Cumul [s]", "Module")]
+        modules = sorted(self.modules.items(), key=lambda x: -x[1][0])
+        for name, (own, cumulative) in modules[:limit]:
+            lines.append("%10.4f %10.4f  %s" % (own, cumulative, name))
+        lines.append("%i modules imported" % len(self.modules))
+        return "\n".join(lines)
+
+
+def parseTotal(txt):
+    """Read the total startup time from a report, [s]
+
+    >>> parseTotal("Startup time: 1.250 s")
+    1.25
+    """
+    match = re.search(r"Startup time: ([0-9.]+) s", txt)
+    if match:
+        return float(match.group(1))
@@ -0,0 +1,432 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Streaming export of stream results
+#
+#   - columns: Output columns of the selected stream properties
+#   - streamValues: Values of the output columns for a stream
+#   - JSONLWriter: Incremental JSON Lines output
+#   - CSVWriter: Incremental csv output
+#   - ColumnarWriter: Incremental columnar binary output
+#   - readColumnar: Load a columnar output as memory mapped arrays
+#   - projectRecords: Iterate over the streams of a project
+#   - export: Write stream results to file
+#   - exportProject: Write the results of all streams of a project
+#
+#   The streams are written one by one as they are read from the iterable, so
+#   the memory use doesn't depend of the number of states, a generator of
+#   a case study can be dumped without keep the streams in memory.
+#   The properties are the keys of Corriente.propertiesNames(), in SI units.
+#   The composition properties are saved with a column by component, named
+#   property.id, with the database index of component.
+###############################################################################
+
+
+from itertools import chain
+import csv
+import json
+import os
+
+from numpy import array, empty, float64, memmap, nan
+
+from lib.corriente import Corriente
+
+
+# Default properties to save
+PROPERTIES = ("T", "P", "x", "caudalmolar", "caudalmasico", "Q", "h", "M",
+              "fraccion")
+
+# Properties with a value for each component
+VECTOR = ("fraccion", "fraccion_masica", "caudalunitariomolar",
+          "caudalunitariomasico")
+
+# Rows saved in each write of the columnar format
+CHUNKSIZE = 4096
+
+FORMATS = ("jsonl", "csv", "columnar")
+
+# Maximum number of streams held in memory searching the components of
+# composition columns
+LOOKAHEAD = 100
+
+
+def _units():
+    """Dict with the unit class of stream properties"""
+    return {key: unit for name, key, unit in Corriente.propertiesNames()}
+
+
+def _unitText(unit):
+    """SI unit text of a unidades class"""
+    if unit is str:
+        return ""
+    txt = getattr(unit, "__text__", None)
+    if txt:
+        return txt[0]
+    return "-"
+
+
+def columns(properties=PROPERTIES, ids=()):
+    """Output columns for the selected properties
+
+    Parameters
+    ----------
+    properties : list
+        Keys of properties to save, from Corriente.propertiesNames()
+    ids : list
+        Database index of components, for the composition properties
+
+    Returns
+    -------
+    columns : list
+        List of tuples with the column name, the property key and the
+        component index, None for the properties of whole stream
+    units : list
+        SI unit text of columns, empty string for text properties
+
+    >>> cols, units = columns(["T", "fraccion"], [62, 2])
+    >>> [col[0] for col in cols]
+    ['T', 'fraccion.62', 'fraccion.2']
+    >>> units
+    ['K', '-', '-']
+    """
+    available = _units()
+    cols = []
+    units = []
+    for key in properties:
+        if key not in available:
+            raise ValueError("Unknown stream property %s" % key)
+        if key in VECTOR:
+            for id in ids:
+                cols.append(("%s.%i" % (key, id), key, id))
+                units.append(_unitText(available[key]))
+        else:
+            cols.append((key, key, None))
+            units.append(_unitText(available[key]))
+    return cols, units
+
+
+def _float(value):
+    """Convert a property value to float, nan for undefined values"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return nan
+
+
+def streamValues(corriente, cols):
+    """Values of the output columns for a stream, the properties not
+    available in stream, i.e. a not solved stream, are nan, and the
+    components not present in stream have zero composition
+
+    Parameters
+    ----------
+    corriente : Corriente
+        Stream
+    cols : list
+        Output columns, as returned by columns
+
+    Returns
+    -------
+    values : list
+        Values of columns, floats except for text properties
+    """
+    ids = getattr(corriente, "ids", None) or []
+    cache = {}
+    values = []
+    for name, key, id in cols:
+        if key not in cache:
+            cache[key] = getattr(corriente, key, None)
+        value = cache[key]
+        if id is None:
+            if isinstance(value, str):
+                values.append(value)
+            else:
+                values.append(_float(value))
+        elif value is None:
+            values.append(nan)
+        elif id in ids:
+            values.append(_float(value[ids.index(id)]))
+        else:
+            values.append(0.)
+    return values
+
+
+class JSONLWriter(object):
+    """Incremental JSON Lines output, a JSON object for each stream with its
+    id and the columns values, undefined values are saved as null"""
+
+    def __init__(self, filename, cols, units):
+        self.columns = [col[0] for col in cols]
+        self.rows = 0
+        self._file = open(filename, "w")
+
+    def write(self, id, values):
+        """Append a stream"""
+        record = {"id": id}
+        for name, value in zip(self.columns, values):
+            if value != value:
+                value = None
+            record[name] = value
+        self._file.write(json.dumps(record)+"\n")
+        self.rows += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class CSVWriter(object):
+    """Incremental csv output, with a header row with the column names and
+    units"""
+
+    def __init__(self, filename, cols, units, delimiter=","):
+        self.rows = 0
+        self._file = open(filename, "w", newline="")
+        self._writer = csv.writer(self._file, delimiter=delimiter)
+        header = ["id"]
+        for (name, key, id), unit in zip(cols, units):
+            if unit:
+                name = "%s [%s]" % (name, unit)
+            header.append(name)
+        self._writer.writerow(header)
+
+    def write(self, id, values):
+        """Append a stream"""
+        row = [id]
+        for value in values:
+            if isinstance(value, float):
+                value = "%r" % value
+            row.append(value)
+        self._writer.writerow(row)
+        self.rows += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ColumnarWriter(object):
+    """Incremental columnar binary output
+
+    The output is a folder with a raw little-endian float64 file for each
+    column, <column>.f8, a id.txt file with the stream ids, one by line, and
+    a columns.json file with the row count, the columns and its units. It can
+    be load with readColumnar. The rows are buffered in chunks of CHUNKSIZE,
+    only numeric properties can be saved"""
+
+    def __init__(self, path, cols, units, chunksize=CHUNKSIZE):
+        self.path = path
+        self.columns = [col[0] for col in cols]
+        self.units = units
+        self.rows = 0
+        for (name, key, id), unit in zip(cols, units):
+            if not unit:
+                raise ValueError(
+                    "Text property %s not supported in columnar format" % key)
+
+        os.makedirs(path, exist_ok=True)
+        self._buffer = empty((chunksize, len(self.columns)), dtype=float64)
+        self._n = 0
+        self._ids = open(os.path.join(path, "id.txt"), "w")
+        self._files = []
+        for name in self.columns:
+            self._files.append(open(os.path.join(path, name+".f8"), "wb"))
+
+    def write(self, id, values):
+        """Append a stream"""
+        self._ids.write("%s\n" % id)
+        self._buffer[self._n] = values
+        self._n += 1
+        self.rows += 1
+        if self._n == len(self._buffer):
+            self._flush()
+
+    def _flush(self):
+        for i, archivo in enumerate(self._files):
+            self._buffer[:self._n, i].astype("<f8").tofile(archivo)
+        self._n = 0
+
+    def close(self):
+        self._flush()
+        self._ids.close()
+        for archivo in self._files:
+            archivo.close()
+        index = {"rows": self.rows,
+                 "columns": self.columns,
+                 "units": dict(zip(self.columns, self.units))}
+        with open(os.path.join(self.path, "columns.json"), "w") as archivo:
+            json.dump(index, archivo, indent=4)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def readColumnar(path):
+    """Load a columnar output as memory mapped arrays
+    return:
+        dict with the column arrays, and the stream ids list as id"""
+    with open(os.path.join(path, "columns.json")) as archivo:
+        index = json.load(archivo)
+    with open(os.path.join(path, "id.txt")) as archivo:
+        data = {"id": archivo.read().splitlines()}
+    for key in index["columns"]:
+        if index["rows"]:
+            data[key] = memmap(os.path.join(path, key+".f8"), dtype="<f8",
+                               mode="r", shape=(index["rows"], ))
+        else:
+            data[key] = array([], dtype=float64)
+    return data
+
+
+WRITERS = {"jsonl": JSONLWriter,
+           "csv": CSVWriter,
+           "columnar": ColumnarWriter}
+
+
+def projectRecords(project):
+    """Iterate over the streams of project, in order of stream index, the
+    stream id is saved as s<index>"""
+    for key in sorted(project.streams):
+        yield "s%i" % key, project.streams[key][4]
+
+
+def export(records, output, fmt="jsonl", properties=PROPERTIES, ids=None,
+           lookahead=LOOKAHEAD):
+    """Write stream results to file, the streams are consumed one by one
+    so the memory use is bounded with any number of streams
+
+    Parameters
+    ----------
+    records : iterable
+        Iterable of tuples (id, Corriente), can be a generator
+    output : str
+        Output file for jsonl and csv format, or folder for columnar format
+    fmt : str
+        Output format, jsonl, csv or columnar
+    properties : list
+        Keys of stream properties to save, from Corriente.propertiesNames()
+    ids : list
+        Components saved in the composition properties, default the
+        components of first stream with components defined, the streams
+        before it are held in memory until it's found
+    lookahead : int
+        Maximum number of streams held searching the components, if none
+        of them has components a ValueError is raised, the ids must be
+        defined for iterables with many unsolved streams at start
+
+    Returns
+    -------
+    rows : int
+        Number of streams written
+
+    The unsolved streams are written with undefined values
+
+    >>> import os
+    >>> import tempfile
+    >>> folder = tempfile.mkdtemp()
+    >>> kw = {"ids": [62], "fraccionMolar": [1.]}
+    >>> solved = Corriente(T=300, P=101325, caudalMasico=1, **kw)
+    >>> records = [("s1", Corriente()), ("s2", solved)]
+    >>> prop = ("T", "fraccion")
+    >>> export(records, os.path.join(folder, "out.jsonl"), "jsonl", prop)
+    2
+    >>> with open(os.path.join(folder, "out.jsonl")) as archivo:
+    ...     for line in archivo:
+    ...         print(sorted(json.loads(line).items()))
+    [('T', None), ('fraccion.62', None), ('id', 's1')]
+    [('T', 300.0), ('fraccion.62', 1.0), ('id', 's2')]
+    >>> export(records, os.path.join(folder, "out.csv"), "csv", prop)
+    2
+    >>> with open(os.path.join(folder, "out.csv")) as archivo:
+    ...     print(archivo.read().strip())
+    id,T [K],fraccion.62 [-]
+    s1,nan,nan
+    s2,300.0,1.0
+    >>> export(records, os.path.join(folder, "out"), "columnar", prop)
+    2
+    >>> data = readColumnar(os.path.join(folder, "out"))
+    >>> print(data["id"], list(data["T"]), list(data["fraccion.62"]))
+    ['s1', 's2'] [nan, 300.0] [nan, 1.0]
+
+    >>> unsolved = (("s%i" % i, Corriente()) for i in range(5))
+    >>> export(unsolved, os.path.join(folder, "out.csv"), "csv", prop,
+    ...        lookahead=3)
+    Traceback (most recent call last):
+        ...
+    ValueError: No stream with components in the first 3 streams, define \
+the ids of components
+    """
+    if fmt not in WRITERS:
+        raise ValueError("Unsupported format %s" % fmt)
+
+    records = iter(records)
+    if ids is None and not any(key in VECTOR for key in properties):
+        # Without composition properties the components aren't needed
+        ids = []
+    if ids is None:
+        # The unsolved streams have no components, search the first stream
+        # with components to define the composition columns
+        previous = []
+        for record in records:
+            previous.append(record)
+            ids = list(getattr(record[1], "ids", None) or [])
+            if ids:
+                break
+            if len(previous) == lookahead:
+                raise ValueError(
+                    "No stream with components in the first %i streams, "
+                    "define the ids of components" % lookahead)
+        records = chain(previous, records)
+
+    cols, units = columns(properties, ids)
+    with WRITERS[fmt](output, cols, units) as writer:
+        for id, corriente in records:
+            writer.write(id, streamValues(corriente, cols))
+    return writer.rows
+
+
+def exportProject(project, output, fmt="jsonl", properties=PROPERTIES):
+    """Write the results of all streams of a project, the composition columns
+    include all the components used in project"""
+    ids = []
+    for id, corriente in projectRecords(project):
+        for cmp in getattr(corriente, "ids", None) or []:
+            if cmp not in ids:
+                ids.append(cmp)
+    return export(projectRecords(project), output, fmt, properties, ids)
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
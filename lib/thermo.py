@@ -72,6 +72,50 @@ class Thermo(object):
     def calculo(self):
         pass
 
+    def __getattr__(self, name):
+        """Calculate in the first access the properties defined as lazy"""
+        lazy = self.__dict__.get("_lazy")
+        if lazy and name in lazy:
+            value = lazy.pop(name)()
+            setattr(self, name, value)
+            return value
+        raise AttributeError("'%s' object has no attribute '%s'" % (
+            self.__class__.__name__, name))
+
+    def __getstate__(self):
+        """Calculate the pending lazy properties before pickle or copy the
+        instance, the functions used to define them can't be serialized
+
+        >>> import pickle
+        >>> from lib.mEoS import H2O
+        >>> st = pickle.loads(pickle.dumps(H2O(T=300, P=1e6, lazy=True)))
+        >>> "%0.4f %0.4f" % (st.Liquido.cp.kJkgK, st.Liquido.mu.mPas)
+        '4.1781 0.8537'
+        >>> "_lazy" in st.Liquido.__dict__
+        False
+        """
+        for name in list(self.__dict__.get("_lazy", {})):
+            getattr(self, name)
+        state = self.__dict__.copy()
+        state.pop("_lazy", None)
+        return state
+
+    def setLazy(self, prop, lazy=False):
+        """Define the derived properties of phase
+        prop: dict with the functions to calculate each property, in order
+            of dependence
+        lazy: boolean to delay the calculation to the first access of each
+            property, else all are calculated now"""
+        if lazy:
+            # Remove the values of a previous calculation
+            for key in prop:
+                self.__dict__.pop(key, None)
+            self._lazy = prop
+        else:
+            self._lazy = {}
+            for key, function in prop.items():
+                setattr(self, key, function())
+
     def _cp0(self, cp0):
         "Set ideal properties to state"""
         self.v0 = unidades.SpecificVolume(cp0["v"])
@@ -27,7 +27,7 @@ import os
 from matplotlib import image
 from PyQt5 import QtGui, QtWidgets
 
-from scipy import arange, arctan, logspace, pi
+from numpy import arange, arctan, array, logspace, pi
 
 from lib.plot import mpl
 from lib.heatTransfer import (efectividad, TemperatureEffectiveness,
@@ -176,10 +176,8 @@ class Efectividad(Chart):
         C = [0, 0.2, 0.4, 0.6, 0.8, 1.]
 
         NTU = arange(0, 6.1, 0.1)
-        for ci in C:
-            e = [0]
-            for N in NTU[1:]:
-                e.append(efectividad(N, ci, flujo, **kw))
+        E = efectividad(NTU, array(C)[:, None], flujo, **kw)
+        for ci, e in zip(C, E):
             self.diagrama.plot(NTU, e, "k")
 
             fraccionx = (NTU[40]-NTU[30])/6
@@ -253,8 +251,8 @@ class TemperatureEfectividad(Chart):
              2., 2.5, 3., 4., 6., 8., 10., 15.]
 
         NTU = logspace(-1.5, 1, 100)
-        for ri in R:
-            e = [0]+[TemperatureEffectiveness(N, ri, flujo, **kwargs) for N in NTU[1:]]
+        E = TemperatureEffectiveness(NTU, array(R)[:, None], flujo, **kwargs)
+        for ri, e in zip(R, E):
             self.diagrama.plot(NTU, e, "k")
             self.diagrama.ax.annotate(" R=%0.1f" % ri, (NTU[-1], e[-1]),
                                       size="medium", ha="left", va="center")
@@ -320,8 +318,8 @@ class F(Chart):
 #        R=[0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1]
 
         P = arange(0, 1.01, 0.01)
-        for ri in R:
-            f = [CorrectionFactor(p, ri, flujo, **kwargs) for p in P]
+        Fc = CorrectionFactor(P, array(R)[:, None], flujo, **kwargs)
+        for f in Fc:
             self.diagrama.plot(P, f, "k")
 
 #            fraccionx=P[90]-P[80]
@@ -368,8 +366,8 @@ class Phi(Chart):
              1.6, 1.8, 2, 2.5, 3, 4, 6, 8, 10]
 
         P = arange(0, 1.01, 0.01)
-        for ri in R:
-            f = [Fi(p, ri, flujo, **kwargs) for p in P]
+        Psi = Fi(P, array(R)[:, None], flujo, **kwargs)
+        for f in Psi:
             self.diagrama.plot(P, f, "k")
 
         NTU = [0.2, 0.4, 0.6, 0.8, 1., 1.2, 1.4, 1.6, 1.8, 2.0, 2.5, 3.]
@@ -24,7 +24,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 
 
 from PyQt5 import QtWidgets
-from scipy import arange
+from numpy import arange, array
 
 from UI.widgets import Entrada_con_unidades
 from lib.petro import Z_list
@@ -43,6 +43,7 @@ class Standing_Katz(QtWidgets.QDialog):
         self.metodos.addItem("Hall Yarborough")
         self.metodos.addItem("Dranchuk Abu-Kassem")
         self.metodos.addItem("Dranchuk Purvis Robinson")
+        self.metodos.addItem("Shell Oil")
         self.metodos.addItem("Beggs Brill")
         self.metodos.addItem("Sarem")
         self.metodos.addItem("Gopal")
@@ -75,15 +76,17 @@ class Standing_Katz(QtWidgets.QDialog):
         self.diagrama.config(self.Prmin.value, self.Prmax.value)
 
         try:
-            Tr = self.Tr.text().split()
-        except:
+            Tr = [float(t) for t in self.Tr.text().split(",")]
+        except ValueError:
             Tr = [1.05, 1.1, 1.15, 1.2, 1.25, 1.3, 1.35, 1.4, 1.45, 1.5, 1.6,
                   1.7, 1.8, 1.9, 2., 2.2, 2.4, 2.6, 2.8, 3.]
         Z = Z_list[indice]
 
+        # All isotherms calculated in a single array call
         P = arange(Prmin, Prmax, 0.1)
-        for Tr in Tr:
-            self.diagrama.plot(P, [Z(Tr, Pr) for Pr in P], "k")
+        Zs = Z(array(Tr)[:, None], P)
+        for z in Zs:
+            self.diagrama.plot(P, z, "k")
         title = QtWidgets.QApplication.translate("pychemqt", "Standing and Katz compressivitity factors chart for natural gas")
         self.diagrama.axes2D.set_title(title, size='12')
         self.diagrama.draw()
@@ -40,10 +40,29 @@ parser.add_argument("--debug", action="store_true",
                     help="Enable loglevel to debug, the more verbose option")
 parser.add_argument("-n", "--nosplash", action="store_true",
                     help="Don't show the splash screen at start")
+parser.add_argument("--profile-startup", action="store_true",
+                    help="Show the time spent in each startup stage and " +
+                    "module import and exit")
 parser.add_argument("projectFile", nargs="*",
                     help="Optional pychemqt project files to load at startup")
 args = parser.parse_args()
 
+# Startup instrumentation, it must be loaded before any other import
+profiler = None
+if args.profile_startup:
+    from lib.startup import StartupProfiler
+    profiler = StartupProfiler()
+    profiler.install()
+
+
+def profileStage(name):
+    """Start a new stage in startup profiling"""
+    if profiler is not None:
+        profiler.stage(name)
+
+
+profileStage("Qt application")
+
 
 # Add pychemqt folder to python path
 path = os.path.dirname(os.path.realpath(sys.argv[0]))
@@ -79,6 +98,7 @@ if qtTranslator.load("qt_" + locale, path):
 
 
 # scipy
+profileStage("Checking dependences")
 try:
     import scipy
 except ImportError as err:
@@ -87,8 +107,8 @@ except ImportError as err:
     print(msg)
     raise err
 else:
-    mayor, minor, corr = map(int, scipy.version.version.split("."))
-    if minor < 14:
+    mayor, minor = map(int, scipy.version.version.split(".")[:2])
+    if (mayor, minor) < (0, 14):
         msg = QtWidgets.QApplication.translate(
             "pychemqt",
             "Your version of scipy is too old, you must update it.")
@@ -103,8 +123,8 @@ except ImportError as err:
     print(msg)
     raise err
 else:
-    mayor, minor, corr = map(int, numpy.version.version.split("."))
-    if mayor < 1 or minor < 8:
+    mayor, minor = map(int, numpy.version.version.split(".")[:2])
+    if (mayor, minor) < (1, 8):
         msg = QtWidgets.QApplication.translate(
             "pychemqt",
             "Your version of numpy is too old, you must update it.")
@@ -170,6 +190,7 @@ for module, use in optional_modules:
 
 
 # Logging configuration
+profileStage("Logging configuration")
 if args.debug:
     loglevel = "DEBUG"
 else:
@@ -202,6 +223,7 @@ class SplashScreen(QtWidgets.QSplashScreen):
 
     def showMessage(self, msg):
         """Procedure to update message in splash"""
+        profileStage(msg)
         align = QtCore.Qt.Alignment(QtCore.Qt.AlignBottom |
                                     QtCore.Qt.AlignRight |
                                     QtCore.Qt.AlignAbsolute)
@@ -282,20 +304,20 @@ splash.showMessage(QtWidgets.QApplication.translate(
     "pychemqt", "Checking custom database..."))
 if not os.path.isfile(conf_dir + "databank.db"):
     firstrun.createDatabase(conf_dir + "databank.db")
+databank = os.path.join(os.environ["pychemqt"], "dat", "databank.db")
+if not firstrun.checkIndex(conf_dir + "databank_index.db", databank):
+    firstrun.createIndex(conf_dir + "databank_index.db", databank,
+                         conf_dir + "databank.db")
 
 # Import internal libraries
 splash.showMessage(QtWidgets.QApplication.translate(
     "pychemqt", "Importing libraries..."))
-from lib import *  # noqa
-from UI import *  # noqa
-from equipment import UI_equipments, equipments  # noqa
-from tools import *  # noqa
-from plots import *  # noqa
+# The equipment graphical interfaces and the tools are imported in first use
+from UI.mainWindow import UI_pychemqt  # noqa
 
 # Load main program UI
 splash.showMessage(QtWidgets.QApplication.translate(
     "pychemqt", "Loading main window..."))
-from UI.mainWindow import UI_pychemqt  # noqa
 pychemqt = UI_pychemqt()
 
 # Load project files, opened in last pychemqt session and/or specified in
@@ -326,6 +348,16 @@ def exceptfunction(error, msg, traceback):
 sys.excepthook = exceptfunction  # noqa
 
 # Finish splash and start qt main loop
+profileStage("Showing main window")
 pychemqt.show()
 splash.finish(pychemqt)
+
+if profiler is not None:
+    app.processEvents()
+    profiler.finish()
+    report = profiler.report()
+    logging.info(report)
+    print(report)
+    sys.exit(0)
+
 sys.exit(app.exec_())
@@ -78,7 +78,8 @@ from numpy import (arange, append, concatenate, linspace,
 from scipy.optimize import fsolve
 from matplotlib.font_manager import FontProperties
 
-from lib import meos, mEoS, coolProp, refProp, unidades, plot, config
+from lib import (meos, mEoS, coolProp, refProp, unidades, plot, config,
+                 meosCache)
 from lib.thermo import ThermoAdvanced
 from lib.utilities import representacion, exportTable, formatLine
 from tools.codeEditor import SimplePythonEditor
@@ -519,7 +520,7 @@ class plugin(object):
         z: property for axis z, optional to 3D plot"""
         index = self.config.getint("MEoS", "fluid")
         fluid = mEoS.__all__[index]
-        filename = "%s.pkl" % (fluid.formula)
+        filename = self._plotKey(fluid)
 
         if z:
             title = QtWidgets.QApplication.translate(
@@ -529,7 +530,8 @@ class plugin(object):
             title = QtWidgets.QApplication.translate(
                 "pychemqt", "Plot %s: %s=f(%s)" % (fluid.formula, y, x))
             dim = 2
-        grafico = PlotMEoS(dim=dim, parent=self.parent(), filename=filename)
+        grafico = PlotMEoS(dim=dim, parent=self.parent(), filename=filename,
+                           legacy="%s.pkl" % fluid.formula)
         grafico.setWindowTitle(title)
         grafico.x = x
         grafico.y = y
@@ -553,7 +555,7 @@ class plugin(object):
         self.parent().statusbar.showMessage(QtWidgets.QApplication.translate(
             "pychemqt", "Loading cached data..."))
         QtWidgets.QApplication.processEvents()
-        data = grafico._getData()
+        data = grafico._getData(mutable=False)
         if not data:
             self.parent().progressBar.setValue(0)
             self.parent().progressBar.setVisible(True)
@@ -601,6 +603,28 @@ class plugin(object):
         grafico.show()
         self.parent().statusbar.clearMessage()
 
+    def _plotKey(self, fluid):
+        """Return the key of plot dataset in cache, it depend of fluid, the
+        equations used, reference state, isolines and points definition"""
+        Preferences = self.parent().Preferences
+        reference = None
+        if self.config.has_option("MEoS", "reference"):
+            reference = [self.config.get("MEoS", "reference")]
+            for opt in ("Tref", "Pref", "ho", "so"):
+                reference.append(self.config.get("MEoS", opt))
+
+        lines = {}
+        lines["Isoquality"] = self.LineList("Isoquality", Preferences)
+        for name in ("Isotherm", "Isobar", "Isochor", "Isoenthalpic",
+                     "Isoentropic"):
+            lines[name] = self.LineList(name, Preferences, fluid)
+
+        return meosCache.cacheKey(
+            fluid, self.config.getint("MEoS", "eq"),
+            self.config.getint("MEoS", "visco"),
+            self.config.getint("MEoS", "thermal"), reference, lines,
+            get_points(Preferences))
+
     def calculatePlot(self, fluid):
         """Calculate data for plot
             fluid: class of meos fluid to calculate"""
@@ -3499,18 +3523,29 @@ class AddPoint(QtWidgets.QDialog):
 # Plot data
 class PlotMEoS(QtWidgets.QWidget):
     """Plot widget to show meos plot data, add context menu options"""
-    def __init__(self, dim, toolbar=False, filename="", parent=None):
+    def __init__(self, dim, toolbar=False, filename="", legacy="",
+                 parent=None):
         """constructor
         Input:
             dim: dimension of plot, | 2 | 3
             toolbar: boolean to add the matplotlib toolbar
-            filename: filename for data
+            filename: key of data in cache
+            legacy: name of pickle data file used in older versions
         """
         super(PlotMEoS, self).__init__(parent)
         self.parent = parent
         self.dim = dim
         self.filename = filename
+        self.legacy = legacy
         self.notes = []
+        size = self.parent.Preferences.getint(
+            "MEOS", "cacheSize", fallback=meosCache.CACHE_SIZE)
+        self.cache = meosCache.PlotCache(size=size)
+
+        # The dataset is edited in place while the window is open, so it
+        # can't be evicted of cache by other plots until it's closed
+        self.cache.hold(filename)
+        self.destroyed.connect(partial(self.cache.release, filename))
 
         layout = QtWidgets.QVBoxLayout(self)
         self.plot = plot.matplotlib(dim)
@@ -3627,27 +3662,34 @@ class PlotMEoS(QtWidgets.QWidget):
         self.parent.centralwidget.currentWidget().addSubWindow(tabla)
         tabla.show()
 
-    def _getData(self):
-        """Get data from file"""
+    def _getData(self, mutable=True):
+        """Get data from cache
+        mutable: return data as lists to let edit it, else the data are
+        memory mapped from disk, faster for plotting only"""
+        if self.filename in self.cache:
+            return self.cache.get(self.filename, mutable)
+
+        # Legacy pickle data files, named by fluid formula, migrated to cache
+        # with the new key at first use
+        if not self.legacy:
+            return None
         filenameHard = os.environ["pychemqt"]+"dat"+os.sep+"mEoS" + \
-            os.sep + self.filename+".gz"
-        filenameSoft = config.conf_dir+self.filename
+            os.sep + self.legacy+".gz"
+        filenameSoft = config.conf_dir+self.legacy
         if os.path.isfile(filenameSoft):
-            print(filenameSoft)
             with open(filenameSoft, "rb") as archivo:
                 data = pickle.load(archivo, fix_imports=False, errors="strict")
+            self._saveData(data)
             return data
         elif os.path.isfile(filenameHard):
-            print(filenameHard)
             with gzip.GzipFile(filenameHard, 'rb') as archivo:
                 data = pickle.load(archivo, encoding="latin1")
             self._saveData(data)
             return data
 
     def _saveData(self, data):
-        """Save changes in data to file"""
-        with open(config.conf_dir+self.filename, 'wb') as file:
-            pickle.dump(data, file)
+        """Save changes in data to cache"""
+        self.cache.set(self.filename, data)
 
     def click(self, event):
         """Update input and graph annotate when mouse click over chart"""
@@ -3756,7 +3798,12 @@ class PlotMEoS(QtWidgets.QWidget):
             dim = 3
         else:
             dim = 2
-        grafico = PlotMEoS(dim=dim, parent=parent, filename=filename)
+        # Project files from older versions save the legacy pickle name
+        legacy = ""
+        if filename.endswith(".pkl"):
+            legacy = filename
+        grafico = PlotMEoS(dim=dim, parent=parent, filename=filename,
+                           legacy=legacy)
         grafico.x = x
         grafico.y = y
         grafico.z = z
@@ -3809,7 +3856,7 @@ class PlotMEoS(QtWidgets.QWidget):
             zmax = stream.readFloat()
             grafico.plot.ax.set_zlim(zmin, zmax)
 
-        data = grafico._getData()
+        data = grafico._getData(mutable=False)
         if z:
             plot2D3D(grafico, data, parent.Preferences, x, y, z)
         else:
@@ -100,23 +100,14 @@ class UI_databank_widget(QtWidgets.QWidget):
     def rellenar(self):
         """Fill in list with component from database"""
         self.BaseDatos.setRowCount(0)
-        sql.databank.execute("select * from compuestos")
-        for i in sql.databank:
-            self.BaseDatos.setRowCount(self.BaseDatos.rowCount()+1)
-            self.BaseDatos.setItem(
-                i[0]-1, 0, QtWidgets.QTableWidgetItem(str(i[0])))
-            self.BaseDatos.setItem(i[0]-1, 1, QtWidgets.QTableWidgetItem(i[2]))
-            self.BaseDatos.setItem(i[0]-1, 2, QtWidgets.QTableWidgetItem(i[1]))
-            self.BaseDatos.setRowHeight(self.BaseDatos.rowCount()-1, 20)
-
-        sql.databank_Custom.execute("select * from compuestos")
-        for i in sql.databank_Custom:
+        columns = ("nombre", "formula")
+        for i in sql.getDatabank().components(columns):
             filas = self.BaseDatos.rowCount()
             self.BaseDatos.setRowCount(filas+1)
             self.BaseDatos.setItem(
                 filas, 0, QtWidgets.QTableWidgetItem(str(i[0])))
-            self.BaseDatos.setItem(filas, 1, QtWidgets.QTableWidgetItem(i[2]))
-            self.BaseDatos.setItem(filas, 2, QtWidgets.QTableWidgetItem(i[1]))
+            self.BaseDatos.setItem(filas, 1, QtWidgets.QTableWidgetItem(i[1]))
+            self.BaseDatos.setItem(filas, 2, QtWidgets.QTableWidgetItem(i[2]))
             self.BaseDatos.setRowHeight(self.BaseDatos.rowCount()-1, 20)
 
         self.BaseDatos.resizeColumnsToContents()
@@ -124,14 +115,16 @@ class UI_databank_widget(QtWidgets.QWidget):
     def buscar(self):
         """Search str at database"""
         self.indice = 0
-        texto = "%"+self.Busqueda.text()+"%"
-        query = "select * from compuestos where "
-        query += "nombre LIKE '%s' or formula LIKE '%s'" % (texto, texto)
-        sql.databank.execute(query)
-        self.correctos = []
-        for i in sql.databank:
-            self.correctos.append(i[0])
-        self.BaseDatos.setCurrentCell(self.correctos[self.indice]-1, 0)
+        self.correctos = sql.getSearchIndex().search(self.Busqueda.text())
+        if self.correctos:
+            self.BaseDatos.setCurrentCell(self._row(self.correctos[0]), 0)
+
+    def _row(self, indice):
+        """Row of table of component with indice, the custom databank
+        components are after the bundled"""
+        if indice > sql.CUSTOM:
+            return sql.N_comp+indice-sql.CUSTOM-1
+        return indice-1
 
     def Next(self):
         """Show next coincidence with search string"""
@@ -139,7 +132,9 @@ class UI_databank_widget(QtWidgets.QWidget):
             self.indice += 1
         else:
             self.indice = 0
-        self.BaseDatos.setCurrentCell(self.correctos[self.indice]-1, 0)
+        if self.correctos:
+            self.BaseDatos.setCurrentCell(
+                self._row(self.correctos[self.indice]), 0)
 
     def checkButton(self, indice):
         """Edit action are only available in custom database elements"""
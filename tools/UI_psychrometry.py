@@ -28,6 +28,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 
 from configparser import ConfigParser
 from functools import partial
+import hashlib
 import logging
 import os
 import pickle
@@ -35,7 +36,8 @@ import pickle
 from PyQt5 import QtCore, QtGui, QtWidgets
 from scipy import pi, arctan
 
-from lib.psycrometry import PsyState, PsychroState, _Pbar, _height
+from lib.psyArray import _Pbar, _height
+from lib.psycrometry import PsyState, PsychroState
 from lib.config import conf_dir
 from lib.plot import mpl
 from lib.unidades import (Temperature, Pressure, Length, Mass,
@@ -387,14 +389,24 @@ class UI_Psychrometry(QtWidgets.QDialog):
             self.plt.ax.annotate(label, (t[p], W[p]), rotation=rot,
                                  size="small", ha="center", va="center")
 
+    def _linesKey(self):
+        """Return a short hash of isolines definition, the cached chart data
+        depend of pressure and the isolines calculated"""
+        lines = []
+        for name in ("isotdb", "isow", "isohr", "isotwb", "isochor"):
+            lines.append([float(v) for v in PsyState.LineList(
+                name, self.Preferences)])
+        return hashlib.md5(repr(lines).encode("utf-8")).hexdigest()[:8]
+
     def plot(self):
         """Plot chart"""
         self.plt.clearPointData()
         self.plt.ax.clear()
         chart = self.Preferences.getboolean("Psychr", "chart")
         self.plt.config(self.Preferences)
-        filename = conf_dir+"%s_%i.pkl" % (
-            PsychroState().__class__.__name__, self.inputs.P.value)
+        filename = conf_dir+"%s_%i_%s.pkl" % (
+            PsychroState().__class__.__name__, self.inputs.P.value,
+            self._linesKey())
         if os.path.isfile(filename):
             with open(filename, "rb") as archivo:
                 data = pickle.load(archivo)
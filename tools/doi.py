@@ -27,19 +27,6 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 from lib import meos, mEoS
 from equipment import equipments
 
-objects = inspect.getmembers(mEoS)
-
-for nombre, objeto in objects:
-    if inspect.isclass(objeto):
-        functions = inspect.getmembers(objeto)
-#        print objeto, functions
-        for name, function in functions:
-            inspect.getdoc(function)
-#            print inspect.getdoc(function)
-
-# print os.path.curdir
-# print glob.glob(os.path.curdir+"/*/*.py")
-
 
 class ShowReference(QtWidgets.QDialog):
     def __init__(self, parent=None):
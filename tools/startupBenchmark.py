@@ -0,0 +1,93 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2016, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Startup time benchmark, to use in continuous integration
+#
+#   Run pychemqt several times with the --profile-startup option, without
+#   display and splash screen, and fail if the best startup time is over the
+#   budget:
+#       python3 tools/startupBenchmark.py --budget 3 --runs 5
+#
+#   The exit status is 0 if the budget is met, 1 if it's exceeded and 2 if
+#   pychemqt can't start
+###############################################################################
+
+
+import argparse
+import os
+import subprocess
+import sys
+
+path = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.insert(0, path)
+from lib.startup import parseTotal  # noqa
+
+
+# Default startup time budget, [s]
+BUDGET = 3.0
+
+
+def run():
+    """Run pychemqt once and return its startup profile report"""
+    env = os.environ.copy()
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    cmd = [sys.executable, os.path.join(path, "pychemqt.py"),
+           "--profile-startup", "--nosplash"]
+    proc = subprocess.run(cmd, env=env, stdout=subprocess.PIPE,
+                          stderr=subprocess.STDOUT, universal_newlines=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stdout)
+    return proc.stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pychemqt startup budget")
+    parser.add_argument("--budget", type=float, default=BUDGET,
+                        help="Maximum startup time, [s]")
+    parser.add_argument("--runs", type=int, default=3,
+                        help="Number of runs, the best time is used")
+    args = parser.parse_args()
+
+    results = []
+    for i in range(args.runs):
+        try:
+            report = run()
+        except RuntimeError as error:
+            print("pychemqt failed to start:\n%s" % error)
+            return 2
+        total = parseTotal(report)
+        if total is None:
+            print("Startup report not found:\n%s" % report)
+            return 2
+        print("Run %i: %0.3f s" % (i+1, total))
+        results.append((total, report))
+
+    best, report = min(results)
+    if best > args.budget:
+        print("Startup time %0.3f s over budget %0.3f s" % (best, args.budget))
+        print(report[report.index("Startup time"):])
+        return 1
+    print("Startup time %0.3f s within budget %0.3f s" % (best, args.budget))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())